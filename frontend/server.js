@@ -4,12 +4,16 @@
  * Simple Express server for TokCollate Frontend
  * Serves the built frontend and provides an API to load local files
  * NPZ files are automatically parsed using Python and served as JSON
+ *
+ * If TOKCOLLATE_RESULTS_SERVER is set (e.g. http://127.0.0.1:8050), dataset and NPZ parsing requests are proxied
+ * to a long-lived `tokcollate serve` instance instead of spawning a Python interpreter per request.
  */
 
 const express = require('express');
 const fs = require('fs');
 const path = require('path');
 const cors = require('cors');
+const http = require('http');
 const { execSync, execFileSync } = require('child_process');
 
 const app = express();
@@ -95,6 +99,43 @@ function scanDatasets() {
   return datasets;
 }
 
+// Optional persistent Python results server (`tokcollate serve`)
+const RESULTS_SERVER = process.env.TOKCOLLATE_RESULTS_SERVER || null;
+if (RESULTS_SERVER) {
+  console.log(`[Server] Proxying dataset requests to ${RESULTS_SERVER}`);
+}
+
+// Helper function to forward a request to the results server.
+// Resolves to false (without sending anything) when the results server is unreachable,
+// so the caller can fall back to the spawn-based NPZ parsing.
+function proxyToResultsServer(req, res, targetPath, body) {
+  return new Promise((resolve) => {
+    const target = new URL(targetPath, RESULTS_SERVER);
+    const headers = {};
+    if (req.headers['if-none-match']) headers['If-None-Match'] = req.headers['if-none-match'];
+    if (req.headers['accept']) headers['Accept'] = req.headers['accept'];
+    if (body) {
+      headers['Content-Type'] = 'application/octet-stream';
+      headers['Content-Length'] = body.length;
+    }
+
+    const proxyReq = http.request(target, { method: req.method, headers }, (proxyRes) => {
+      res.status(proxyRes.statusCode);
+      for (const name of ['content-type', 'etag', 'cache-control']) {
+        if (proxyRes.headers[name]) res.setHeader(name, proxyRes.headers[name]);
+      }
+      proxyRes.pipe(res);
+      proxyRes.on('end', () => resolve(true));
+    });
+    proxyReq.on('error', (e) => {
+      console.warn('[Proxy] Results server unavailable, falling back to local parsing:', e.message);
+      resolve(false);
+    });
+    if (body) proxyReq.write(body);
+    proxyReq.end();
+  });
+}
+
 // Helper function to parse NPZ files using Python
 function parseNPZWithPython(filePath) {
   const pythonScript = `
@@ -325,8 +366,11 @@ app.get('/api/datasets', (req, res) => {
 });
 
 // Load a specific dataset (metadata + results.npz + optional languages_info)
-app.get('/api/datasets/:id', (req, res) => {
+app.get('/api/datasets/:id', async (req, res) => {
   const id = req.params.id;
+  if (RESULTS_SERVER && await proxyToResultsServer(req, res, `/api/datasets/${encodeURIComponent(id)}`)) {
+    return;
+  }
   const dirPath = path.join(DATA_ROOT, id);
   const metadataPath = path.join(dirPath, 'metadata.json');
   const resultsPath = path.join(dirPath, 'results.npz');
@@ -372,18 +416,35 @@ app.get('/api/datasets/:id', (req, res) => {
   }
 });
 
+// Result slices (per metric, system and language) are only available from the results server
+app.get('/api/datasets/:id/metrics/:key?', async (req, res) => {
+  if (!RESULTS_SERVER) {
+    return res.status(501).json({ error: 'Metric slices require TOKCOLLATE_RESULTS_SERVER to be set' });
+  }
+  const query = req.originalUrl.includes('?') ? req.originalUrl.slice(req.originalUrl.indexOf('?')) : '';
+  const key = req.params.key ? `/${encodeURIComponent(req.params.key)}` : '';
+  const targetPath = `/api/datasets/${encodeURIComponent(req.params.id)}/metrics${key}${query}`;
+  if (!(await proxyToResultsServer(req, res, targetPath))) {
+    res.status(502).json({ error: 'Results server unavailable' });
+  }
+});
+
 // Health check endpoint
 app.get('/api/health', (req, res) => {
   res.json({ status: 'ok' });
 });
 
 // Endpoint to parse NPZ files uploaded as binary
-app.post('/api/parse-npz', express.raw({ type: 'application/octet-stream', limit: '100mb' }), (req, res) => {
+app.post('/api/parse-npz', express.raw({ type: 'application/octet-stream', limit: '100mb' }), async (req, res) => {
   try {
     if (!req.body || req.body.length === 0) {
       return res.status(400).json({ error: 'No file data provided' });
     }
 
+    if (RESULTS_SERVER && await proxyToResultsServer(req, res, '/api/parse-npz', req.body)) {
+      return;
+    }
+
     // req.body is a Buffer when using express.raw()
     const buffer = Buffer.isBuffer(req.body) ? req.body : Buffer.from(req.body);
     
@@ -1,13 +1,13 @@
 #!/usr/bin/env python3
+import argparse
 import csv
 import json
 import logging
-import time
 from io import StringIO
 from pathlib import Path
 from typing import Any
 
-import requests
+from tokcollate.fetch import Fetcher
 
 """Collect language data from FLORES, Wikidata, and Glottolog APIs.
 
@@ -22,6 +22,9 @@ MORPHOLOGY_TYPES_N_COLS = 3
 FLORES_LANGUAGES_N_COLS = 4
 RESPONSE_SUCCESS_CODE = 200
 
+# maximum number of requests per second of the queried hosts
+RATE_LIMITS = {"query.wikidata.org": 1.0, "glottolog.org": 10.0, "raw.githubusercontent.com": 5.0}
+
 
 # Configure logging with date and time
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
@@ -123,13 +126,14 @@ def load_flores_languages(tsv_path: Path) -> dict[str, dict[str, str | set]]:
     return languages
 
 
-def get_wikidata_info(iso_codes: list[str]) -> list[str]:
+def get_wikidata_info(iso_codes: list[str], fetcher: Fetcher) -> list[str]:
     """Query Wikidata for language info using ISO 639-3 codes"""
 
     endpoint = "https://query.wikidata.org/sparql"
 
     batch_size = 50
     all_results = []
+    requests = []
 
     for i in range(0, len(iso_codes), batch_size):
         batch = iso_codes[i : i + batch_size]
@@ -155,35 +159,33 @@ def get_wikidata_info(iso_codes: list[str]) -> list[str]:
         }}
         """
 
-        response = requests.get(
-            endpoint, params={"query": query, "format": "json"}, headers={"User-Agent": "LanguageDataBot/1.0"}
-        )
+        requests.append((endpoint, {"query": query, "format": "json"}))
 
-        if response.status_code == RESPONSE_SUCCESS_CODE:
+    for i, response in enumerate(fetcher.get_many(requests, return_exceptions=True)):
+        if isinstance(response, Exception):
+            logging.error("Error on batch %i: %s", i * batch_size, response)
+        elif response.status_code == RESPONSE_SUCCESS_CODE:
             data = response.json()
             all_results.extend(data["results"]["bindings"])
         else:
-            logging.error("Error on batch %i: %i", i, response.status_code)
-
-        time.sleep(1)
+            logging.error("Error on batch %i: %i", i * batch_size, response.status_code)
 
     return all_results
 
 
-def get_glottolog_families(glottocodes: list[str]) -> dict[str, str | None]:
+def get_glottolog_families(glottocodes: list[str], fetcher: Fetcher) -> dict[str, str | None]:
     """Query Glottolog API for language family information using glottocodes"""
 
     families = {}
+    glottocodes = [glottocode for glottocode in glottocodes if glottocode]
+    urls = [f"https://glottolog.org/resource/languoid/id/{glottocode}.json" for glottocode in glottocodes]
 
-    for glottocode in glottocodes:
-        if not glottocode:
+    for glottocode, response in zip(glottocodes, fetcher.get_many(urls, return_exceptions=True), strict=True):
+        if isinstance(response, Exception):
+            logging.error("Exception fetching Glottolog data for %s: %s", glottocode, response)
+            families[glottocode] = None
             continue
-
-        url = f"https://glottolog.org/resource/languoid/id/{glottocode}.json"
-
         try:
-            response = requests.get(url, headers={"User-Agent": "LanguageDataBot/1.0"})
-
             if response.status_code == RESPONSE_SUCCESS_CODE:
                 data = response.json()
 
@@ -202,19 +204,17 @@ def get_glottolog_families(glottocodes: list[str]) -> dict[str, str | None]:
             logging.exception("Exception fetching Glottolog data for %s:", glottocode)
             families[glottocode] = None
 
-        time.sleep(0.1)  # Be nice to the API
-
     return families
 
 
-def get_fineweb2_data() -> dict[str, int | str | None]:
+def get_fineweb2_data(fetcher: Fetcher) -> dict[str, int | str | None]:
     """Download and parse Fine Web 2 language distribution data"""
 
     url = "https://raw.githubusercontent.com/huggingface/fineweb-2/refs/heads/main/fineweb2-language-distribution.csv"
 
     try:
         logging.info("Downloading Fine Web 2 language distribution data...")
-        response = requests.get(url, headers={"User-Agent": "LanguageDataBot/1.0"})
+        response = fetcher.get(url)
 
         if response.status_code != RESPONSE_SUCCESS_CODE:
             logging.error("Error downloading Fine Web 2 data: %i", response.status_code)
@@ -363,7 +363,25 @@ def merge_wikidata_info(  # noqa: PLR0912
     return output
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Collect the language metadata (printed as JSON to stdout).")
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=Path(".cache", "language_data"),
+        help="Location of the persistent response cache.",
+    )
+    parser.add_argument("--offline", action="store_true", help="Use only the cached responses.")
+    parser.add_argument("--max-workers", type=int, default=8, help="Number of concurrent requests.")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    fetcher = Fetcher(
+        cache_dir=args.cache_dir, offline=args.offline, max_workers=args.max_workers, rate_limits=RATE_LIMITS
+    )
+
     # Load languages from FLORES TSV
     logging.info("Loading languages from flores_languages.tsv...")
     languages = load_flores_languages(Path("tokcollate/resources/language/flores_languages.tsv"))
@@ -382,7 +400,7 @@ if __name__ == "__main__":
     # Get Wikidata information
     logging.info("Querying Wikidata for additional information...")
     iso_codes = list(languages.keys())
-    wikidata_results = get_wikidata_info(iso_codes)
+    wikidata_results = get_wikidata_info(iso_codes, fetcher)
 
     # Get Glottolog family information
     logging.info("Querying Glottolog for language families...")
@@ -391,11 +409,11 @@ if __name__ == "__main__":
     for lang in languages.values():
         all_glottocodes.update(lang.get("glottocodes", set()))
     glottocodes = list(all_glottocodes)
-    glottolog_families = get_glottolog_families(glottocodes)
+    glottolog_families = get_glottolog_families(glottocodes, fetcher)
 
     # Get Fine Web 2 corpus data
-    logging.info("Fetching Fine Web 2 corpus statistics..."), morphology_types
-    fineweb_data = get_fineweb2_data()
+    logging.info("Fetching Fine Web 2 corpus statistics...")
+    fineweb_data = get_fineweb2_data(fetcher)
 
     # Merge the data
     logging.info("Merging data...")
@@ -17,3 +17,5 @@ def clear_registries(monkeypatch):  # noqa: PT004
     monkeypatch.setattr(metrics, "METRIC_REGISTRY", {})
     monkeypatch.setattr(metrics, "METRIC_INSTANCE_REGISTRY", {})
     monkeypatch.setattr(metrics, "METRIC_CLASS_NAMES", set())
+    monkeypatch.setattr(metrics, "METRIC_MANIFEST", {})
+    monkeypatch.setattr(metrics, "PLUGIN_MANIFEST", {})
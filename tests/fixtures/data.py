@@ -53,9 +53,54 @@ def foo_system_output_tiny_multilingual(input_dir, foo_text_tiny, languages):
 
 
 @pytest.fixture(scope="session")
-def foo_dataset(input_dir, foo_system_output_tiny_multilingual, languages):
+def foo_reference_multilingual(input_dir, foo_text_tiny, languages):
+    """Per-language gold segmentation of the foo text (word prefixes split from the rest of the words)."""
+    paths = []
+    Path(input_dir, "reference").mkdir()
+    segmented = "\n".join(
+        " ".join(" ".join(filter(None, [word[:2], word[2:]])) for word in line.split(" "))
+        for line in foo_text_tiny.split("\n")
+    )
+    for lang in languages:
+        paths.append(Path(input_dir, "reference", f"{lang}.txt"))
+        with open_file(paths[-1], "w") as fh:
+            print(segmented, file=fh)
+    return paths
+
+
+@pytest.fixture(scope="session")
+def foo_dataset(input_dir, foo_system_output_tiny_multilingual, foo_reference_multilingual, languages):  # noqa: ARG001
     return {
         "data_dir": input_dir,
         "systems": [str(path.parent).split("/")[-1] for path in foo_system_output_tiny_multilingual],
         "languages": languages,
     }
+
+
+@pytest.fixture()
+def foo_plaintext_dir(tmp_path, foo_text_tiny, languages):
+    """Untokenized (per-language) plaintext files."""
+    input_dir = Path(tmp_path, "plaintext")
+    input_dir.mkdir()
+    for lang in languages:
+        Path(input_dir, f"{lang}.txt").write_text(foo_text_tiny + "\n", encoding="utf-8")
+    return input_dir
+
+
+@pytest.fixture()
+def foo_vocab(foo_text_tiny):
+    """Whitespace tokenizer vocabulary of the foo text."""
+    return sorted(set(foo_text_tiny.split()))
+
+
+@pytest.fixture()
+def foo_spm_model(tmp_path, foo_text_tiny):
+    """Small SentencePiece model trained on the foo text."""
+    spm = pytest.importorskip("sentencepiece")
+    spm.SentencePieceTrainer.train(
+        sentence_iterator=iter(foo_text_tiny.split("\n") * 10),
+        model_prefix=str(tmp_path / "foo"),
+        vocab_size=40,
+        hard_vocab_limit=False,
+    )
+    return tmp_path / "foo.model"
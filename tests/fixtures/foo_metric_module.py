@@ -0,0 +1,6 @@
+from tokcollate.metrics import TokCollateMetric, register_metric
+
+
+@register_metric("foo")
+class FooLazyMetric(TokCollateMetric):
+    """Mock metric registered on import (used for testing the lazy metric loading)."""
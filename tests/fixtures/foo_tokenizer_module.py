@@ -0,0 +1,19 @@
+from attrs import define, field
+
+
+@define(kw_only=True)
+class FooWhitespaceTokenizer:
+    """Mock tokenizer splitting the lines on whitespace (used for testing the callable tokenizer backend)."""
+
+    vocab: list[str] = field(factory=list)
+
+    def encode_batch(self, lines: list[str]) -> list[list[int]]:
+        token_ids = {tok: i for i, tok in enumerate(self.vocab)}
+        return [[token_ids[tok] for tok in line.split()] for line in lines]
+
+    def get_vocab(self) -> list[str]:
+        return self.vocab
+
+
+def create_foo_tokenizer(vocab: list[str]) -> FooWhitespaceTokenizer:
+    return FooWhitespaceTokenizer(vocab=vocab)
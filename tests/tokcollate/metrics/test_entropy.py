@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.bootstrap import BootstrapResampler
+from tokcollate.data import TokCollateData
+from tokcollate.metrics import build_metric
+from tokcollate.metrics.entropy import convert_power
+from tokcollate.scorer import TokCollateScorer
+
+POWERS = [0.5, 1.0, 1.5, 2.5, 3.0]
+
+
+@pytest.mark.parametrize("function_type", ["renyi_entropy", "renyi_efficiency"])
+def test_power_sweep_matches_single_powers(foo_dataset, function_type):
+    """Sweeping the powers gives the scores of the separate metric instances (the Shannon entropy for 1.0)."""
+    sweep = build_metric(metric="entropy", metric_label="sweep", function_type=function_type, power=POWERS)
+    data = TokCollateData(metrics=[sweep], **foo_dataset)
+    scores = sweep.score_all(data, systems=data.systems, languages=data.languages)
+    assert scores.shape == (len(data.systems), len(data.languages), len(POWERS))
+    np.testing.assert_array_equal(sweep.sweep_values, POWERS)
+    for k, power in enumerate(POWERS):
+        metric = build_metric(metric="entropy", metric_label=f"power_{power}", function_type=function_type, power=power)
+        np.testing.assert_allclose(scores[..., k], metric.score_all(data, data.systems, languages=data.languages))
+
+
+def test_power_sweep_resampled(foo_dataset):
+    sweep = build_metric(metric="entropy", metric_label="sweep", power=POWERS)
+    data = TokCollateData(metrics=[sweep], **foo_dataset)
+    resampler = BootstrapResampler(num_samples=4, batch_size=3)
+    samples = sweep.resample_all(data, data.systems, languages=data.languages, resampler=resampler)
+    assert samples.shape == (len(data.systems), 4, len(data.languages), len(POWERS))
+    metric = build_metric(metric="entropy", metric_label="single", power=POWERS[-1])
+    np.testing.assert_allclose(
+        samples[..., -1], metric.resample_all(data, data.systems, languages=data.languages, resampler=resampler)
+    )
+
+
+@pytest.mark.parametrize(
+    ("power", "expected"),
+    [
+        (2, 2.0),
+        ([1, 2.5], [1.0, 2.5]),
+        ({"start": 1.0, "stop": 2.0, "num": 3}, [1.0, 1.5, 2.0]),
+        ({"start": 0.5, "stop": 2.0, "step": 0.5}, [0.5, 1.0, 1.5, 2.0]),
+    ],
+)
+def test_convert_power(power, expected):
+    np.testing.assert_allclose(convert_power(power), expected)
+
+
+def test_convert_power_fail():
+    with pytest.raises(ValueError, match="power range"):
+        convert_power({"start": 1.0, "stop": 2.0})
+
+
+def test_scorer_power_sweep(foo_config_file, clear_instance_registry):  # noqa: ARG001
+    """The sweep results are not correlated with the other metrics."""
+    config = OmegaConf.load(foo_config_file)
+    config.scorer.metrics = [
+        {"metric": "entropy", "metric_label": "renyi"},
+        {"metric": "vocab_size", "metric_label": "vocab_size"},
+        {"metric": "entropy", "metric_label": "renyi_sweep", "power": {"start": 1.0, "stop": 3.0, "num": 5}},
+    ]
+    results = TokCollateScorer(config=config).run()
+    assert results["metrics"]["renyi_sweep"].shape == (*results["metrics"]["renyi"].shape, 5)
+    assert results["correlation"]["mono"].shape == (2, 2)
+    assert results["correlation"]["multi"] is None
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from tokcollate.session import TokCollateSession
+
+TEXTS = {
+    # words: un|happi|ness, is, a / b|c (the special token is ignored)
+    "spm": [["▁un", "happi", "ness", "▁is", "▁a"], ["<s>", "▁b", "c"]],
+    "wordpiece": [["un", "##happi", "##ness", "is", "a"], ["[CLS]", "b", "##c"]],
+    # the byte-fallback token continues the word
+    "bpe": [["un", "happi", "ness", "Ġis", "Ġa"], ["b", "<0xC3>"]],
+    "whitespace": [["unhappiness", "is"], ["a", "bc"]],
+}
+EXPECTED = {
+    "fertility": [7 / 4, 7 / 4, 7 / 4, 1.0],
+    "continued_words": [2 / 4, 2 / 4, 2 / 4, 0.0],
+    "single_token_words": [2 / 4, 2 / 4, 2 / 4, 1.0],
+}
+
+
+@pytest.fixture
+def fertility_session():
+    return TokCollateSession(texts={system: {"en": text} for system, text in TEXTS.items()}, languages=["en"])
+
+
+@pytest.mark.parametrize("function_type", list(EXPECTED))
+def test_fertility(fertility_session, function_type):
+    metric = fertility_session.build_metric(metric="fertility", metric_label=function_type, function_type=function_type)
+    res = metric.score_all(fertility_session.data, systems=list(TEXTS), languages=["en"])
+    np.testing.assert_allclose(res[:, 0], EXPECTED[function_type])
+
+
+@pytest.mark.parametrize(("scheme", "expected"), [("marker", 7 / 4), ("continuation", 7 / 7), ("whitespace", 7 / 7)])
+def test_fertility_scheme(fertility_session, scheme, expected):
+    metric = fertility_session.build_metric(metric="fertility", metric_label=f"fertility_{scheme}", scheme=scheme)
+    assert metric.score(fertility_session.data, "spm", language="en") == pytest.approx(expected)
+
+
+def test_fertility_resampled(fertility_session):
+    metric = fertility_session.build_metric(metric="fertility", metric_label="fertility")
+    # keep only the second line ("b c", a single two-token word) of the spm output
+    weights = np.array([[0.0, 1.0], [2.0, 0.0]])
+    res = metric.score_resampled(fertility_session.data, "spm", weights=weights, language="en")
+    np.testing.assert_allclose(res, [2.0, 5 / 3])
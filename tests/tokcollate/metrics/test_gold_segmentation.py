@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tokcollate.data import TokCollateData
+from tokcollate.metrics import build_metric, gold_segmentation
+from tokcollate.utils import TOKEN_IDS_SUFFIX, get_vocabulary, save_token_ids, save_vocab
+
+GOLD = [["un", "happi", "ness", "is"], ["a", "b"]]
+OUTPUTS = {
+    # boundaries {2, 11} and {1}
+    "spm": [["▁un", "happiness", "▁is"], ["▁a", "b"]],
+    # boundaries {1, 5, 7, 11, 12} and {}
+    "bpe": [["u", "nhap", "pi", "ness", "Ġi", "s"], ["ab"]],
+}
+EXPECTED = {
+    "boundary_precision": {"spm": 3 / 3, "bpe": 2 / 5},
+    "boundary_recall": {"spm": 3 / 4, "bpe": 2 / 4},
+    "boundary_f1": {"spm": 6 / 7, "bpe": 4 / 9},
+    "morpheme_alignment": {"spm": 4 / 6, "bpe": 2 / 6},
+    "morpheme_exact": {"spm": 4 / 6, "bpe": 1 / 6},
+}
+
+
+def write_text(path: Path, text: list[list[str]], file_suffix: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if file_suffix == TOKEN_IDS_SUFFIX:
+        vocab = sorted({tok for line in text for tok in line})
+        save_vocab(Path(path.parent, "vocab.json"), vocab)
+        ids = [vocab.index(tok) for line in text for tok in line]
+        save_token_ids(path, np.array(ids), np.array([len(line) for line in text]))
+    else:
+        path.write_text("\n".join(" ".join(line) for line in text) + "\n", encoding="utf-8")
+
+
+@pytest.fixture(params=["txt", TOKEN_IDS_SUFFIX])
+def gold_dataset(tmp_path, request):
+    for label, text in [*OUTPUTS.items(), ("reference", GOLD)]:
+        write_text(Path(tmp_path, label, f"en.{request.param}"), text, request.param)
+    return {"data_dir": tmp_path, "systems": list(OUTPUTS), "languages": ["en"], "file_suffix": request.param}
+
+
+@pytest.mark.parametrize("function_type", list(EXPECTED))
+def test_gold_segmentation(gold_dataset, function_type, clear_instance_registry):  # noqa: ARG001
+    metric = build_metric(metric="gold_segmentation", metric_label=function_type, function_type=function_type)
+    data = TokCollateData(metrics=[metric], **gold_dataset)
+    assert data.get_reference_text("en") == GOLD
+    res = metric.score_all(data, systems=list(OUTPUTS), languages=["en"])
+    np.testing.assert_allclose(res[:, 0], [EXPECTED[function_type][system] for system in OUTPUTS])
+
+
+def test_gold_segmentation_cached(gold_dataset, monkeypatch, clear_instance_registry):  # noqa: ARG001
+    """The gold segmentation is processed once per language (and shared by the scored systems)."""
+    calls = []
+    monkeypatch.setattr(gold_segmentation, "get_vocabulary", lambda text: calls.append(text) or get_vocabulary(text))
+    metric = build_metric(metric="gold_segmentation", metric_label="gold", function_type="morpheme_exact")
+    data = TokCollateData(metrics=[metric], **gold_dataset)
+    res = metric.score_all(data, systems=list(OUTPUTS), languages=["en"])
+    np.testing.assert_allclose(res[:, 0], [EXPECTED["morpheme_exact"][system] for system in OUTPUTS])
+    assert len(calls) == 1
+
+
+def test_gold_segmentation_requires_aligned_lines(tmp_path, clear_instance_registry):  # noqa: ARG001
+    for label, text in [("spm", OUTPUTS["spm"]), ("reference", GOLD[:1])]:
+        write_text(Path(tmp_path, label, "en.txt"), text, "txt")
+    metric = build_metric(metric="gold_segmentation", metric_label="gold")
+    data = TokCollateData(metrics=[metric], data_dir=tmp_path, systems=["spm"], languages=["en"])
+    with pytest.raises(ValueError, match="has 1 lines"):
+        metric.score(data, "spm", language="en")
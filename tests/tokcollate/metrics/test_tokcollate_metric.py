@@ -2,13 +2,13 @@ import numpy as np
 import pytest
 
 from tokcollate.data import TokCollateData
-from tokcollate.metrics import METRIC_REGISTRY, TokCollateMultilingualMetric, build_metric
+from tokcollate.metrics import TokCollateMultilingualMetric, build_metric, list_metrics
 
 MONOLINGUAL_DIM = 2
 MULTILINGUAL_DIM = 3
 
 
-@pytest.mark.parametrize("metric", METRIC_REGISTRY.keys())
+@pytest.mark.parametrize("metric", list_metrics())
 def test_score_return_value(foo_dataset, metric):
     """TODO"""
     te_metric = build_metric(metric=metric, metric_label=f"{metric}_score")
@@ -20,7 +20,7 @@ def test_score_return_value(foo_dataset, metric):
     assert isinstance(res, float)
 
 
-@pytest.mark.parametrize("metric", METRIC_REGISTRY.keys())
+@pytest.mark.parametrize("metric", list_metrics())
 def test_score_all_return_value(foo_dataset, metric):
     """TODO"""
     te_metric = build_metric(metric=metric, metric_label=f"{metric}_score_all")
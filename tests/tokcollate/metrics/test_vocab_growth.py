@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from tokcollate.metrics import build_metric
+from tokcollate.session import TokCollateSession
+
+
+@pytest.fixture(scope="module")
+def zipf_session():
+    rng = np.random.default_rng(0)
+    tokens = [f"tok{i}" for i in rng.zipf(1.5, size=100000)]
+    text = [tokens[i : i + 50] for i in range(0, len(tokens), 50)]
+    return TokCollateSession(texts={"zipf": {"en": text}}, languages=["en"])
+
+
+def test_growth_curve_matches_prefix_vocabulary(foo_text_tiny_tokenized):
+    """The growth curve equals the vocabulary sizes of the text prefixes."""
+    session = TokCollateSession(texts={"foo": {"en": foo_text_tiny_tokenized}}, languages=["en"])
+    metric = build_metric(
+        metric="vocab_growth", metric_label="curve", function_type="growth_curve", num_points=6, min_fraction=0.05
+    )
+    curve = metric.score(session.data, "foo", "en")
+
+    tokens = [tok for line in foo_text_tiny_tokenized for tok in line]
+    expected = [len(set(tokens[: int(np.ceil(fraction * len(tokens)))])) for fraction in metric.sweep_values]
+    np.testing.assert_array_equal(curve, expected)
+    assert metric.score_all(session.data, ["foo"], languages=["en"]).shape == (1, 1, 6)
+
+
+def test_power_law_fits(zipf_session):
+    """The fitted exponents of a Zipfian text are close to their theoretical values."""
+    heaps = build_metric(metric="vocab_growth", metric_label="heaps")
+    zipf = build_metric(metric="vocab_growth", metric_label="zipf", function_type="zipf_exponent")
+    # the Heaps' exponent of a Zipfian text with the exponent s is about 1 / s
+    assert heaps.score(zipf_session.data, "zipf", "en") == pytest.approx(1 / 1.5, abs=0.05)
+    assert zipf.score(zipf_session.data, "zipf", "en") == pytest.approx(1.5, abs=0.25)
+
+
+def test_unknown_function_type():
+    with pytest.raises(ValueError, match="function_type"):
+        build_metric(metric="vocab_growth", metric_label="foo", function_type="foo")
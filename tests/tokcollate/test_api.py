@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.api import score_tokenized, score_tokenizers, sentencepiece_tokenizer, tokenize_lines
+from tokcollate.data import TokCollateData
+from tokcollate.scorer import TokCollateScorer
+
+METRICS = [
+    {"metric": "sequence_length", "metric_label": "seq_len"},
+    {"metric": "token_length", "metric_label": "tok_len"},
+    {"metric": "sequence_ratio", "metric_label": "seq_ratio"},
+]
+
+
+@pytest.fixture(scope="module")
+def foo_lines(foo_text_tiny):
+    return foo_text_tiny.split("\n")
+
+
+def test_score_tokenized_matches_scorer(
+    foo_config_file,
+    foo_text_tiny_tokenized,
+    languages,
+    clear_instance_registry,  # noqa: ARG001
+):
+    """The in-memory texts give the same results as the dataset files."""
+    config = OmegaConf.load(foo_config_file)
+    config.scorer.systems = config.scorer.systems[:1]
+    config.scorer.metrics = METRICS
+    scorer_results = TokCollateScorer(config=config).run()
+
+    tokenized = {config.scorer.systems[0]: dict.fromkeys(languages, foo_text_tiny_tokenized)}
+    results = score_tokenized(tokenized, METRICS)
+    for metric_label, scores in scorer_results["metrics"].items():
+        np.testing.assert_allclose(results["metrics"][metric_label], scores)
+
+
+def test_tokenize_lines_ids(foo_lines):
+    """Map the token ids back to the token strings."""
+    vocab = sorted({tok for line in foo_lines for tok in line.split()})
+    token_ids = {tok: i for i, tok in enumerate(vocab)}
+
+    def tokenizer(line: str) -> list[int]:
+        return [token_ids[tok] for tok in line.split()]
+
+    expected = [line.split() for line in foo_lines]
+    assert tokenize_lines(tokenizer, foo_lines, id_to_token=vocab) == expected
+    assert tokenize_lines(tokenizer, foo_lines, id_to_token=vocab.__getitem__) == expected
+    assert tokenize_lines(tokenizer, foo_lines)[0] == [str(token_ids[tok]) for tok in expected[0]]
+
+
+def test_score_tokenizers(foo_lines, languages):
+    """Score plain and batched tokenizer callables."""
+
+    def batched_tokenizer(lines: list[str]) -> list[list[str]]:
+        return [list(line.replace(" ", "")) for line in lines]
+
+    batched_tokenizer.batched = True
+    results = score_tokenizers(
+        {"words": str.split, "chars": batched_tokenizer}, dict.fromkeys(languages, foo_lines), METRICS
+    )
+    assert results["metrics"]["seq_len"].shape == (2, len(languages))
+    # single character tokens
+    np.testing.assert_allclose(results["metrics"]["tok_len"][1], 1.0)
+
+
+def test_sentencepiece_tokenizer(tmp_path, foo_lines, languages):
+    """Score a SentencePiece model without writing the tokenized texts."""
+    spm = pytest.importorskip("sentencepiece")
+    spm.SentencePieceTrainer.train(
+        sentence_iterator=iter(foo_lines * 10),
+        model_prefix=str(tmp_path / "foo"),
+        vocab_size=40,
+        hard_vocab_limit=False,
+    )
+    results = score_tokenizers(
+        {"spm": sentencepiece_tokenizer(tmp_path / "foo.model")},
+        dict.fromkeys(languages, foo_lines),
+        [{"metric": "vocab_size"}],
+    )
+    assert results["metrics"]["vocab_size"].shape == (1, len(languages))
+    assert np.all(results["metrics"]["vocab_size"] > 0)
+
+
+def test_in_memory_missing_language_fail(foo_text_tiny_tokenized, languages):
+    """Fail when an in-memory system output misses a language."""
+    with pytest.raises(ValueError, match="Missing texts"):
+        TokCollateData(texts={"foo": {languages[0]: foo_text_tiny_tokenized}}, languages=languages)
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tokcollate.benchmark import BenchmarkRunner, SyntheticCorpus, compare_benchmarks, default_metrics
+from tokcollate.utils import get_unigram_frequencies, load_tokenized_text_file
+
+
+@pytest.fixture()
+def foo_corpus():
+    return SyntheticCorpus(num_systems=2, num_languages=2, num_lines=50, vocab_size=[100, 200], tokens_per_line=10)
+
+
+def test_generate_corpus(foo_corpus, tmp_path):
+    foo_corpus.generate(tmp_path)
+    for system in foo_corpus.systems:
+        for lang in foo_corpus.languages:
+            text = load_tokenized_text_file(Path(tmp_path, system, f"{lang}.txt"))
+            assert len(text) == foo_corpus.num_lines
+            freqs = get_unigram_frequencies(text)
+            # Zipfian distribution: the most frequent tokens dominate
+            assert freqs[0] > np.median(freqs)
+
+
+def test_generate_corpus_reproducible(foo_corpus, tmp_path):
+    foo_corpus.generate(Path(tmp_path, "a"))
+    foo_corpus.generate(Path(tmp_path, "b"))
+    path = Path(foo_corpus.systems[0], f"{foo_corpus.languages[0]}.txt")
+    assert Path(tmp_path, "a", path).read_text() == Path(tmp_path, "b", path).read_text()
+
+
+def test_benchmark_run(foo_corpus, tmp_path):
+    runner = BenchmarkRunner(corpus=foo_corpus, work_dir=tmp_path, metrics=["vocab_size", "sequence_ratio"], repeats=1)
+    results = runner.run()
+    assert set(results["stages"]) == {"load", "score.vocab_size", "score.sequence_ratio", "correlate", "save"}
+    assert all(stage["peak_traced_mb"] is not None for stage in results["stages"].values())
+
+
+def test_benchmark_run_default_metrics(foo_corpus, tmp_path):
+    """The default metric list only contains the metrics able to score the synthetic corpus."""
+    runner = BenchmarkRunner(corpus=foo_corpus, work_dir=tmp_path, repeats=1, trace_memory=False)
+    assert runner.metrics == default_metrics()
+    assert "gold_segmentation" not in runner.metrics
+    assert "encode_throughput" not in runner.metrics
+    results = runner.run()
+    assert {f"score.{metric}" for metric in runner.metrics} <= set(results["stages"])
+
+
+def test_compare_benchmarks():
+    baseline = {"corpus": {}, "stages": {"load": {"wall_time": 1.0, "peak_traced_mb": 10.0}}}
+    results = {"corpus": {}, "stages": {"load": {"wall_time": 1.1, "peak_traced_mb": 10.0}}}
+    assert not compare_benchmarks(results, baseline)
+    results["stages"]["load"]["wall_time"] = 2.0
+    results["stages"]["load"]["peak_traced_mb"] = 20.0
+    assert len(compare_benchmarks(results, baseline)) == 2  # noqa: PLR2004
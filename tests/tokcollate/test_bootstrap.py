@@ -0,0 +1,158 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.bootstrap import BootstrapResampler
+from tokcollate.metrics import TokCollateMultilingualMetric
+from tokcollate.scorer import TokCollateScorer
+from tokcollate.server import decode_results
+from tokcollate.session import TokCollateSession
+
+NUM_SAMPLES = 20
+
+METRICS = [
+    {"metric": "bits", "metric_label": "bits"},
+    {"metric": "entropy", "metric_label": "renyi"},
+    {"metric": "entropy", "metric_label": "renyi_eff", "function_type": "renyi_efficiency"},
+    {"metric": "entropy", "metric_label": "shannon", "function_type": "shannon_entropy"},
+    {"metric": "entropy", "metric_label": "shannon_eff", "function_type": "shannon_efficiency"},
+    {"metric": "fertility", "metric_label": "fertility"},
+    {"metric": "fertility", "metric_label": "continued_words", "function_type": "continued_words"},
+    {"metric": "percentile_frequency", "metric_label": "percentile"},
+    {"metric": "vocab_size", "metric_label": "vocab_size"},
+    {"metric": "sequence_length", "metric_label": "seq_len"},
+    {"metric": "sequence_length", "metric_label": "seq_bytes", "use_bytes": True, "mode": "var"},
+    {"metric": "sequence_length", "metric_label": "seq_sum", "mode": "sum"},
+    {"metric": "token_length", "metric_label": "tok_len"},
+    {"metric": "token_length", "metric_label": "tok_bytes", "use_bytes": True, "mode": "var"},
+    {"metric": "sequence_ratio", "metric_label": "seq_ratio"},
+    {"metric": "sequence_ratio", "metric_label": "seq_ratio_var", "mode": "var"},
+    {"metric": "jensen_shannon_divergence", "metric_label": "jsd"},
+    {"metric": "kullback_liebler_divergence", "metric_label": "kld", "vocab_most_common": 10},
+]
+
+
+@pytest.fixture()
+def foo_parallel_session(foo_text_tiny_tokenized):
+    """Session with different (parallel) texts in each language."""
+    texts = {
+        "foo": {
+            "en": foo_text_tiny_tokenized,
+            "fr": [[*reversed(line), "déjà", "vu"] for line in foo_text_tiny_tokenized],
+        },
+        "bar": {
+            "en": [[tok for word in line for tok in (word[:2], word[2:]) if tok] for line in foo_text_tiny_tokenized],
+            "fr": [list(" ".join(line)) for line in foo_text_tiny_tokenized],
+        },
+    }
+    return TokCollateSession(texts=texts, languages=["en", "fr"])
+
+
+@pytest.mark.parametrize("metric_params", METRICS, ids=[params["metric_label"] for params in METRICS])
+def test_unit_weights_match_score(foo_parallel_session, metric_params):
+    """Resampling each line exactly once gives the point estimate of the metric."""
+    data = foo_parallel_session.data
+    metric = foo_parallel_session.build_metric(**metric_params)
+    scores = metric.score_all(data, data.systems, languages=data.languages)
+    for i, system_label in enumerate(data.systems):
+        weights = np.ones((2, data.get_sequence_lengths(system_label, "en").size))
+        if isinstance(metric, TokCollateMultilingualMetric):
+            resampled = metric.score_resampled(data, system_label, weights=weights, languages=data.languages)
+            np.testing.assert_allclose(resampled, np.stack([scores[i]] * 2), atol=1e-12)
+        else:
+            for j, lang in enumerate(data.languages):
+                resampled = metric.score_resampled(data, system_label, weights=weights, language=lang)
+                np.testing.assert_allclose(resampled, [scores[i, j]] * 2)
+
+
+@pytest.mark.parametrize("metric_params", METRICS, ids=[params["metric_label"] for params in METRICS])
+def test_resampled_matches_rescoring(foo_parallel_session, metric_params):
+    """The vectorized resampling gives the scores of the explicitly resampled texts."""
+    if "vocab_most_common" in metric_params:
+        pytest.skip("The resampling keeps the vocabulary cut-off of the original system output.")
+    data = foo_parallel_session.data
+    metric = foo_parallel_session.build_metric(**metric_params)
+    resampler = BootstrapResampler(num_samples=3, batch_size=2)
+    samples = metric.resample_all(data, data.systems, languages=data.languages, resampler=resampler)
+
+    for i, system_label in enumerate(data.systems):
+        num_lines = data.get_sequence_lengths(system_label, "en").size
+        weights = np.concatenate([weights for _, weights in resampler.iter_weights(num_lines)])
+        for b, line_weights in enumerate(weights.astype(int)):
+            texts = {
+                lang: [
+                    line
+                    for line, count in zip(data.get_system_text(system_label, lang), line_weights, strict=True)
+                    for _ in range(count)
+                ]
+                for lang in data.languages
+            }
+            session = TokCollateSession(texts={system_label: texts}, languages=data.languages)
+            expected = session.build_metric(**metric_params).score_all(
+                session.data, [system_label], languages=data.languages
+            )[0]
+            np.testing.assert_allclose(samples[i, b], expected, atol=1e-12)
+
+
+def test_resampler_weights():
+    """The resamples are deterministic, cover the whole dataset and depend only on the number of lines."""
+    resampler = BootstrapResampler(num_samples=5, batch_size=2, seed=1)
+    batches = list(resampler.iter_weights(7))
+    assert [start for start, _ in batches] == [0, 2, 4]
+    weights = np.concatenate([weights for _, weights in batches])
+    assert weights.shape == (5, 7)
+    np.testing.assert_array_equal(weights.sum(axis=1), 7)
+    np.testing.assert_array_equal(weights, np.concatenate([w for _, w in resampler.iter_weights(7)]))
+    other = np.concatenate([w for _, w in BootstrapResampler(num_samples=5, batch_size=2, seed=2).iter_weights(7)])
+    assert not np.array_equal(weights, other)
+
+
+def test_resampler_invalid_confidence():
+    with pytest.raises(ValueError, match="confidence"):
+        BootstrapResampler(confidence=1.5)
+
+
+def test_scorer_bootstrap(foo_config_file, tmp_path, clear_instance_registry):  # noqa: ARG001
+    """The scorer stores the confidence bounds next to each metric."""
+    config = OmegaConf.load(foo_config_file)
+    config.scorer.output_dir = str(Path(tmp_path, "results"))
+    config.scorer.bootstrap = {"num_samples": NUM_SAMPLES, "confidence": 0.9, "batch_size": 8}
+    results = TokCollateScorer(config=config).run()
+
+    for bound in ("lower", "upper"):
+        assert results[f"metrics_{bound}"].keys() == {f"{label}_{bound}" for label in results["metrics"]}
+        for metric_label, scores in results["metrics"].items():
+            assert results[f"metrics_{bound}"][f"{metric_label}_{bound}"].shape == scores.shape
+    for metric_label in results["metrics"]:
+        assert np.all(
+            results["metrics_lower"][f"{metric_label}_lower"] <= results["metrics_upper"][f"{metric_label}_upper"]
+        )
+
+    with Path(tmp_path, "results", "metadata.json").open() as fh:
+        assert json.load(fh)["bootstrap"]["num_samples"] == NUM_SAMPLES
+
+
+def test_scorer_bootstrap_decode_results(foo_config_file, tmp_path, clear_instance_registry):  # noqa: ARG001
+    """The flattened results keep both the metric scores and their confidence bounds."""
+    config = OmegaConf.load(foo_config_file)
+    config.scorer.output_dir = str(Path(tmp_path, "results"))
+    config.scorer.bootstrap = {"num_samples": NUM_SAMPLES, "batch_size": 8}
+    results = TokCollateScorer(config=config).run()
+
+    arrays = decode_results(Path(tmp_path, "results", "results.npz"))
+    for metric_label, scores in results["metrics"].items():
+        np.testing.assert_array_equal(arrays[metric_label], scores)
+        np.testing.assert_array_equal(
+            arrays[f"{metric_label}_lower"], results["metrics_lower"][f"{metric_label}_lower"]
+        )
+        np.testing.assert_array_equal(
+            arrays[f"{metric_label}_upper"], results["metrics_upper"][f"{metric_label}_upper"]
+        )
+
+
+def test_scorer_without_bootstrap(foo_config_file, clear_instance_registry):  # noqa: ARG001
+    results = TokCollateScorer(config=OmegaConf.load(foo_config_file)).run()
+    assert "metrics_lower" not in results
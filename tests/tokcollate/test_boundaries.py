@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.boundaries import DEFAULT_CONTINUATION_PREFIXES, DEFAULT_MARKERS, BoundaryAgreement, normalized_length
+from tokcollate.session import TokCollateSession
+
+TEXTS = {
+    "spm": {"en": [["▁Hello", "▁wor", "ld"], ["▁a", "b"]]},
+    "bpe": {"en": [["Hello", "Ġworld"], ["ab"]]},
+    "wordpiece": {"en": [["Hel", "##lo", "wor", "##ld"], ["a", "##b"]]},
+    "bytes": {"en": [["▁H", "ello", "▁", "<0xC3>", "<0xA9>"], ["a", "b"]]},
+}
+
+
+@pytest.mark.parametrize(
+    ("token", "expected"),
+    [("▁Hello", 5), ("Ġworld", 5), ("##ld", 2), ("##", 2), ("▁", 0), ("<0xC3>", 1), ("<0xA9>", 0), ("<0x20>", 0)],
+)
+def test_normalized_length(token, expected):
+    assert normalized_length(token, DEFAULT_MARKERS, DEFAULT_CONTINUATION_PREFIXES) == expected
+
+
+def test_boundary_agreement():
+    """The boundaries are compared by their plaintext character offsets regardless of the token markers."""
+    session = TokCollateSession(texts=TEXTS, languages=["en"])
+    res = BoundaryAgreement().compute(session.data, list(TEXTS), ["en"])
+    assert res["boundary_f1"].shape == (4, 4, 1)
+    np.testing.assert_array_equal(np.diagonal(res["boundary_f1"][..., 0]), 1.0)
+
+    # spm: {5, 8} and {1}, bpe: {5}, wordpiece: {3, 5, 8} and {1}, bytes: {1, 5} and {1}
+    expected_shared = np.array([[3, 1, 3, 2], [1, 1, 1, 1], [3, 1, 4, 2], [2, 1, 2, 3]])
+    expected_totals = np.array([3, 1, 4, 3])
+    np.testing.assert_allclose(res["boundary_precision"][..., 0], expected_shared / expected_totals[:, None])
+    np.testing.assert_allclose(res["boundary_recall"][..., 0], expected_shared / expected_totals[None, :])
+    np.testing.assert_allclose(res["boundary_f1"][..., 0], res["boundary_f1"][..., 0].T)
+
+
+@pytest.mark.parametrize(
+    ("config", "expected"),
+    [
+        (None, None),
+        (False, None),
+        (True, BoundaryAgreement()),
+        ({"measures": ["f1"]}, BoundaryAgreement(measures=["f1"])),
+        (OmegaConf.create({"markers": ["_"]}), BoundaryAgreement(markers=["_"])),
+    ],
+)
+def test_boundary_agreement_from_config(config, expected):
+    assert BoundaryAgreement.from_config(config) == expected
+
+
+def test_boundary_agreement_requires_measures():
+    with pytest.raises(ValueError, match="At least one of the measures"):
+        BoundaryAgreement(measures=[])
+
+
+def test_boundary_agreement_requires_parallel_lines():
+    texts = {"spm": TEXTS["spm"], "bpe": {"en": TEXTS["bpe"]["en"][:1]}}
+    session = TokCollateSession(texts=texts, languages=["en"])
+    with pytest.raises(ValueError, match="same en lines"):
+        BoundaryAgreement().compute(session.data, list(texts), ["en"])
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.cube import load_stats_cube, save_stats_cube
+from tokcollate.scorer import TokCollateScorer
+from tokcollate.session import TokCollateSession
+from tokcollate_cli import main
+
+METRICS = [
+    {"metric": "bits", "metric_label": "bits"},
+    {"metric": "entropy", "metric_label": "renyi_3", "power": 3.0},
+    {"metric": "percentile_frequency", "metric_label": "percentile"},
+    {"metric": "vocab_size", "metric_label": "vocab_size"},
+    {"metric": "sequence_length", "metric_label": "seq_bytes", "use_bytes": True},
+    {"metric": "token_length", "metric_label": "tok_len", "mode": "median"},
+    {"metric": "sequence_ratio", "metric_label": "seq_ratio"},
+    {"metric": "vocab_growth", "metric_label": "heaps"},
+    {"metric": "jensen_shannon_divergence", "metric_label": "jsd"},
+    {"metric": "kullback_liebler_divergence", "metric_label": "kld", "vocab_most_common": 3},
+]
+
+
+def test_stats_cube_matches_text(foo_text_tiny_tokenized, tmp_path):
+    """The cube statistics equal the statistics of the texts (including the vocabulary order)."""
+    texts = {
+        "foo": {"en": foo_text_tiny_tokenized, "fr": [[*reversed(line), "déjà"] for line in foo_text_tiny_tokenized]},
+        "bar": {"en": [list("".join(line)) for line in foo_text_tiny_tokenized], "fr": foo_text_tiny_tokenized[:2]},
+    }
+    data = TokCollateSession(texts=texts, languages=["en", "fr"]).data
+    save_stats_cube(data, tmp_path)
+    cube = load_stats_cube(tmp_path)
+    assert cube.systems == data.systems
+    assert cube.languages == data.languages
+    for system_label in data.systems:
+        for lang in [None, *data.languages]:
+            assert list(cube.get_vocabulary(system_label, lang).items()) == list(
+                data.get_vocabulary(system_label, lang).items()
+            )
+            for use_bytes in (False, True):
+                np.testing.assert_array_equal(
+                    cube.get_sequence_lengths(system_label, lang, use_bytes=use_bytes),
+                    data.get_sequence_lengths(system_label, lang, use_bytes=use_bytes),
+                )
+
+    subset = load_stats_cube(tmp_path, systems=["bar"], languages=["fr"])
+    assert subset.get_vocabulary("bar", "fr") == data.get_vocabulary("bar", "fr")
+    with pytest.raises(ValueError, match="does not contain: baz"):
+        load_stats_cube(tmp_path, systems=["baz"])
+
+
+def test_stats_cube_missing(tmp_path):
+    with pytest.raises(FileNotFoundError, match="No stats cube"):
+        load_stats_cube(tmp_path)
+
+
+def test_rescore_matches_scorer(foo_config_file, tmp_path, clear_instance_registry):  # noqa: ARG001
+    """Re-scoring the stats cube gives the results of scoring the dataset files."""
+    config = OmegaConf.load(foo_config_file)
+    config.scorer.output_dir = str(Path(tmp_path, "results"))
+    config.scorer.stats_cube = True
+    TokCollateScorer(config=config).run()
+    assert Path(tmp_path, "results", "stats_cube", "cube.json").exists()
+
+    config.scorer.metrics = METRICS
+    config.scorer.stats_cube = False
+    config.scorer.output_dir = None
+    expected = TokCollateScorer(config=config).run()
+
+    rescore_config = OmegaConf.create(
+        {
+            "rescore": {"cube_dir": str(Path(tmp_path, "results"))},
+            "scorer": {"output_dir": str(Path(tmp_path, "rescored")), "metrics": METRICS},
+        }
+    )
+    config_file = Path(tmp_path, "config.rescore.yml")
+    OmegaConf.save(rescore_config, config_file)
+    assert main(["rescore", "--config-file", str(config_file)]) == 0
+
+    with np.load(Path(tmp_path, "rescored", "results.npz"), allow_pickle=True) as npz:
+        results = npz["metrics"].item()
+    for metric_label, scores in expected["metrics"].items():
+        np.testing.assert_allclose(results[metric_label], scores, err_msg=metric_label)
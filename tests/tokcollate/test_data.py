@@ -4,7 +4,7 @@ import pytest
 
 from tests.utils import FooMetric
 from tokcollate.data import TokCollateData
-from tokcollate.utils import open_file, remove_dir
+from tokcollate.utils import get_vocabulary, open_file, remove_dir
 
 LANGUAGES = ["en", "fr"]
 
@@ -124,3 +124,15 @@ def test_get_system_language_text(foo_data, foo_tokcollate_data_obj, foo_text_ti
             text = foo_tokcollate_data_obj.get_system_text(sys, language=lang)
             assert text is not None
             assert len(text) == len(foo_text_tiny_tokenized)
+
+
+def test_get_vocabulary_cached(foo_data, foo_tokcollate_data_obj):
+    """The vocabularies are computed only once (and dropped with the removed system)."""
+    system = foo_data["systems"][0]
+    vocab = foo_tokcollate_data_obj.get_vocabulary(system)
+    assert vocab == get_vocabulary(foo_tokcollate_data_obj.get_system_text(system))
+    assert foo_tokcollate_data_obj.get_vocabulary(system) is vocab
+
+    foo_tokcollate_data_obj.remove_system(system)
+    foo_tokcollate_data_obj.add_system(system)
+    assert foo_tokcollate_data_obj.get_vocabulary(system) is not vocab
@@ -1,3 +1,8 @@
+import importlib
+import importlib.metadata
+import sys
+from pathlib import Path
+
 import pytest
 
 from tokcollate import metrics
@@ -77,3 +82,48 @@ def test_list_instantiated_metric_labels(clear_registries):  # noqa: ARG001
         metrics.build_metric(metric="foo", metric_label=metric_label)
 
     assert set(metrics.list_metric_instance_labels()) == set(metric_labels)
+
+
+def test_metric_manifest():
+    """The manifest lists exactly the metrics registered by the metric modules."""
+    metric_dir = Path(metrics.__file__).parent
+    for file in metric_dir.glob("[!_]*.py"):
+        importlib.import_module(f"tokcollate.metrics.{file.stem}")
+    assert set(metrics.METRIC_MANIFEST) == set(metrics.METRIC_REGISTRY)
+    for name, module in metrics.METRIC_MANIFEST.items():
+        assert metrics.METRIC_REGISTRY[name].__module__ == module
+        assert metrics.METRIC_REGISTRY[name].requirements() == metrics.METRIC_MANIFEST_REQUIREMENTS.get(name, ())
+
+
+def test_get_metric_lazy_import(clear_registries, monkeypatch):  # noqa: ARG001
+    """Import the metric module only when the metric is requested."""
+    monkeypatch.setattr(metrics, "METRIC_MANIFEST", {"foo": "tests.fixtures.foo_metric_module"})
+    monkeypatch.delitem(sys.modules, "tests.fixtures.foo_metric_module", raising=False)
+    assert list(metrics.list_metrics()) == ["foo"]
+    assert "tests.fixtures.foo_metric_module" not in sys.modules
+    assert metrics.get_metric("foo").__name__ == "FooLazyMetric"
+
+
+def test_get_metric_requirements_lazy(clear_registries, monkeypatch):  # noqa: ARG001
+    """Return the requirements of the built-in metrics without importing their modules."""
+    monkeypatch.setattr(metrics, "METRIC_MANIFEST", {"foo": "tests.fixtures.foo_metric_module"})
+    monkeypatch.setattr(metrics, "METRIC_MANIFEST_REQUIREMENTS", {"foo": ("reference_text",)})
+    monkeypatch.delitem(sys.modules, "tests.fixtures.foo_metric_module", raising=False)
+    assert metrics.get_metric_requirements("foo") == ("reference_text",)
+    assert "tests.fixtures.foo_metric_module" not in sys.modules
+
+
+def test_get_metric_plugin(clear_registries, monkeypatch):  # noqa: ARG001
+    """Register the metric classes provided by the plugin entry points."""
+    entry_point = importlib.metadata.EntryPoint(
+        name="foo_plugin", value="tests.utils:FooMetric", group=metrics.PLUGIN_ENTRY_POINT_GROUP
+    )
+    monkeypatch.setattr(metrics, "PLUGIN_MANIFEST", {"foo_plugin": entry_point})
+    assert "foo_plugin" in metrics.list_metrics()
+    assert metrics.get_metric("foo_plugin").__name__ == "FooMetric"
+
+
+def test_get_metric_unknown_fail(clear_registries):  # noqa: ARG001
+    """Fail when requesting an unknown metric."""
+    with pytest.raises(KeyError):
+        metrics.get_metric("foo")
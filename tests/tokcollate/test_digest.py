@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from tokcollate.digest import TDigest
+from tokcollate.metrics.tokcollate_metric import EvalMode, get_quantile
+from tokcollate.session import TokCollateSession
+
+QUANTILES = [0.0, 0.01, 0.25, 0.5, 0.9, 0.99, 1.0]
+COMPRESSION = 200
+
+
+def test_digest_exact_quantiles():
+    """The digests of the integer lengths give the np.quantile values."""
+    values = np.random.default_rng(0).poisson(20, size=5000)
+    digest = TDigest.from_values(values, buffer_size=1000)
+    assert digest.exact
+    np.testing.assert_allclose(digest.quantile(QUANTILES), np.quantile(values, QUANTILES))
+    assert digest.total == values.size
+
+
+def test_digest_weighted_quantiles():
+    """Integer weights are equivalent to repeating the values."""
+    values = np.array([3, 1, 4, 1, 5, 9, 2, 6])
+    weights = np.array([1, 2, 3, 1, 1, 2, 1, 4])
+    digest = TDigest.from_values(values, weights)
+    np.testing.assert_allclose(digest.quantile(QUANTILES), np.quantile(np.repeat(values, weights), QUANTILES))
+
+
+def test_digest_approximate_quantiles():
+    values = np.random.default_rng(0).lognormal(size=200000)
+    digest = TDigest.from_values(values, compression=COMPRESSION, max_exact_values=1000, buffer_size=10000)
+    assert not digest.exact
+    assert digest.means.size < COMPRESSION
+    for q in (0.01, 0.5, 0.9, 0.99):
+        assert digest.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+    assert digest.quantile(0.0) == values.min()
+    assert digest.quantile(1.0) == values.max()
+
+
+@pytest.mark.parametrize("max_exact_values", [10000, 100])
+def test_digest_merge(max_exact_values):
+    """Merging the digests of the shards gives (about) the digest of the whole data."""
+    values = np.random.default_rng(1).poisson(50, size=20000)
+    merged = TDigest(max_exact_values=max_exact_values)
+    for shard in np.array_split(values, 4):
+        merged.merge(TDigest.from_values(shard, max_exact_values=max_exact_values))
+    expected = TDigest.from_values(values, max_exact_values=max_exact_values)
+    assert merged.exact == expected.exact
+    np.testing.assert_allclose(merged.quantile(QUANTILES), expected.quantile(QUANTILES), rtol=0.02)
+
+
+def test_empty_digest():
+    assert np.isnan(TDigest().quantile(0.5))
+
+
+@pytest.mark.parametrize(
+    ("mode", "quantile", "expected"),
+    [("median", None, 0.5), ("p90", None, 0.9), ("p99", None, 0.99), ("quantile", 0.3, 0.3)],
+)
+def test_get_quantile(mode, quantile, expected):
+    assert get_quantile(EvalMode(mode), quantile) == expected
+
+
+@pytest.mark.parametrize(("mode", "quantile"), [("quantile", None), ("quantile", 1.5), ("mean", 0.5)])
+def test_get_quantile_fail(mode, quantile):
+    with pytest.raises(ValueError, match="quantile"):
+        get_quantile(EvalMode(mode), quantile)
+
+
+@pytest.mark.parametrize(
+    ("metric", "params"),
+    [
+        ("sequence_length", {}),
+        ("sequence_length", {"use_bytes": True}),
+        ("token_length", {}),
+        ("token_length", {"use_bytes": True}),
+    ],
+)
+def test_quantile_modes_match_numpy(foo_text_tiny_tokenized, metric, params):
+    session = TokCollateSession(texts={"foo": {"en": foo_text_tiny_tokenized}}, languages=["en"])
+    data = session.data
+    if metric == "sequence_length":
+        values = data.get_sequence_lengths("foo", "en", use_bytes=params.get("use_bytes", False))
+    else:
+        values = [len(tok.encode("utf-8")) if params else len(tok) for line in foo_text_tiny_tokenized for tok in line]
+    for mode, q in [("median", 0.5), ("p90", 0.9), ("quantile", 0.3)]:
+        quantile = q if mode == "quantile" else None
+        metric_obj = session.build_metric(
+            metric=metric, metric_label=f"{metric}_{mode}_{params}", mode=mode, quantile=quantile, **params
+        )
+        score = metric_obj.score_all(data, ["foo"], languages=["en"])
+        assert score[0, 0] == pytest.approx(np.quantile(values, q))
@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tokcollate.fetch import Fetcher, build_url
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Stub API counting the requests (the /flaky endpoint fails twice before succeeding)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self.server.hits[self.path] += 1
+        self.server.connections.add(self.client_address)
+        if self.path.startswith("/flaky") and self.server.hits[self.path] <= 2:  # noqa: PLR2004
+            self._send(503, b"unavailable", headers={"Retry-After": "0"})
+        elif self.path.startswith("/redirect"):
+            self._send(302, b"", headers={"Location": "/json?id=redirected"})
+        elif self.path.startswith("/missing"):
+            self._send(404, b"not found")
+        else:
+            self._send(200, json.dumps({"path": self.path}).encode("utf-8"))
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:  # noqa: ANN002, ARG002
+        return
+
+
+@pytest.fixture()
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.hits = Counter()
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def stub_url(stub_server):
+    return f"http://127.0.0.1:{stub_server.server_address[1]}"
+
+
+def test_build_url():
+    """Sort the query parameters, so the cache keys are stable."""
+    assert build_url("http://foo/bar", {"b": 1, "a": "x y"}) == "http://foo/bar?a=x+y&b=1"
+    assert build_url("http://foo/bar?c=2", {"a": 1}) == "http://foo/bar?c=2&a=1"
+
+
+def test_cache_and_offline(stub_server, stub_url, tmp_path):
+    """Repeated requests are served from the cache, also in the offline mode."""
+    fetcher = Fetcher(cache_dir=tmp_path, default_rate=1000)
+    response = fetcher.get(f"{stub_url}/json", params={"id": 1})
+    assert response.ok
+    assert response.json() == {"path": "/json?id=1"}
+    assert not response.from_cache
+
+    assert fetcher.get(f"{stub_url}/json", params={"id": 1}).from_cache
+    assert stub_server.hits["/json?id=1"] == 1
+
+    offline = Fetcher(cache_dir=tmp_path, offline=True)
+    assert offline.get(f"{stub_url}/json", params={"id": 1}).json() == {"path": "/json?id=1"}
+    with pytest.raises(FileNotFoundError, match="offline mode"):
+        offline.get(f"{stub_url}/json", params={"id": 2})
+
+
+def test_errors_not_cached(stub_server, stub_url, tmp_path):
+    """Only the successful responses are cached."""
+    fetcher = Fetcher(cache_dir=tmp_path, default_rate=1000)
+    assert fetcher.get(f"{stub_url}/missing").status_code == 404  # noqa: PLR2004
+    assert fetcher.get(f"{stub_url}/missing").status_code == 404  # noqa: PLR2004
+    assert stub_server.hits["/missing"] == 2  # noqa: PLR2004
+
+
+def test_retry(stub_server, stub_url):
+    """Retry the failed requests."""
+    fetcher = Fetcher(default_rate=1000, backoff=0.01)
+    assert fetcher.get(f"{stub_url}/flaky").ok
+    assert stub_server.hits["/flaky"] == 3  # noqa: PLR2004
+
+    fetcher = Fetcher(default_rate=1000, backoff=0.01, max_retries=1)
+    assert fetcher.get(f"{stub_url}/flaky?other").status_code == 503  # noqa: PLR2004
+
+
+def test_connection_error():
+    """Fail after the retries if the host is unreachable."""
+    fetcher = Fetcher(default_rate=1000, backoff=0.01, max_retries=1, timeout=1)
+    with pytest.raises(ConnectionError, match="after 2 attempts"):
+        fetcher.get("http://127.0.0.1:1/json")
+    assert isinstance(fetcher.get_many(["http://127.0.0.1:1/json"], return_exceptions=True)[0], ConnectionError)
+
+
+def test_redirect(stub_url):
+    """Follow the redirects."""
+    fetcher = Fetcher(default_rate=1000)
+    assert fetcher.get(f"{stub_url}/redirect").json() == {"path": "/json?id=redirected"}
+
+
+def test_get_many(stub_server, stub_url):
+    """Fetch concurrently (reusing the connections), keeping the request order."""
+    fetcher = Fetcher(default_rate=1000, max_workers=4)
+    requests = [(f"{stub_url}/json", {"id": i}) for i in range(20)]
+    responses = fetcher.get_many(requests)
+    assert [response.json()["path"] for response in responses] == [f"/json?id={i}" for i in range(20)]
+    assert len(stub_server.connections) <= 4  # noqa: PLR2004
+
+
+def test_rate_limit(stub_url):
+    """Space the requests to a single host."""
+    rate = 50.0
+    num_requests = 6
+    fetcher = Fetcher(rate_limits={f"127.0.0.1:{stub_url.rsplit(':', 1)[1]}": rate}, max_workers=num_requests)
+    start = time.monotonic()
+    fetcher.get_many([f"{stub_url}/json?id={i}" for i in range(num_requests)])
+    assert time.monotonic() - start >= (num_requests - 1) / rate
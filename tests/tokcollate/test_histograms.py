@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.histograms import LengthHistograms, histogram_counts
+from tokcollate.scorer import TokCollateScorer
+from tokcollate.session import TokCollateSession
+
+NUM_BINS = 16
+
+
+@pytest.mark.parametrize("log_bins", [True, False])
+@pytest.mark.parametrize("max_value", [0, 5, 1000])
+def test_bin_edges(log_bins, max_value):
+    """The integer bin edges cover all the values with at most num_bins bins."""
+    edges = LengthHistograms(num_bins=NUM_BINS, log_bins=log_bins).bin_edges(max_value)
+    assert edges[0] == 0
+    assert edges[-1] == max_value + 1
+    assert np.all(np.diff(edges) > 0)
+    assert edges.size - 1 <= NUM_BINS
+
+
+def test_histogram_counts():
+    values = np.array([0, 1, 1, 2, 5, 9])
+    edges = np.array([0, 1, 2, 4, 10])
+    np.testing.assert_array_equal(histogram_counts(values, edges), [1, 2, 1, 2])
+    np.testing.assert_array_equal(histogram_counts(values, edges, weights=np.arange(6)), [0, 3, 3, 9])
+
+
+def test_histograms_match_text(foo_text_tiny_tokenized):
+    texts = {
+        "foo": {"en": foo_text_tiny_tokenized},
+        "bar": {"en": [list("".join(line)) for line in foo_text_tiny_tokenized]},
+    }
+    session = TokCollateSession(texts=texts, languages=["en"])
+    res = LengthHistograms(num_bins=8).compute(session.data, ["foo", "bar"], ["en"])
+
+    for i, system_label in enumerate(["foo", "bar"]):
+        text = session.data.get_system_text(system_label, "en")
+        expected = {
+            "sequence_length": [len(line) for line in text],
+            "sequence_bytes": [sum(len(tok.encode("utf-8")) for tok in line) for line in text],
+            "token_length": [len(tok) for line in text for tok in line],
+        }
+        for statistic, values in expected.items():
+            hist = res[f"{statistic}_histogram"]
+            assert hist.dtype == np.int64
+            assert hist.shape == (2, 1, res[f"{statistic}_bin_edges"].size - 1)
+            counts, _ = np.histogram(values, bins=res[f"{statistic}_bin_edges"])
+            np.testing.assert_array_equal(hist[i, 0], counts, err_msg=statistic)
+
+
+def test_scorer_without_histograms(foo_config_file, clear_instance_registry):  # noqa: ARG001
+    results = TokCollateScorer(config=OmegaConf.load(foo_config_file)).run()
+    assert "histograms" not in results
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.jobs import JobStatus, QueueFullError, ScoringDataset, ScoringService, add_job_routes
+from tokcollate.server import Request, ResultsIndex, TokCollateServer
+
+NUM_CONCURRENT_JOBS = 4
+
+
+@pytest.fixture()
+def foo_config(foo_config_file):
+    return OmegaConf.load(foo_config_file)
+
+
+@pytest.fixture()
+def foo_new_system(foo_system_output_tiny_multilingual, tmp_path):
+    """Directory with a new system output (copy of an existing one)."""
+    new_system = Path(tmp_path, "new_system")
+    shutil.copytree(foo_system_output_tiny_multilingual[0].parent, new_system)
+    return new_system
+
+
+@pytest.fixture()
+def foo_service(foo_config, tmp_path):
+    service = ScoringService(datasets={"foo": foo_config}, max_workers=1, output_dir=Path(tmp_path, "jobs"))
+    yield service
+    service.shutdown()
+
+
+def test_job_results(foo_service, foo_config, foo_new_system):
+    job = foo_service.submit(dataset="foo", system_label="new", system_path=foo_new_system)
+    job._future.result()  # noqa: SLF001
+    assert job.status == JobStatus.DONE
+    assert job.progress == 1.0
+    num_systems = len(foo_config.scorer.systems) + 1
+    num_languages = len(foo_config.scorer.languages)
+    for metric_label, res in job.results["metrics"].items():
+        if "mono" in metric_label:
+            assert res.shape == (num_systems, num_languages)
+        else:
+            assert res.shape == (num_systems, num_languages, num_languages)
+        # the new system is a copy of the first system
+        np.testing.assert_array_equal(res[0], res[-1])
+    assert Path(job.output_dir, "results.npz").exists()
+    # the new system is removed from the shared dataset after scoring
+    assert foo_service.datasets["foo"].data.systems == list(foo_config.scorer.systems)
+
+
+def test_job_reuses_dataset_scores(foo_service, foo_new_system, monkeypatch):
+    job = foo_service.submit(dataset="foo", system_label="new", system_path=foo_new_system)
+    job._future.result()  # noqa: SLF001
+
+    scored_systems = []
+    orig_score_system = ScoringDataset.score_system
+
+    def score_system(self, metric, metric_key, system_label):  # noqa: ANN202
+        if (metric_key, system_label) not in self._row_cache:
+            scored_systems.append(system_label)
+        return orig_score_system(self, metric, metric_key, system_label)
+
+    monkeypatch.setattr(ScoringDataset, "score_system", score_system)
+    job = foo_service.submit(dataset="foo", system_label="new_2", system_path=foo_new_system)
+    job._future.result()  # noqa: SLF001
+    assert job.status == JobStatus.DONE
+    assert not scored_systems
+
+
+def test_concurrent_jobs(foo_config, foo_new_system):
+    """Concurrent jobs share the loaded dataset without corrupting it."""
+    service = ScoringService(datasets={"foo": foo_config}, max_workers=NUM_CONCURRENT_JOBS)
+    jobs = [
+        service.submit(dataset="foo", system_label=f"new_{i}", system_path=foo_new_system)
+        for i in range(NUM_CONCURRENT_JOBS)
+    ]
+    for job in jobs:
+        job._future.result()  # noqa: SLF001
+    service.shutdown()
+    assert all(job.status == JobStatus.DONE for job in jobs)
+    for metric_label, res in jobs[0].results["metrics"].items():
+        for job in jobs[1:]:
+            np.testing.assert_array_equal(job.results["metrics"][metric_label], res)
+    data = service.datasets["foo"].data
+    assert data.systems == list(foo_config.scorer.systems)
+    assert all(key[0] in data.systems for key in data._vocab_cache)  # noqa: SLF001
+
+
+def test_job_reference_metric(foo_service, foo_dataset, foo_new_system):  # noqa: ARG001
+    """The reference text required by the job metrics is loaded into the shared dataset."""
+    metrics = [{"metric": "gold_segmentation", "metric_label": "gold"}]
+    job = foo_service.submit(dataset="foo", system_label="new", system_path=foo_new_system, metrics=metrics)
+    job._future.result()  # noqa: SLF001
+    assert job.status == JobStatus.DONE, job.error
+    np.testing.assert_array_equal(job.results["metrics"]["gold"][0], job.results["metrics"]["gold"][-1])
+
+
+def test_job_cancel_queued(foo_service, foo_new_system, monkeypatch):
+    release = threading.Event()
+    orig_load = ScoringDataset.load
+
+    def blocking_load(self):  # noqa: ANN202
+        release.wait(timeout=10)
+        return orig_load(self)
+
+    monkeypatch.setattr(ScoringDataset, "load", blocking_load)
+    running = foo_service.submit(dataset="foo", system_label="new_1", system_path=foo_new_system)
+    queued = foo_service.submit(dataset="foo", system_label="new_2", system_path=foo_new_system)
+    assert foo_service.cancel(queued.job_id)
+    release.set()
+    running._future.result()  # noqa: SLF001
+    assert queued.status == JobStatus.CANCELLED
+    assert running.status == JobStatus.DONE
+    assert not foo_service.cancel(running.job_id)
+
+
+def test_job_queue_full(foo_config, foo_new_system):
+    service = ScoringService(datasets={"foo": foo_config}, max_workers=1, max_queued=0)
+    with pytest.raises(QueueFullError):
+        service.submit(dataset="foo", system_label="new", system_path=foo_new_system)
+    service.shutdown()
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"dataset": "bar", "system_label": "new"},
+        {"dataset": "foo", "system_label": "system_multi_1"},
+        {"dataset": "foo", "system_label": "new", "metrics": [{"metric": "unknown_metric", "metric_label": "x"}]},
+    ],
+)
+def test_job_invalid_request(foo_service, foo_new_system, params):
+    with pytest.raises((KeyError, ValueError)):
+        foo_service.submit(system_path=foo_new_system, **params)
+
+
+def test_job_routes(foo_service, foo_new_system, tmp_path):
+    server = TokCollateServer(index=ResultsIndex(roots=[tmp_path]), port=0)
+    add_job_routes(server, foo_service)
+
+    def request(method, path, body=None):  # noqa: ANN202
+        req = Request(method=method, path=path, query={}, headers={}, body=json.dumps(body).encode() if body else b"")
+        response = asyncio.run(server.dispatch(req))
+        return response.status, json.loads(response.body)
+
+    status, payload = request(
+        "POST", "/api/jobs", {"dataset": "foo", "system_label": "new", "system_path": str(foo_new_system)}
+    )
+    assert status == 202  # noqa: PLR2004
+    job_id = payload["job"]["id"]
+    foo_service.get(job_id)._future.result()  # noqa: SLF001
+
+    status, payload = request("GET", f"/api/jobs/{job_id}")
+    assert payload["job"]["status"] == "done"
+    assert set(payload["job"]["results"]["metrics"]) == {m["metric_label"] for m in foo_service.get(job_id).metrics}
+
+    status, _ = request("DELETE", f"/api/jobs/{job_id}")
+    assert status == 409  # noqa: PLR2004
+    status, _ = request("POST", "/api/jobs", {"dataset": "bar"})
+    assert status == 400  # noqa: PLR2004
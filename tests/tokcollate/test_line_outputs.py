@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from tokcollate.line_outputs import LineOutputs, load_line_outputs, top_lines
+from tokcollate.session import TokCollateSession
+
+
+@pytest.fixture()
+def foo_line_session(foo_text_tiny_tokenized):
+    texts = {
+        "foo": {"en": foo_text_tiny_tokenized, "fr": [[*line, "vu"] for line in foo_text_tiny_tokenized]},
+        "bar": {"en": [list("".join(line)) for line in foo_text_tiny_tokenized], "fr": foo_text_tiny_tokenized[:2]},
+    }
+    return TokCollateSession(texts=texts, languages=["en", "fr"])
+
+
+def test_line_outputs(foo_line_session, foo_text_tiny_tokenized, tmp_path):
+    """The line outputs contain the per-line statistics (padded if the languages have less lines)."""
+    data = foo_line_session.data
+    outputs = LineOutputs(statistics=["sequence_length", "sequence_bytes"]).compute(
+        data, ["foo", "bar"], ["en", "fr"], output_dir=tmp_path
+    )
+    num_lines = len(foo_text_tiny_tokenized)
+    assert outputs["sequence_length"].shape == (2, 2, num_lines)
+    assert outputs["sequence_length"].dtype == np.int32
+    np.testing.assert_array_equal(outputs["sequence_length"][0, 0], [len(line) for line in foo_text_tiny_tokenized])
+    np.testing.assert_array_equal(outputs["sequence_length"][1, 1, 2:], -1)
+    np.testing.assert_array_equal(
+        outputs["sequence_bytes"][1, 0], data.get_sequence_lengths("bar", "en", use_bytes=True)
+    )
+
+    loaded = load_line_outputs(tmp_path)
+    assert sorted(loaded) == ["sequence_bytes", "sequence_length"]
+    assert isinstance(loaded["sequence_length"], np.memmap)
+    np.testing.assert_array_equal(loaded["sequence_length"], outputs["sequence_length"])
+
+
+def test_line_outputs_ratio(foo_line_session):
+    data = foo_line_session.data
+    outputs = LineOutputs(statistics=["sequence_ratio"], pivot_language="en").compute(data, ["foo"], ["en", "fr"])
+    assert outputs["sequence_ratio"].dtype == np.float32
+    np.testing.assert_allclose(outputs["sequence_ratio"][0, 0], 1.0)
+    lengths = data.get_sequence_lengths("foo", "en")
+    np.testing.assert_allclose(outputs["sequence_ratio"][0, 1], (lengths + 1) / lengths, rtol=1e-6)
+
+    with pytest.raises(ValueError, match="parallel"):
+        LineOutputs(statistics=["sequence_ratio"]).compute(data, ["bar"], ["en", "fr"])
+
+
+def test_line_outputs_invalid_statistic():
+    with pytest.raises(ValueError, match="foo"):
+        LineOutputs(statistics=["foo"])
+
+
+def test_top_lines():
+    values = np.array([[[3, 9, 1, 7, -1], [5, 2, -1, -1, -1]]], dtype=np.int32)
+    indices, top_values = top_lines(values, 3)
+    np.testing.assert_array_equal(indices, [[[1, 3, 0], [0, 1, -1]]])
+    np.testing.assert_array_equal(top_values[indices >= 0], [9, 7, 3, 5, 2])
+
+    values = np.where(values < 0, np.nan, values).astype(np.float32)
+    indices, top_values = top_lines(values, 2, largest=False)
+    np.testing.assert_array_equal(indices, [[[2, 0], [1, 0]]])
+    np.testing.assert_array_equal(top_values, [[[1, 3], [2, 5]]])
+
+
+def test_top_lines_matches_sort():
+    values = np.random.default_rng(0).random((3, 2, 100)).astype(np.float32)
+    indices, _ = top_lines(values, 10)
+    np.testing.assert_array_equal(indices, np.argsort(-values, axis=-1, kind="stable")[..., :10])
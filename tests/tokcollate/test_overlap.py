@@ -0,0 +1,60 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from tokcollate.overlap import MinHashSignatures, VocabularyOverlap, exact_overlap
+from tokcollate.session import TokCollateSession
+
+
+@pytest.fixture
+def vocabularies():
+    rng = np.random.default_rng(42)
+    return [Counter(f"tok{i}" for i in rng.zipf(1.3, size=20000) % 2000 + offset) for offset in (0, 100, 400)]
+
+
+def test_exact_overlap(vocabularies):
+    """The exact overlaps match the set operations on the vocabularies."""
+    jaccard, weighted, top = exact_overlap(vocabularies, top_k=50)
+    for i, vocab_i in enumerate(vocabularies):
+        for j, vocab_j in enumerate(vocabularies):
+            expected = len(vocab_i.keys() & vocab_j.keys()) / len(vocab_i.keys() | vocab_j.keys())
+            assert jaccard[i, j] == pytest.approx(expected)
+            total_i, total_j = vocab_i.total(), vocab_j.total()
+            expected = sum(min(vocab_i[tok] / total_i, vocab_j[tok] / total_j) for tok in vocab_i.keys() & vocab_j)
+            assert weighted[i, j] == pytest.approx(expected)
+            top_i = {tok for tok, _ in vocab_i.most_common(50)}
+            top_j = {tok for tok, _ in vocab_j.most_common(50)}
+            assert top[i, j] == pytest.approx(len(top_i & top_j) / 50)
+
+
+def test_minhash_overlap(vocabularies):
+    """The MinHash estimates are within a few standard errors of the exact overlaps."""
+    exact = VocabularyOverlap(mode="exact", per_language=False)._compare(vocabularies)  # noqa: SLF001
+    approx = VocabularyOverlap(mode="minhash", num_perm=512, per_language=False)._compare(vocabularies)  # noqa: SLF001
+    for measure in ["vocab_jaccard", "vocab_weighted_overlap"]:
+        np.testing.assert_allclose(approx[measure], exact[measure], atol=0.1, err_msg=measure)
+        np.testing.assert_array_equal(np.diag(approx[measure]), 1.0)
+    np.testing.assert_array_equal(approx["vocab_top_k"], exact["vocab_top_k"])
+
+
+def test_minhash_signatures_are_stable(vocabularies):
+    minhash = MinHashSignatures(num_perm=32)
+    reordered = Counter(dict(reversed(vocabularies[0].most_common())))
+    for left, right in zip(minhash.signatures(vocabularies[0]), minhash.signatures(reordered), strict=True):
+        np.testing.assert_array_equal(left, right)
+
+
+def test_overlap_per_language(foo_text_tiny_tokenized):
+    texts = {
+        "foo": {"en": foo_text_tiny_tokenized, "de": foo_text_tiny_tokenized[::-1]},
+        "bar": {"en": [list("".join(line)) for line in foo_text_tiny_tokenized], "de": foo_text_tiny_tokenized},
+    }
+    session = TokCollateSession(texts=texts, languages=["en", "de"])
+    res = VocabularyOverlap(measures=["jaccard"]).compute(session.data, ["foo", "bar"], ["en", "de"])
+    assert list(res) == ["vocab_jaccard"]
+    # (systems, systems, languages), the same layout as the boundary agreement
+    assert res["vocab_jaccard"].shape == (2, 2, 2)
+    np.testing.assert_array_equal(res["vocab_jaccard"][0, 0], 1.0)
+    assert res["vocab_jaccard"][0, 1, 1] == pytest.approx(1.0)
+    assert res["vocab_jaccard"][0, 1, 0] < 1.0
@@ -0,0 +1,132 @@
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.data import LanguageInfo, TokCollateData
+from tokcollate.planner import ResourcePlanner, estimate_file, extrapolate_vocab_size, load_calibration
+from tokcollate.utils import load_tokenized_text_file
+from tokcollate_cli import main
+
+
+@pytest.fixture()
+def foo_large_file(tmp_path, foo_text_tiny):
+    path = Path(tmp_path, "large.txt")
+    lines = [f"{line} tok{i % 1000}" for i in range(5000) for line in foo_text_tiny.split("\n")]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_estimate_file_exact(foo_system_output_tiny_multilingual):
+    """Small files are read completely."""
+    path = foo_system_output_tiny_multilingual[0]
+    text = load_tokenized_text_file(path)
+    estimate = estimate_file(path)
+    assert estimate.exact
+    assert estimate.num_lines == len(text)
+    assert estimate.num_tokens == sum(len(line) for line in text)
+    assert estimate.vocab_size == len({tok for line in text for tok in line})
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_estimate_file_sampled(foo_large_file, compress):
+    """Estimate the counts from the sampled blocks within a reasonable error."""
+    path = foo_large_file
+    if compress:
+        path = Path(f"{foo_large_file}.gz")
+        with gzip.open(path, "wb") as fh:
+            fh.write(foo_large_file.read_bytes())
+    text = load_tokenized_text_file(foo_large_file)
+    num_tokens = sum(len(line) for line in text)
+
+    estimate = estimate_file(path, block_size=4096, num_blocks=8)
+    assert not estimate.exact
+    assert estimate.num_lines == pytest.approx(len(text), rel=0.1)
+    assert estimate.num_tokens == pytest.approx(num_tokens, rel=0.1)
+
+
+def test_extrapolate_vocab_size():
+    """The extrapolated vocabulary grows with the text size (but never exceeds the token count)."""
+    num_types = 700
+    sample = [f"tok{i % 500}" for i in range(1000)] + [f"rare{i}" for i in range(num_types - 500)]
+    assert extrapolate_vocab_size(sample, len(sample)) == num_types
+    assert num_types < extrapolate_vocab_size(sample, 10 * len(sample)) < 10 * len(sample)
+
+
+def test_plan(foo_config_file):
+    """Predict the resource usage of all the configured metrics."""
+    plan = ResourcePlanner.from_config(OmegaConf.load(foo_config_file)).plan()
+    assert [m.metric_label for m in plan.metrics] == [
+        "metric_foo_mono_1",
+        "metric_foo_mono_2",
+        "metric_foo_multi_1",
+        "metric_foo_multi_2",
+    ]
+    assert plan.peak_bytes > plan.data_bytes > 0
+    assert plan.runtime > 0
+    assert "Predicted peak memory" in plan.report()
+    json.dumps(plan.to_dict())
+
+
+def test_plan_multilingual_temporaries(foo_config_file):
+    """The (V, L, L) temporaries of the divergence metrics grow quadratically with the number of languages."""
+    config = OmegaConf.load(foo_config_file)
+    config.scorer.metrics = [{"metric": "jensen_shannon_divergence", "metric_label": "jsd"}]
+    planner = ResourcePlanner.from_config(config)
+    plan = planner.plan()
+
+    config.scorer.languages = config.scorer.languages[:1]
+    plan_mono = ResourcePlanner.from_config(config).plan()
+    assert plan.metrics[0].peak_bytes > plan_mono.metrics[0].peak_bytes
+
+
+def test_plan_calibration(foo_config_file, tmp_path):
+    """Use the measured benchmark throughput for the runtime prediction."""
+    bench_file = Path(tmp_path, "bench.json")
+    with bench_file.open("w") as fh:
+        json.dump({"stages": {"score.sequence_length": {"wall_time": 2.0, "num_tokens": 100}}}, fh)
+    calibration = load_calibration(bench_file)
+    assert calibration == {"sequence_length": 50.0}
+
+    config = OmegaConf.load(foo_config_file)
+    config.plan = {"calibration_file": str(bench_file)}
+    plan = ResourcePlanner.from_config(config).plan()
+    assert plan.metrics[0].calibrated
+    assert not plan.metrics[1].calibrated
+
+
+def test_plan_missing_files_fail(foo_config_file):
+    """Report all the missing dataset files at once."""
+    config = OmegaConf.load(foo_config_file)
+    config.scorer.systems = ["foo_missing_1", "foo_missing_2"]
+    with pytest.raises(FileNotFoundError, match=r"foo_missing_1(.|\n)*foo_missing_2"):
+        ResourcePlanner.from_config(config).plan()
+
+
+def test_invalid_languages_fail(foo_dataset):
+    """Fail on invalid language specification before loading the data."""
+    languages_info = {
+        "eng": LanguageInfo(
+            name="English",
+            scripts=["Latn"],
+            glottocodes=["stan1293"],
+            families=None,
+            speakers=None,
+            continent=None,
+            wikipedia=None,
+            tier=None,
+            morphology="fusional",
+            fineweb2=None,
+        )
+    }
+    with pytest.raises(ValueError, match="Invalid language specification"):
+        TokCollateData(**foo_dataset, languages_info=languages_info)
+
+
+def test_run_dry_run(foo_config_file, capsys):
+    """Execute 'run --dry-run' without scoring."""
+    rc = main(["run", "--config-file", str(foo_config_file), "--dry-run"])
+    assert rc == 0
+    assert "Predicted runtime" in capsys.readouterr().out
@@ -0,0 +1,94 @@
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.profiling import MB, StageProfiler, get_peak_rss
+from tokcollate.scorer import ScorerResultSaver, TokCollateScorer
+
+RSS_GROWTH_MB = 32
+
+
+@pytest.fixture()
+def foo_config(foo_config_file):
+    return OmegaConf.load(foo_config_file)
+
+
+def test_stage_record():
+    profiler = StageProfiler()
+    with profiler.stage("foo", metric="bar", num_tokens=100) as record:
+        sum(range(10000))
+    assert profiler.records == [record]
+    assert record.wall_time > 0
+    assert record.rss_growth_mb >= 0
+    assert profiler.peak_rss_mb > 0
+    assert record.peak_traced_mb is None
+    assert record.tokens_per_second > 0
+
+
+def test_stage_record_detailed(tmp_path):
+    profiler = StageProfiler(detailed=True, profile_dir=tmp_path)
+    with profiler.stage("foo", metric="bar", system="baz") as record:
+        _ = [0] * 100000
+    assert record.peak_traced_mb > 0
+    assert Path(tmp_path, "foo.bar.baz.prof").exists()
+    assert "foo" in profiler.summary()
+    profiler.close()
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_lifetime():
+    """The allocation tracing starts with the first stage and stops at the exit of the profiler context."""
+    with StageProfiler(detailed=True) as profiler:
+        assert not tracemalloc.is_tracing()
+        with profiler.stage("foo"):
+            assert tracemalloc.is_tracing()
+    assert not tracemalloc.is_tracing()
+
+
+def test_stage_rss_growth():
+    """Only the stages raising the process peak RSS report its growth."""
+    profiler = StageProfiler()
+    with profiler.stage("alloc"):
+        # exceeds the earlier process peak regardless of the current memory usage
+        buffer = bytearray(int(get_peak_rss() + RSS_GROWTH_MB) * MB)
+        buffer[::4096] = b"x" * len(buffer[::4096])
+    del buffer
+    with profiler.stage("noop"):
+        pass
+    alloc, noop = profiler.records
+    assert alloc.rss_growth_mb > 0
+    assert noop.rss_growth_mb == 0
+
+
+def test_scorer_profile(foo_config):
+    scorer = TokCollateScorer(config=foo_config)
+    scorer.run()
+
+    with Path(scorer.output_dir, ScorerResultSaver._profile_filename).open("r") as fh:  # noqa: SLF001
+        profile = json.load(fh)
+    assert profile["peak_rss_mb"] > 0
+    records = profile["stages"]
+    stages = {record["stage"] for record in records}
+    assert stages == {"load", "score", "correlate", "save"}
+    scored = {(r["metric"], r["system"]) for r in records if r["stage"] == "score"}
+    assert scored == {(metric, system) for metric in scorer.metrics for system in scorer.systems}
+    assert all(r["num_tokens"] > 0 for r in records if r["stage"] in ("load", "score"))
+
+
+def test_scorer_profile_cprofile_dump(foo_config):
+    foo_config.profile = True
+    scorer = TokCollateScorer(config=foo_config)
+    scorer.run()
+    assert any(Path(scorer.output_dir, "profile").glob("score.*.prof"))
+    assert not tracemalloc.is_tracing()
+
+
+def test_scorer_load_failure_stops_tracing(foo_config, tmp_path):
+    foo_config.profile = True
+    foo_config.scorer.input_dir = str(Path(tmp_path, "missing"))
+    with pytest.raises(FileNotFoundError):
+        TokCollateScorer(config=foo_config)
+    assert not tracemalloc.is_tracing()
@@ -1,10 +1,32 @@
+import json
 from pathlib import Path
 
 import numpy as np
 import pytest
 from omegaconf import OmegaConf
 
+from tokcollate.line_outputs import load_line_outputs
 from tokcollate.scorer import ScorerResultSaver, TokCollateScorer
+from tokcollate.server import decode_results
+
+# optional scorer outputs, their configurations and the expected result keys
+SCORER_OUTPUTS = [
+    (
+        "histograms",
+        {"num_bins": 4, "log_bins": False},
+        [
+            "sequence_length_histogram",
+            "sequence_length_bin_edges",
+            "sequence_bytes_histogram",
+            "sequence_bytes_bin_edges",
+            "token_length_histogram",
+            "token_length_bin_edges",
+        ],
+    ),
+    ("line_outputs", {"statistics": ["sequence_length"]}, ["sequence_length"]),
+    ("overlap", {"per_language": False, "top_k": 10}, ["vocab_jaccard", "vocab_weighted_overlap", "vocab_top_k"]),
+    ("boundary_agreement", {"measures": ["f1"]}, ["boundary_f1"]),
+]
 
 
 @pytest.fixture()
@@ -73,3 +95,30 @@ def test_scorer_metric_marix_size(foo_scorer, metric_type):
         elif metric_type == "multi":
             ref_shape = [len(foo_scorer.systems), len(foo_scorer.languages), len(foo_scorer.languages)]
         assert results["metrics"][metric_label].shape == np.zeros(ref_shape).shape
+
+
+@pytest.mark.parametrize(("output", "output_config", "keys"), SCORER_OUTPUTS)
+def test_scorer_outputs(foo_config, output, output_config, keys, clear_instance_registry):  # noqa: ARG001
+    """The optional outputs are saved with their configuration and the axis layout of their arrays."""
+    foo_config.scorer[output] = output_config
+    scorer = TokCollateScorer(config=foo_config)
+    results = scorer.run()
+    assert list(results[output]) == keys
+
+    if output in ScorerResultSaver._external_results:  # noqa: SLF001
+        assert output not in np.load(Path(scorer.output_dir, "results.npz"), allow_pickle=True).files
+        arrays = load_line_outputs(scorer.output_dir)
+    else:
+        arrays = decode_results(Path(scorer.output_dir, "results.npz"))
+    with Path(scorer.output_dir, "metadata.json").open() as fh:
+        metadata = json.load(fh)
+    assert {key: metadata[output][key] for key in output_config} == output_config
+
+    sizes = {"systems": len(scorer.systems), "languages": len(scorer.languages)}
+    for key in keys:
+        np.testing.assert_array_equal(arrays[key], results[output][key])
+        axes = metadata["result_axes"][key]
+        assert len(axes) == results[output][key].ndim
+        for axis, axis_name in enumerate(axes):
+            if axis_name in sizes:
+                assert results[output][key].shape[axis] == sizes[axis_name]
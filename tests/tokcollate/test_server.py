@@ -0,0 +1,171 @@
+import asyncio
+import io
+import json
+from http import HTTPStatus
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tokcollate.scorer import ScorerResultSaver
+from tokcollate.server import DatasetResults, ResultsCache, ResultsIndex, TokCollateServer, decode_results
+
+SYSTEMS = ["sys_a", "sys_b"]
+LANGUAGES = ["en", "fr", "de"]
+
+
+@pytest.fixture()
+def foo_results_root(tmp_path):
+    """Directory containing a single saved scorer output."""
+    output_dir = Path(tmp_path, "foo_dataset")
+    output_dir.mkdir()
+    results = {
+        "metrics": {
+            "seq_len": np.arange(6, dtype=float).reshape(2, 3),
+            "seq_ratio": np.arange(18, dtype=float).reshape(2, 3, 3),
+        },
+        "correlation": {"mono": np.float64(1.0), "multi": None},
+    }
+    results["metrics"]["seq_len"][0, 0] = np.nan
+    ScorerResultSaver(
+        output_dir=output_dir, tokenizers=SYSTEMS, metrics=["seq_len", "seq_ratio"], languages=LANGUAGES
+    ).save_results(results)
+    return tmp_path
+
+
+async def _request(server, method, path, headers=None, body=b""):  # noqa: ANN202
+    host, port = server.address
+    reader, writer = await asyncio.open_connection(host, port)
+    header_lines = "".join(f"{k}: {v}\r\n" for k, v in (headers or {}).items())
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n{header_lines}\r\n".encode("latin-1")
+        + body
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, payload = raw.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = {k.lower(): v.strip() for k, v in (line.split(":", 1) for line in header_lines)}
+    return int(status_line.split(" ")[1]), response_headers, payload
+
+
+def _run_requests(root, requests):  # noqa: ANN202
+    async def run():  # noqa: ANN202
+        server = TokCollateServer(index=ResultsIndex(roots=[root]), port=0)
+        await server.start()
+        try:
+            return [await _request(server, *req) for req in requests], server
+        finally:
+            await server.stop()
+
+    return asyncio.run(run())
+
+
+def test_decode_results_flattens_groups(foo_results_root):
+    arrays = decode_results(Path(foo_results_root, "foo_dataset", "results.npz"))
+    assert arrays["seq_ratio"].shape == (len(SYSTEMS), len(LANGUAGES), len(LANGUAGES))
+
+
+def test_list_datasets(foo_results_root):
+    [(status, _, body)], _ = _run_requests(foo_results_root, [("GET", "/api/datasets")])
+    assert status == HTTPStatus.OK
+    assert [d["id"] for d in json.loads(body)["datasets"]] == ["foo_dataset"]
+
+
+def test_get_dataset_etag(foo_results_root):
+    [(status, headers, body)], _ = _run_requests(foo_results_root, [("GET", "/api/datasets/foo_dataset")])
+    assert status == HTTPStatus.OK
+    payload = json.loads(body)
+    assert payload["metadata"]["tokenizers"] == SYSTEMS
+    assert payload["npzData"]["seq_len"][0][0] == "NaN"
+
+    responses, server = _run_requests(
+        foo_results_root,
+        [
+            ("GET", "/api/datasets/foo_dataset", {"If-None-Match": headers["etag"]}),
+            ("GET", "/api/datasets/foo_dataset"),
+        ],
+    )
+    assert responses[0][0] == HTTPStatus.NOT_MODIFIED
+    assert responses[0][2] == b""
+    assert len(server.cache) == 1
+
+
+def test_get_unknown_dataset(foo_results_root):
+    [(status, _, _)], _ = _run_requests(foo_results_root, [("GET", "/api/datasets/bar")])
+    assert status == HTTPStatus.NOT_FOUND
+
+
+def test_get_metric_slice(foo_results_root):
+    [(status, _, body)], _ = _run_requests(
+        foo_results_root, [("GET", "/api/datasets/foo_dataset/metrics/seq_ratio?system=sys_b&language=fr,de")]
+    )
+    assert status == HTTPStatus.OK
+    payload = json.loads(body)
+    assert payload["shape"] == [1, 2, 2]
+    assert payload["data"] == [[[13.0, 14.0], [16.0, 17.0]]]
+
+
+def test_get_metric_slice_binary(foo_results_root):
+    [(status, headers, body)], _ = _run_requests(
+        foo_results_root, [("GET", "/api/datasets/foo_dataset/metrics/seq_len?language=fr&format=npy")]
+    )
+    assert status == HTTPStatus.OK
+    assert headers["content-type"] == "application/x-npy"
+    np.testing.assert_array_equal(np.load(io.BytesIO(body)), np.array([[1.0], [4.0]]))
+
+
+def test_get_metric_unknown_label(foo_results_root):
+    [(status, _, _)], _ = _run_requests(
+        foo_results_root, [("GET", "/api/datasets/foo_dataset/metrics/seq_len?system=sys_c")]
+    )
+    assert status == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize("content_length", ["abc", "-1"])
+def test_malformed_content_length(foo_results_root, content_length):
+    """The malformed requests are rejected without breaking the server."""
+    (bad, ok), _ = _run_requests(
+        foo_results_root,
+        [("GET", "/api/datasets", {"Content-Length": content_length}), ("GET", "/api/datasets")],
+    )
+    assert bad[0] == HTTPStatus.BAD_REQUEST
+    assert ok[0] == HTTPStatus.OK
+
+
+def test_parse_npz(foo_results_root):
+    body = Path(foo_results_root, "foo_dataset", "results.npz").read_bytes()
+    [(status, _, payload)], _ = _run_requests(foo_results_root, [("POST", "/api/parse-npz", None, body)])
+    assert status == HTTPStatus.OK
+    assert set(json.loads(payload)) >= {"seq_len", "seq_ratio"}
+
+
+def test_select_result_axes():
+    """The system and language axes are selected by the saved layout (also when #systems == #languages)."""
+    arr = np.arange(8, dtype=float).reshape(2, 2, 2)
+    dataset = DatasetResults(
+        dataset_id="foo",
+        etag="foo",
+        metadata={
+            "tokenizers": ["a", "b"],
+            "languages": ["en", "fr"],
+            "result_axes": {"boundary_f1": ["systems", "systems", "languages"]},
+        },
+        arrays={"boundary_f1": arr, "seq_ratio": arr},
+    )
+    selected = dataset.select("boundary_f1", systems=["b"], languages=["fr"])
+    assert selected.shape == (1, 2, 1)
+    assert selected[0, :, 0].tolist() == [5.0, 7.0]
+    # the results without a saved layout are laid out as the metric scores
+    np.testing.assert_array_equal(dataset.select("seq_ratio", systems=["b"], languages=["fr"]), [[[7.0]]])
+
+
+def test_cache_eviction():
+    cache = ResultsCache(max_bytes=100)
+    for key in ["a", "b", "c"]:
+        cache.put(key, DatasetResults(dataset_id=key, etag=key, metadata={}, arrays={"x": np.zeros(10)}))
+    assert "a" not in cache
+    assert "c" in cache
+    assert cache.nbytes <= cache.max_bytes
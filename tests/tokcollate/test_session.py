@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate import metrics
+from tokcollate.scorer import ScorerResultSaver, TokCollateScorer
+from tokcollate.session import TokCollateSession
+
+
+@pytest.fixture()
+def foo_config(foo_config_file):
+    return OmegaConf.load(foo_config_file)
+
+
+@pytest.fixture()
+def foo_session(foo_config):
+    return TokCollateSession.from_config(foo_config)
+
+
+def test_session_run_matches_scorer(foo_config_file, foo_session, clear_instance_registry):  # noqa: ARG001
+    """The session produces the same results as the scorer."""
+    results = foo_session.run(OmegaConf.load(foo_config_file))
+    scorer_results = TokCollateScorer(config=OmegaConf.load(foo_config_file)).run()
+    for metric_label, scores in scorer_results["metrics"].items():
+        np.testing.assert_allclose(results["metrics"][metric_label], scores)
+    np.testing.assert_allclose(results["correlation"]["multi"], scorer_results["correlation"]["multi"])
+
+
+def test_session_does_not_modify_config(foo_config, foo_session):
+    """The metric configurations can be reused."""
+    foo_session.score(foo_config)
+    assert all("metric" in params for params in foo_config.scorer.metrics)
+
+
+def test_session_metric_instances(foo_session):
+    """The metric instances are kept per session (not in the global registry)."""
+    metric = foo_session.build_metric("sequence_length", metric_label="foo")
+    assert foo_session.build_metric("sequence_length", metric_label="foo") is metric
+    assert "foo" not in metrics.list_metric_instance_labels()
+    with pytest.raises(ValueError, match="already used"):
+        foo_session.build_metric("token_length", metric_label="foo")
+
+
+def test_session_sweep(foo_session):
+    """Score all the parameter combinations."""
+    results = foo_session.sweep("sequence_ratio", {"mode": ["mean", "var"]}, use_bytes=True)
+    assert set(results) == {
+        "sequence_ratio[mode=mean,use_bytes=True]",
+        "sequence_ratio[mode=var,use_bytes=True]",
+    }
+    num_languages = len(foo_session.languages)
+    ref_shape = (len(foo_session.systems), num_languages, num_languages)
+    assert all(scores.shape == ref_shape for scores in results.values())
+
+
+def test_session_parallel(foo_config):
+    """The parallel scoring produces the same results as the sequential one."""
+    sequential = TokCollateSession.from_config(foo_config).score(foo_config)
+    parallel = TokCollateSession.from_config(foo_config, max_workers=4).score(foo_config)
+    for metric_label, scores in sequential.items():
+        np.testing.assert_allclose(parallel[metric_label], scores)
+
+
+def test_session_save_results(foo_config, foo_session, tmp_path):
+    """Save the results in the scorer output format."""
+    foo_session.run(foo_config, output_dir=tmp_path)
+    assert (tmp_path / ScorerResultSaver._results_filename).exists()  # noqa: SLF001
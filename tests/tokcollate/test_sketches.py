@@ -0,0 +1,128 @@
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.scorer import TokCollateScorer
+from tokcollate.sketches import CountMinSketch, EntropySketch, HyperLogLog, UnigramSketch, hash_tokens, sketch_file
+
+# minimum fraction of the count-min estimates within the error bound
+CMS_BOUND_RATE = 0.95
+
+UNIGRAM_METRICS = [
+    {"metric": "bits", "metric_label": "bits"},
+    {"metric": "entropy", "metric_label": "renyi"},
+    {"metric": "entropy", "metric_label": "shannon", "function_type": "shannon_efficiency"},
+    {"metric": "percentile_frequency", "metric_label": "percentile"},
+    {"metric": "vocab_size", "metric_label": "vocab_size"},
+]
+
+
+@pytest.fixture(scope="module")
+def zipf_vocab():
+    rng = np.random.default_rng(0)
+    return Counter(f"tok{i}" for i in rng.zipf(1.3, size=200000))
+
+
+@pytest.fixture()
+def foo_unigram_config(foo_config_file):
+    config = OmegaConf.load(foo_config_file)
+    config.scorer.metrics = UNIGRAM_METRICS
+    config.scorer.output_dir = None
+    return config
+
+
+def test_approximate_scorer_exact_on_small_data(foo_unigram_config, clear_instance_registry):  # noqa: ARG001
+    """The sketches of the vocabularies smaller than the sample size give the exact scores."""
+    results = TokCollateScorer(config=foo_unigram_config).run()
+    foo_unigram_config.scorer.approximate = {"num_workers": 2}
+    approx_results = TokCollateScorer(config=foo_unigram_config).run()
+    for metric_label, scores in results["metrics"].items():
+        np.testing.assert_allclose(approx_results["metrics"][metric_label], scores)
+
+
+def test_approximate_scorer_unsupported_metric(foo_config_file, clear_instance_registry):  # noqa: ARG001
+    config = OmegaConf.load(foo_config_file)
+    config.scorer.approximate = True
+    with pytest.raises(NotImplementedError, match="approximate"):
+        TokCollateScorer(config=config).run()
+
+
+def test_unigram_sketch_estimates(zipf_vocab):
+    """The estimates of a saturated sketch are close to the exact values."""
+    sketch = UnigramSketch(sample_size=2048, num_heavy_hitters=256)
+    sketch.update_vocabulary(zipf_vocab)
+    assert not sketch.is_exact
+
+    counts = np.array(list(zipf_vocab.values()), dtype=np.float64)
+    probs = counts / counts.sum()
+    assert sketch.total == counts.sum()
+    assert sketch.vocab_size() == pytest.approx(len(zipf_vocab), rel=4 * sketch.hll.relative_error)
+    assert sketch.shannon_entropy() == pytest.approx(-np.sum(probs * np.log2(probs)), abs=0.1)
+    assert sketch.frequency_moment(2.5) == pytest.approx(np.sum(counts**2.5), rel=0.01)
+    assert sketch.heavy_hitters.most_common(3) == zipf_vocab.most_common(3)
+
+
+def test_unigram_sketch_merge(zipf_vocab):
+    """Merging the sketches of the shards gives the sketch of the whole data."""
+    tokens = list(zipf_vocab.keys())
+    sketch = UnigramSketch(sample_size=512)
+    sketch.update_vocabulary(zipf_vocab)
+    merged = UnigramSketch(sample_size=512)
+    for shard in (tokens[::2], tokens[1::2]):
+        shard_sketch = UnigramSketch(sample_size=512)
+        shard_sketch.update(shard, [zipf_vocab[tok] for tok in shard])
+        merged.merge(shard_sketch)
+    np.testing.assert_array_equal(merged.hll.registers, sketch.hll.registers)
+    np.testing.assert_array_equal(merged.heavy_hitters.cms.table, sketch.heavy_hitters.cms.table)
+    np.testing.assert_array_equal(merged.sample.counts, sketch.sample.counts)
+    assert merged.heavy_hitters.tokens == sketch.heavy_hitters.tokens
+    assert merged.total == sketch.total
+
+    with pytest.raises(ValueError, match="different settings"):
+        merged.merge(UnigramSketch(sample_size=256))
+
+
+def test_unigram_sketch_save_load(tmp_path, zipf_vocab):
+    sketch = UnigramSketch(sample_size=512, entropy_projections=16)
+    sketch.update_vocabulary(zipf_vocab)
+    sketch.save(Path(tmp_path, "sketch.npz"))
+    loaded = UnigramSketch.load(Path(tmp_path, "sketch.npz"))
+    assert loaded.params == sketch.params
+    assert loaded.vocab_size() == sketch.vocab_size()
+    assert loaded.shannon_entropy() == sketch.shannon_entropy()
+    assert loaded.heavy_hitters.most_common(10) == sketch.heavy_hitters.most_common(10)
+
+
+def test_sketch_file(foo_system_output_tiny, foo_text_tiny):
+    sketch = sketch_file(foo_system_output_tiny, batch_lines=2)
+    vocab = Counter(foo_text_tiny.split())
+    assert sketch.is_exact
+    assert sketch.total == vocab.total()
+    assert sketch.vocab_size() == len(vocab)
+
+
+def test_hyperloglog():
+    hll = HyperLogLog(precision=12)
+    hll.update(hash_tokens([str(i) for i in range(50000)]))
+    assert hll.estimate() == pytest.approx(50000, rel=4 * hll.relative_error)
+
+
+def test_count_min_sketch(zipf_vocab):
+    cms = CountMinSketch(width=1024, depth=4)
+    hashes = hash_tokens(list(zipf_vocab.keys()))
+    counts = np.array(list(zipf_vocab.values()))
+    cms.update(hashes, counts)
+    estimates = cms.query(hashes)
+    assert np.all(estimates >= counts)
+    assert np.mean(estimates - counts <= cms.error_bound(counts.sum())) > CMS_BOUND_RATE
+
+
+def test_entropy_sketch(zipf_vocab):
+    sketch = EntropySketch(num_projections=512)
+    counts = np.array(list(zipf_vocab.values()))
+    sketch.update(hash_tokens(list(zipf_vocab.keys())), counts)
+    probs = counts / counts.sum()
+    assert sketch.estimate() == pytest.approx(-np.sum(probs * np.log2(probs)), abs=0.5)
@@ -0,0 +1,119 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from omegaconf import DictConfig, OmegaConf
+
+from tokcollate.scorer import TokCollateScorer
+from tokcollate.streaming import StreamingScorer, TokenStatisticsAccumulator
+from tokcollate.utils import TOKEN_IDS_SUFFIX, get_vocabulary
+from tokcollate_cli import main
+
+METRICS = [
+    {"metric": "bits", "metric_label": "bits"},
+    {"metric": "entropy", "metric_label": "renyi"},
+    {"metric": "entropy", "metric_label": "shannon", "function_type": "shannon_efficiency"},
+    {"metric": "percentile_frequency", "metric_label": "percentile"},
+    {"metric": "vocab_size", "metric_label": "vocab_size"},
+    {"metric": "sequence_length", "metric_label": "seq_len"},
+    {"metric": "sequence_length", "metric_label": "seq_bytes", "use_bytes": True, "mode": "var"},
+    {"metric": "token_length", "metric_label": "tok_len"},
+    {"metric": "token_length", "metric_label": "tok_bytes", "use_bytes": True, "mode": "var"},
+    {"metric": "sequence_ratio", "metric_label": "seq_ratio"},
+    {"metric": "sequence_length", "metric_label": "seq_len_p90", "mode": "p90"},
+    {"metric": "sequence_length", "metric_label": "seq_bytes_median", "use_bytes": True, "mode": "median"},
+    {"metric": "token_length", "metric_label": "tok_len_p95", "mode": "p95"},
+    {"metric": "sequence_ratio", "metric_label": "seq_ratio_q", "mode": "quantile", "quantile": 0.25},
+    {"metric": "vocab_growth", "metric_label": "heaps"},
+    {"metric": "vocab_growth", "metric_label": "growth_curve", "function_type": "growth_curve", "num_points": 8},
+    {"metric": "jensen_shannon_divergence", "metric_label": "jsd"},
+    {"metric": "kullback_liebler_divergence", "metric_label": "kld", "vocab_most_common": 10},
+]
+
+
+@pytest.fixture()
+def foo_stream_config(tmp_path, foo_text_tiny, foo_spm_model):
+    """Config with different (parallel) texts in each language, including empty lines."""
+    input_dir = Path(tmp_path, "plaintext")
+    input_dir.mkdir()
+    lines = foo_text_tiny.split("\n")
+    Path(input_dir, "en.txt").write_text("\n".join([*lines, "", *lines]) + "\n", encoding="utf-8")
+    lines_fr = [f"{line} déjà vu" for line in reversed(lines)]
+    Path(input_dir, "fr.txt").write_text("\n".join([*lines_fr, "", *lines_fr]) + "\n", encoding="utf-8")
+    return OmegaConf.create(
+        {
+            "tokenize": {
+                "input_dir": str(input_dir),
+                "output_dir": str(Path(tmp_path, "tokenized")),
+                "shard_size": 3,
+                "tokenizers": {"spm": {"type": "sentencepiece", "model_file": str(foo_spm_model)}},
+            },
+            "scorer": {
+                "input_dir": str(Path(tmp_path, "tokenized")),
+                "output_dir": str(Path(tmp_path, "results")),
+                "systems": ["spm"],
+                "languages": ["en", "fr"],
+                "file_suffix": TOKEN_IDS_SUFFIX,
+                "metrics": METRICS,
+            },
+        }
+    )
+
+
+def test_accumulator_matches_text_statistics(foo_text_tiny_tokenized, foo_vocab):
+    """The accumulated statistics equal the statistics of the loaded text."""
+    token_ids = {tok: i for i, tok in enumerate(foo_vocab)}
+    accumulator = TokenStatisticsAccumulator(vocab=foo_vocab)
+    for line in foo_text_tiny_tokenized:
+        accumulator.update(np.array([token_ids[tok] for tok in line], dtype=np.int64), np.array([len(line), 0]))
+    streamed = accumulator.finalize()
+
+    vocabulary = get_vocabulary(foo_text_tiny_tokenized)
+    assert list(streamed.vocabulary.items()) == list(vocabulary.items())
+    np.testing.assert_array_equal(streamed.sequence_lengths, [len(line) for line in foo_text_tiny_tokenized])
+    np.testing.assert_array_equal(
+        streamed.sequence_bytes, [sum(len(tok.encode("utf-8")) for tok in line) for line in foo_text_tiny_tokenized]
+    )
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_streaming_matches_tokenize_then_score(
+    foo_stream_config,
+    num_workers,
+    clear_instance_registry,  # noqa: ARG001
+):
+    """Scoring the streamed statistics gives the same results as scoring the tokenized files."""
+    foo_stream_config.tokenize.num_workers = num_workers
+    foo_stream_config.scorer.histograms = {"num_bins": 8}
+    assert main(["tokenize", "--config-file", _save_config(foo_stream_config)]) == 0
+    expected = TokCollateScorer(config=foo_stream_config).run()
+
+    results = StreamingScorer(config=foo_stream_config).run()
+    assert list(results["metrics"].keys()) == [metric["metric_label"] for metric in METRICS]
+    for metric_label, scores in expected["metrics"].items():
+        np.testing.assert_allclose(results["metrics"][metric_label], scores, err_msg=metric_label)
+    for key, hist in expected["histograms"].items():
+        np.testing.assert_array_equal(results["histograms"][key], hist, err_msg=key)
+    assert Path(foo_stream_config.scorer.output_dir, "results.npz").exists()
+    assert Path(foo_stream_config.scorer.output_dir, "tokenize_stats.json").exists()
+
+
+def test_streaming_text_access_fail(foo_stream_config):
+    """Fail clearly when a metric requires the text itself."""
+    scorer = StreamingScorer(config=foo_stream_config)
+    scorer.run()
+    with pytest.raises(NotImplementedError, match="not available in the streaming mode"):
+        scorer.session.data.get_system_text("spm", "en")
+
+
+def test_stream_cli(foo_stream_config):
+    """Execute the 'stream' subcommand."""
+    assert main(["stream", "--config-file", _save_config(foo_stream_config)]) == 0
+    assert Path(foo_stream_config.scorer.output_dir, "results.npz").exists()
+    assert not Path(foo_stream_config.tokenize.output_dir).exists()
+
+
+def _save_config(config: DictConfig) -> str:
+    config_file = Path(config.tokenize.input_dir).with_name("config.yml")
+    OmegaConf.save(config, config_file)
+    return str(config_file)
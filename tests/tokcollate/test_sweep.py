@@ -0,0 +1,84 @@
+import gzip
+from pathlib import Path
+
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.sweep import SentencePieceSweep, expand_grid, sweep_label
+from tokcollate.utils import TOKEN_IDS_SUFFIX, concat_files
+from tokcollate_cli import main
+
+NUM_GRID_CONFIGS = 4
+
+
+@pytest.fixture()
+def foo_sweep_config(tmp_path, foo_plaintext_dir, foo_text_tiny):
+    pytest.importorskip("sentencepiece")
+    train_files = [Path(tmp_path, f"train.{i}.txt") for i in range(2)]
+    for train_file in train_files:
+        train_file.write_text("\n".join(foo_text_tiny.split("\n") * 5) + "\n", encoding="utf-8")
+    return OmegaConf.create(
+        {
+            "sweep": {
+                "train_datasets": [str(path) for path in train_files],
+                "eval_dir": str(foo_plaintext_dir),
+                "output_dir": str(Path(tmp_path, "sweep")),
+                "grid": {"vocab_size": [30, 40], "model_type": ["unigram", "bpe"]},
+                "trainer_args": {"hard_vocab_limit": False},
+                "num_workers": 2,
+            },
+            "scorer": {"metrics": [{"metric": "vocab_size", "metric_label": "vocab_size"}]},
+        }
+    )
+
+
+def test_expand_grid():
+    """Enumerate all the parameter combinations with unique labels."""
+    configs = expand_grid({"vocab_size": [8000, 16000], "model_type": ["bpe", "unigram"]})
+    assert configs[0] == {"vocab_size": 8000, "model_type": "bpe"}
+    assert len({sweep_label(params) for params in configs}) == len(configs) == NUM_GRID_CONFIGS
+
+
+def test_concat_files(tmp_path, foo_text_tiny):
+    """Concatenate the (possibly compressed) files."""
+    plain_file = Path(tmp_path, "foo.txt")
+    plain_file.write_text(foo_text_tiny + "\n")
+    gz_file = Path(tmp_path, "foo.txt.gz")
+    with gzip.open(gz_file, "wt") as fh:
+        fh.write(foo_text_tiny + "\n")
+    concat_files([plain_file, gz_file], Path(tmp_path, "concat.txt"))
+    assert Path(tmp_path, "concat.txt").read_text() == 2 * (foo_text_tiny + "\n")
+
+
+def test_sweep(foo_sweep_config, languages, clear_instance_registry):  # noqa: ARG001
+    """Train, encode and score all the grid models in a single run."""
+    sweep = SentencePieceSweep.from_config(foo_sweep_config)
+    results = sweep.run(foo_sweep_config)
+    assert results["metrics"]["vocab_size"].shape == (len(sweep.configs), len(languages))
+    for label in sweep.configs:
+        assert sweep.model_file(label).exists()
+        for lang in languages:
+            assert Path(sweep.tokenized_dir, label, f"{lang}.{TOKEN_IDS_SUFFIX}").exists()
+    assert Path(sweep.output_dir, "results", "results.npz").exists()
+
+
+def test_sweep_reuses_models(foo_sweep_config):
+    """Only the missing models are trained."""
+    sweep = SentencePieceSweep.from_config(foo_sweep_config)
+    model_files = sweep.train()
+    mtimes = {label: path.stat().st_mtime_ns for label, path in model_files.items()}
+
+    foo_sweep_config.sweep.grid.vocab_size.append(50)
+    sweep = SentencePieceSweep.from_config(foo_sweep_config)
+    model_files = sweep.train()
+    assert len(model_files) == len(mtimes) + 2
+    for label, mtime in mtimes.items():
+        assert model_files[label].stat().st_mtime_ns == mtime
+
+
+def test_sweep_cli(foo_sweep_config, tmp_path):
+    """Execute the 'sweep' subcommand."""
+    config_file = Path(tmp_path, "config.yml")
+    OmegaConf.save(foo_sweep_config, config_file)
+    assert main(["sweep", "--config-file", str(config_file)]) == 0
+    assert Path(foo_sweep_config.sweep.output_dir, "results", "results.npz").exists()
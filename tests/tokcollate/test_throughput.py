@@ -0,0 +1,89 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.data import TokCollateData
+from tokcollate.metrics import build_metric
+from tokcollate.throughput import THROUGHPUT_STATISTICS, ThroughputBenchmark, pin_cpus
+from tokcollate_cli import main
+
+NUM_TRIALS = 2
+
+
+@pytest.fixture
+def foo_tokenizers(foo_vocab):
+    return {
+        "foo": {
+            "type": "callable",
+            "factory": "fixtures.foo_tokenizer_module:create_foo_tokenizer",
+            "kwargs": {"vocab": foo_vocab},
+        }
+    }
+
+
+def test_throughput_benchmark(foo_plaintext_dir, foo_tokenizers, foo_text_tiny, languages):
+    benchmark = ThroughputBenchmark(
+        tokenizers=foo_tokenizers, input_dir=foo_plaintext_dir, languages=languages, warmup=2, num_trials=NUM_TRIALS
+    )
+    stats = benchmark.run()
+    assert [(s.system, s.language) for s in stats] == [("foo", lang) for lang in languages]
+    for s in stats:
+        assert s.num_lines == len(foo_text_tiny.split("\n"))
+        assert s.num_tokens == len(foo_text_tiny.split())
+        assert s.num_bytes == len(foo_text_tiny.replace("\n", "").encode("utf-8"))
+        assert len(s.trial_times) == NUM_TRIALS
+        assert s.latencies.shape == (s.num_lines,)
+        assert s.bytes_per_second > 0
+        assert s.latency(0.5) <= s.latency(0.99)
+    for statistic in THROUGHPUT_STATISTICS:
+        assert benchmark.to_matrix(statistic).shape == (1, len(languages))
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="CPU affinity is not supported")
+def test_pin_cpus():
+    original = os.sched_getaffinity(0)
+    cpu = min(original)
+    with pin_cpus([cpu]):
+        assert os.sched_getaffinity(0) == {cpu}
+    assert os.sched_getaffinity(0) == original
+
+
+def test_encode_throughput_metric(foo_dataset, foo_plaintext_dir, foo_spm_model, clear_instance_registry):  # noqa: ARG001
+    system_label = foo_dataset["systems"][0]
+    metric = build_metric(
+        metric="encode_throughput",
+        metric_label="latency",
+        function_type="latency_p99",
+        tokenizers={system_label: {"type": "sentencepiece", "model_file": str(foo_spm_model)}},
+        input_dir=foo_plaintext_dir,
+        num_trials=NUM_TRIALS,
+    )
+    data = TokCollateData(metrics=[metric], **foo_dataset)
+    res = metric.score_all(data, systems=[system_label, "unknown"], languages=foo_dataset["languages"])
+    assert res.shape == (2, len(foo_dataset["languages"]))
+    assert np.all(res[0] > 0)
+    assert np.all(np.isnan(res[1]))
+
+
+def test_throughput_cli(tmp_path, foo_plaintext_dir, foo_tokenizers, languages):
+    """Execute the 'throughput' subcommand."""
+    config = {
+        "throughput": {
+            "input_dir": str(foo_plaintext_dir),
+            "output_dir": str(Path(tmp_path, "throughput")),
+            "languages": languages,
+            "num_trials": 1,
+            "tokenizers": foo_tokenizers,
+        }
+    }
+    config_file = Path(tmp_path, "config.yml")
+    OmegaConf.save(OmegaConf.create(config), config_file)
+    assert main(["throughput", "--config-file", str(config_file)]) == 0
+    with Path(tmp_path, "throughput", "throughput_stats.json").open() as fh:
+        stats = json.load(fh)
+    assert [entry["language"] for entry in stats] == languages
+    assert all(entry["tokens_per_second"] > 0 for entry in stats)
@@ -0,0 +1,140 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from omegaconf import OmegaConf
+
+from tokcollate.api import sentencepiece_tokenizer, tokenize_lines
+from tokcollate.data import TokCollateData
+from tokcollate.planner import estimate_file
+from tokcollate.tokenization import TokenizationRunner, build_tokenizer
+from tokcollate.utils import TOKEN_IDS_SUFFIX, load_system_output, save_token_ids, save_vocab
+from tokcollate_cli import main
+
+
+def test_token_ids_roundtrip(tmp_path, foo_text_tiny_tokenized, foo_vocab):
+    """Load the token-id files as the tokenized text (ignoring the empty lines)."""
+    token_ids = {tok: i for i, tok in enumerate(foo_vocab)}
+    sequences = [*foo_text_tiny_tokenized, []]
+    ids = np.array([token_ids[tok] for line in sequences for tok in line])
+    save_token_ids(Path(tmp_path, f"foo.{TOKEN_IDS_SUFFIX}"), ids, [len(line) for line in sequences])
+    save_vocab(Path(tmp_path, "vocab.json"), foo_vocab)
+
+    assert load_system_output(Path(tmp_path, f"foo.{TOKEN_IDS_SUFFIX}")) == foo_text_tiny_tokenized
+
+
+@pytest.mark.parametrize("num_workers", [1, 2])
+def test_tokenize_sentencepiece(foo_plaintext_dir, foo_spm_model, foo_text_tiny, languages, num_workers):
+    """Batched (multi-process) tokenization gives the same tokens as encoding the lines directly."""
+    runner = TokenizationRunner(
+        tokenizers={"spm": {"type": "sentencepiece", "model_file": str(foo_spm_model)}},
+        input_dir=foo_plaintext_dir,
+        output_dir=foo_plaintext_dir.with_name("tokenized"),
+        num_workers=num_workers,
+        shard_size=2,
+    )
+    stats = runner.run()
+    assert [s.language for s in stats] == languages
+
+    expected = tokenize_lines(sentencepiece_tokenizer(foo_spm_model), foo_text_tiny.split("\n"))
+    data = TokCollateData(
+        data_dir=runner.output_dir, systems=["spm"], languages=languages, file_suffix=TOKEN_IDS_SUFFIX
+    )
+    for lang in languages:
+        assert data.get_system_text("spm", lang) == expected
+
+    with Path(runner.output_dir, "tokenize_stats.json").open("r") as fh:
+        saved_stats = json.load(fh)
+    assert sum(s["num_tokens"] for s in saved_stats) == len(languages) * sum(len(line) for line in expected)
+
+
+def test_tokenize_callable_text_format(tmp_path, foo_plaintext_dir, foo_vocab, foo_text_tiny_tokenized, languages):
+    """Write the whitespace-separated tokens of a custom tokenizer."""
+    spec = {"type": "callable", "factory": "fixtures.foo_tokenizer_module:create_foo_tokenizer"}
+    spec["kwargs"] = {"vocab": foo_vocab}
+    assert build_tokenizer(spec).get_vocab() == foo_vocab
+
+    runner = TokenizationRunner(
+        tokenizers={"foo": spec},
+        input_dir=foo_plaintext_dir,
+        output_dir=Path(tmp_path, "tokenized"),
+        output_format="text",
+    )
+    runner.run()
+    for lang in languages:
+        assert load_system_output(runner.output_file("foo", lang)) == foo_text_tiny_tokenized
+
+
+def test_tokenize_interrupted(tmp_path, foo_plaintext_dir, foo_vocab, foo_text_tiny_tokenized, monkeypatch):
+    """An interrupted run leaves no partial outputs, so the restarted run tokenizes the files again."""
+    spec = {"type": "callable", "factory": "fixtures.foo_tokenizer_module:create_foo_tokenizer"}
+    spec["kwargs"] = {"vocab": foo_vocab}
+    encode_file = TokenizationRunner.encode_file
+
+    def interrupted_encode_file(self, *args):  # noqa: ANN002, ANN202
+        shards = encode_file(self, *args)
+        yield next(shards)
+        err_msg = "interrupted"
+        raise RuntimeError(err_msg)
+
+    for output_format in ["ids", "text"]:
+        runner = TokenizationRunner(
+            tokenizers={"foo": spec},
+            input_dir=foo_plaintext_dir,
+            output_dir=Path(tmp_path, output_format),
+            output_format=output_format,
+            shard_size=1,
+        )
+        with monkeypatch.context() as patch:
+            patch.setattr(TokenizationRunner, "encode_file", interrupted_encode_file)
+            with pytest.raises(RuntimeError, match="interrupted"):
+                runner.run()
+        assert not any(runner.output_file("foo", lang).exists() for lang in runner.languages)
+
+        runner.run()
+        for lang in runner.languages:
+            assert load_system_output(runner.output_file("foo", lang)) == foo_text_tiny_tokenized
+
+
+def test_estimate_token_ids_file(tmp_path, foo_plaintext_dir, foo_vocab, foo_text_tiny_tokenized):
+    """Count the lines and tokens of the token-id files exactly."""
+    spec = {"type": "callable", "factory": "fixtures.foo_tokenizer_module:create_foo_tokenizer"}
+    spec["kwargs"] = {"vocab": foo_vocab}
+    runner = TokenizationRunner(
+        tokenizers={"foo": spec}, input_dir=foo_plaintext_dir, output_dir=Path(tmp_path, "tokenized")
+    )
+    runner.run()
+    estimate = estimate_file(runner.output_file("foo", runner.languages[0]))
+    assert estimate.exact
+    assert estimate.num_lines == len(foo_text_tiny_tokenized)
+    assert estimate.num_tokens == sum(len(line) for line in foo_text_tiny_tokenized)
+    assert estimate.vocab_size == len(foo_vocab)
+
+
+def test_unknown_tokenizer_type_fail():
+    """Fail on an unregistered tokenizer backend."""
+    with pytest.raises(ValueError, match="Unknown tokenizer type"):
+        build_tokenizer({"type": "foo_missing"})
+
+
+def test_tokenize_cli(tmp_path, foo_plaintext_dir, foo_vocab, languages):
+    """Execute the 'tokenize' subcommand."""
+    config = {
+        "tokenize": {
+            "input_dir": str(foo_plaintext_dir),
+            "output_dir": str(Path(tmp_path, "tokenized")),
+            "tokenizers": {
+                "foo": {
+                    "type": "callable",
+                    "factory": "fixtures.foo_tokenizer_module:create_foo_tokenizer",
+                    "kwargs": {"vocab": foo_vocab},
+                }
+            },
+        }
+    }
+    config_file = Path(tmp_path, "config.yml")
+    OmegaConf.save(OmegaConf.create(config), config_file)
+    assert main(["tokenize", "--config-file", str(config_file)]) == 0
+    for lang in languages:
+        assert Path(tmp_path, "tokenized", "foo", f"{lang}.{TOKEN_IDS_SUFFIX}").exists()
@@ -0,0 +1,39 @@
+import re
+import subprocess
+import sys
+
+# generous limit (in seconds) on the CLI import time, it only guards against importing the heavy modules eagerly
+IMPORT_TIME_LIMIT = 1.0
+HEAVY_MODULES = ["scipy", "numpy", "tokcollate.scorer"]
+
+
+def _import_time(module: str) -> tuple[float, set[str]]:
+    """Return the cumulative import time of a module (in seconds) and the names of the imported modules."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {}
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match is not None:
+            imported[match.group(3)] = int(match.group(1)) / 1e6
+    return imported[module], set(imported)
+
+
+def test_cli_import_time():
+    """Importing the CLI does not import the subcommands and their dependencies."""
+    import_time, imported = _import_time("tokcollate_cli")
+    assert import_time < IMPORT_TIME_LIMIT
+    for module in HEAVY_MODULES:
+        assert module not in imported
+
+
+def test_metrics_import_time():
+    """Importing the metrics package does not import the metric implementations (e.g. scipy)."""
+    import_time, imported = _import_time("tokcollate.metrics")
+    assert import_time < IMPORT_TIME_LIMIT
+    assert "scipy" not in imported
+    assert "tokcollate.metrics.jensen_shannon" not in imported
@@ -0,0 +1,144 @@
+import logging
+from collections.abc import Callable, Mapping, Sequence
+from pathlib import Path
+
+import numpy as np
+
+from tokcollate.data import TextType, TokenSequencesType, convert_token_sequences
+from tokcollate.session import MetricConfigType, TokCollateSession
+
+logger = logging.getLogger(__name__)
+
+TokenizerType = Callable[[str], Sequence[str | int]] | Callable[[list[str]], list[Sequence[str | int]]]
+RawTextType = Mapping[str, Sequence[str]] | Sequence[str]
+
+
+def sentencepiece_tokenizer(model: "SentencePieceProcessor | Path | str") -> TokenizerType:  # noqa: F821
+    """Wrap a SentencePiece model (or model file) into a batched tokenizer returning the token pieces.
+
+    The returned callable encodes whole lists of lines at once (letting SentencePiece parallelize the encoding).
+    """
+    import sentencepiece as spm  # noqa: PLC0415
+
+    if not isinstance(model, spm.SentencePieceProcessor):
+        model = spm.SentencePieceProcessor(model_file=str(model))
+
+    def tokenize(lines: list[str]) -> list[list[str]]:
+        return model.encode(lines, out_type=str)
+
+    tokenize.batched = True
+    return tokenize
+
+
+def tokenize_lines(
+    tokenizer: TokenizerType,
+    lines: Sequence[str],
+    id_to_token: Callable[[int], str] | Sequence[str] | None = None,
+    *,
+    batched: bool | None = None,
+) -> TextType:
+    """Tokenize the lines and convert them to the TokCollateData text representation.
+
+    Args:
+        tokenizer: callable returning the tokens (strings) or token ids of a line (or of a list of lines if batched)
+        lines (list[str]): untokenized lines
+        id_to_token: (optional) mapping of the token ids to the token strings (a callable or a vocabulary list).
+            Without it, the ids are used as the tokens, which is fine for the frequency-based metrics, but not
+            for the metrics based on the token lengths (e.g. token_length).
+        batched (bool): the tokenizer processes whole lists of lines. Defaults to the tokenizer `batched` attribute.
+    """
+    if batched is None:
+        batched = getattr(tokenizer, "batched", False)
+    lines = [line.rstrip("\n") for line in lines]
+    sequences = tokenizer(lines) if batched else [tokenizer(line) for line in lines]
+    if id_to_token is not None:
+        if not callable(id_to_token):
+            vocab = np.asarray(id_to_token, dtype=object)
+            sequences = [vocab[np.asarray(seq, dtype=np.int64)] for seq in sequences]
+        else:
+            sequences = [[id_to_token(int(idx)) for idx in seq] for seq in sequences]
+    return convert_token_sequences(sequences)
+
+
+def tokenize_texts(
+    tokenizers: Mapping[str, TokenizerType],
+    texts: RawTextType,
+    id_to_token: Mapping[str, Callable[[int], str] | Sequence[str]] | None = None,
+) -> dict[str, dict[str, TextType] | TextType]:
+    """Tokenize the (per-language) texts with each tokenizer.
+
+    Args:
+        tokenizers (dict): tokenizers keyed by the system labels (see tokenize_lines)
+        texts: untokenized lines, or a {language: lines} mapping for a multilingual evaluation
+        id_to_token (dict): (optional) per-tokenizer mapping of the token ids to the token strings
+
+    Returns:
+        The in-memory system outputs in the TokCollateData.texts format.
+    """
+    id_to_token = id_to_token or {}
+    outputs = {}
+    for system_label, tokenizer in tokenizers.items():
+        logger.info("Tokenizing texts with %s...", system_label)
+        if isinstance(texts, Mapping):
+            outputs[system_label] = {
+                lang: tokenize_lines(tokenizer, lines, id_to_token=id_to_token.get(system_label, None))
+                for lang, lines in texts.items()
+            }
+        else:
+            outputs[system_label] = tokenize_lines(tokenizer, texts, id_to_token=id_to_token.get(system_label, None))
+    return outputs
+
+
+def score_tokenized(
+    tokenized: Mapping[str, Mapping[str, TokenSequencesType] | TokenSequencesType],
+    metrics: MetricConfigType,
+    output_dir: Path | None = None,
+    max_workers: int = 1,
+) -> dict[str, dict[str, np.ndarray]]:
+    """Score in-memory tokenized texts (token strings or ids) without writing them to the disk.
+
+    Args:
+        tokenized (dict): {system: {language: lines}} (or {system: lines}) tokenized texts
+        metrics: metric configurations in the scorer.metrics format (see TokCollateSession.score)
+        output_dir (Path): (optional) target location for saving the results
+        max_workers (int): number of metrics scored in parallel
+
+    Returns:
+        The TokCollateScorer.run results (metric scores and correlations).
+    """
+    languages = []
+    first = next(iter(tokenized.values()))
+    if isinstance(first, Mapping):
+        languages = list(first.keys())
+    session = TokCollateSession(texts=tokenized, languages=languages, max_workers=max_workers)
+    return session.run(metrics, output_dir=output_dir)
+
+
+def score_tokenizers(
+    tokenizers: Mapping[str, TokenizerType],
+    texts: RawTextType,
+    metrics: MetricConfigType,
+    *,
+    id_to_token: Mapping[str, Callable[[int], str] | Sequence[str]] | None = None,
+    output_dir: Path | None = None,
+    max_workers: int = 1,
+) -> dict[str, dict[str, np.ndarray]]:
+    """Tokenize the texts with the given tokenizers and score the outputs (without touching the disk).
+
+    Example:
+        results = score_tokenizers(
+            {"spm_8k": sentencepiece_tokenizer("spm_8k.model"), "hf": AutoTokenizer.from_pretrained(...).tokenize},
+            {"en": en_lines, "cs": cs_lines},
+            [{"metric": "sequence_ratio", "metric_label": "ratio"}],
+        )
+
+    Args:
+        tokenizers (dict): tokenizers keyed by the system labels (see tokenize_lines)
+        texts: untokenized lines, or a {language: lines} mapping for a multilingual evaluation
+        metrics: metric configurations in the scorer.metrics format (see TokCollateSession.score)
+        id_to_token (dict): (optional) per-tokenizer mapping of the token ids to the token strings
+        output_dir (Path): (optional) target location for saving the results
+        max_workers (int): number of metrics scored in parallel
+    """
+    tokenized = tokenize_texts(tokenizers, texts, id_to_token=id_to_token)
+    return score_tokenized(tokenized, metrics, output_dir=output_dir, max_workers=max_workers)
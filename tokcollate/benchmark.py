@@ -0,0 +1,274 @@
+import datetime as dt
+import json
+import logging
+import platform
+import subprocess
+from pathlib import Path
+from typing import Any, ClassVar
+
+import numpy as np
+from attrs import define, field, validators
+from omegaconf import OmegaConf
+
+from tokcollate.metrics import get_metric_requirements, list_metrics
+from tokcollate.scorer import TokCollateScorer
+from tokcollate.utils import open_file
+
+logger = logging.getLogger(__name__)
+
+# first code points of the (lowercase) alphabets used for the synthetic languages
+SCRIPT_OFFSETS = [0x61, 0x3B1, 0x430, 0x915, 0x5D0, 0x4E00]
+SCRIPT_SIZE = 24
+
+
+def default_metrics() -> list[str]:
+    """Return the registered metrics that can score the synthetic corpus.
+
+    The metrics requiring anything besides the tokenized system outputs (e.g. a reference text or the tokenizers,
+    not generated by SyntheticCorpus) are skipped.
+    """
+    return [name for name in sorted(list_metrics()) if not get_metric_requirements(name)]
+
+
+@define(kw_only=True)
+class SyntheticCorpus:
+    """Generator of Zipfian synthetic tokenized corpora.
+
+    Each system gets its own vocabulary of random tokens (written in a language-specific script) and the lines are
+    sampled from a Zipfian unigram distribution over the vocabulary. The output follows the
+    `{system}/{lang}.{file_suffix}` layout expected by TokCollateData.
+
+    Args:
+        num_systems (int): number of generated systems
+        num_languages (int): number of generated languages
+        num_lines (int): number of lines per language
+        vocab_size (int | list[int]): vocabulary size (per system)
+        zipf_exponent (float): exponent of the Zipfian unigram distribution
+        tokens_per_line (float): mean number of tokens per line (Poisson distributed)
+        token_length (float): mean number of characters per token (Poisson distributed)
+        seed (int): random generator seed
+    """
+
+    num_systems: int = field(converter=int, default=4)
+    num_languages: int = field(converter=int, default=8)
+    num_lines: int = field(converter=int, default=1000)
+    vocab_size: int | list[int] = field(
+        converter=lambda v: int(v) if isinstance(v, int | str) else [int(x) for x in v], default=32000
+    )
+    zipf_exponent: float = field(converter=float, default=1.1)
+    tokens_per_line: float = field(converter=float, default=30.0)
+    token_length: float = field(converter=float, default=4.0)
+    seed: int = field(converter=int, default=42)
+
+    file_suffix: ClassVar[str] = "txt"
+
+    @property
+    def systems(self) -> list[str]:
+        """Labels of the generated systems."""
+        return [f"sys_{i}" for i in range(self.num_systems)]
+
+    @property
+    def languages(self) -> list[str]:
+        """Labels of the generated languages."""
+        return [f"lang_{i}" for i in range(self.num_languages)]
+
+    def system_vocab_size(self, system_idx: int) -> int:
+        """Vocabulary size of the given system."""
+        if isinstance(self.vocab_size, int):
+            return self.vocab_size
+        return int(self.vocab_size[system_idx % len(self.vocab_size)])
+
+    def generate_lines(self, rng: np.random.Generator, vocab_size: int, script_offset: int) -> list[str]:
+        """Sample the tokenized lines of a single (system, language) pair."""
+        token_lengths = 1 + rng.poisson(max(self.token_length - 1, 0), size=vocab_size)
+        chars = rng.integers(script_offset, script_offset + SCRIPT_SIZE, size=token_lengths.sum())
+        boundaries = np.cumsum(token_lengths)[:-1]
+        vocab = np.array(["".join(map(chr, piece)) for piece in np.split(chars, boundaries)], dtype=object)
+
+        probs = 1.0 / np.arange(1, vocab_size + 1) ** self.zipf_exponent
+        probs /= probs.sum()
+        line_lengths = 1 + rng.poisson(max(self.tokens_per_line - 1, 0), size=self.num_lines)
+        tokens = vocab[rng.choice(vocab_size, size=line_lengths.sum(), p=probs)]
+        return [" ".join(line) for line in np.split(tokens, np.cumsum(line_lengths)[:-1])]
+
+    def generate(self, output_dir: Path) -> None:
+        """Write the corpus into the output directory."""
+        rng = np.random.default_rng(self.seed)
+        for i, system in enumerate(self.systems):
+            Path(output_dir, system).mkdir(parents=True, exist_ok=True)
+            for j, lang in enumerate(self.languages):
+                lines = self.generate_lines(
+                    rng, self.system_vocab_size(i), SCRIPT_OFFSETS[j % len(SCRIPT_OFFSETS)] + i % SCRIPT_SIZE
+                )
+                with open_file(Path(output_dir, system, f"{lang}.{self.file_suffix}"), "w") as fh:
+                    print("\n".join(lines), file=fh)
+        logger.info(
+            "Generated %d systems x %d languages x %d lines in %s",
+            self.num_systems,
+            self.num_languages,
+            self.num_lines,
+            output_dir,
+        )
+
+
+def get_git_revision() -> str | None:
+    """Return the current git commit hash (if available)."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=Path(__file__).parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@define(kw_only=True)
+class BenchmarkRunner:
+    """Times and memory-profiles the scorer stages on a synthetic corpus.
+
+    The scorer is executed `repeats` times with the lightweight profiling (the minimum times are reported) and
+    once more with the allocation tracing enabled (for the per-stage memory peaks).
+
+    Args:
+        corpus (SyntheticCorpus): benchmark corpus specification
+        work_dir (Path): directory for the generated corpus and the scorer outputs
+        metrics (list[str]): names of the benchmarked metrics (defaults to all the registered metrics able to score
+            the synthetic corpus, see default_metrics)
+        repeats (int): number of timed runs
+        trace_memory (bool): run the additional allocation-tracing pass
+    """
+
+    corpus: SyntheticCorpus = field(validator=validators.instance_of(SyntheticCorpus))
+    work_dir: Path = field(converter=Path)
+    metrics: list[str] = field(converter=lambda m: list(m) if m is not None else default_metrics(), default=None)
+    repeats: int = field(converter=int, default=3)
+    trace_memory: bool = field(default=True)
+
+    def scorer_config(self) -> dict[str, Any]:
+        """Create the scorer configuration for the benchmark run."""
+        return {
+            "scorer": {
+                "input_dir": str(Path(self.work_dir, "corpus")),
+                "output_dir": str(Path(self.work_dir, "output")),
+                "systems": self.corpus.systems,
+                "languages": self.corpus.languages,
+                "file_suffix": self.corpus.file_suffix,
+                "metrics": [{"metric": metric, "metric_label": metric} for metric in self.metrics],
+            }
+        }
+
+    def _run_scorer(self, *, profile: bool) -> list[dict[str, Any]]:
+        config = OmegaConf.create(self.scorer_config())
+        config.profile = profile
+        scorer = TokCollateScorer(config=config)
+        scorer.run()
+        return scorer.profiler.to_list()
+
+    @staticmethod
+    def _aggregate(records: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+        """Sum the records over the systems, keyed by stage (and metric)."""
+        stages = {}
+        for record in records:
+            name = record["stage"] if record["metric"] is None else f"{record['stage']}.{record['metric']}"
+            stage = stages.setdefault(name, {"wall_time": 0.0, "cpu_time": 0.0, "num_tokens": 0})
+            stage["wall_time"] += record["wall_time"]
+            stage["cpu_time"] += record["cpu_time"]
+            stage["num_tokens"] += record["num_tokens"] or 0
+            if record["peak_traced_mb"] is not None:
+                stage["peak_traced_mb"] = max(stage.get("peak_traced_mb", 0.0), record["peak_traced_mb"])
+        return stages
+
+    def run(self) -> dict[str, Any]:
+        """Generate the corpus, execute the benchmark and return the results."""
+        self.corpus.generate(Path(self.work_dir, "corpus"))
+
+        stages = {}
+        for i in range(self.repeats):
+            logger.info("Benchmark run %d/%d...", i + 1, self.repeats)
+            for name, stage in self._aggregate(self._run_scorer(profile=False)).items():
+                if name not in stages:
+                    stages[name] = stage
+                    continue
+                for key in ("wall_time", "cpu_time"):
+                    stages[name][key] = min(stages[name][key], stage[key])
+
+        if self.trace_memory:
+            logger.info("Benchmark run with allocation tracing...")
+            for name, stage in self._aggregate(self._run_scorer(profile=True)).items():
+                stages.setdefault(name, {})["peak_traced_mb"] = stage["peak_traced_mb"]
+
+        return {
+            "timestamp": f"{dt.datetime.now():%Y-%m-%d_%H:%M:%S}",
+            "revision": get_git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "corpus": {
+                "num_systems": self.corpus.num_systems,
+                "num_languages": self.corpus.num_languages,
+                "num_lines": self.corpus.num_lines,
+                "vocab_size": self.corpus.vocab_size,
+                "zipf_exponent": self.corpus.zipf_exponent,
+                "tokens_per_line": self.corpus.tokens_per_line,
+                "token_length": self.corpus.token_length,
+                "seed": self.corpus.seed,
+            },
+            "repeats": self.repeats,
+            "stages": stages,
+        }
+
+
+def save_benchmark(results: dict[str, Any], path: Path) -> None:
+    """Save the benchmark results as JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w") as fh:
+        json.dump(results, sort_keys=True, indent=2, fp=fh)
+
+
+def load_benchmark(path: Path) -> dict[str, Any]:
+    """Load previously saved benchmark results."""
+    with Path(path).open("r") as fh:
+        return json.load(fh)
+
+
+def compare_benchmarks(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    time_threshold: float = 1.25,
+    memory_threshold: float = 1.25,
+    min_time: float = 0.01,
+) -> list[str]:
+    """Compare the benchmark results with a baseline and return the list of detected regressions.
+
+    Args:
+        results (dict): current benchmark results
+        baseline (dict): baseline benchmark results (e.g. from a previous commit)
+        time_threshold (float): maximum allowed ratio of the current and the baseline stage wall time
+        memory_threshold (float): maximum allowed ratio of the current and the baseline stage memory peak
+        min_time (float): stages faster than this (in the baseline) are not compared (too noisy)
+    """
+    if results["corpus"] != baseline["corpus"]:
+        logger.warning("The benchmark corpus differs from the baseline corpus. The comparison might be misleading.")
+
+    regressions = []
+    for name, stage in results["stages"].items():
+        if name not in baseline["stages"]:
+            continue
+        base = baseline["stages"][name]
+        if base.get("wall_time", 0.0) >= min_time and stage["wall_time"] > time_threshold * base["wall_time"]:
+            regressions.append(
+                f"{name}: wall time {stage['wall_time']:.3f}s > {time_threshold} x {base['wall_time']:.3f}s"
+            )
+        if (
+            base.get("peak_traced_mb") is not None
+            and stage.get("peak_traced_mb") is not None
+            and stage["peak_traced_mb"] > memory_threshold * base["peak_traced_mb"]
+        ):
+            regressions.append(
+                f"{name}: memory peak {stage['peak_traced_mb']:.1f}MB > "
+                f"{memory_threshold} x {base['peak_traced_mb']:.1f}MB"
+            )
+    return regressions
@@ -0,0 +1,105 @@
+import logging
+from collections import Counter
+from collections.abc import Iterator, Mapping
+
+import numpy as np
+from attrs import Attribute, define, field
+
+from tokcollate.options import build_optional
+
+logger = logging.getLogger(__name__)
+
+
+def resample_counts(line_counts: "sparse.spmatrix", weights: np.ndarray) -> np.ndarray:  # noqa: F821
+    """Return the token counts of the resampled texts.
+
+    Args:
+        line_counts (sparse matrix): (num_lines, V) token counts of each line (see TokCollateData.get_line_counts)
+        weights (np.ndarray): (num_samples, num_lines) line occurrence counts of the resamples
+
+    Returns:
+        Numpy ndarray with shape(num_samples, V).
+    """
+    return np.asarray((line_counts.T @ weights.T).T)
+
+
+def vocabulary_columns(system_vocab: Counter, vocab: Counter) -> np.ndarray:
+    """Return the line_counts columns of the vocab entries (ordered as in get_unigram_distribution(vocab=vocab)).
+
+    Args:
+        system_vocab (Counter): vocabulary defining the line_counts columns (TokCollateData.get_vocabulary(system))
+        vocab (Counter): (sub)set of the system vocabulary
+    """
+    index = {tok: i for i, tok in enumerate(system_vocab)}
+    return np.array([index[tok] for tok, _ in vocab.most_common()], dtype=np.int64)
+
+
+def check_parallel(line_counts: list[int], weights: np.ndarray) -> None:
+    """Check that the resampled texts are parallel (the same lines are resampled in each language)."""
+    if any(num_lines != weights.shape[1] for num_lines in line_counts):
+        err_msg = f"The resampling requires parallel texts with {weights.shape[1]} lines (got {line_counts} lines)."
+        raise ValueError(err_msg)
+
+
+@define(kw_only=True)
+class BootstrapResampler:
+    """Draws bootstrap resamples of the dataset lines and computes the confidence intervals of the metrics.
+
+    Each resample is represented by the number of occurrences of each line (a row of the `weights` matrix), so
+    the metrics can score a whole batch of resamples at once from their per-line statistics (e.g. the sparse per-line
+    token counts) with a few matrix products (see TokCollateMetric.score_resampled) instead of re-scoring every
+    resampled text. The resamples only depend on the seed and the number of lines, so the outputs with the same
+    number of lines (the scored systems and the languages of a parallel dataset) are resampled identically
+    (i.e. a paired bootstrap).
+
+    Args:
+        num_samples (int): number of the bootstrap resamples
+        confidence (float): confidence level of the (percentile) intervals
+        batch_size (int): number of resamples scored at once (bounds the (batch_size, V) temporaries)
+        seed (int): random seed of the resampling
+    """
+
+    num_samples: int = field(converter=int, default=1000)
+    confidence: float = field(converter=float, default=0.95)
+    batch_size: int = field(converter=int, default=100)
+    seed: int = field(converter=int, default=42)
+
+    @confidence.validator
+    def _check_confidence(self, attribute: Attribute, value: float) -> None:
+        if not 0.0 < value < 1.0:
+            err_msg = f"The {attribute.name} must be in the (0, 1) interval (got {value})."
+            raise ValueError(err_msg)
+
+    @classmethod
+    def from_config(cls: "BootstrapResampler", config: Mapping | None) -> "BootstrapResampler | None":
+        """Create the resampler from the scorer.bootstrap config section (see build_optional).
+
+        OmegaConf Args:
+            scorer.bootstrap.num_samples: number of the bootstrap resamples
+            scorer.bootstrap.confidence: confidence level of the intervals
+            scorer.bootstrap.batch_size: number of resamples scored at once
+            scorer.bootstrap.seed: random seed of the resampling
+        """
+        return build_optional(cls, config)
+
+    def iter_weights(self, num_lines: int) -> Iterator[tuple[int, np.ndarray]]:
+        """Yield the batches of resamples (the index of the first resample and the (batch, num_lines) weights)."""
+        for start in range(0, self.num_samples, self.batch_size):
+            size = min(self.batch_size, self.num_samples - start)
+            if num_lines == 0:
+                yield start, np.zeros((size, 0))
+                continue
+            rng = np.random.default_rng([self.seed, num_lines, start])
+            weights = rng.multinomial(num_lines, np.full(num_lines, 1.0 / num_lines), size=size)
+            yield start, weights.astype(np.float64)
+
+    def interval(self, samples: np.ndarray, axis: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """Return the lower and upper bounds of the percentile intervals of the resampled scores.
+
+        Args:
+            samples (np.ndarray): resampled scores (see TokCollateMetric.resample_all)
+            axis (int): axis of the resamples
+        """
+        alpha = 1.0 - self.confidence
+        lower, upper = np.nanquantile(samples, [alpha / 2, 1.0 - alpha / 2], axis=axis)
+        return lower, upper
@@ -0,0 +1,183 @@
+import logging
+from collections import Counter
+from collections.abc import Mapping
+
+import numpy as np
+from attrs import define, field, validators
+
+from tokcollate.data import TokCollateData
+from tokcollate.options import build_optional, require_any
+
+logger = logging.getLogger(__name__)
+
+BOUNDARY_MEASURES = ("precision", "recall", "f1")
+# word-boundary markers of the common tokenizers (SentencePiece, byte-level BPE) and the WordPiece continuation prefix
+DEFAULT_MARKERS = ("▁", "Ġ")
+DEFAULT_CONTINUATION_PREFIXES = ("##",)
+
+# the line index is stored in the upper bits of the boundary keys (see boundary_keys)
+LINE_OFFSET_BITS = 32
+
+
+def normalized_length(token: str, markers: tuple[str, ...], continuation_prefixes: tuple[str, ...]) -> int:
+    """Return the number of the plaintext characters covered by the token (ignoring the markers and whitespace).
+
+    The byte-fallback tokens (<0xNN>) count as a character if they start a utf-8 sequence, i.e. a character split
+    into several byte tokens ends with its last byte.
+    """
+    if len(token) == 6 and token.startswith("<0x") and token.endswith(">"):  # noqa: PLR2004
+        try:
+            byte = int(token[3:5], 16)
+        except ValueError:
+            pass
+        else:
+            return 0 if byte >> 6 == 0b10 or chr(byte).isspace() else 1  # noqa: PLR2004
+    for prefix in continuation_prefixes:
+        if token.startswith(prefix) and len(token) > len(prefix):
+            token = token[len(prefix) :]
+            break
+    for marker in markers:
+        token = token.replace(marker, "")
+    return sum(not char.isspace() for char in token)
+
+
+def token_lengths(
+    text: list[list[str]], vocab: Counter, markers: tuple[str, ...], continuation_prefixes: tuple[str, ...]
+) -> np.ndarray:
+    """Return the normalized lengths (see normalized_length) of the concatenated tokens of the text lines.
+
+    The lengths are computed once per vocabulary type and gathered by the token ids.
+    """
+    token_index = {tok: i for i, tok in enumerate(vocab)}
+    lookup = np.fromiter(
+        (normalized_length(tok, markers, continuation_prefixes) for tok in vocab), dtype=np.int64, count=len(vocab)
+    )
+    token_ids = np.fromiter(
+        (token_index[tok] for line in text for tok in line), dtype=np.int64, count=sum(len(line) for line in text)
+    )
+    return lookup[token_ids]
+
+
+def token_offsets(line_lengths: np.ndarray, token_lengths: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the line indices and the character offsets of the token ends, and the character lengths of the lines.
+
+    Args:
+        line_lengths (np.ndarray): (lines) number of tokens per line
+        token_lengths (np.ndarray): (tokens) normalized lengths of the concatenated line tokens
+    """
+    line_index = np.repeat(np.arange(line_lengths.size, dtype=np.int64), line_lengths)
+    if token_lengths.size == 0:
+        return line_index, np.zeros(0, dtype=np.int64), np.zeros(line_lengths.size, dtype=np.int64)
+    ends = np.cumsum(token_lengths, dtype=np.int64)
+    line_ends = np.cumsum(line_lengths)
+    line_starts = np.concatenate([[0], ends])[line_ends - line_lengths]
+    line_totals = np.concatenate([[0], ends])[line_ends] - line_starts
+    return line_index, ends - line_starts[line_index], line_totals
+
+
+def boundary_keys(line_lengths: np.ndarray, token_lengths: np.ndarray) -> np.ndarray:
+    """Return the sorted unique keys of the line-internal token boundaries.
+
+    Args:
+        line_lengths (np.ndarray): (lines) number of tokens per line
+        token_lengths (np.ndarray): (tokens) normalized lengths of the concatenated line tokens
+
+    Returns:
+        The (line index << 32 | character offset) int64 keys of the token ends, except the line ends and
+        the boundaries of the tokens covering no characters.
+    """
+    line_index, offsets, line_totals = token_offsets(line_lengths, token_lengths)
+    internal = (offsets > 0) & (offsets < line_totals[line_index])
+    return np.unique((line_index[internal] << LINE_OFFSET_BITS) | offsets[internal])
+
+
+@define(kw_only=True)
+class BoundaryAgreement:
+    """Computes the segmentation boundary agreement between every pair of systems tokenizing the same plaintext.
+
+    The tokens of each line are mapped to the character offsets of their ends in the plaintext (without
+    whitespace): the word-boundary markers (e.g. `▁`), the continuation prefixes (e.g. `##`) and the whitespace are
+    removed from the vocabulary entries once per vocabulary type and the per-token lengths are gathered from
+    the resulting lookup array. The line-internal boundaries of a system are encoded as sorted (line, offset) keys,
+    so each pair of systems is compared by a single sorted-array intersection over all the lines.
+
+    Boundary measures (the systems on the first axis are evaluated against the systems on the second axis):
+        precision: fraction of the boundaries of the first system shared by the second system
+        recall: fraction of the boundaries of the second system shared by the first system
+        f1: harmonic mean of the precision and recall (symmetric)
+
+    Args:
+        measures (list[str]): computed boundary measures
+        markers (list[str]): word-boundary markers removed from the tokens
+        continuation_prefixes (list[str]): word-continuation prefixes removed from the start of the tokens
+    """
+
+    measures: list[str] = field(
+        converter=list,
+        factory=lambda: list(BOUNDARY_MEASURES),
+        validator=[validators.deep_iterable(validators.in_(BOUNDARY_MEASURES)), require_any(BOUNDARY_MEASURES)],
+    )
+    markers: tuple[str, ...] = field(converter=tuple, default=DEFAULT_MARKERS)
+    continuation_prefixes: tuple[str, ...] = field(converter=tuple, default=DEFAULT_CONTINUATION_PREFIXES)
+
+    @classmethod
+    def from_config(cls: "BoundaryAgreement", config: Mapping | None) -> "BoundaryAgreement | None":
+        """Create the agreement from the scorer.boundary_agreement config section (see build_optional).
+
+        OmegaConf Args:
+            scorer.boundary_agreement.measures: computed boundary measures
+            scorer.boundary_agreement.markers: word-boundary markers removed from the tokens
+            scorer.boundary_agreement.continuation_prefixes: word-continuation prefixes removed from the tokens
+        """
+        return build_optional(cls, config)
+
+    def get_boundaries(self, data: TokCollateData, system_label: str, language: str | None = None) -> np.ndarray:
+        """Return the sorted (line, offset) keys of the line-internal token boundaries (see boundary_keys)."""
+        lengths = token_lengths(
+            data.get_system_text(system_label, language=language),
+            data.get_vocabulary(system_label, language),
+            self.markers,
+            self.continuation_prefixes,
+        )
+        return boundary_keys(data.get_sequence_lengths(system_label, language), lengths)
+
+    def result_axes(self) -> dict[str, tuple[str, ...]]:
+        """Return the axis layout of each computed agreement matrix (see compute)."""
+        return {f"boundary_{measure}": ("systems", "systems", "languages") for measure in self.measures}
+
+    def compute(self, data: TokCollateData, systems: list[str], languages: list[str]) -> dict[str, np.ndarray]:
+        """Return the boundary agreement of each measure.
+
+        Returns:
+            Dictionary with the `boundary_{measure}` ndarrays with shape(len(systems), len(systems), len(languages)).
+        """
+        num_systems = len(systems)
+        shared = np.zeros((num_systems, num_systems, len(languages)))
+        totals = np.zeros((num_systems, len(languages)))
+        for k, lang in enumerate(languages):
+            self._check_parallel(data, systems, lang)
+            boundaries = [self.get_boundaries(data, system_label, lang) for system_label in systems]
+            totals[:, k] = [keys.size for keys in boundaries]
+            for i in range(num_systems):
+                shared[i, i, k] = boundaries[i].size
+                for j in range(i + 1, num_systems):
+                    size = np.intersect1d(boundaries[i], boundaries[j], assume_unique=True).size
+                    shared[i, j, k] = shared[j, i, k] = size
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            res = {
+                "precision": shared / totals[:, None, :],
+                "recall": shared / totals[None, :, :],
+                "f1": 2 * shared / (totals[:, None, :] + totals[None, :, :]),
+            }
+        return {f"boundary_{measure}": res[measure] for measure in self.measures}
+
+    @staticmethod
+    def _check_parallel(data: TokCollateData, systems: list[str], language: str) -> None:
+        num_lines = {system_label: data.get_sequence_lengths(system_label, language).size for system_label in systems}
+        if len(set(num_lines.values())) > 1:
+            err_msg = (
+                f"The boundary agreement requires the systems tokenizing the same {language} lines "
+                f"(number of lines: {num_lines})."
+            )
+            raise ValueError(err_msg)
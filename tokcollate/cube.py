@@ -0,0 +1,211 @@
+import json
+import logging
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+from attrs import define, field, validators
+from omegaconf import DictConfig
+
+from tokcollate.data import LanguageInfo, TokCollateData
+
+logger = logging.getLogger(__name__)
+
+STATS_CUBE_DIRNAME = "stats_cube"
+STATS_CUBE_METADATA_FILENAME = "cube.json"
+STATS_CUBE_VERSION = 1
+
+
+def save_stats_cube(
+    data: TokCollateData,
+    output_dir: Path,
+    systems: list[str] | None = None,
+    languages: list[str] | None = None,
+) -> Path:
+    """Save the counting statistics of the system outputs, so the metrics can be re-scored without their texts.
+
+    The cube is saved to the `stats_cube` subdirectory of the output_dir, one `{system}.npz` file per system:
+        tokens: vocabulary of the system (in the get_vocabulary(system) order)
+        char_lengths, byte_lengths: lengths of the vocabulary entries
+        counts_indptr, counts_indices, counts_data: sparse (languages, vocabulary) token counts (CSR arrays, the
+            column indices of each language follow its get_vocabulary(system, language) order)
+        lines_indptr, sequence_lengths, sequence_bytes: concatenated per-line lengths of the languages
+        first_occurrences: (optional) token stream positions of the first occurrences of the counted tokens
+            (aligned with counts_data, see TokCollateData.get_first_occurrences)
+
+    Args:
+        data (TokCollateData): scored data
+        output_dir (Path): scorer output directory
+        systems (list[str]): (optional) saved systems (defaults to all the data systems)
+        languages (list[str]): (optional) saved languages (defaults to all the data languages)
+
+    Returns:
+        The stats cube directory.
+    """
+    systems = data.systems if systems is None else systems
+    languages = data.languages if languages is None else languages
+    if not languages:
+        err_msg = "The stats cube requires the system outputs with languages."
+        raise ValueError(err_msg)
+
+    cube_dir = Path(output_dir, STATS_CUBE_DIRNAME)
+    cube_dir.mkdir(parents=True, exist_ok=True)
+    logger.info("Saving the stats cube to %s", cube_dir)
+    for system_label in systems:
+        system_vocab = data.get_vocabulary(system_label)
+        char_lengths, _ = data.get_token_lengths(system_label)
+        byte_lengths, _ = data.get_token_lengths(system_label, use_bytes=True)
+        columns = {tok: i for i, tok in enumerate(system_vocab)}
+
+        vocabs = [data.get_vocabulary(system_label, lang) for lang in languages]
+        lengths = [data.get_sequence_lengths(system_label, lang) for lang in languages]
+        try:
+            optional = {
+                "first_occurrences": np.concatenate(
+                    [data.get_first_occurrences(system_label, lang) for lang in languages]
+                )
+            }
+        except NotImplementedError:
+            logger.debug("The first occurrences of the %s tokens are not available.", system_label)
+            optional = {}
+        np.savez(
+            Path(cube_dir, f"{system_label}.npz"),
+            **optional,
+            tokens=np.array(list(system_vocab), dtype=str),
+            char_lengths=char_lengths,
+            byte_lengths=byte_lengths,
+            counts_indptr=np.cumsum([0] + [len(vocab) for vocab in vocabs]),
+            counts_indices=np.array([columns[tok] for vocab in vocabs for tok in vocab], dtype=np.int64),
+            counts_data=np.array([count for vocab in vocabs for count in vocab.values()], dtype=np.int64),
+            lines_indptr=np.cumsum([0] + [length.size for length in lengths]),
+            sequence_lengths=np.concatenate(lengths),
+            sequence_bytes=np.concatenate(
+                [data.get_sequence_lengths(system_label, lang, use_bytes=True) for lang in languages]
+            ),
+        )
+    with Path(cube_dir, STATS_CUBE_METADATA_FILENAME).open("w") as fh:
+        json.dump(
+            {"version": STATS_CUBE_VERSION, "systems": list(systems), "languages": list(languages)},
+            fh,
+            sort_keys=True,
+            indent=2,
+        )
+    return cube_dir
+
+
+def load_stats_cube(
+    output_dir: Path,
+    systems: list[str] | None = None,
+    languages: list[str] | None = None,
+    languages_info: dict[str, LanguageInfo] | None = None,
+) -> "TokCollateStreamedData":  # noqa: F821
+    """Load the stats cube (see save_stats_cube) as the data providing the vocabularies and the sequence lengths.
+
+    Args:
+        output_dir (Path): scorer output directory containing the stats_cube subdirectory
+        systems (list[str]): (optional) loaded systems (defaults to all the cube systems)
+        languages (list[str]): (optional) loaded languages (defaults to all the cube languages)
+        languages_info (dict[str, LanguageInfo]): (optional) language metadata
+    """
+    from tokcollate.streaming import StreamedText, TokCollateStreamedData  # noqa: PLC0415
+
+    cube_dir = Path(output_dir, STATS_CUBE_DIRNAME)
+    metadata_path = Path(cube_dir, STATS_CUBE_METADATA_FILENAME)
+    if not metadata_path.exists():
+        err_msg = f"No stats cube found in {output_dir} (run the scorer with scorer.stats_cube enabled)."
+        raise FileNotFoundError(err_msg)
+    with metadata_path.open() as fh:
+        metadata = json.load(fh)
+    if metadata["version"] != STATS_CUBE_VERSION:
+        err_msg = f"Unsupported stats cube version {metadata['version']} (expected {STATS_CUBE_VERSION})."
+        raise ValueError(err_msg)
+    systems = metadata["systems"] if systems is None else list(systems)
+    languages = metadata["languages"] if languages is None else list(languages)
+    missing = [system for system in systems if system not in metadata["systems"]]
+    missing += [lang for lang in languages if lang not in metadata["languages"]]
+    if missing:
+        err_msg = f"The stats cube does not contain: {', '.join(missing)}"
+        raise ValueError(err_msg)
+
+    streamed = {}
+    for system_label in systems:
+        logger.debug("Loading the stats cube of %s...", system_label)
+        with np.load(Path(cube_dir, f"{system_label}.npz")) as npz:
+            tokens = npz["tokens"].tolist()
+            counts_indptr, lines_indptr = npz["counts_indptr"], npz["lines_indptr"]
+            counts_indices, counts_data = npz["counts_indices"], npz["counts_data"].tolist()
+            sequence_lengths, sequence_bytes = npz["sequence_lengths"], npz["sequence_bytes"]
+            first_occurrences = npz["first_occurrences"] if "first_occurrences" in npz.files else None
+        streamed[system_label] = {}
+        for lang in languages:
+            i = metadata["languages"].index(lang)
+            start, end = counts_indptr[i], counts_indptr[i + 1]
+            vocabulary = Counter(
+                dict(zip([tokens[j] for j in counts_indices[start:end]], counts_data[start:end], strict=True))
+            )
+            lines = slice(lines_indptr[i], lines_indptr[i + 1])
+            streamed[system_label][lang] = StreamedText(
+                vocabulary=vocabulary,
+                sequence_lengths=sequence_lengths[lines],
+                sequence_bytes=sequence_bytes[lines],
+                first_occurrences=first_occurrences[start:end] if first_occurrences is not None else None,
+            )
+    return TokCollateStreamedData(
+        streamed=streamed, systems=systems, languages=languages, languages_info=languages_info
+    )
+
+
+@define(kw_only=True)
+class StatsCubeRescorer:
+    """Scores the metrics from a saved stats cube, without reopening the scored dataset files.
+
+    Supports the metrics based on the vocabularies and the sequence lengths (see TokCollateStreamedData), so newly
+    added or reconfigured metrics (e.g. a different Rényi power or vocab_most_common) are scored in seconds.
+
+    Args:
+        config (DictConfig): TokCollate configuration
+
+    OmegaConf Args:
+        rescore.cube_dir: output directory of the scorer run that saved the stats cube (scorer.stats_cube)
+        scorer.output_dir: (optional) target location for saving the scorer results
+        scorer.systems: (optional) list of the scored systems (defaults to all the cube systems)
+        scorer.languages: (optional) list of the scored languages (defaults to all the cube languages)
+        scorer.languages_info: (optional) languages_info JSON file
+        scorer.metrics: list of metrics and their configurations (dict)
+        scorer.max_workers: (optional) number of metrics scored in parallel
+        scorer.histograms: (optional) length histogram options (see LengthHistograms)
+        scorer.line_outputs: (optional) per-line output options (see LineOutputs)
+        scorer.overlap: (optional) vocabulary overlap options (see VocabularyOverlap)
+    """
+
+    config: DictConfig = field(validator=validators.instance_of(DictConfig))
+
+    session: "TokCollateSession" = field(init=False, default=None)  # noqa: F821
+
+    def __attrs_post_init__(self) -> None:
+        """Load the stats cube."""
+        from tokcollate.session import TokCollateSession  # noqa: PLC0415
+
+        scorer_config = self.config.scorer
+        languages_info = None
+        if scorer_config.get("languages_info", None) is not None:
+            with Path(scorer_config.languages_info).open("r", encoding="utf-8") as fh:
+                languages_info = {lang: LanguageInfo.create_entry(entry) for lang, entry in json.load(fh).items()}
+        data = load_stats_cube(
+            self.config.rescore.cube_dir,
+            systems=scorer_config.get("systems", None),
+            languages=scorer_config.get("languages", None),
+            languages_info=languages_info,
+        )
+        self.session = TokCollateSession(data=data, max_workers=scorer_config.get("max_workers", 1))
+
+    def run(self) -> dict[str, dict[str, np.ndarray]]:
+        """Score the metrics (the TokCollateScorer.run output)."""
+        scorer_config = self.config.scorer
+        return self.session.run(
+            scorer_config.metrics,
+            output_dir=scorer_config.get("output_dir", None),
+            histograms=scorer_config.get("histograms", None),
+            line_outputs=scorer_config.get("line_outputs", None),
+            overlap=scorer_config.get("overlap", None),
+        )
@@ -1,16 +1,26 @@
 import logging
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from pathlib import Path
+from typing import ClassVar, TypeVar
 
+import numpy as np
 from attrs import converters, define, field, validators
 
-from tokcollate.utils import load_tokenized_text_file
+from tokcollate.digest import TDigest
+from tokcollate.utils import get_vocabulary, load_system_output, load_tokenized_text_file
 
 logger = logging.getLogger(__name__)
 
 TextType = list[list[str]]
+# tokenized lines as token strings or token ids (e.g. directly from a tokenizer)
+TokenSequencesType = Iterable[Sequence[str | int]]
 
 LANG_SPEC_LEN = 3
 
+T = TypeVar("T")
+
 
 @define(kw_only=True)
 class LanguageInfo(dict):
@@ -33,11 +43,111 @@ class LanguageInfo(dict):
         return cls(**entry)
 
 
+def validate_languages(languages: list[str], languages_info: dict[str, LanguageInfo]) -> None:
+    """Check that the language specifications ({language}_{script}_{glottocode}) match the languages_info entries.
+
+    Raises:
+        ValueError: listing all the invalid language specifications
+    """
+    errors = []
+    for lang in languages:
+        lang_split = lang.split("_")
+        if len(lang_split) != LANG_SPEC_LEN:
+            errors.append(f"Language {lang} does not follow the {{language}}_{{script}}_{{glottocode}} format.")
+            continue
+        if lang_split[0] not in languages_info:
+            errors.append(f"Language {lang_split[0]} not in the provided languages_info JSON file.")
+            continue
+        if lang_split[1] not in languages_info[lang_split[0]].scripts:
+            errors.append(
+                f"Script {lang_split[1]} of language {lang_split[0]} not listed in the languages_info JSON file "
+                f"(available: {languages_info[lang_split[0]].scripts})."
+            )
+        if lang_split[2] not in languages_info[lang_split[0]].glottocodes:
+            errors.append(
+                f"Glottocode {lang_split[2]} of language {lang_split[0]} not listed in the languages_info JSON file "
+                f"(available: {languages_info[lang_split[0]].glottocodes})."
+            )
+    if errors:
+        err_msg = "Invalid language specification:\n  " + "\n  ".join(errors)
+        raise ValueError(err_msg)
+
+
+def get_system_files(
+    data_dir: Path, system_label: str, languages: list[str], file_suffix: str
+) -> dict[str | None, Path]:
+    """Return the locations of the system output files (keyed by language, None in the monolingual case)."""
+    if not languages:
+        return {None: Path(data_dir, f"{system_label}.{file_suffix}")}
+    return {lang: Path(data_dir, system_label, f"{lang}.{file_suffix}") for lang in languages}
+
+
+def get_reference_files(
+    data_dir: Path, reference_file_stem: str, languages: list[str], file_suffix: str
+) -> dict[str | None, Path]:
+    """Return the locations of the reference files (keyed by language, None if the reference is shared).
+
+    The per-language references (e.g. gold segmentations) follow the system output layout
+    (`{reference_file_stem}/{lang}.{file_suffix}`), otherwise a single `{reference_file_stem}.{file_suffix}` file is
+    shared by all the languages.
+    """
+    if languages and Path(data_dir, reference_file_stem).is_dir():
+        return get_system_files(data_dir, reference_file_stem, languages, file_suffix)
+    return {None: Path(data_dir, f"{reference_file_stem}.{file_suffix}")}
+
+
+def get_data_files(
+    data_dir: Path,
+    systems: list[str],
+    languages: list[str],
+    *,
+    file_suffix: str = "txt",
+    input_file_stem: str | None = None,
+    reference_file_stem: str | None = None,
+) -> dict[str, Path]:
+    """Return the locations of all the dataset files loaded by TokCollateData.
+
+    The files are keyed by the system label (and language, e.g. `system/lang`) or by the input/reference file stem.
+    """
+    files = {}
+    for system_label in systems:
+        for lang, path in get_system_files(data_dir, system_label, languages, file_suffix).items():
+            files[system_label if lang is None else f"{system_label}/{lang}"] = path
+    if input_file_stem is not None:
+        files[input_file_stem] = Path(data_dir, f"{input_file_stem}.{file_suffix}")
+    if reference_file_stem is not None:
+        for lang, path in get_reference_files(data_dir, reference_file_stem, languages, file_suffix).items():
+            files[reference_file_stem if lang is None else f"{reference_file_stem}/{lang}"] = path
+    return files
+
+
+def convert_token_sequences(sequences: TokenSequencesType) -> TextType:
+    """Convert in-memory tokenized lines (token strings or ids) to the TokCollateData text representation.
+
+    The token ids are converted to their string representation and the empty lines are dropped (the same way as
+    by load_tokenized_text_file).
+    """
+    text = []
+    for seq in sequences:
+        line = [tok if isinstance(tok, str) else str(tok) for tok in seq]
+        if line:
+            text.append(line)
+    return text
+
+
 @define(kw_only=True)
 class TokCollateData:
-    """TODO"""
+    """TODO
+
+    The system outputs are loaded from the data_dir files, or taken directly from the `texts` mapping
+    ({system: {language: lines}} or {system: lines} without languages) without touching the disk.
+
+    The data can be shared by concurrently scoring threads (e.g. the tokcollate.jobs workers): the cache fills and
+    the add_system/remove_system calls are serialized by a lock.
+    """
 
-    data_dir: Path = field(converter=Path)
+    data_dir: Path = field(converter=converters.optional(Path), default=None)
+    texts: Mapping[str, Mapping[str, TokenSequencesType] | TokenSequencesType] = field(default=None, repr=False)
     systems: list[str] = field(converter=converters.optional(list), factory=list)
     languages: list[str] = field(converter=converters.optional(list), factory=list)
     languages_info: dict[str, LanguageInfo] = field(
@@ -48,65 +158,184 @@ class TokCollateData:
     input_file_stem: str = field(validator=validators.instance_of(str), default="input")
     reference_file_stem: str = field(validator=validators.instance_of(str), default="reference")
 
+    # the approximate data (see tokcollate.sketches) provides only the unigram sketches of the system outputs
+    approximate: ClassVar[bool] = False
+
     _data: dict = None
+    _vocab_cache: dict[tuple[str, str | None], Counter] = field(init=False, factory=dict)
+    _lengths_cache: dict[tuple[str, str | None, bool], np.ndarray] = field(init=False, factory=dict)
+    _token_lengths_cache: dict[tuple[str, str | None, bool], tuple[np.ndarray, np.ndarray]] = field(
+        init=False, factory=dict
+    )
+    _first_occurrences_cache: dict[tuple[str, str | None], np.ndarray] = field(init=False, factory=dict)
+    _token_ids_cache: dict[tuple[str, str | None], tuple[np.ndarray, np.ndarray]] = field(init=False, factory=dict)
+    _digest_cache: dict[tuple[str, str | None, bool], TDigest] = field(init=False, factory=dict)
+    _line_counts_cache: dict[tuple[str, str | None], "sparse.csr_matrix"] = field(  # noqa: F821
+        init=False, factory=dict
+    )
+    _lock: threading.RLock = field(init=False, factory=threading.RLock, repr=False)
     _input_key: str = "__input__"
     _reference_key: str = "__reference__"
 
     def __attrs_post_init__(self) -> None:
         """TODO"""
+        # check the inputs before the (potentially long) loading
+        if self.languages_info is not None:
+            validate_languages(self.languages, self.languages_info)
+        if self.texts is not None:
+            self._init_from_texts()
+            return
+        if self.data_dir is None:
+            err_msg = "Either data_dir or texts must be provided."
+            raise ValueError(err_msg)
+        missing = [
+            str(path)
+            for path in get_data_files(
+                self.data_dir,
+                self.systems,
+                self.languages,
+                file_suffix=self.file_suffix,
+                input_file_stem=self.input_file_stem if self.has_input_text else None,
+                reference_file_stem=self.reference_file_stem if self.has_reference_text else None,
+            ).values()
+            if not path.exists()
+        ]
+        if missing:
+            err_msg = "Missing dataset files:\n  " + "\n  ".join(missing)
+            raise FileNotFoundError(err_msg)
+
         self._data = {}
         logger.info("Loading texts for scoring...")
         for system_label in self.systems:
-            if not self.languages:
-                filename = f"{system_label}.{self.file_suffix}"
-                logger.debug("Loading %s ...", filename)
-                self._data[system_label] = load_tokenized_text_file(Path(self.data_dir, filename))
-            else:
-                logger.debug("Loading %s/{%s}.%s ...", system_label, ",".join(self.languages), self.file_suffix)
-                self._data[system_label] = {
-                    lang: load_tokenized_text_file(Path(self.data_dir, f"{system_label}", f"{lang}.{self.file_suffix}"))
-                    for lang in self.languages
-                }
+            self._data[system_label] = self._load_system(system_label)
+        self._load_auxiliary_texts()
 
-        if self.has_input_text:
+    def _init_from_texts(self) -> None:
+        """Use the in-memory system outputs."""
+        if not self.systems:
+            self.systems = list(self.texts.keys())
+        missing = [system_label for system_label in self.systems if system_label not in self.texts]
+        if missing:
+            err_msg = f"Missing texts of systems: {missing}"
+            raise ValueError(err_msg)
+        self._data = {}
+        for system_label in self.systems:
+            self._data[system_label] = self._convert_system_text(system_label, self.texts[system_label])
+        self._load_auxiliary_texts()
+
+    def _convert_system_text(
+        self, system_label: str, text: Mapping[str, TokenSequencesType] | TokenSequencesType
+    ) -> TextType | dict[str, TextType]:
+        if not self.languages:
+            return convert_token_sequences(text)
+        if not isinstance(text, Mapping):
+            err_msg = f"Texts of system {system_label} must be a {{language: lines}} mapping."
+            raise TypeError(err_msg)
+        missing = [lang for lang in self.languages if lang not in text]
+        if missing:
+            err_msg = f"Missing texts of system {system_label} in languages: {missing}"
+            raise ValueError(err_msg)
+        return {lang: convert_token_sequences(text[lang]) for lang in self.languages}
+
+    def _load_auxiliary_texts(self) -> None:
+        """Load the input and reference texts if they are required by the metrics (and not loaded yet)."""
+        if (self.has_input_text or self.has_reference_text) and self.data_dir is None:
+            err_msg = "Metrics requiring the input or reference texts cannot be used with the in-memory texts only."
+            raise ValueError(err_msg)
+        if self.has_input_text and self._input_key not in self._data:
             filename = f"{self.input_file_stem}.{self.file_suffix}"
             logger.debug("Loading %s ...", filename)
             self._data[self._input_key] = load_tokenized_text_file(Path(self.data_dir, filename))
 
-        if self.has_reference_text:
-            filename = f"{self.reference_file_stem}.{self.file_suffix}"
-            self._data[self._reference_key] = load_tokenized_text_file(Path(self.data_dir, filename))
+        if self.has_reference_text and self._reference_key not in self._data:
+            # the references are loaded the same way as the system outputs (tokenized text or token ids)
+            files = get_reference_files(self.data_dir, self.reference_file_stem, self.languages, self.file_suffix)
+            logger.debug("Loading %s ...", ", ".join(str(path) for path in files.values()))
+            if None in files:
+                self._data[self._reference_key] = load_system_output(files[None])
+            else:
+                self._data[self._reference_key] = {lang: load_system_output(path) for lang, path in files.items()}
 
-        if self.languages_info is not None:
-            # The language info needs to follow a strict data structure. In such case, the language specification also
-            # needs to follow it.
-            for lang in self.languages:
-                lang_split = lang.split("_")
-                assert len(lang_split) == LANG_SPEC_LEN
-                if lang_split[0] not in self.languages_info:
-                    logger.exception(
-                        "Language %s not in the provided languages_info JSON file.\nAvailable languages: [%s]",
-                        lang_split[0],
-                        ",".join(self.languages_info.keys()),
-                    )
-                if lang_split[1] not in self.languages_info[lang_split[0]].scripts:
-                    logger.exception(
-                        "Script %s of language %s not listed in the languages_info JSON file.\n"
-                        "langages_info['%s'] = %s",
-                        lang_split[1],
-                        lang_split[0],
-                        lang_split[0],
-                        self.languages_info[lang_split[0]],
-                    )
-                if lang_split[2] not in self.languages_info[lang_split[0]].glottocodes:
-                    logger.exception(
-                        "Glottocode %s of language %s not listed in the languages_info JSON file.\n"
-                        "langages_info['%s'] = %s",
-                        lang_split[2],
-                        lang_split[0],
-                        lang_split[0],
-                        self.languages_info[lang_split[0]],
-                    )
+    def add_metrics(self, metrics: list["TokCollateMetric"]) -> None:  # noqa: F821
+        """Register additional metrics, loading the input or reference texts if they newly require them."""
+        with self._lock:
+            self.metrics = [*self.metrics, *(m for m in metrics if m not in self.metrics)]
+            self._load_auxiliary_texts()
+
+    def _load_system(self, system_label: str, system_path: Path | None = None) -> TextType | dict[str, TextType]:
+        """Load the system output(s).
+
+        Args:
+            system_label (str): label of the loaded system
+            system_path (Path): (optional) location of the system output file (or a directory with the per-language
+                files in the multilingual case). Defaults to the location inside the data_dir.
+        """
+        if system_path is None:
+            files = get_system_files(self.data_dir, system_label, self.languages, self.file_suffix)
+        elif not self.languages:
+            files = {None: system_path}
+        else:
+            files = {lang: Path(system_path, f"{lang}.{self.file_suffix}") for lang in self.languages}
+        if not self.languages:
+            logger.debug("Loading %s ...", files[None])
+            return load_system_output(files[None])
+        logger.debug("Loading %s ...", ", ".join(str(path) for path in files.values()))
+        return {lang: load_system_output(path) for lang, path in files.items()}
+
+    def add_system(
+        self,
+        system_label: str,
+        system_path: Path | None = None,
+        text: Mapping[str, TokenSequencesType] | TokenSequencesType | None = None,
+    ) -> None:
+        """Load an additional system output into the already loaded data.
+
+        Args:
+            system_label (str): label of the new system
+            system_path (Path): (optional) location of the system output file (or a directory with the per-language
+                files in the multilingual case). Defaults to the location inside the data_dir.
+            text: (optional) in-memory system output (used instead of the files), see TokCollateData.texts
+        """
+        if text is not None:
+            system_text = self._convert_system_text(system_label, text)
+        else:
+            system_text = self._load_system(
+                system_label, system_path=Path(system_path) if system_path is not None else None
+            )
+        with self._lock:
+            if system_label in self._data:
+                err_msg = f"System {system_label} is already loaded."
+                raise ValueError(err_msg)
+            self._data[system_label] = system_text
+            self.systems.append(system_label)
+
+    def remove_system(self, system_label: str) -> None:
+        """Remove a loaded system output."""
+        with self._lock:
+            if system_label not in self.systems:
+                err_msg = f"System {system_label} is not loaded."
+                raise ValueError(err_msg)
+            self.systems.remove(system_label)
+            del self._data[system_label]
+            for cache in (
+                self._vocab_cache,
+                self._lengths_cache,
+                self._token_lengths_cache,
+                self._first_occurrences_cache,
+                self._token_ids_cache,
+                self._digest_cache,
+                self._line_counts_cache,
+            ):
+                for key in [key for key in cache if key[0] == system_label]:
+                    del cache[key]
+
+    def _get_cached(self, cache: dict[tuple, T], key: tuple, compute: Callable[[], T]) -> T:
+        """Return the cached value, computing it (under the lock) if it is missing."""
+        if key not in cache:
+            with self._lock:
+                if key not in cache:
+                    cache[key] = compute()
+        return cache[key]
 
     @property
     def has_input_text(self) -> bool:
@@ -125,10 +354,18 @@ class TokCollateData:
         err_msg = "[self.__class__.__name__] Trying to access unavailable ._input_key"
         raise AttributeError(err_msg)
 
-    def get_reference_text(self) -> TextType:
-        """TODO"""
+    def get_reference_text(self, language: str | None = None) -> TextType:
+        """Return the reference text (of the language if the references are per-language, see get_reference_files).
+
+        A single reference file is shared by all the languages.
+        """
         if self._reference_key in self._data:
-            return self._data[self._reference_key]
+            reference = self._data[self._reference_key]
+            if not isinstance(reference, dict):
+                return reference
+            if language is not None:
+                return reference[language]
+            return [line for lang in self.languages for line in reference[lang]]
         err_msg = "[self.__class__.__name__] Trying to access unavailable ._reference_key."
         raise AttributeError(err_msg)
 
@@ -143,6 +380,133 @@ class TokCollateData:
             return [line for lang in self.languages for line in self._data[system_label][lang]]
         return self._data[system_label]
 
+    def get_vocabulary(self, system_label: str, language: str | None = None) -> Counter:
+        """Return the token vocabulary of the system output(s).
+
+        The vocabularies are computed only once and shared by all the metrics scoring the data. They must not be
+        modified by the callers.
+        """
+        return self._get_cached(
+            self._vocab_cache,
+            (system_label, language),
+            lambda: get_vocabulary(self.get_system_text(system_label, language=language)),
+        )
+
+    def get_sequence_lengths(
+        self, system_label: str, language: str | None = None, *, use_bytes: bool = False
+    ) -> np.ndarray:
+        """Return the per-line lengths of the system output(s) in tokens (or utf-8 bytes if use_bytes).
+
+        The arrays are computed only once and shared by all the metrics scoring the data. They must not be
+        modified by the callers.
+        """
+
+        def compute() -> np.ndarray:
+            text = self.get_system_text(system_label, language=language)
+            if use_bytes:
+                lengths = [sum(len(tok.encode("utf-8")) for tok in line) for line in text]
+            else:
+                lengths = [len(line) for line in text]
+            return np.array(lengths, dtype=np.int64)
+
+        return self._get_cached(self._lengths_cache, (system_label, language, use_bytes), compute)
+
+    def get_token_lengths(
+        self, system_label: str, language: str | None = None, *, use_bytes: bool = False
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the lengths (in characters or utf-8 bytes if use_bytes) and the counts of the vocabulary entries.
+
+        The arrays follow the order of get_vocabulary, they are computed only once and must not be modified by the
+        callers.
+        """
+
+        def compute() -> tuple[np.ndarray, np.ndarray]:
+            vocab = self.get_vocabulary(system_label, language)
+            if use_bytes:
+                lengths = np.fromiter((len(tok.encode("utf-8")) for tok in vocab), dtype=np.int64, count=len(vocab))
+            else:
+                lengths = np.fromiter((len(tok) for tok in vocab), dtype=np.int64, count=len(vocab))
+            return lengths, np.fromiter(vocab.values(), dtype=np.int64, count=len(vocab))
+
+        return self._get_cached(self._token_lengths_cache, (system_label, language, use_bytes), compute)
+
+    def get_first_occurrences(self, system_label: str, language: str | None = None) -> np.ndarray:
+        """Return the (sorted) positions of the first occurrences of the vocabulary entries in the token stream.
+
+        The number of distinct tokens among the first n tokens (the vocabulary growth curve) equals
+        np.searchsorted(first_occurrences, n). The arrays are computed only once and must not be modified by
+        the callers.
+        """
+
+        def compute() -> np.ndarray:
+            vocab = self.get_vocabulary(system_label, language)
+            token_index = {tok: i for i, tok in enumerate(vocab)}
+            text = self.get_system_text(system_label, language=language)
+            token_ids = np.fromiter(
+                (token_index[tok] for line in text for tok in line), dtype=np.int64, count=vocab.total()
+            )
+            _, first_index = np.unique(token_ids, return_index=True)
+            return np.sort(first_index)
+
+        return self._get_cached(self._first_occurrences_cache, (system_label, language), compute)
+
+    def get_token_ids(self, system_label: str, language: str | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return the concatenated token ids of the lines and the line offsets (line i spans offsets[i]:offsets[i + 1]).
+
+        The ids index the system vocabulary (get_vocabulary(system_label)), shared by all the languages, so
+        the per-type lookup arrays can be gathered by the ids. The arrays are computed only once and must not be
+        modified by the callers.
+        """
+
+        def compute() -> tuple[np.ndarray, np.ndarray]:
+            token_index = {tok: i for i, tok in enumerate(self.get_vocabulary(system_label))}
+            text = self.get_system_text(system_label, language=language)
+            offsets = np.zeros(len(text) + 1, dtype=np.int64)
+            np.cumsum([len(line) for line in text], out=offsets[1:])
+            ids = np.fromiter((token_index[tok] for line in text for tok in line), dtype=np.int64, count=offsets[-1])
+            return ids, offsets
+
+        return self._get_cached(self._token_ids_cache, (system_label, language), compute)
+
+    def get_length_digest(self, system_label: str, language: str | None = None, *, use_bytes: bool = False) -> TDigest:
+        """Return the quantile digest of the per-line lengths (see get_sequence_lengths).
+
+        The digests are computed only once and must not be modified by the callers.
+        """
+        return self._get_cached(
+            self._digest_cache,
+            (system_label, language, use_bytes),
+            lambda: TDigest.from_values(self.get_sequence_lengths(system_label, language, use_bytes=use_bytes)),
+        )
+
+    def get_line_counts(self, system_label: str, language: str | None = None) -> "sparse.csr_matrix":  # noqa: F821
+        """Return the per-line token counts of the system output(s) as a sparse (lines, V) matrix.
+
+        The columns follow the order of the system vocabulary (get_vocabulary(system_label)), so the matrices of all
+        languages share the same columns. Used by the bootstrap resampling (see tokcollate.bootstrap).
+        The matrices are computed only once and must not be modified by the callers.
+        """
+        from scipy import sparse  # noqa: PLC0415
+
+        def compute() -> sparse.csr_matrix:
+            token_index = {tok: i for i, tok in enumerate(self.get_vocabulary(system_label))}
+            text = self.get_system_text(system_label, language=language)
+            indptr = np.zeros(len(text) + 1, dtype=np.int64)
+            np.cumsum([len(line) for line in text], out=indptr[1:])
+            indices = np.fromiter((token_index[tok] for line in text for tok in line), dtype=np.int64, count=indptr[-1])
+            counts = sparse.csr_matrix(
+                (np.ones(indices.size, dtype=np.int64), indices, indptr), shape=(len(text), len(token_index))
+            )
+            counts.sum_duplicates()
+            return counts
+
+        return self._get_cached(self._line_counts_cache, (system_label, language), compute)
+
+    def num_tokens(self, system_label: str | None = None, language: str | None = None) -> int:
+        """Return the number of tokens in the system output(s). Counts all systems if system_label is None."""
+        systems = self.systems if system_label is None else [system_label]
+        return sum(len(line) for system in systems for line in self.get_system_text(system, language=language))
+
     def get_full_text(self) -> TextType:
         """TODO"""
         text = [line for system_label in self.systems for line in self.get_system_text(system_label)]
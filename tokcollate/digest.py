@@ -0,0 +1,139 @@
+import logging
+from collections.abc import Sequence
+from typing import Self
+
+import numpy as np
+from attrs import define, field
+
+logger = logging.getLogger(__name__)
+
+
+@define(kw_only=True)
+class TDigest:
+    """Mergeable quantile sketch (a merging t-digest, Dunning and Ertl, 2019).
+
+    The values are kept exactly as (value, weight) pairs as long as there are at most `max_exact_values` distinct
+    values (e.g. the integer sequence lengths), so the quantiles equal np.quantile of the (weighted) values.
+    Otherwise, the values are compressed into about `compression / 2` centroids, whose sizes are bounded by the k1
+    (arcsin) scale function, so the quantile estimates are most accurate in the tails (the relative rank error of
+    the extreme quantiles is roughly proportional to q * (1 - q) / compression).
+
+    The digests of different shards can be merged. The incoming values are buffered and compressed in batches.
+
+    Args:
+        compression (float): compression parameter (delta) bounding the number of centroids
+        max_exact_values (int): maximum number of the distinct values kept exactly
+        buffer_size (int): number of the buffered values triggering the compression
+    """
+
+    compression: float = field(converter=float, default=200.0)
+    max_exact_values: int = field(converter=int, default=10000)
+    buffer_size: int = field(converter=int, default=100000)
+
+    means: np.ndarray = field(factory=lambda: np.zeros(0, dtype=np.float64), repr=False)
+    weights: np.ndarray = field(factory=lambda: np.zeros(0, dtype=np.float64), repr=False)
+    exact: bool = field(default=True)
+    min: float = field(default=np.inf)
+    max: float = field(default=-np.inf)
+
+    _buffer_means: list[np.ndarray] = field(init=False, factory=list, repr=False)
+    _buffer_weights: list[np.ndarray] = field(init=False, factory=list, repr=False)
+    _buffered: int = field(init=False, default=0)
+
+    @classmethod
+    def from_values(
+        cls: "TDigest",
+        values: np.ndarray,
+        weights: np.ndarray | None = None,
+        **kwargs,  # noqa: ANN003
+    ) -> "TDigest":
+        digest = cls(**kwargs)
+        digest.update(values, weights)
+        return digest
+
+    @property
+    def total(self) -> float:
+        self._flush()
+        return float(self.weights.sum())
+
+    def update(self, values: np.ndarray, weights: np.ndarray | None = None) -> None:
+        """Add the (optionally weighted) values."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return
+        weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=np.float64).ravel()
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer_means.append(values)
+        self._buffer_weights.append(weights)
+        self._buffered += values.size
+        if self._buffered >= self.buffer_size:
+            self._flush()
+
+    def merge(self, other: "TDigest") -> Self:
+        """Add the values of another digest in place."""
+        other._flush()  # noqa: SLF001
+        self.update(other.means, other.weights)
+        self.exact = self.exact and other.exact
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float | Sequence[float]) -> float | np.ndarray:
+        """Return the (estimated) quantile(s) of the values (the linear interpolation of np.quantile if exact)."""
+        self._flush()
+        q_array = np.asarray(q, dtype=np.float64)
+        if self.means.size == 0:
+            res = np.full(q_array.shape, np.nan)
+        elif self.exact:
+            res = self._exact_quantile(q_array)
+        else:
+            res = self._approximate_quantile(q_array)
+        return float(res) if res.ndim == 0 else res
+
+    def _exact_quantile(self, q: np.ndarray) -> np.ndarray:
+        # the values at the floor and ceil ranks of q * (n - 1) (as np.quantile with the linear interpolation)
+        cum_weights = np.cumsum(self.weights)
+        position = q * (cum_weights[-1] - 1)
+        lower = np.floor(position)
+        lower_values = self.means[np.searchsorted(cum_weights, lower, side="right")]
+        upper_values = self.means[
+            np.minimum(np.searchsorted(cum_weights, lower + 1, side="right"), self.means.size - 1)
+        ]
+        return lower_values + (position - lower) * (upper_values - lower_values)
+
+    def _approximate_quantile(self, q: np.ndarray) -> np.ndarray:
+        # interpolate between the centroid centers (and the extreme values)
+        cum_weights = np.cumsum(self.weights)
+        centers = np.concatenate([[0.0], cum_weights - self.weights / 2, [cum_weights[-1]]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(q * cum_weights[-1], centers, values)
+
+    def _flush(self) -> None:
+        """Compress the buffered values together with the current centroids."""
+        if not self._buffer_means:
+            return
+        means = np.concatenate([self.means, *self._buffer_means])
+        weights = np.concatenate([self.weights, *self._buffer_weights])
+        self._buffer_means, self._buffer_weights, self._buffered = [], [], 0
+
+        means, inverse = np.unique(means, return_inverse=True)
+        weights = np.bincount(inverse, weights=weights)
+        if means.size > self.max_exact_values:
+            if self.exact:
+                logger.debug("Compressing %d distinct values of the digest.", means.size)
+            self.exact = False
+        if not self.exact:
+            means, weights = self._compress(means, weights)
+        self.means, self.weights = means, weights
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Merge the sorted values into the centroids spanning at most a unit of the k1 scale function."""
+        cum_weights = np.cumsum(weights)
+        q_left = (cum_weights - weights) / cum_weights[-1]
+        k_left = self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        groups = np.floor(k_left - k_left[0]).astype(np.int64)
+        _, groups = np.unique(groups, return_inverse=True)
+        group_weights = np.bincount(groups, weights=weights)
+        group_means = np.bincount(groups, weights=means * weights) / group_weights
+        return group_means, group_weights
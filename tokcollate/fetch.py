@@ -0,0 +1,258 @@
+import hashlib
+import http.client
+import json
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from attrs import converters, define, field
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+REDIRECT_STATUS_CODES = frozenset([301, 302, 303, 307, 308])
+MAX_REDIRECTS = 5
+
+RequestType = str | tuple[str, dict[str, Any] | None]
+
+
+def build_url(url: str, params: dict[str, Any] | None = None) -> str:
+    """Return the URL with the (sorted) query parameters."""
+    if not params:
+        return url
+    separator = "&" if urlsplit(url).query else "?"
+    return f"{url}{separator}{urlencode(sorted(params.items()))}"
+
+
+@define(kw_only=True)
+class FetchResponse:
+    """Response of a (possibly cached) GET request."""
+
+    url: str
+    status_code: int
+    text: str
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300  # noqa: PLR2004
+
+    def json(self) -> Any:  # noqa: ANN401
+        return json.loads(self.text)
+
+
+@define(kw_only=True)
+class ResponseCache:
+    """Persistent on-disk cache of the successful responses keyed by their URL.
+
+    Args:
+        cache_dir (Path): location of the cached responses
+    """
+
+    cache_dir: Path = field(converter=Path)
+
+    def path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return Path(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, url: str) -> FetchResponse | None:
+        path = self.path(url)
+        if not path.exists():
+            return None
+        with path.open("r", encoding="utf-8") as fh:
+            entry = json.load(fh)
+        return FetchResponse(url=url, status_code=entry["status_code"], text=entry["text"], from_cache=True)
+
+    def put(self, response: FetchResponse) -> None:
+        path = self.path(response.url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write atomically, so concurrent or interrupted runs never leave a partial entry
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            json.dump({"url": response.url, "status_code": response.status_code, "text": response.text}, fh)
+        tmp_path.replace(path)
+
+
+@define(kw_only=True)
+class HostRateLimiter:
+    """Thread-safe limiter spacing the requests to each host.
+
+    Args:
+        rate_limits (dict[str, float]): maximum number of requests per second of the individual hosts
+        default_rate (float): maximum number of requests per second of the other hosts
+    """
+
+    rate_limits: dict[str, float] = field(factory=dict)
+    default_rate: float = field(converter=float, default=5.0)
+
+    _next_time: dict[str, float] = field(init=False, factory=dict)
+    _lock: threading.Lock = field(init=False, factory=threading.Lock)
+
+    def wait(self, host: str) -> None:
+        """Block until the next request to the host is allowed."""
+        interval = 1.0 / self.rate_limits.get(host, self.default_rate)
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(now, self._next_time.get(host, now))
+            self._next_time[host] = scheduled + interval
+        if scheduled > now:
+            time.sleep(scheduled - now)
+
+
+@define(kw_only=True)
+class Fetcher:
+    """Concurrent HTTP fetcher with per-host rate limits, retries and a persistent response cache.
+
+    Each worker thread keeps its own persistent (keep-alive) connections to the hosts. The failed requests
+    (connection errors and the 429 or 5xx responses) are retried with an exponential backoff, respecting the
+    Retry-After header. The successful responses are cached on the disk, so the repeated runs do not touch the
+    network. In the offline mode, only the cached responses are used.
+
+    Args:
+        cache_dir (Path): (optional) location of the response cache
+        offline (bool): use only the cached responses (fail on a cache miss)
+        max_workers (int): number of concurrent requests (in get_many)
+        rate_limits (dict[str, float]): maximum number of requests per second of the individual hosts
+        default_rate (float): maximum number of requests per second of the other hosts
+        max_retries (int): maximum number of retries of a failed request
+        backoff (float): initial retry delay in seconds (doubled after each retry)
+        timeout (float): connection timeout in seconds
+        headers (dict[str, str]): headers sent with each request
+    """
+
+    cache_dir: Path = field(converter=converters.optional(Path), default=None)
+    offline: bool = field(default=False)
+    max_workers: int = field(converter=int, default=8)
+    rate_limits: dict[str, float] = field(factory=dict)
+    default_rate: float = field(converter=float, default=5.0)
+    max_retries: int = field(converter=int, default=3)
+    backoff: float = field(converter=float, default=1.0)
+    timeout: float = field(converter=float, default=30.0)
+    headers: dict[str, str] = field(factory=lambda: {"User-Agent": "LanguageDataBot/1.0"})
+
+    cache: ResponseCache = field(init=False, default=None)
+    _limiter: HostRateLimiter = field(init=False)
+    _local: threading.local = field(init=False, factory=threading.local)
+
+    def __attrs_post_init__(self) -> None:
+        """Create the cache and the rate limiter."""
+        if self.cache_dir is not None:
+            self.cache = ResponseCache(cache_dir=self.cache_dir)
+        elif self.offline:
+            err_msg = "The offline mode requires the cache_dir."
+            raise ValueError(err_msg)
+        self._limiter = HostRateLimiter(rate_limits=self.rate_limits, default_rate=self.default_rate)
+
+    def get(self, url: str, params: dict[str, Any] | None = None) -> FetchResponse:
+        """Return the (cached) response of a GET request.
+
+        Raises:
+            FileNotFoundError: if the response is not cached in the offline mode
+            ConnectionError: if the request fails even after the retries
+        """
+        url = build_url(url, params)
+        if self.cache is not None:
+            response = self.cache.get(url)
+            if response is not None:
+                return response
+        if self.offline:
+            err_msg = f"Response of {url} is not cached (offline mode)."
+            raise FileNotFoundError(err_msg)
+
+        location = url
+        response = self._request(location)
+        for _ in range(MAX_REDIRECTS):
+            if response.status_code not in REDIRECT_STATUS_CODES:
+                break
+            location = urljoin(location, response.text)
+            response = self._request(location)
+        response.url = url
+        if response.ok and self.cache is not None:
+            self.cache.put(response)
+        return response
+
+    def get_many(
+        self, requests: Sequence[RequestType], *, return_exceptions: bool = False
+    ) -> list[FetchResponse | Exception]:
+        """Fetch the URLs (or (URL, params) pairs) concurrently and return the responses in the same order.
+
+        Args:
+            requests (list): URLs or (URL, params) pairs
+            return_exceptions (bool): return the exceptions of the failed requests instead of raising the first one
+        """
+
+        def fetch(request: RequestType) -> FetchResponse | Exception:
+            url, params = (request, None) if isinstance(request, str) else request
+            try:
+                return self.get(url, params)
+            except (ConnectionError, FileNotFoundError) as err:
+                if not return_exceptions:
+                    raise
+                return err
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tokcollate-fetch") as executor:
+            return list(executor.map(fetch, requests))
+
+    def close(self) -> None:
+        """Close the connections of the current thread."""
+        for connection in getattr(self._local, "connections", {}).values():
+            connection.close()
+        self._local.connections = {}
+
+    def _connection(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+        if (scheme, netloc) not in connections:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            connections[(scheme, netloc)] = cls(netloc, timeout=self.timeout)
+        return connections[(scheme, netloc)]
+
+    def _drop_connection(self, scheme: str, netloc: str) -> None:
+        connection = self._local.connections.pop((scheme, netloc), None)
+        if connection is not None:
+            connection.close()
+
+    def _request(self, url: str) -> FetchResponse:
+        """Execute the request with retries. Redirect responses store the target location in their text."""
+        parts = urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        response = None
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self._limiter.wait(parts.netloc)
+            delay = self.backoff * 2**attempt
+            try:
+                connection = self._connection(parts.scheme, parts.netloc)
+                connection.request("GET", target, headers=self.headers)
+                raw_response = connection.getresponse()
+                body = raw_response.read()
+            except (OSError, http.client.HTTPException) as err:
+                logger.warning("Request %s failed (attempt %d): %s", url, attempt + 1, err)
+                self._drop_connection(parts.scheme, parts.netloc)
+                error = err
+            else:
+                if raw_response.will_close:
+                    self._drop_connection(parts.scheme, parts.netloc)
+                if raw_response.status in REDIRECT_STATUS_CODES:
+                    text = raw_response.getheader("Location", "")
+                else:
+                    text = body.decode(raw_response.headers.get_content_charset() or "utf-8", errors="replace")
+                response = FetchResponse(url=url, status_code=raw_response.status, text=text)
+                if raw_response.status not in RETRY_STATUS_CODES:
+                    return response
+                logger.warning("Request %s returned %d (attempt %d)", url, raw_response.status, attempt + 1)
+                retry_after = raw_response.getheader("Retry-After")
+                if retry_after is not None and retry_after.isdigit():
+                    delay = float(retry_after)
+            if attempt < self.max_retries:
+                time.sleep(delay)
+        if response is None:
+            err_msg = f"Failed to fetch {url} after {self.max_retries + 1} attempts."
+            raise ConnectionError(err_msg) from error
+        return response
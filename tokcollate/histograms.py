@@ -0,0 +1,113 @@
+import logging
+from collections.abc import Mapping
+
+import numpy as np
+from attrs import Attribute, define, field
+
+from tokcollate.data import TokCollateData
+from tokcollate.options import build_optional
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_STATISTICS = ("sequence_length", "sequence_bytes", "token_length")
+
+
+def histogram_counts(values: np.ndarray, bin_edges: np.ndarray, weights: np.ndarray | None = None) -> np.ndarray:
+    """Return the (weighted) number of the integer values in each [bin_edges[i], bin_edges[i + 1]) bin."""
+    bins = np.searchsorted(bin_edges, values, side="right") - 1
+    return np.bincount(bins, weights=weights, minlength=bin_edges.size - 1).astype(np.int64)
+
+
+@define(kw_only=True)
+class LengthHistograms:
+    """Computes the histograms of the length statistics of the system outputs.
+
+    The histograms are computed from the per-line lengths and the vocabulary token lengths cached by
+    the TokCollateData (i.e. the statistics shared with the sequence_length and token_length metrics, or collected
+    while tokenizing in the streaming mode), so they require no additional pass over the text. The histograms of
+    a statistic share the same integer bin edges across all the systems and languages, so they can be stored as
+    a single dense (systems, languages, bins) tensor.
+
+    Histogram statistics:
+        sequence_length: number of tokens per line
+        sequence_bytes: number of utf-8 token bytes per line
+        token_length: number of characters per token (the vocabulary entries weighted by their counts)
+
+    Args:
+        num_bins (int): (maximum) number of the histogram bins
+        log_bins (bool): use the logarithmically spaced bins instead of the bins with a fixed width
+    """
+
+    num_bins: int = field(converter=int, default=64)
+    log_bins: bool = field(converter=bool, default=True)
+
+    @num_bins.validator
+    def _check_num_bins(self, attribute: Attribute, value: int) -> None:
+        if value < 1:
+            err_msg = f"The {attribute.name} must be positive (got {value})."
+            raise ValueError(err_msg)
+
+    @classmethod
+    def from_config(cls: "LengthHistograms", config: Mapping | None) -> "LengthHistograms | None":
+        """Create the histograms from the scorer.histograms config section (see build_optional).
+
+        OmegaConf Args:
+            scorer.histograms.num_bins: (maximum) number of the histogram bins
+            scorer.histograms.log_bins: use the logarithmically spaced bins
+        """
+        return build_optional(cls, config)
+
+    def bin_edges(self, max_value: int) -> np.ndarray:
+        """Return the integer bin edges covering the [0, max_value] values (at most num_bins bins)."""
+        if self.log_bins:
+            edges = np.concatenate([[0.0], np.geomspace(1, max_value + 1, self.num_bins)])
+        else:
+            edges = np.linspace(0, max_value + 1, self.num_bins + 1)
+        return np.unique(np.ceil(edges).astype(np.int64))
+
+    def result_axes(self) -> dict[str, tuple[str, ...]]:
+        """Return the axis layout of each computed ndarray (see compute)."""
+        res = {}
+        for statistic in HISTOGRAM_STATISTICS:
+            res[f"{statistic}_histogram"] = ("systems", "languages", "bins")
+            res[f"{statistic}_bin_edges"] = ("bin_edges",)
+        return res
+
+    def compute(self, data: TokCollateData, systems: list[str], languages: list[str]) -> dict[str, np.ndarray]:
+        """Return the histograms of each statistic and their bin edges.
+
+        Returns:
+            Dictionary with the `{statistic}_histogram` integer ndarrays with shape(len(systems), len(languages),
+            num_bins) and the `{statistic}_bin_edges` ndarrays with shape(num_bins + 1) (the number of bins can be
+            lower than the requested num_bins if the statistic has only a few distinct values).
+        """
+        res = {}
+        for statistic in HISTOGRAM_STATISTICS:
+            values = {
+                (system_label, lang): self._get_values(data, statistic, system_label, lang)
+                for system_label in systems
+                for lang in languages
+            }
+            max_value = max((int(vals.max()) for vals, _ in values.values() if vals.size), default=0)
+            edges = self.bin_edges(max_value)
+            hist = np.zeros((len(systems), len(languages), edges.size - 1), dtype=np.int64)
+            for i, system_label in enumerate(systems):
+                for j, lang in enumerate(languages):
+                    vals, weights = values[(system_label, lang)]
+                    hist[i, j] = histogram_counts(vals, edges, weights)
+            res[f"{statistic}_histogram"] = hist
+            res[f"{statistic}_bin_edges"] = edges
+        return res
+
+    @staticmethod
+    def _get_values(
+        data: TokCollateData, statistic: str, system_label: str, language: str
+    ) -> tuple[np.ndarray, np.ndarray | None]:
+        if statistic == "sequence_length":
+            return data.get_sequence_lengths(system_label, language), None
+        if statistic == "sequence_bytes":
+            return data.get_sequence_lengths(system_label, language, use_bytes=True), None
+        if statistic == "token_length":
+            return data.get_token_lengths(system_label, language)
+        err_msg = f"Unknown histogram statistic: {statistic}"
+        raise ValueError(err_msg)
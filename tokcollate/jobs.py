@@ -0,0 +1,395 @@
+import datetime as dt
+import enum
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from attrs import define, field, validators
+from omegaconf import DictConfig, OmegaConf
+
+from tokcollate.data import LanguageInfo, TokCollateData
+from tokcollate.metrics import TokCollateMetric, get_metric
+from tokcollate.scorer import ScorerResultSaver, result_axes
+from tokcollate.server import HTTPError, Request, Response, TokCollateServer
+from tokcollate.session import metric_config_key
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(enum.Enum):
+    """Indicate the state of a scoring job."""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobCancelledError(Exception):
+    """Raised inside a worker when the running job was cancelled."""
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more jobs."""
+
+
+def _now() -> str:
+    return f"{dt.datetime.now():%Y-%m-%d_%H:%M:%S}"
+
+
+@define(kw_only=True)
+class ScoringJob:
+    """A single request to score a new system output against a loaded dataset.
+
+    Args:
+        dataset (str): name of the dataset the system is compared with
+        system_label (str): label of the scored system
+        system_path (Path): location of the system output(s)
+        metrics (list[dict]): metric configurations (in the scorer.metrics config format)
+    """
+
+    dataset: str = field(converter=str)
+    system_label: str = field(converter=str)
+    system_path: Path = field(converter=Path)
+    metrics: list[dict] = field(validator=validators.instance_of(list))
+
+    job_id: str = field(factory=lambda: uuid.uuid4().hex[:12])
+    status: JobStatus = field(default=JobStatus.QUEUED)
+    progress: float = field(default=0.0)
+    error: str = field(default=None)
+    created_at: str = field(factory=_now)
+    finished_at: str = field(default=None)
+    output_dir: Path = field(default=None)
+    results: dict[str, Any] = field(default=None)
+
+    _cancel_event: threading.Event = field(init=False, factory=threading.Event)
+    _future: Future = field(init=False, default=None)
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether the job reached a terminal state."""
+        return self.status in (JobStatus.DONE, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    def cancel(self) -> bool:
+        """Request the job cancellation. Running jobs stop before scoring the next metric."""
+        if self.is_finished:
+            return False
+        self._cancel_event.set()
+        if self._future is not None and self._future.cancel():
+            self.status = JobStatus.CANCELLED
+            self.finished_at = _now()
+        return True
+
+    def check_cancelled(self) -> None:
+        """Raise JobCancelledError if cancellation was requested."""
+        if self._cancel_event.is_set():
+            raise JobCancelledError(self.job_id)
+
+    def describe(self, *, with_results: bool = False) -> dict[str, Any]:
+        """Return a JSON-serializable job description."""
+        desc = {
+            "id": self.job_id,
+            "dataset": self.dataset,
+            "system_label": self.system_label,
+            "system_path": str(self.system_path),
+            "metrics": [m["metric_label"] for m in self.metrics],
+            "status": self.status.value,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "output_dir": str(self.output_dir) if self.output_dir is not None else None,
+        }
+        if with_results and self.results is not None:
+            desc["results"] = self.results
+        return desc
+
+
+@define(kw_only=True)
+class ScoringDataset:
+    """A dataset kept loaded in memory together with the already computed per-system metric scores.
+
+    Args:
+        name (str): dataset identifier
+        config (DictConfig): scorer configuration describing the dataset (scorer.input_dir, scorer.systems, ...)
+    """
+
+    name: str = field(converter=str)
+    config: DictConfig = field(validator=validators.instance_of(DictConfig))
+
+    data: TokCollateData = field(init=False, default=None)
+    _row_cache: dict[tuple[str, str], np.ndarray] = field(init=False, factory=dict)
+    _lock: threading.Lock = field(init=False, factory=threading.Lock)
+
+    @property
+    def systems(self) -> list[str]:
+        """Labels of the dataset systems."""
+        return list(self.config.scorer.systems)
+
+    @property
+    def languages(self) -> list[str]:
+        """Dataset languages."""
+        return list(self.config.scorer.get("languages", []))
+
+    @property
+    def metrics(self) -> list[dict]:
+        """Default metric configurations of the dataset."""
+        return [OmegaConf.to_container(m) for m in self.config.scorer.get("metrics", [])]
+
+    def load(self) -> TokCollateData:
+        """Load the dataset texts (only once)."""
+        with self._lock:
+            if self.data is None:
+                logger.info("Loading dataset %s...", self.name)
+                languages_info = None
+                if self.config.scorer.get("languages_info", None) is not None:
+                    with Path(self.config.scorer.languages_info).open("r", encoding="utf-8") as fh:
+                        languages_info = {lang: LanguageInfo.create_entry(e) for lang, e in json.load(fh).items()}
+                self.data = TokCollateData(
+                    data_dir=self.config.scorer.input_dir,
+                    systems=self.systems,
+                    languages=self.languages,
+                    languages_info=languages_info,
+                    file_suffix=self.config.scorer.get("file_suffix", "txt"),
+                )
+        return self.data
+
+    def score_system(self, metric: TokCollateMetric, metric_key: str, system_label: str) -> np.ndarray:
+        """Score a single dataset system, reusing the cached result if available."""
+        key = (metric_key, system_label)
+        with self._lock:
+            row = self._row_cache.get(key)
+        if row is None:
+            # concurrent jobs may score the same row twice, the first stored result is kept
+            row = metric.score_all(self.data, [system_label], languages=self.languages)[0]
+            with self._lock:
+                row = self._row_cache.setdefault(key, row)
+        return row
+
+
+@define(kw_only=True)
+class ScoringService:
+    """On-demand scoring service with a bounded worker pool.
+
+    Jobs score a new system output against one of the configured datasets. The dataset texts are loaded once
+    and the metric scores of the dataset systems are cached across jobs, so only the new system needs to be scored.
+    The jobs run in a thread pool (sharing the loaded datasets), pending jobs wait in a bounded queue and both
+    pending and running jobs can be cancelled.
+
+    Args:
+        datasets (dict[str, DictConfig]): dataset name to scorer configuration mapping
+        max_workers (int): number of concurrently running jobs
+        max_queued (int): maximum number of pending jobs
+        output_dir (Path): (optional) directory for saving the job results (one subdirectory per job)
+    """
+
+    datasets: dict[str, ScoringDataset] = field(
+        converter=lambda datasets: {
+            name: dset if isinstance(dset, ScoringDataset) else ScoringDataset(name=name, config=dset)
+            for name, dset in datasets.items()
+        }
+    )
+    max_workers: int = field(converter=int, default=2)
+    max_queued: int = field(converter=int, default=16)
+    output_dir: Path = field(converter=lambda p: Path(p) if p is not None else None, default=None)
+
+    _jobs: dict[str, ScoringJob] = field(init=False, factory=dict)
+    _executor: ThreadPoolExecutor = field(init=False, default=None)
+    _lock: threading.Lock = field(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self) -> None:
+        """Create the worker pool."""
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tokcollate-job")
+
+    @property
+    def num_queued(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return sum(job.status == JobStatus.QUEUED for job in self._jobs.values())
+
+    def submit(
+        self,
+        dataset: str,
+        system_label: str,
+        system_path: Path,
+        metrics: list[dict] | None = None,
+    ) -> ScoringJob:
+        """Queue a new scoring job."""
+        if dataset not in self.datasets:
+            err_msg = f"Unknown dataset {dataset}. Available datasets: [{','.join(self.datasets)}]"
+            raise KeyError(err_msg)
+        if system_label in self.datasets[dataset].systems:
+            err_msg = f"System label {system_label} collides with an existing {dataset} system."
+            raise ValueError(err_msg)
+        if not Path(system_path).exists():
+            raise FileNotFoundError(system_path)
+        if metrics is None:
+            metrics = self.datasets[dataset].metrics
+        for metric_params in metrics:
+            if "metric" not in metric_params or "metric_label" not in metric_params:
+                err_msg = f"Metric configuration {metric_params} requires 'metric' and 'metric_label' fields."
+                raise ValueError(err_msg)
+            get_metric(metric_params["metric"])
+
+        with self._lock:
+            if self.num_queued >= self.max_queued:
+                err_msg = f"The job queue is full ({self.max_queued} pending jobs)."
+                raise QueueFullError(err_msg)
+            job = ScoringJob(dataset=dataset, system_label=system_label, system_path=system_path, metrics=metrics)
+            self._jobs[job.job_id] = job
+            job._future = self._executor.submit(self._run, job)  # noqa: SLF001
+        logger.info("Queued job %s (%s on %s).", job.job_id, system_label, dataset)
+        return job
+
+    def get(self, job_id: str) -> ScoringJob:
+        """Return the job with the given id."""
+        return self._jobs[job_id]
+
+    def list_jobs(self) -> list[ScoringJob]:
+        """Return all the known jobs."""
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a pending or running job."""
+        return self._jobs[job_id].cancel()
+
+    def shutdown(self, *, wait: bool = True) -> None:
+        """Cancel the pending jobs and stop the worker pool."""
+        for job in self._jobs.values():
+            job.cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: ScoringJob) -> None:
+        if job.is_finished:
+            return
+        job.status = JobStatus.RUNNING
+        dataset = self.datasets[job.dataset]
+        # a job-specific key keeps concurrently scored systems with identical labels apart
+        job_system = f"{job.system_label}@{job.job_id}"
+        data = None
+        try:
+            metrics = []
+            for metric_params in job.metrics:
+                params = dict(metric_params)
+                metric_name = params.pop("metric")
+                metric_label = params.pop("metric_label")
+                metrics.append(
+                    get_metric(metric_name).build_metric(metric=metric_name, metric_label=metric_label, **params)
+                )
+
+            data = dataset.load()
+            # loads the input or reference texts required by the job metrics (only once per dataset)
+            data.add_metrics([m for m in metrics if m.requires_input_text or m.requires_reference_text])
+            job.check_cancelled()
+            data.add_system(job_system, system_path=job.system_path)
+
+            metric_scores = {}
+            for i, (metric_params, metric) in enumerate(zip(job.metrics, metrics, strict=True)):
+                job.check_cancelled()
+                metric_label = metric.metric_label
+                metric_key = metric_config_key(metric_params)
+
+                logger.info("[%s] Running %s metric...", job.job_id, metric_label)
+                rows = [dataset.score_system(metric, metric_key, system_label) for system_label in dataset.systems]
+                rows.append(metric.score_all(data, [job_system], languages=dataset.languages)[0])
+                metric_scores[metric_label] = np.stack(rows, axis=0)
+                job.progress = (i + 1) / len(job.metrics)
+
+            job.results = {
+                "systems": [*dataset.systems, job.system_label],
+                "languages": dataset.languages,
+                "metrics": metric_scores,
+            }
+            if self.output_dir is not None:
+                self._save(job, metrics)
+            job.status = JobStatus.DONE
+        except JobCancelledError:
+            logger.info("Job %s cancelled.", job.job_id)
+            job.status = JobStatus.CANCELLED
+        except Exception as err:
+            logger.exception("Job %s failed.", job.job_id)
+            job.error = f"{err.__class__.__name__}: {err}"
+            job.status = JobStatus.FAILED
+        finally:
+            if data is not None and job_system in data.systems:
+                data.remove_system(job_system)
+            job.finished_at = _now()
+
+    def _save(self, job: ScoringJob, metrics: list[TokCollateMetric]) -> None:
+        job.output_dir = Path(self.output_dir, f"{job.system_label}-{job.job_id}")
+        job.output_dir.mkdir(parents=True, exist_ok=True)
+        ScorerResultSaver(
+            output_dir=job.output_dir,
+            dataset_name=job.dataset,
+            tokenizers=job.results["systems"],
+            metrics=list(job.results["metrics"].keys()),
+            languages=job.results["languages"],
+            result_axes=result_axes({metric.metric_label: metric for metric in metrics}),
+        ).save_results({"metrics": job.results["metrics"]})
+
+
+def add_job_routes(server: TokCollateServer, service: ScoringService) -> None:
+    """Expose the scoring service through the results server.
+
+    Endpoints:
+        GET /api/scoring/datasets
+        GET /api/jobs
+        POST /api/jobs {"dataset": ..., "system_label": ..., "system_path": ..., "metrics": [...]}
+        GET /api/jobs/{id}
+        DELETE /api/jobs/{id}
+    """
+
+    def get_job(request: Request) -> ScoringJob:
+        try:
+            return service.get(request.params["job_id"])
+        except KeyError as err:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown job {request.params['job_id']}") from err
+
+    async def list_datasets(request: Request) -> Response:  # noqa: ARG001
+        return Response.from_json(
+            {
+                "datasets": [
+                    {"id": name, "systems": dset.systems, "languages": dset.languages, "loaded": dset.data is not None}
+                    for name, dset in service.datasets.items()
+                ]
+            }
+        )
+
+    async def list_jobs(request: Request) -> Response:  # noqa: ARG001
+        return Response.from_json({"jobs": [job.describe() for job in service.list_jobs()]})
+
+    async def submit_job(request: Request) -> Response:
+        try:
+            params = request.json()
+            job = service.submit(
+                dataset=params["dataset"],
+                system_label=params["system_label"],
+                system_path=params["system_path"],
+                metrics=params.get("metrics", None),
+            )
+        except QueueFullError as err:
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, str(err)) from err
+        except (KeyError, ValueError, TypeError, FileNotFoundError) as err:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Invalid job request: {err}") from err
+        return Response.from_json({"job": job.describe()}, status=HTTPStatus.ACCEPTED)
+
+    async def job_status(request: Request) -> Response:
+        return Response.from_json({"job": get_job(request).describe(with_results=True)})
+
+    async def cancel_job(request: Request) -> Response:
+        job = get_job(request)
+        if not service.cancel(job.job_id):
+            raise HTTPError(HTTPStatus.CONFLICT, f"Job {job.job_id} already finished ({job.status.value}).")
+        return Response.from_json({"job": job.describe()})
+
+    server.add_route("GET", r"/api/scoring/datasets", list_datasets)
+    server.add_route("GET", r"/api/jobs", list_jobs)
+    server.add_route("POST", r"/api/jobs", submit_job)
+    server.add_route("GET", r"/api/jobs/(?P<job_id>[^/]+)", job_status)
+    server.add_route("DELETE", r"/api/jobs/(?P<job_id>[^/]+)", cancel_job)
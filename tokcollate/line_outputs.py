@@ -0,0 +1,161 @@
+import logging
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+from attrs import define, field, validators
+
+from tokcollate.data import TokCollateData
+from tokcollate.options import build_optional, require_any
+
+logger = logging.getLogger(__name__)
+
+LINE_STATISTICS = {"sequence_length": np.int32, "sequence_bytes": np.int32, "sequence_ratio": np.float32}
+LINE_OUTPUTS_DIRNAME = "line_outputs"
+
+
+def fill_value(dtype: np.dtype) -> int | float:
+    """Return the value padding the lines missing in a language (shorter datasets)."""
+    return np.nan if np.issubdtype(dtype, np.floating) else -1
+
+
+def load_line_outputs(output_dir: Path, statistics: list[str] | None = None) -> dict[str, np.ndarray]:
+    """Load the (read-only, memory-mapped) per-line outputs saved in the scorer output directory."""
+    line_dir = Path(output_dir, LINE_OUTPUTS_DIRNAME)
+    if statistics is None:
+        statistics = [path.stem for path in sorted(line_dir.glob("*.npy"))]
+    return {statistic: np.load(Path(line_dir, f"{statistic}.npy"), mmap_mode="r") for statistic in statistics}
+
+
+def top_lines(values: np.ndarray, k: int, *, largest: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    """Return the indices and values of the k largest (or smallest) lines of each system and language.
+
+    The lines are selected for all the systems and languages at once (np.argpartition along the lines axis), so
+    the query only needs the (memory-mapped) per-line outputs. The padded lines (see fill_value) are never
+    selected, the results of the languages with less than k lines are padded with the index -1.
+
+    Args:
+        values (np.ndarray): (..., lines) per-line outputs (e.g. a LineOutputs.compute output)
+        k (int): number of the returned lines
+        largest (bool): return the largest values (otherwise the smallest)
+
+    Returns:
+        The (..., k) line indices and values, sorted from the most extreme value.
+    """
+    k = min(k, values.shape[-1])
+    if k < 1:
+        return np.zeros((*values.shape[:-1], 0), dtype=np.int64), values[..., :0]
+    valid = values != fill_value(values.dtype)
+    if np.issubdtype(values.dtype, np.floating):
+        valid &= ~np.isnan(values)
+    keys = np.where(valid, -values if largest else values, np.inf)
+    indices = np.argpartition(keys, k - 1, axis=-1)[..., :k]
+    order = np.argsort(np.take_along_axis(keys, indices, axis=-1), axis=-1, kind="stable")
+    indices = np.take_along_axis(indices, order, axis=-1)
+    top_values = np.take_along_axis(values, indices, axis=-1)
+    missing = ~np.take_along_axis(valid, indices, axis=-1)
+    indices[missing] = -1
+    return indices, top_values
+
+
+@define(kw_only=True)
+class LineOutputs:
+    """Computes the per-line outputs of the line-level statistics for the drill-down (e.g. outlier) analysis.
+
+    Each statistic is stored as a dense (systems, languages, lines) tensor, padded with the fill_value if
+    the languages have a different number of lines. With an output directory, the tensors are written to
+    memory-mapped `line_outputs/{statistic}.npy` files (see load_line_outputs), so neither the tensors nor the text
+    need to be kept in memory for the subsequent queries (see top_lines).
+
+    Line statistics:
+        sequence_length: number of tokens per line (int32)
+        sequence_bytes: number of utf-8 token bytes per line (int32)
+        sequence_ratio: number of tokens per line relative to the parallel line of the pivot language (float32)
+
+    Args:
+        statistics (list[str]): computed line statistics
+        pivot_language (str): pivot language of the sequence_ratio statistic (defaults to the first language)
+    """
+
+    statistics: list[str] = field(
+        converter=list,
+        factory=lambda: list(LINE_STATISTICS.keys()),
+        validator=[validators.deep_iterable(validators.in_(LINE_STATISTICS.keys())), require_any(LINE_STATISTICS)],
+    )
+    pivot_language: str = field(default=None)
+
+    @classmethod
+    def from_config(cls: "LineOutputs", config: Mapping | None) -> "LineOutputs | None":
+        """Create the line outputs from the scorer.line_outputs config section (see build_optional).
+
+        OmegaConf Args:
+            scorer.line_outputs.statistics: computed line statistics
+            scorer.line_outputs.pivot_language: pivot language of the sequence_ratio statistic
+        """
+        return build_optional(cls, config)
+
+    def result_axes(self) -> dict[str, tuple[str, ...]]:
+        """Return the axis layout of each computed tensor (see compute)."""
+        return dict.fromkeys(self.statistics, ("systems", "languages", "lines"))
+
+    def compute(
+        self,
+        data: TokCollateData,
+        systems: list[str],
+        languages: list[str],
+        output_dir: Path | None = None,
+    ) -> dict[str, np.ndarray]:
+        """Return the (systems, languages, lines) tensor of each statistic.
+
+        Args:
+            data (TokCollateData): scored data
+            systems (list[str]): system labels
+            languages (list[str]): language labels
+            output_dir (Path): (optional) scorer output directory, the tensors are memory-mapped to its
+                `line_outputs` subdirectory
+        """
+        num_lines = max(
+            (data.get_sequence_lengths(system_label, lang).size for system_label in systems for lang in languages),
+            default=0,
+        )
+        res = {}
+        for statistic in self.statistics:
+            dtype = np.dtype(LINE_STATISTICS[statistic])
+            shape = (len(systems), len(languages), num_lines)
+            if output_dir is not None:
+                path = Path(output_dir, LINE_OUTPUTS_DIRNAME, f"{statistic}.npy")
+                path.parent.mkdir(parents=True, exist_ok=True)
+                logger.info("Saving %s line outputs to %s", statistic, path)
+                out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+                out[...] = fill_value(dtype)
+            else:
+                out = np.full(shape, fill_value(dtype), dtype=dtype)
+            for i, system_label in enumerate(systems):
+                for j, lang in enumerate(languages):
+                    values = self._get_values(data, statistic, system_label, lang, languages)
+                    out[i, j, : values.size] = values
+            if output_dir is not None:
+                out.flush()
+            res[statistic] = out
+        return res
+
+    def _get_values(
+        self, data: TokCollateData, statistic: str, system_label: str, language: str, languages: list[str]
+    ) -> np.ndarray:
+        if statistic == "sequence_length":
+            return data.get_sequence_lengths(system_label, language)
+        if statistic == "sequence_bytes":
+            return data.get_sequence_lengths(system_label, language, use_bytes=True)
+        if statistic == "sequence_ratio":
+            pivot_language = self.pivot_language if self.pivot_language is not None else languages[0]
+            lengths = data.get_sequence_lengths(system_label, language)
+            pivot_lengths = data.get_sequence_lengths(system_label, pivot_language)
+            if lengths.size != pivot_lengths.size:
+                err_msg = (
+                    f"The sequence_ratio line outputs require parallel texts ({system_label} has {lengths.size} "
+                    f"{language} lines and {pivot_lengths.size} {pivot_language} lines)."
+                )
+                raise ValueError(err_msg)
+            return lengths / pivot_lengths
+        err_msg = f"Unknown line statistic: {statistic}"
+        raise ValueError(err_msg)
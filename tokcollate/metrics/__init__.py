@@ -1,6 +1,7 @@
 import importlib
+import importlib.metadata
+import logging
 from collections.abc import Callable
-from pathlib import Path
 
 from .tokcollate_metric import TokCollateMetric, TokCollateMultilingualMetric
 
@@ -9,10 +10,44 @@ __all__ = [
     "TokCollateMultilingualMetric",
 ]
 
+logger = logging.getLogger(__name__)
+
 METRIC_REGISTRY = {}
 METRIC_INSTANCE_REGISTRY = {}
 METRIC_CLASS_NAMES = set()
 
+# Names of the metrics registered with register_metric and their implementation modules.
+# The modules (and their dependencies, e.g. scipy) are only imported when the metric is requested (see get_metric).
+METRIC_MANIFEST = {
+    "bits": "tokcollate.metrics.bits",
+    "encode_throughput": "tokcollate.metrics.throughput",
+    "entropy": "tokcollate.metrics.entropy",
+    "fertility": "tokcollate.metrics.fertility",
+    "gold_segmentation": "tokcollate.metrics.gold_segmentation",
+    "jensen_shannon_divergence": "tokcollate.metrics.jensen_shannon",
+    "kullback_liebler_divergence": "tokcollate.metrics.kullback_liebler",
+    "percentile_frequency": "tokcollate.metrics.percentile_frequency",
+    "sequence_length": "tokcollate.metrics.sequence_length",
+    "sequence_ratio": "tokcollate.metrics.sequence_ratio",
+    "token_length": "tokcollate.metrics.token_length",
+    "vocab_growth": "tokcollate.metrics.vocab_growth",
+    "vocab_size": "tokcollate.metrics.vocab_size",
+}
+# Requirements of the built-in metrics (see TokCollateMetric.requirements), so the metrics can be filtered without
+# importing their modules. The built-in metrics not listed here only require the tokenized system outputs.
+METRIC_MANIFEST_REQUIREMENTS = {
+    "encode_throughput": ("tokenizers",),
+    "gold_segmentation": ("reference_text",),
+}
+
+# Third-party metrics are discovered through this entry point group. The entry point name is the metric name and
+# the value points either to the module registering the metric or directly to the TokCollateMetric subclass, e.g.:
+#
+#   [project.entry-points."tokcollate.metrics"]
+#   char_per_token = "my_package.metrics:CharPerTokenMetric"
+PLUGIN_ENTRY_POINT_GROUP = "tokcollate.metrics"
+PLUGIN_MANIFEST = None
+
 
 def build_metric(metric: str, metric_label: str, **kwargs) -> TokCollateMetric:  # noqa: ANN003
     """TODO"""
@@ -57,9 +92,30 @@ def register_metric(name: str) -> Callable:
     return register_metric_cls
 
 
+def _get_plugin_manifest() -> dict[str, importlib.metadata.EntryPoint]:
+    """Return the metric plugin entry points (discovered on the first call)."""
+    global PLUGIN_MANIFEST  # noqa: PLW0603
+    if PLUGIN_MANIFEST is None:
+        PLUGIN_MANIFEST = {ep.name: ep for ep in importlib.metadata.entry_points(group=PLUGIN_ENTRY_POINT_GROUP)}
+    return PLUGIN_MANIFEST
+
+
+def _load_metric(name: str) -> None:
+    """Import the module implementing the requested (not yet registered) metric."""
+    if name in METRIC_MANIFEST:
+        importlib.import_module(METRIC_MANIFEST[name])
+        return
+    plugins = _get_plugin_manifest()
+    if name in plugins:
+        logger.debug("Loading metric plugin %s (%s)", name, plugins[name].value)
+        obj = plugins[name].load()
+        if name not in METRIC_REGISTRY and isinstance(obj, type):
+            register_metric(name)(obj)
+
+
 def list_metrics() -> list[str]:
-    """Return a list of available metrics."""
-    return METRIC_REGISTRY.keys()
+    """Return a list of available metrics (including the not yet imported ones)."""
+    return list(dict.fromkeys([*METRIC_REGISTRY.keys(), *METRIC_MANIFEST.keys(), *_get_plugin_manifest().keys()]))
 
 
 def list_metric_instance_labels() -> list[str]:
@@ -67,17 +123,21 @@ def list_metric_instance_labels() -> list[str]:
     return METRIC_INSTANCE_REGISTRY.keys()
 
 
-def get_metric(name: str) -> TokCollateMetric:
-    return METRIC_REGISTRY[name]
+def get_metric_requirements(name: str) -> tuple[str, ...]:
+    """Return the inputs required by the metric besides the tokenized system outputs (e.g. "reference_text").
+
+    The requirements of the not yet imported built-in metrics are read from the METRIC_MANIFEST_REQUIREMENTS.
+    """
+    if name in METRIC_MANIFEST and name not in METRIC_REGISTRY:
+        return METRIC_MANIFEST_REQUIREMENTS.get(name, ())
+    return get_metric(name).requirements()
 
 
-metric_module_dir = Path(__file__).parents[0]
-for file in metric_module_dir.iterdir():
-    if (
-        not file.stem.startswith("_")
-        and not file.stem.startswith(".")
-        and file.name.endswith("py")
-        and not file.is_dir()
-    ):
-        metric_name = file.stem if file.name.endswith(".py") else file
-        importlib.import_module("tokcollate.metrics." + str(metric_name))
+def get_metric(name: str) -> TokCollateMetric:
+    """Return the metric class registered under the given name (importing its implementation if necessary)."""
+    if name not in METRIC_REGISTRY:
+        _load_metric(name)
+    if name not in METRIC_REGISTRY:
+        err_msg = f"Unknown metric {name}. Available metrics: [{','.join(list_metrics())}]"
+        raise KeyError(err_msg)
+    return METRIC_REGISTRY[name]
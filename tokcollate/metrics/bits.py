@@ -1,6 +1,7 @@
 import numpy as np
 from attrs import define
 
+from tokcollate.bootstrap import resample_counts
 from tokcollate.data import TokCollateData
 from tokcollate.metrics import TokCollateMetric, register_metric
 from tokcollate.utils import get_unigram_frequencies
@@ -20,7 +21,16 @@ class BitsMetric(TokCollateMetric):
         system_label: str,
         language: str,
     ) -> float:
-        text = data.get_system_text(system_label=system_label, language=language)
-        unigram_freqs = get_unigram_frequencies(text)
+        unigram_freqs = get_unigram_frequencies(text_vocab=data.get_vocabulary(system_label, language))
         vocab_size = unigram_freqs.size
         return unigram_freqs.sum() * np.log2(vocab_size)
+
+    def score_sketch(self, sketch: "UnigramSketch") -> float:  # noqa: F821
+        return sketch.total * np.log2(sketch.vocab_size())
+
+    def score_resampled(
+        self, data: TokCollateData, system_label: str, weights: np.ndarray, language: str
+    ) -> np.ndarray:
+        unigram_freqs = resample_counts(data.get_line_counts(system_label, language), weights)
+        vocab_size = (unigram_freqs > 0).sum(axis=1)
+        return unigram_freqs.sum(axis=1) * np.log2(vocab_size)
@@ -1,8 +1,10 @@
 import logging
+from collections.abc import Mapping, Sequence
 
 import numpy as np
 from attrs import Attribute, define, field, validators
 
+from tokcollate.bootstrap import resample_counts
 from tokcollate.data import TokCollateData
 from tokcollate.metrics import TokCollateMetric, register_metric
 from tokcollate.utils import get_unigram_distribution
@@ -10,18 +12,41 @@ from tokcollate.utils import get_unigram_distribution
 logger = logging.getLogger(__name__)
 
 
+def convert_power(value: float | Sequence[float] | Mapping) -> float | np.ndarray:
+    """Convert the Rényi power: a single value, a list of values or a range (a {start, stop, num or step} mapping).
+
+    The ranges include the stop value (np.linspace with num values, or np.arange with the step).
+    """
+    if isinstance(value, Mapping):
+        start, stop = float(value["start"]), float(value["stop"])
+        if "num" in value:
+            return np.linspace(start, stop, int(value["num"]))
+        if "step" in value:
+            step = float(value["step"])
+            return np.arange(start, stop + step / 2, step)
+        err_msg = f"The power range requires the start, stop and either num or step values (got {dict(value)})."
+        raise ValueError(err_msg)
+    if isinstance(value, Sequence | np.ndarray) and not isinstance(value, str):
+        return np.array([float(power) for power in value], dtype=np.float64)
+    return float(value)
+
+
 @register_metric("entropy")
 @define(kw_only=True)
 class EntropyMetric(TokCollateMetric):
     """Metric class implementing various entropy computations.
 
+    The Rényi entropy can be computed for multiple powers at once (a list or a range of powers, see convert_power).
+    The unigram distribution is then computed only once and the scores get an additional last axis indexed by
+    the powers (see TokCollateMetric.sweep_values).
+
     Args:
         function_type (str): specifies which entropy function to use
-        power (float): power value used in the Renyi entropy computation
+        power (float | list[float]): power value(s) used in the Renyi entropy computation
     """
 
     function_type: str = field(validator=validators.instance_of(str), default="renyi_entropy")
-    power: float = field(default=2.5)
+    power: float | np.ndarray = field(converter=convert_power, default=2.5)
 
     _functions = frozenset(["renyi_efficiency", "renyi_entropy", "shannon_efficiency", "shannon_entropy"])
 
@@ -32,46 +57,85 @@ class EntropyMetric(TokCollateMetric):
             err_msg = f"Unknown {attribute.name} value: {value}. Supported values [{self._functions}]."
             raise ValueError(err_msg)
 
+    @property
+    def sweep_values(self) -> np.ndarray | None:
+        """The swept Rényi powers (the Shannon functions ignore the power)."""
+        if "shannon" in self.function_type or np.ndim(self.power) == 0:
+            return None
+        return self.power
+
     def _shannon_entropy(self, unigram_probs: np.ndarray) -> float:
         """Shannon entropy implementation."""
         return -np.sum(unigram_probs * np.log2(unigram_probs))
 
+    def _renyi_entropy(self, unigram_probs: np.ndarray) -> float | np.ndarray:
+        """Rényi entropy of each power (the Shannon entropy as its limit for the power 1.0)."""
+        if np.ndim(self.power) == 0:
+            if self.power == 1.0:
+                logger.warning(
+                    "%s function parameter `power=1.0`. Computing shannon variant instead.", self.function_type
+                )
+                return self._shannon_entropy(unigram_probs)
+            return 1 / (1 - self.power) * np.log2(np.sum(unigram_probs**self.power))
+
+        # all the powers are evaluated at once as a single (vocab_size, num_powers) reduction
+        shannon = self.power == 1.0
+        powers = self.power[~shannon]
+        ent = np.empty(self.power.shape)
+        ent[shannon] = self._shannon_entropy(unigram_probs)
+        ent[~shannon] = np.log2(np.sum(unigram_probs[:, None] ** powers, axis=0)) / (1 - powers)
+        return ent
+
+    def score_sketch(self, sketch: "UnigramSketch") -> float:  # noqa: F821
+        vocab_size = sketch.vocab_size()
+        if "shannon" in self.function_type:
+            ent = sketch.shannon_entropy()
+        else:
+            ent = np.array(
+                [
+                    sketch.shannon_entropy()
+                    if power == 1.0
+                    else 1 / (1 - power) * np.log2(sketch.frequency_moment(power) / sketch.total**power)
+                    for power in np.atleast_1d(self.power)
+                ]
+            )
+            ent = ent if self.sweep_values is not None else float(ent[0])
+        if "efficiency" in self.function_type:
+            return ent / np.log2(vocab_size)
+        return ent
+
+    def score_resampled(
+        self, data: TokCollateData, system_label: str, weights: np.ndarray, language: str
+    ) -> np.ndarray:
+        counts = resample_counts(data.get_line_counts(system_label, language), weights)
+        unigram_probs = counts / counts.sum(axis=1, keepdims=True)
+        vocab_size = (counts > 0).sum(axis=1)
+
+        powers = [1.0] if "shannon" in self.function_type else np.atleast_1d(self.power)
+        ent = np.zeros((counts.shape[0], len(powers)))
+        for k, power in enumerate(powers):
+            if power == 1.0:
+                # the tokens missing in a resample (zero probabilities) do not contribute to the entropy
+                ent[:, k] = -np.sum(unigram_probs * np.log2(np.where(unigram_probs > 0, unigram_probs, 1.0)), axis=1)
+            else:
+                ent[:, k] = 1 / (1 - power) * np.log2(np.sum(unigram_probs**power, axis=1))
+        if "efficiency" in self.function_type:
+            ent /= np.log2(vocab_size)[:, None]
+        return ent if self.sweep_values is not None else ent[:, 0]
+
     def score(
         self,
         data: TokCollateData,
         system_label: str,
         language: str,
     ) -> float:
-        text = data.get_system_text(system_label=system_label, language=language)
-        unigram_probs = get_unigram_distribution(text)
+        unigram_probs = get_unigram_distribution(text_vocab=data.get_vocabulary(system_label, language))
         vocab_size = unigram_probs.size
 
-        value_err_msg = f"Unknown entropy function: {self.function_type}"
-
         if "shannon" in self.function_type:
             ent = self._shannon_entropy(unigram_probs)
-            if self.function_type == "shannon_entropy":
-                return ent
-            if self.function_type == "shannon_efficiency":
-                return ent / np.log2(vocab_size)
-            raise ValueError(value_err_msg)
-
-        if self.power == 1.0:
-            if "shannon" not in self.function_type:
-                logger.warning(
-                    "%s function parameter `power=1.0`. Computing shannon variant instead.", self.function_type
-                )
-            ent = self._shannon_entropy(unigram_probs)
-            if "entropy" in self.function_type:
-                return ent
-            if "efficiency" in self.function_type:
-                return ent / np.log2(vocab_size)
-            raise ValueError(value_err_msg)
-
-        scale = 1 / (1 - self.power)
-        ent = scale * np.log2(np.sum(unigram_probs**self.power))
-        if self.function_type == "renyi_entropy":
-            return ent
-        if self.function_type == "renyi_efficiency":
+        else:
+            ent = self._renyi_entropy(unigram_probs)
+        if "efficiency" in self.function_type:
             return ent / np.log2(vocab_size)
-        raise ValueError(value_err_msg)
+        return ent
@@ -0,0 +1,151 @@
+from collections import Counter
+from typing import ClassVar
+
+import numpy as np
+from attrs import Attribute, define, field, validators
+
+from tokcollate.boundaries import DEFAULT_CONTINUATION_PREFIXES, DEFAULT_MARKERS
+from tokcollate.data import TokCollateData
+from tokcollate.metrics import TokCollateMetric, register_metric
+
+WORD_SCHEMES = ("auto", "marker", "continuation", "whitespace")
+
+
+def is_byte_fallback(token: str) -> bool:
+    """Return whether the token is a byte-fallback token (<0xNN>)."""
+    return len(token) == 6 and token.startswith("<0x") and token.endswith(">")  # noqa: PLR2004
+
+
+def is_special(token: str) -> bool:
+    """Return whether the token looks like a special token (e.g. <s>, </s>, <unk>, <|endoftext|> or [CLS])."""
+    if len(token) < 3 or is_byte_fallback(token):  # noqa: PLR2004
+        return False
+    return (token[0] == "<" and token[-1] == ">") or (token[0] == "[" and token[-1] == "]" and token[1:-1].isupper())
+
+
+@register_metric("fertility")
+@define(kw_only=True)
+class FertilityMetric(TokCollateMetric):
+    """Computes the word-level fertility statistics of the tokenized text.
+
+    Each vocabulary type of the system is classified once into the small lookup arrays (word-initial tokens,
+    the special tokens), so the words are delimited by gathering the lookups with the token ids
+    (see TokCollateData.get_token_ids) and counted by the per-line segment sums. The special tokens are ignored.
+    The byte-fallback tokens (<0xNN>) continue the current word. The first token of each line always starts a word.
+
+    Word schemes:
+        marker: the words start with the tokens with a word-boundary marker (SentencePiece `▁`, byte-level BPE `Ġ`)
+        continuation: all the tokens except the ones with a continuation prefix (WordPiece `##`) start the words
+        whitespace: every token is a word (whitespace-tokenized text)
+        auto: continuation if any vocabulary type has a continuation prefix, marker if any type has a marker,
+            whitespace otherwise
+
+    Function types:
+        fertility: average number of tokens per word
+        continued_words: fraction of the words split into multiple tokens
+        single_token_words: fraction of the words tokenized as a single token
+
+    Args:
+        function_type (str): computed statistic
+        scheme (str): word scheme
+        markers (list[str]): word-boundary markers
+        continuation_prefixes (list[str]): word-continuation prefixes
+    """
+
+    function_type: str = field(validator=validators.instance_of(str), default="fertility")
+    scheme: str = field(validator=validators.in_(WORD_SCHEMES), default="auto")
+    markers: tuple[str, ...] = field(converter=tuple, default=DEFAULT_MARKERS)
+    continuation_prefixes: tuple[str, ...] = field(converter=tuple, default=DEFAULT_CONTINUATION_PREFIXES)
+
+    tokens_per_second: ClassVar[float] = 2e7
+
+    # lookup arrays of the system vocabularies (validated by the identity of the cached vocabulary)
+    _lookups: dict[str, tuple[Counter, np.ndarray, np.ndarray]] = field(init=False, factory=dict, repr=False)
+
+    _functions = frozenset(["continued_words", "fertility", "single_token_words"])
+
+    @function_type.validator
+    def _supported_function(self, attribute: Attribute, value: str) -> None:
+        """Check whether the specified function_type is supported by the class."""
+        if value not in self._functions:
+            err_msg = f"Unknown {attribute.name} value: {value}. Supported values [{self._functions}]."
+            raise ValueError(err_msg)
+
+    def score(
+        self,
+        data: TokCollateData,
+        system_label: str,
+        language: str,
+    ) -> float:
+        num_tokens, num_words, num_single = self.line_counts(data, system_label, language)
+        return float(self._aggregate(num_tokens.sum(), num_words.sum(), num_single.sum()))
+
+    def score_resampled(
+        self, data: TokCollateData, system_label: str, weights: np.ndarray, language: str
+    ) -> np.ndarray:
+        num_tokens, num_words, num_single = self.line_counts(data, system_label, language)
+        return self._aggregate(weights @ num_tokens, weights @ num_words, weights @ num_single)
+
+    def classify_vocabulary(self, vocab: Counter) -> tuple[np.ndarray, np.ndarray]:
+        """Return the word-initial and special token lookup arrays of the vocabulary types."""
+        tokens = list(vocab)
+        special = np.fromiter((is_special(tok) for tok in tokens), dtype=bool, count=len(tokens))
+        scheme = self.scheme
+        if scheme == "auto":
+            scheme = self._detect_scheme(tokens)
+        if scheme == "whitespace":
+            return ~special, special
+        if scheme == "continuation":
+            prefixes = tuple(self.continuation_prefixes)
+            word_initial = (
+                not is_byte_fallback(tok) and not (tok.startswith(prefixes) and tok not in prefixes) for tok in tokens
+            )
+        else:
+            markers = tuple(self.markers)
+            word_initial = (tok.startswith(markers) for tok in tokens)
+        return np.fromiter(word_initial, dtype=bool, count=len(tokens)) & ~special, special
+
+    def line_counts(
+        self, data: TokCollateData, system_label: str, language: str
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the per-line numbers of the (non-special) tokens, words and single-token words."""
+        vocab = data.get_vocabulary(system_label)
+        if system_label not in self._lookups or self._lookups[system_label][0] is not vocab:
+            self._lookups[system_label] = (vocab, *self.classify_vocabulary(vocab))
+        _, word_initial, special = self._lookups[system_label]
+        ids, offsets = data.get_token_ids(system_label, language)
+        num_lines = offsets.size - 1
+        line_index = np.repeat(np.arange(num_lines), np.diff(offsets))
+
+        kept = ~special[ids]
+        ids, line_index = ids[kept], line_index[kept]
+        starts = word_initial[ids]
+        if ids.size:
+            starts[0] = True
+            starts[1:] |= line_index[1:] != line_index[:-1]
+        word_index = np.cumsum(starts) - 1
+        word_lengths = np.bincount(word_index, minlength=int(starts.sum()))
+        word_lines = line_index[starts]
+        return (
+            np.bincount(line_index, minlength=num_lines).astype(np.float64),
+            np.bincount(word_lines, minlength=num_lines).astype(np.float64),
+            np.bincount(word_lines, weights=word_lengths == 1, minlength=num_lines),
+        )
+
+    def _detect_scheme(self, tokens: list[str]) -> str:
+        prefixes, markers = tuple(self.continuation_prefixes), tuple(self.markers)
+        if prefixes and any(tok.startswith(prefixes) for tok in tokens):
+            return "continuation"
+        if markers and any(tok.startswith(markers) for tok in tokens):
+            return "marker"
+        return "whitespace"
+
+    def _aggregate(
+        self, num_tokens: np.ndarray | float, num_words: np.ndarray | float, num_single: np.ndarray | float
+    ) -> np.ndarray | float:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.function_type == "fertility":
+                return np.divide(num_tokens, num_words)
+            if self.function_type == "continued_words":
+                return np.divide(num_words - num_single, num_words)
+            return np.divide(num_single, num_words)
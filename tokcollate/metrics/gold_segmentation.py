@@ -0,0 +1,139 @@
+from typing import ClassVar
+
+import numpy as np
+from attrs import Attribute, define, field, validators
+
+from tokcollate.boundaries import (
+    DEFAULT_CONTINUATION_PREFIXES,
+    DEFAULT_MARKERS,
+    LINE_OFFSET_BITS,
+    boundary_keys,
+    token_lengths,
+    token_offsets,
+)
+from tokcollate.data import TokCollateData
+from tokcollate.metrics import TokCollateMetric, register_metric
+from tokcollate.utils import get_vocabulary
+
+
+def contains_keys(sorted_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Return whether each of the keys is present in the sorted_keys array."""
+    if sorted_keys.size == 0:
+        return np.zeros(keys.shape, dtype=bool)
+    index = np.minimum(np.searchsorted(sorted_keys, keys), sorted_keys.size - 1)
+    return sorted_keys[index] == keys
+
+
+@register_metric("gold_segmentation")
+@define(kw_only=True)
+class GoldSegmentationMetric(TokCollateMetric):
+    """Compares the system segmentation with a gold segmentation of the same text (e.g. morphological segmentation).
+
+    The gold segmentation is the reference text of the data (see TokCollateData.get_reference_files), with
+    the segments (e.g. morphemes) separated by spaces, line-aligned with the system outputs. The tokens of both are
+    mapped to the character offsets in the plaintext without whitespace and markers (see tokcollate.boundaries),
+    so the boundaries and segment spans are matched by sorted-array lookups instead of per-token alignment.
+
+    Function types:
+        boundary_precision: fraction of the line-internal system boundaries that are gold boundaries
+        boundary_recall: fraction of the line-internal gold boundaries that are system boundaries
+        boundary_f1: harmonic mean of the boundary precision and recall
+        morpheme_alignment: fraction of the gold segments whose both ends are system boundaries (the segments are not
+            crossed by the system tokens, but they can be split into several tokens)
+        morpheme_exact: fraction of the gold segments matching a single system token
+
+    Args:
+        function_type (str): computed statistic
+        markers (list[str]): word-boundary markers removed from the tokens (and the gold segments)
+        continuation_prefixes (list[str]): word-continuation prefixes removed from the start of the tokens
+    """
+
+    function_type: str = field(validator=validators.instance_of(str), default="boundary_f1")
+    markers: tuple[str, ...] = field(converter=tuple, default=DEFAULT_MARKERS)
+    continuation_prefixes: tuple[str, ...] = field(converter=tuple, default=DEFAULT_CONTINUATION_PREFIXES)
+
+    _requires_reference_text: bool = True
+
+    tokens_per_second: ClassVar[float] = 5e6
+
+    # gold line lengths, boundary keys and segment spans per language (validated by the identity of the gold text)
+    _gold: dict[str, tuple[list[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = field(
+        init=False, factory=dict, repr=False
+    )
+
+    _functions = frozenset(
+        ["boundary_f1", "boundary_precision", "boundary_recall", "morpheme_alignment", "morpheme_exact"]
+    )
+
+    @function_type.validator
+    def _supported_function(self, attribute: Attribute, value: str) -> None:
+        """Check whether the specified function_type is supported by the class."""
+        if value not in self._functions:
+            err_msg = f"Unknown {attribute.name} value: {value}. Supported values [{self._functions}]."
+            raise ValueError(err_msg)
+
+    def score(
+        self,
+        data: TokCollateData,
+        system_label: str,
+        language: str,
+    ) -> float:
+        gold_line_lengths, gold_boundaries, gold_starts, gold_ends = self._get_gold(data, language)
+        line_lengths = data.get_sequence_lengths(system_label, language)
+        if gold_line_lengths.size != line_lengths.size:
+            err_msg = (
+                f"The gold segmentation has {gold_line_lengths.size} lines, but the output of {system_label} "
+                f"({language}) has {line_lengths.size} lines."
+            )
+            raise ValueError(err_msg)
+        lengths = token_lengths(
+            data.get_system_text(system_label, language=language),
+            data.get_vocabulary(system_label, language),
+            self.markers,
+            self.continuation_prefixes,
+        )
+        if self.function_type.startswith("boundary"):
+            return self._boundary_score(boundary_keys(line_lengths, lengths), gold_boundaries)
+        return self._morpheme_score(line_lengths, lengths, gold_starts, gold_ends)
+
+    def _get_gold(self, data: TokCollateData, language: str) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return the gold line lengths, line-internal boundary keys and the (start, end) keys of the segments."""
+        gold_text = data.get_reference_text(language)
+        if language not in self._gold or self._gold[language][0] is not gold_text:
+            line_lengths = np.array([len(line) for line in gold_text], dtype=np.int64)
+            lengths = token_lengths(gold_text, get_vocabulary(gold_text), self.markers, self.continuation_prefixes)
+            line_index, offsets, _ = token_offsets(line_lengths, lengths)
+            segments = lengths > 0
+            ends = (line_index[segments] << LINE_OFFSET_BITS) | offsets[segments]
+            starts = ends - lengths[segments]
+            self._gold[language] = (gold_text, line_lengths, boundary_keys(line_lengths, lengths), starts, ends)
+        return self._gold[language][1:]
+
+    def _boundary_score(self, boundaries: np.ndarray, gold_boundaries: np.ndarray) -> float:
+        num_shared = np.intersect1d(boundaries, gold_boundaries, assume_unique=True).size
+        if self.function_type == "boundary_precision":
+            return num_shared / boundaries.size if boundaries.size else np.nan
+        if self.function_type == "boundary_recall":
+            return num_shared / gold_boundaries.size if gold_boundaries.size else np.nan
+        total = boundaries.size + gold_boundaries.size
+        return 2 * num_shared / total if total else np.nan
+
+    def _morpheme_score(
+        self,
+        line_lengths: np.ndarray,
+        lengths: np.ndarray,
+        starts: np.ndarray,
+        ends: np.ndarray,
+    ) -> float:
+        # all the system boundaries including the line starts and ends
+        line_index, offsets, _ = token_offsets(line_lengths, lengths)
+        line_starts = np.arange(line_lengths.size, dtype=np.int64) << LINE_OFFSET_BITS
+        boundaries = np.unique(np.concatenate([line_starts, (line_index << LINE_OFFSET_BITS) | offsets]))
+        if not ends.size:
+            return np.nan
+        aligned = contains_keys(boundaries, starts) & contains_keys(boundaries, ends)
+        if self.function_type == "morpheme_exact":
+            # no system boundary strictly inside the segment
+            inside = np.searchsorted(boundaries, ends, side="left") - np.searchsorted(boundaries, starts, side="right")
+            aligned &= inside == 0
+        return float(aligned.mean())
@@ -1,12 +1,15 @@
+import itertools
 from collections import Counter
+from typing import ClassVar
 
 import numpy as np
 from attrs import define, field, validators
 from scipy.special import kl_div
 
-from tokcollate.data import TextType, TokCollateData
+from tokcollate.bootstrap import check_parallel, resample_counts, vocabulary_columns
+from tokcollate.data import TokCollateData
 from tokcollate.metrics import TokCollateMultilingualMetric, register_metric
-from tokcollate.utils import get_unigram_distribution, get_vocabulary
+from tokcollate.utils import get_unigram_distribution
 
 
 @register_metric("kullback_liebler_divergence")
@@ -21,23 +24,40 @@ class KullbackLieblerDivergenceMetric(TokCollateMultilingualMetric):
 
     vocab_most_common: int = field(validator=validators.optional(validators.instance_of(int)), default=None)
 
+    tokens_per_second: ClassVar[float] = 2.5e6
+
+    def estimate_resources(
+        self,
+        system: "SystemEstimate",  # noqa: F821
+        tokens_per_second: float | None = None,
+    ) -> tuple[float, float]:
+        """The batched scoring keeps the (V, L, L) float64 divergences together with their (V, L, L) inf mask."""
+        runtime, peak_bytes = super().estimate_resources(system, tokens_per_second=tokens_per_second)
+        if not self.batched:
+            return runtime, peak_bytes
+        vocab_size = system.vocab_size
+        if self.vocab_most_common is not None:
+            vocab_size = min(vocab_size, self.vocab_most_common)
+        num_langs = len(system.num_tokens)
+        return runtime, peak_bytes + 100 * system.vocab_size + (8 + 2) * vocab_size * num_langs * num_langs
+
     def score(self, data: TokCollateData, system_label: str, src_lang: str, tgt_lang: str) -> float:
-        text_src = data.get_system_text(system_label=system_label, language=src_lang)
-        text_tgt = data.get_system_text(system_label=system_label, language=tgt_lang)
-        text_all = data.get_system_text(system_label=system_label)
-        vocab = self._extract_vocabulary(text_all, self.vocab_most_common)
+        vocab = self._extract_vocabulary(data.get_vocabulary(system_label), self.vocab_most_common)
 
-        unigram_probs_src = get_unigram_distribution(text_src, vocab=vocab)
-        unigram_probs_tgt = get_unigram_distribution(text_tgt, vocab=vocab)
+        unigram_probs_src = get_unigram_distribution(
+            vocab=vocab, text_vocab=data.get_vocabulary(system_label, src_lang)
+        )
+        unigram_probs_tgt = get_unigram_distribution(
+            vocab=vocab, text_vocab=data.get_vocabulary(system_label, tgt_lang)
+        )
 
         return kl_div(unigram_probs_src, unigram_probs_tgt).sum()
 
     def score_batched(self, data: TokCollateData, system_label: str, languages: list[str]) -> np.ndarray:
-        text_all = data.get_system_text(system_label=system_label)
-        vocab = self._extract_vocabulary(text_all, self.vocab_most_common)
+        vocab = self._extract_vocabulary(data.get_vocabulary(system_label), self.vocab_most_common)
         unigram_probs = np.stack(
             [
-                get_unigram_distribution(data.get_system_text(system_label=system_label, language=lang), vocab=vocab)
+                get_unigram_distribution(vocab=vocab, text_vocab=data.get_vocabulary(system_label, lang))
                 for lang in languages
             ],
             axis=1,
@@ -50,8 +70,27 @@ class KullbackLieblerDivergenceMetric(TokCollateMultilingualMetric):
 
         return res.sum(0)
 
-    def _extract_vocabulary(self, text: TextType, most_common: int | None = None) -> Counter:
-        vocab = get_vocabulary(text=text)
+    def score_resampled(
+        self, data: TokCollateData, system_label: str, weights: np.ndarray, languages: list[str]
+    ) -> np.ndarray:
+        # the vocabulary cut-off is given by the original (not resampled) system output
+        system_vocab = data.get_vocabulary(system_label)
+        columns = vocabulary_columns(system_vocab, self._extract_vocabulary(system_vocab, self.vocab_most_common))
+        line_counts = [data.get_line_counts(system_label, lang) for lang in languages]
+        check_parallel([counts.shape[0] for counts in line_counts], weights)
+        unigram_probs = []
+        for counts in line_counts:
+            unigram_freqs = resample_counts(counts[:, columns], weights)
+            unigram_probs.append(unigram_freqs / unigram_freqs.sum(axis=1, keepdims=True))
+
+        res = np.zeros(shape=[weights.shape[0], len(languages), len(languages)])
+        for j, k in itertools.product(range(len(languages)), repeat=2):
+            divergence = kl_div(unigram_probs[j], unigram_probs[k])
+            divergence[divergence == np.inf] = 0.0
+            res[:, j, k] = divergence.sum(axis=1)
+        return res
+
+    def _extract_vocabulary(self, vocab: Counter, most_common: int | None = None) -> Counter:
         if most_common is not None:
             vocab = Counter(dict(vocab.most_common(most_common)))
         return vocab
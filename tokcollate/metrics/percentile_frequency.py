@@ -1,6 +1,7 @@
 import numpy as np
 from attrs import define, field
 
+from tokcollate.bootstrap import resample_counts
 from tokcollate.data import TokCollateData
 from tokcollate.metrics import TokCollateMetric, register_metric
 from tokcollate.utils import get_unigram_distribution
@@ -25,9 +26,22 @@ class PercentileFrequencyMetric(TokCollateMetric):
         system_label: str,
         language: str,
     ) -> float:
-        text = data.get_system_text(system_label=system_label, language=language)
-        unigram_probs = get_unigram_distribution(text)
-
+        unigram_probs = get_unigram_distribution(text_vocab=data.get_vocabulary(system_label, language))
+        return self._score_distribution(unigram_probs)
+
+    def score_sketch(self, sketch: "UnigramSketch") -> float:  # noqa: F821
+        # sum(p * (p >= gamma_1_val) * (p * gamma_2_val)) expressed through the counts
+        gamma_1_count, gamma_2_count = sketch.count_percentiles([self.gamma_1, self.gamma_2])
+        return gamma_2_count / sketch.total * sketch.frequency_moment(2.0, min_count=gamma_1_count) / sketch.total**2
+
+    def score_resampled(
+        self, data: TokCollateData, system_label: str, weights: np.ndarray, language: str
+    ) -> np.ndarray:
+        # the percentiles are computed separately for each resample (over its non-zero probabilities)
+        counts = resample_counts(data.get_line_counts(system_label, language), weights)
+        return np.array([self._score_distribution(row[row > 0] / row.sum()) for row in counts])
+
+    def _score_distribution(self, unigram_probs: np.ndarray) -> float:
         gamma_1_val = np.percentile(unigram_probs, self.gamma_1)
         gamma_2_val = np.percentile(unigram_probs, self.gamma_2)
 
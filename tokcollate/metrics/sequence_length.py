@@ -1,33 +1,60 @@
+from typing import ClassVar
+
 import numpy as np
-from attrs import define, field
+from attrs import converters, define, field
 
 from tokcollate.data import TokCollateData
 from tokcollate.metrics import TokCollateMetric, register_metric
 
-from .tokcollate_metric import EvalMode
+from .tokcollate_metric import EvalMode, aggregate_resampled, check_quantile, get_quantile
 
 
 @register_metric("sequence_length")
 @define(kw_only=True)
 class SequenceLengthMetric(TokCollateMetric):
-    """Computes the average sequence length in the terms of tokens per line."""
+    """Computes the average sequence length in the terms of tokens per line.
+
+    Args:
+        mode (EvalMode): aggregation of the per-line lengths
+        quantile (float): computed quantile (required by the EvalMode.QUANTILE mode)
+        use_bytes (bool): measure the lengths in the utf-8 bytes instead of tokens
+    """
 
     mode: EvalMode = field(converter=EvalMode, default=EvalMode.MEAN)
+    quantile: float = field(converter=converters.optional(float), default=None, validator=check_quantile)
     use_bytes: bool = field(default=False)
 
+    tokens_per_second: ClassVar[float] = 2e7
+
+    def estimate_resources(
+        self,
+        system: "SystemEstimate",  # noqa: F821
+        tokens_per_second: float | None = None,
+    ) -> tuple[float, float]:
+        """Only the per-line lengths of a single language are kept in memory."""
+        runtime, _ = super().estimate_resources(system, tokens_per_second=tokens_per_second)
+        if self.use_bytes:
+            runtime *= 10
+        return runtime, float(36 * max(system.num_lines.values(), default=0))
+
     def score(
         self,
         data: TokCollateData,
         system_label: str,
         language: str,
     ) -> float:
-        text = data.get_system_text(system_label=system_label, language=language)
-        if self.use_bytes:
-            seq_length = np.array([sum(len(tok.encode("utf-8")) for tok in line) for line in text])
-        else:
-            seq_length = np.array([len(line) for line in text])
+        if self.mode.is_quantile:
+            digest = data.get_length_digest(system_label, language, use_bytes=self.use_bytes)
+            return digest.quantile(get_quantile(self.mode, self.quantile))
+        seq_length = data.get_sequence_lengths(system_label, language, use_bytes=self.use_bytes)
         return self._aggregate_scores(seq_length)
 
+    def score_resampled(
+        self, data: TokCollateData, system_label: str, weights: np.ndarray, language: str
+    ) -> np.ndarray:
+        seq_length = data.get_sequence_lengths(system_label, language, use_bytes=self.use_bytes)
+        return aggregate_resampled(self.mode, weights.sum(axis=1), weights @ seq_length, weights @ seq_length**2)
+
     def _aggregate_scores(self, scores: np.ndarray) -> float:
         if self.mode == EvalMode.MEAN:
             return scores.mean()
@@ -1,45 +1,81 @@
+from typing import ClassVar
+
 import numpy as np
-from attrs import define, field
+from attrs import converters, define, field
 
+from tokcollate.bootstrap import check_parallel
 from tokcollate.data import TokCollateData
+from tokcollate.digest import TDigest
 from tokcollate.metrics import TokCollateMultilingualMetric, register_metric
 
-from .tokcollate_metric import EvalMode
+from .tokcollate_metric import EvalMode, aggregate_resampled, check_quantile, get_quantile
 
 
 @register_metric("sequence_ratio")
 @define(kw_only=True)
 class SequenceRatioMetric(TokCollateMultilingualMetric):
-    """Compute the sequence length ratio between two outputs of a single tokenizer."""
+    """Compute the sequence length ratio between two outputs of a single tokenizer.
+
+    Args:
+        mode (EvalMode): aggregation of the per-line ratios
+        quantile (float): computed quantile (required by the EvalMode.QUANTILE mode)
+        use_bytes (bool): measure the lengths in the utf-8 bytes instead of tokens
+    """
 
     mode: EvalMode = field(converter=EvalMode, default=EvalMode.MEAN)
+    quantile: float = field(converter=converters.optional(float), default=None, validator=check_quantile)
     use_bytes: bool = field(default=False)
 
-    def score(self, data: TokCollateData, system_label: str, src_lang: str, tgt_lang: str) -> float:
-        text_src = data.get_system_text(system_label=system_label, language=src_lang)
-        text_tgt = data.get_system_text(system_label=system_label, language=tgt_lang)
+    tokens_per_second: ClassVar[float] = 2e7
 
+    def estimate_resources(
+        self,
+        system: "SystemEstimate",  # noqa: F821
+        tokens_per_second: float | None = None,
+    ) -> tuple[float, float]:
+        """The batched scoring computes the (lines, L, L) float64 ratios (and their deviations in the VAR mode)."""
+        runtime, _ = super().estimate_resources(system, tokens_per_second=tokens_per_second)
         if self.use_bytes:
-            lengths_src = np.array([sum(len(tok.encode("utf-8")) for tok in line) for line in text_src])
-            lengths_tgt = np.array([sum(len(tok.encode("utf-8")) for tok in line) for line in text_tgt])
-        else:
-            lengths_src = np.array([len(line) for line in text_src])
-            lengths_tgt = np.array([len(line) for line in text_tgt])
+            # encoding every token is considerably slower than just counting them
+            runtime *= 10
+        num_langs = len(system.num_tokens)
+        num_lines = max(system.num_lines.values(), default=0)
+        if not self.batched:
+            return runtime, float(16 * num_lines)
+        num_copies = 2 if self.mode == EvalMode.VAR else 1
+        return runtime, float(8 * num_lines * num_langs * (1 + num_copies * num_langs))
+
+    def score(self, data: TokCollateData, system_label: str, src_lang: str, tgt_lang: str) -> float:
+        lengths_src = data.get_sequence_lengths(system_label, src_lang, use_bytes=self.use_bytes)
+        lengths_tgt = data.get_sequence_lengths(system_label, tgt_lang, use_bytes=self.use_bytes)
         ratios = lengths_src / lengths_tgt
         return self._aggregate_scores(ratios)
 
     def score_batched(self, data: TokCollateData, system_label: str, languages: list[str]) -> np.ndarray:
-        texts = [data.get_system_text(system_label=system_label, language=lang) for lang in languages]
-        if self.use_bytes:
-            lengths = np.stack(
-                [np.array([sum(len(tok.encode("utf-8")) for tok in line) for line in text]) for text in texts], axis=1
-            )
-        else:
-            lengths = np.stack([np.array([len(line) for line in text]) for text in texts], axis=1)
+        lengths = np.stack(
+            [data.get_sequence_lengths(system_label, lang, use_bytes=self.use_bytes) for lang in languages], axis=1
+        )
         ratios = lengths.reshape(-1, len(languages), 1) / lengths.reshape(-1, 1, len(languages))
         return self._aggregate_scores(ratios, axis=0)
 
+    def score_resampled(
+        self, data: TokCollateData, system_label: str, weights: np.ndarray, languages: list[str]
+    ) -> np.ndarray:
+        lengths = [data.get_sequence_lengths(system_label, lang, use_bytes=self.use_bytes) for lang in languages]
+        check_parallel([length.size for length in lengths], weights)
+        lengths = np.stack(lengths, axis=1)
+        ratios = (lengths.reshape(-1, len(languages), 1) / lengths.reshape(-1, 1, len(languages))).reshape(
+            lengths.shape[0], -1
+        )
+        res = aggregate_resampled(self.mode, weights.sum(axis=1, keepdims=True), weights @ ratios, weights @ ratios**2)
+        return res.reshape(-1, len(languages), len(languages))
+
     def _aggregate_scores(self, scores: np.ndarray, axis: int = 0) -> float:
+        if self.mode.is_quantile:
+            quantile = get_quantile(self.mode, self.quantile)
+            columns = np.moveaxis(scores, axis, -1).reshape(-1, scores.shape[axis])
+            res = np.array([TDigest.from_values(column).quantile(quantile) for column in columns])
+            return res.reshape(np.delete(scores.shape, axis))
         if self.mode == EvalMode.MEAN:
             return scores.mean(axis=axis)
         if self.mode == EvalMode.VAR:
@@ -0,0 +1,90 @@
+import logging
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from attrs import Attribute, converters, define, field, validators
+
+from tokcollate.data import TokCollateData
+from tokcollate.metrics import TokCollateMetric, register_metric
+from tokcollate.throughput import THROUGHPUT_STATISTICS, ThroughputBenchmark, ThroughputStats
+from tokcollate.tokenization import TokCollateTokenizer, build_tokenizer
+
+logger = logging.getLogger(__name__)
+
+
+@register_metric("encode_throughput")
+@define(kw_only=True)
+class EncodeThroughputMetric(TokCollateMetric):
+    """Measures the encoding speed of the tokenizers producing the system outputs on each language's plaintext.
+
+    Unlike the other metrics, the scores are not computed from the tokenized system outputs, but by re-encoding
+    the `{input_dir}/{lang}.{file_suffix}` plaintext (the TokenizationRunner inputs) with the tokenizer of each
+    system (see tokcollate.throughput.ThroughputBenchmark). The systems without a tokenizer specification score NaN.
+
+    Function types:
+        bytes_per_second: encoded utf-8 bytes per second
+        tokens_per_second: produced tokens per second
+        latency_p50: median per-line encoding latency (in seconds)
+        latency_p99: 99th percentile of the per-line encoding latency (in seconds)
+
+    Args:
+        function_type (str): computed statistic
+        tokenizers (dict[str, dict]): tokenizer specifications ({"type": ..., **params}) keyed by the system labels
+        input_dir (Path): location of the plaintext files
+        file_suffix (str): suffix of the plaintext files
+        max_lines (int): (optional) number of the measured lines per language
+        warmup (int): number of the lines encoded before the measurement
+        num_trials (int): number of the measured passes over the lines
+        cpus (list[int]): (optional) CPUs the measurement is pinned to
+    """
+
+    function_type: str = field(validator=validators.in_(THROUGHPUT_STATISTICS), default="bytes_per_second")
+    tokenizers: dict[str, dict[str, Any]] = field(converter=lambda t: {k: dict(v) for k, v in t.items()}, factory=dict)
+    input_dir: Path = field(converter=converters.optional(Path), default=None)
+    file_suffix: str = field(converter=str, default="txt")
+    max_lines: int = field(converter=converters.optional(int), default=None)
+    warmup: int = field(converter=int, default=100)
+    num_trials: int = field(converter=int, default=3)
+    cpus: list[int] = field(converter=converters.optional(list), default=None)
+
+    _requires_tokenizers: bool = True
+
+    _built_tokenizers: dict[str, TokCollateTokenizer] = field(init=False, factory=dict)
+    _stats: dict[tuple[str, str], ThroughputStats] = field(init=False, factory=dict)
+
+    @input_dir.validator
+    def _check_input_dir(self, attribute: Attribute, value: Path | None) -> None:
+        if self.tokenizers and value is None:
+            err_msg = f"The {attribute.name} with the plaintext files is required to measure the tokenizers."
+            raise ValueError(err_msg)
+
+    def score(
+        self,
+        data: TokCollateData,  # noqa: ARG002
+        system_label: str,
+        language: str,
+    ) -> float:
+        if system_label not in self.tokenizers:
+            logger.warning("[%s] No tokenizer specification of %s.", self.metric_label, system_label)
+            return np.nan
+        return self.get_stats(system_label, language).get(self.function_type)
+
+    def get_stats(self, system_label: str, language: str) -> ThroughputStats:
+        """Return the (cached) throughput measurement of the system tokenizer on the language."""
+        key = (system_label, language)
+        if key not in self._stats:
+            if system_label not in self._built_tokenizers:
+                self._built_tokenizers[system_label] = build_tokenizer(self.tokenizers[system_label])
+            benchmark = ThroughputBenchmark(
+                tokenizers=self.tokenizers,
+                input_dir=self.input_dir,
+                languages=[language],
+                file_suffix=self.file_suffix,
+                max_lines=self.max_lines,
+                warmup=self.warmup,
+                num_trials=self.num_trials,
+                cpus=self.cpus,
+            )
+            self._stats[key] = benchmark.measure(system_label, language, tokenizer=self._built_tokenizers[system_label])
+        return self._stats[key]
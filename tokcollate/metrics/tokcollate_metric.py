@@ -1,8 +1,9 @@
 import enum
 import logging
+from typing import ClassVar
 
 import numpy as np
-from attrs import define, field, validators
+from attrs import Attribute, define, field, fields_dict, validators
 
 from tokcollate.data import TokCollateData
 
@@ -17,13 +18,63 @@ class EvalMode(enum.Enum):
     In cases when we need to report e.g. both mean and variance over the aggregated values, the user should call two
     different instances of a same metric class, one for each `mode`.
 
-    # TODO(varisd): more modes?
+    The quantile modes (MEDIAN, P90, P95, P99 and QUANTILE with an arbitrary `quantile` metric parameter) are
+    computed using a mergeable digest (see tokcollate.digest.TDigest), which is exact for up to 10000 distinct values.
     """
 
     NONE = None
     MEAN = "mean"
     VAR = "var"
     SUM = "sum"
+    MEDIAN = "median"
+    P90 = "p90"
+    P95 = "p95"
+    P99 = "p99"
+    QUANTILE = "quantile"
+
+    @property
+    def is_quantile(self) -> bool:
+        return self in QUANTILE_MODES or self == EvalMode.QUANTILE
+
+
+QUANTILE_MODES = {EvalMode.MEDIAN: 0.5, EvalMode.P90: 0.9, EvalMode.P95: 0.95, EvalMode.P99: 0.99}
+
+# inputs a metric can require besides the tokenized system outputs (declared by the _requires_* attributes)
+METRIC_REQUIREMENTS = ("input_text", "reference_text", "tokenizers")
+
+
+def get_quantile(mode: EvalMode, quantile: float | None = None) -> float:
+    """Return the quantile computed by a quantile EvalMode (the `quantile` value for the EvalMode.QUANTILE)."""
+    if mode in QUANTILE_MODES:
+        return QUANTILE_MODES[mode]
+    if mode != EvalMode.QUANTILE:
+        err_msg = f"{mode} is not a quantile mode."
+        raise ValueError(err_msg)
+    if quantile is None or not 0.0 <= quantile <= 1.0:
+        err_msg = f"The quantile mode requires a quantile parameter from the [0, 1] interval (got {quantile})."
+        raise ValueError(err_msg)
+    return float(quantile)
+
+
+def check_quantile(instance: "TokCollateMetric", attribute: Attribute, value: float | None) -> None:  # noqa: ARG001
+    """Validate the `quantile` parameter of a metric aggregating the values in a (quantile) EvalMode `mode`."""
+    if instance.mode.is_quantile:
+        get_quantile(instance.mode, value)
+
+
+def aggregate_resampled(mode: EvalMode, total: np.ndarray, first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Aggregate the resampled scores given their count, sum and sum of squares (one value per resample)."""
+    if mode.is_quantile:
+        err_msg = f"The {mode.value} mode does not support the bootstrap resampling."
+        raise NotImplementedError(err_msg)
+    if mode == EvalMode.MEAN:
+        return first / total
+    if mode == EvalMode.VAR:
+        return second / total - (first / total) ** 2
+    if mode == EvalMode.SUM:
+        return first
+    err_msg = f"Unknown metric mode: {mode}"
+    raise ValueError(err_msg)
 
 
 @define(kw_only=True)
@@ -36,7 +87,8 @@ class TokCollateMetric:
     Instances should be created using the tokcollate.metrics.build_metric() method.
 
     Some metrics might require a reference or an input file in addition to the tokenizer output. In such cases,
-    the metric should set the relevat private class attributes self._requires_*_text to True.
+    the metric should set the relevat private class attributes self._requires_*_text to True. The metrics measuring
+    the tokenizers themselves (instead of their outputs) set the self._requires_tokenizers attribute.
     TODO(varisd): is there a better way to implement this?
 
     Args:
@@ -49,6 +101,10 @@ class TokCollateMetric:
 
     _requires_reference_text: bool = False
     _requires_input_text: bool = False
+    _requires_tokenizers: bool = False
+
+    # rough processing speed used by the resource planner (can be calibrated using the benchmark results)
+    tokens_per_second: ClassVar[float] = 5e6
 
     @classmethod
     def build_metric(
@@ -81,6 +137,36 @@ class TokCollateMetric:
         """Accessor to the ._requires_reference_text private attribute."""
         return self._requires_reference_text
 
+    @property
+    def requires_tokenizers(self) -> bool:
+        """Accessor to the ._requires_tokenizers private attribute."""
+        return self._requires_tokenizers
+
+    @classmethod
+    def requirements(cls: "TokCollateMetric") -> tuple[str, ...]:
+        """Return the METRIC_REQUIREMENTS declared by the class (i.e. the defaults of its _requires_* attributes)."""
+        attributes = fields_dict(cls)
+        return tuple(name for name in METRIC_REQUIREMENTS if attributes[f"_requires_{name}"].default)
+
+    @property
+    def sweep_values(self) -> np.ndarray | None:
+        """Values of a metric parameter swept in a single pass (None if the metric does not sweep a parameter).
+
+        The scores of a sweeping metric have an additional last axis indexed by the sweep values, i.e. its .score()
+        returns an ndarray with shape(len(sweep_values)).
+        """
+        return None
+
+    @property
+    def sweep_shape(self) -> tuple[int, ...]:
+        """Shape of the additional result axes (empty if the metric does not sweep a parameter)."""
+        return () if self.sweep_values is None else (len(self.sweep_values),)
+
+    @property
+    def result_axes(self) -> tuple[str, ...]:
+        """Axis layout of the score_all() results (the sweep axis is indexed by the sweep values)."""
+        return ("systems", "languages", *("sweep",) * len(self.sweep_shape))
+
     def score(
         self,
         data: TokCollateData,
@@ -107,6 +193,30 @@ class TokCollateMetric:
         """
         raise NotImplementedError()
 
+    def estimate_resources(
+        self,
+        system: "SystemEstimate",  # noqa: F821
+        tokens_per_second: float | None = None,
+    ) -> tuple[float, float]:
+        """Estimate the cost of scoring a single system (used by the tokcollate.planner.ResourcePlanner).
+
+        The default model assumes a single pass over the tokens of each language and temporaries proportional
+        to the per-language token count and vocabulary. Metrics with larger temporaries should override it.
+
+        Args:
+            system (SystemEstimate): estimated line, token and vocabulary counts of the system outputs
+            tokens_per_second (float): (optional) calibrated processing speed of the metric
+
+        Returns:
+            Predicted runtime (in seconds) and the peak memory of the temporaries (in bytes).
+        """
+        tokens_per_second = tokens_per_second or self.tokens_per_second
+        peak_bytes = max(
+            (8 * system.num_tokens[lang] + 100 * system.lang_vocab_size[lang] for lang in system.num_tokens),
+            default=0,
+        )
+        return system.total_tokens / tokens_per_second, float(peak_bytes)
+
     def score_all(self, data: TokCollateData, systems: list[str], languages: list[str]) -> np.ndarray:
         """Wrapper for evaluating a set of tokenizers (and languages).
 
@@ -123,12 +233,83 @@ class TokCollateMetric:
         Returns:
             Numpy ndarray with shape(len(systems), len(languages))
             or shape(len(systems), len(languages, len(languages)).
+            The sweeping metrics add the last axis with shape(len(sweep_values)).
         """
-        res = np.zeros(shape=[len(systems), len(languages)])
+        res = np.zeros(shape=[len(systems), len(languages), *self.sweep_shape])
         for i, system_label in enumerate(systems):
             for j, lang in enumerate(languages):
                 logger.debug("[%s] Scoring system %s (%s)...", self.metric_label, system_label, lang)
-                res[i, j] = self.score(data=data, system_label=system_label, language=lang)
+                if data.approximate:
+                    res[i, j] = self.score_sketch(data.get_unigram_sketch(system_label, lang))
+                else:
+                    res[i, j] = self.score(data=data, system_label=system_label, language=lang)
+        return res
+
+    def score_sketch(self, sketch: "UnigramSketch") -> float:  # noqa: F821
+        """Approximate the metric from the unigram sketch of the text (used with tokcollate.sketches data).
+
+        Args:
+            sketch (UnigramSketch): fixed-memory summary of the token distribution
+
+        Returns:
+            A single floating value metric score.
+
+        Raises:
+            NotImplementedError: if the metric does not support the approximate mode
+        """
+        err_msg = f"Metric {self.metric} does not support the approximate (sketched) mode."
+        raise NotImplementedError(err_msg)
+
+    def score_resampled(
+        self,
+        data: TokCollateData,
+        system_label: str,
+        weights: np.ndarray,
+        **kwargs,  # noqa: ANN003
+    ) -> np.ndarray:
+        """Score a batch of bootstrap resamples of the system output (see tokcollate.bootstrap.BootstrapResampler).
+
+        Instead of re-scoring each resampled text, the metrics compute the scores directly from the per-line
+        statistics (e.g. data.get_sequence_lengths, data.get_line_counts) weighted by the number of occurrences of
+        each line in the resamples.
+
+        Args:
+            data (TokCollateData): data structure containing all texts available for evaluation
+            system_label (str): tokenizer label used for text selection
+            weights (np.ndarray): (num_samples, num_lines) line occurrence counts of the resamples
+            **kwargs: text selection parameters (language, or languages for the multilingual metrics)
+
+        Returns:
+            Numpy ndarray with shape(num_samples) (or shape(num_samples, len(languages), len(languages))).
+
+        Raises:
+            NotImplementedError: if the metric does not support the resampling
+        """
+        err_msg = f"Metric {self.metric} does not support the bootstrap resampling."
+        raise NotImplementedError(err_msg)
+
+    def resample_all(
+        self,
+        data: TokCollateData,
+        systems: list[str],
+        languages: list[str],
+        resampler: "BootstrapResampler",  # noqa: F821
+    ) -> np.ndarray:
+        """Wrapper for scoring the bootstrap resamples of a set of tokenizers (and languages).
+
+        Returns:
+            Numpy ndarray with shape(len(systems), num_samples, len(languages))
+            or shape(len(systems), num_samples, len(languages), len(languages)).
+        """
+        res = np.zeros(shape=[len(systems), resampler.num_samples, len(languages), *self.sweep_shape])
+        for i, system_label in enumerate(systems):
+            for j, lang in enumerate(languages):
+                logger.debug("[%s] Resampling system %s (%s)...", self.metric_label, system_label, lang)
+                num_lines = data.get_sequence_lengths(system_label, lang).size
+                for start, weights in resampler.iter_weights(num_lines):
+                    res[i, start : start + weights.shape[0], j] = self.score_resampled(
+                        data=data, system_label=system_label, weights=weights, language=lang
+                    )
         return res
 
 
@@ -137,6 +318,11 @@ class TokCollateMultilingualMetric(TokCollateMetric):
 
     batched: bool = field(validator=validators.instance_of(bool), default=True)
 
+    @property
+    def result_axes(self) -> tuple[str, ...]:
+        """Axis layout of the score_all() results (the source and the target languages)."""
+        return ("systems", "languages", "languages")
+
     def score(
         self,
         data: TokCollateData,
@@ -154,6 +340,17 @@ class TokCollateMultilingualMetric(TokCollateMetric):
     ) -> np.ndarray:
         raise NotImplementedError()
 
+    def estimate_resources(
+        self,
+        system: "SystemEstimate",  # noqa: F821
+        tokens_per_second: float | None = None,
+    ) -> tuple[float, float]:
+        """Estimate the cost of scoring a single system (the unbatched scoring reads the texts per language pair)."""
+        runtime, peak_bytes = super().estimate_resources(system, tokens_per_second=tokens_per_second)
+        if not self.batched:
+            runtime *= max(len(system.num_tokens), 1)
+        return runtime, peak_bytes
+
     def score_all(self, data: TokCollateData, systems: list[str], languages: list[str]) -> np.ndarray:
         """TODO"""
         res = np.zeros(shape=[len(systems), len(languages), len(languages)])
@@ -175,3 +372,23 @@ class TokCollateMultilingualMetric(TokCollateMetric):
                             data=data, system_label=system_label, src_lang=src_lang, tgt_lang=tgt_lang
                         )
         return res
+
+    def resample_all(
+        self,
+        data: TokCollateData,
+        systems: list[str],
+        languages: list[str],
+        resampler: "BootstrapResampler",  # noqa: F821
+    ) -> np.ndarray:
+        """The parallel lines are resampled jointly in all languages (see TokCollateMetric.resample_all)."""
+        res = np.zeros(shape=[len(systems), resampler.num_samples, len(languages), len(languages)])
+        if not languages:
+            return res
+        for i, system_label in enumerate(systems):
+            logger.debug("[%s] Resampling system %s...", self.metric_label, system_label)
+            num_lines = data.get_sequence_lengths(system_label, languages[0]).size
+            for start, weights in resampler.iter_weights(num_lines):
+                res[i, start : start + weights.shape[0]] = self.score_resampled(
+                    data=data, system_label=system_label, weights=weights, languages=languages
+                )
+        return res
@@ -1,39 +1,73 @@
+from typing import ClassVar
+
 import numpy as np
-from attrs import define, field
+from attrs import converters, define, field
 
 from tokcollate.data import TokCollateData
+from tokcollate.digest import TDigest
 from tokcollate.metrics import TokCollateMetric, register_metric
 
-from .tokcollate_metric import EvalMode
+from .tokcollate_metric import EvalMode, aggregate_resampled, check_quantile, get_quantile
 
 
 @register_metric("token_length")
 @define(kw_only=True)
 class TokenLengthMetric(TokCollateMetric):
-    """Compute the average number of utf-8 characters per token."""
+    """Compute the average number of utf-8 characters per token.
+
+    Args:
+        mode (EvalMode): aggregation of the token lengths
+        quantile (float): computed quantile (required by the EvalMode.QUANTILE mode)
+        use_bytes (bool): measure the lengths in the utf-8 bytes instead of characters
+    """
 
     mode: EvalMode = field(converter=EvalMode, default=EvalMode.MEAN)
+    quantile: float = field(converter=converters.optional(float), default=None, validator=check_quantile)
     use_bytes: bool = field(default=False)
 
+    tokens_per_second: ClassVar[float] = 1e7
+
+    def estimate_resources(
+        self,
+        system: "SystemEstimate",  # noqa: F821
+        tokens_per_second: float | None = None,
+    ) -> tuple[float, float]:
+        """Only the lengths of the vocabulary entries (weighted by their counts) are kept in memory."""
+        runtime, _ = super().estimate_resources(system, tokens_per_second=tokens_per_second)
+        return runtime, float(100 * max(system.lang_vocab_size.values(), default=0))
+
     def score(
         self,
         data: TokCollateData,
         system_label: str,
         language: str,
     ) -> float:
-        text = data.get_system_text(system_label=system_label, language=language)
-        if self.use_bytes:
-            token_lengths = np.array([len(tok.encode("utf-8")) for line in text for tok in line])
-        else:
-            token_lengths = np.array([len(tok) for line in text for tok in line])
-        return self._aggregate_scores(token_lengths)
-
-    def _aggregate_scores(self, scores: np.ndarray) -> float:
+        # the token lengths are aggregated over the vocabulary entries weighted by their counts
+        token_lengths, counts = data.get_token_lengths(system_label, language, use_bytes=self.use_bytes)
+        return self._aggregate_scores(token_lengths, counts)
+
+    def score_resampled(
+        self, data: TokCollateData, system_label: str, weights: np.ndarray, language: str
+    ) -> np.ndarray:
+        # the line_counts columns follow the system vocabulary
+        token_lengths, _ = data.get_token_lengths(system_label, use_bytes=self.use_bytes)
+        line_counts = data.get_line_counts(system_label, language)
+        return aggregate_resampled(
+            self.mode,
+            weights @ np.asarray(line_counts.sum(axis=1)).ravel(),
+            weights @ (line_counts @ token_lengths),
+            weights @ (line_counts @ token_lengths**2),
+        )
+
+    def _aggregate_scores(self, scores: np.ndarray, weights: np.ndarray) -> float:
+        if self.mode.is_quantile:
+            return TDigest.from_values(scores, weights).quantile(get_quantile(self.mode, self.quantile))
         if self.mode == EvalMode.MEAN:
-            return scores.mean()
+            return np.average(scores, weights=weights)
         if self.mode == EvalMode.VAR:
-            return scores.var()
+            mean = np.average(scores, weights=weights)
+            return np.average((scores - mean) ** 2, weights=weights)
         if self.mode == EvalMode.SUM:
-            return scores.sum()
+            return (scores * weights).sum()
         err_msg = f"Unknown metric mode: {self.mode}"
         raise ValueError(err_msg)
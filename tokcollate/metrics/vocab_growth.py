@@ -0,0 +1,96 @@
+from typing import ClassVar
+
+import numpy as np
+from attrs import Attribute, define, field, validators
+
+from tokcollate.data import TokCollateData
+from tokcollate.metrics import TokCollateMetric, register_metric
+
+
+def log_spaced_points(stop: int, num_points: int) -> np.ndarray:
+    """Return up to num_points distinct log-spaced integers from the [1, stop] interval."""
+    return np.unique(np.geomspace(1, stop, num_points).round().astype(np.int64))
+
+
+def fit_power_law(x: np.ndarray, y: np.ndarray) -> tuple[float, float]:
+    """Return the exponent and the coefficient of the least-squares fit of y = coefficient * x^exponent (log-log)."""
+    if x.size < 2:  # noqa: PLR2004
+        return np.nan, np.nan
+    exponent, intercept = np.polyfit(np.log(x), np.log(y), deg=1)
+    return float(exponent), float(np.exp(intercept))
+
+
+@register_metric("vocab_growth")
+@define(kw_only=True)
+class VocabGrowthMetric(TokCollateMetric):
+    """Computes the vocabulary growth (Heaps' law) and the rank-frequency (Zipf's law) statistics of the tokenized text.
+
+    The vocabulary growth curve V(n) (the number of distinct tokens among the first n tokens) is computed from
+    the sorted positions of the first occurrences of the tokens (see TokCollateData.get_first_occurrences), i.e.
+    a single np.unique pass over the token ids followed by binary searches, instead of re-counting the vocabulary
+    of the growing prefixes. The power laws are fitted in the log-log space at log-spaced points.
+
+    Function types:
+        heaps_exponent: exponent b of the fitted V(n) = k * n^b (lower values saturate faster)
+        heaps_coefficient: coefficient k of the fitted V(n) = k * n^b
+        zipf_exponent: exponent s of the fitted frequency(rank) ~ rank^-s
+        growth_curve: V(n) at the log-spaced fractions of the text, with an additional result axis indexed by
+            the fractions (see TokCollateMetric.sweep_values)
+
+    Args:
+        function_type (str): computed statistic
+        num_points (int): number of the log-spaced points of the growth curve and the fits
+        min_fraction (float): smallest fraction of the text of the growth curve
+    """
+
+    function_type: str = field(validator=validators.instance_of(str), default="heaps_exponent")
+    num_points: int = field(converter=int, default=32)
+    min_fraction: float = field(converter=float, default=1e-3)
+
+    tokens_per_second: ClassVar[float] = 2e7
+
+    _functions = frozenset(["growth_curve", "heaps_coefficient", "heaps_exponent", "zipf_exponent"])
+
+    @function_type.validator
+    def _supported_function(self, attribute: Attribute, value: str) -> None:
+        """Check whether the specified function_type is supported by the class."""
+        if value not in self._functions:
+            err_msg = f"Unknown {attribute.name} value: {value}. Supported values [{self._functions}]."
+            raise ValueError(err_msg)
+
+    @property
+    def sweep_values(self) -> np.ndarray | None:
+        """The fractions of the text of the growth curve."""
+        if self.function_type != "growth_curve":
+            return None
+        return np.geomspace(self.min_fraction, 1.0, self.num_points)
+
+    def score(
+        self,
+        data: TokCollateData,
+        system_label: str,
+        language: str,
+    ) -> float | np.ndarray:
+        if self.function_type == "zipf_exponent":
+            return self._zipf_exponent(data.get_vocabulary(system_label, language).values())
+
+        first_occurrences = data.get_first_occurrences(system_label, language)
+        num_tokens = data.get_vocabulary(system_label, language).total()
+        if self.function_type == "growth_curve":
+            return self._growth_curve(first_occurrences, np.ceil(self.sweep_values * num_tokens))
+
+        positions = log_spaced_points(num_tokens, self.num_points) if num_tokens else np.zeros(0, dtype=np.int64)
+        exponent, coefficient = fit_power_law(positions, self._growth_curve(first_occurrences, positions))
+        if self.function_type == "heaps_exponent":
+            return exponent
+        return coefficient
+
+    def _growth_curve(self, first_occurrences: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Return the number of distinct tokens among the first `positions` tokens."""
+        return np.searchsorted(first_occurrences, positions, side="left").astype(np.float64)
+
+    def _zipf_exponent(self, counts: list[int]) -> float:
+        freqs = np.sort(np.fromiter(counts, dtype=np.float64))[::-1]
+        ranks = log_spaced_points(freqs.size, self.num_points) if freqs.size else np.zeros(0, dtype=np.int64)
+        exponent, _ = fit_power_law(ranks, freqs[ranks - 1])
+        return -exponent
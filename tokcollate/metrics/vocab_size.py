@@ -1,8 +1,9 @@
+import numpy as np
 from attrs import define
 
+from tokcollate.bootstrap import resample_counts
 from tokcollate.data import TokCollateData
 from tokcollate.metrics import TokCollateMetric, register_metric
-from tokcollate.utils import get_vocabulary
 
 
 @register_metric("vocab_size")
@@ -19,5 +20,13 @@ class VocabSizeMetric(TokCollateMetric):
         system_label: str,
         language: str,
     ) -> float:
-        text = data.get_system_text(system_label=system_label, language=language)
-        return float(len(get_vocabulary(text)))
+        return float(len(data.get_vocabulary(system_label, language)))
+
+    def score_sketch(self, sketch: "UnigramSketch") -> float:  # noqa: F821
+        return sketch.vocab_size()
+
+    def score_resampled(
+        self, data: TokCollateData, system_label: str, weights: np.ndarray, language: str
+    ) -> np.ndarray:
+        counts = resample_counts(data.get_line_counts(system_label, language), weights)
+        return (counts > 0).sum(axis=1).astype(np.float64)
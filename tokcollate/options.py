@@ -1,8 +1,10 @@
 import argparse
 import logging
-from collections.abc import Sequence
+from collections.abc import Callable, Iterable, Mapping, Sequence
 from pathlib import Path
+from typing import Any
 
+from attrs import Attribute
 from omegaconf import DictConfig, OmegaConf
 
 from tokcollate.utils import file_path
@@ -23,6 +25,16 @@ def parse_args(argv: Sequence[str]) -> DictConfig:
     parser.add_argument(
         "--log-level", type=str, choices=["info", "debug"], default="info", help="Current logging level."
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Trace the memory allocations and dump the cProfile statistics of each execution stage.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only check the inputs and predict the runtime and peak memory of the execution.",
+    )
     args, unparsed = parser.parse_known_args(argv)
     config = create_config(args.config_file, unparsed)
     for arg in vars(args):
@@ -46,3 +58,30 @@ def create_config(config_file: Path, argv: Sequence[str] | None = None) -> DictC
     if argv is not None:
         config = OmegaConf.merge(config, OmegaConf.from_cli(argv))
     return config
+
+
+def build_optional(cls: type, config: Mapping | None) -> object | None:
+    """Build an optional scorer component (e.g. LengthHistograms) from its config section.
+
+    None or false disable the component, true uses the defaults, an already built instance is returned unchanged
+    and a mapping contains the constructor parameters.
+    """
+    if config is None or config is False:
+        return None
+    if isinstance(config, cls):
+        return config
+    if config is True:
+        return cls()
+    return cls(**config)
+
+
+def require_any(choices: Iterable[str]) -> Callable[[Any, Attribute, list[str]], None]:
+    """Return an attrs validator rejecting an empty selection of the choices (e.g. of the computed measures)."""
+    choices = list(choices)
+
+    def check(instance: Any, attribute: Attribute, value: list[str]) -> None:  # noqa: ANN401, ARG001
+        if not value:
+            err_msg = f"At least one of the {attribute.name} ({', '.join(choices)}) must be requested."
+            raise ValueError(err_msg)
+
+    return check
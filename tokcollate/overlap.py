@@ -0,0 +1,220 @@
+import itertools
+import logging
+from collections import Counter
+from collections.abc import Mapping
+
+import numpy as np
+from attrs import define, field, validators
+
+from tokcollate.data import TokCollateData
+from tokcollate.options import build_optional, require_any
+from tokcollate.sketches import hash_tokens, splitmix64, to_unit_interval
+
+logger = logging.getLogger(__name__)
+
+OVERLAP_MEASURES = ("jaccard", "weighted_overlap", "top_k")
+OVERLAP_MODES = ("auto", "exact", "minhash")
+
+# number of the MinHash permutations whose (vocabulary, permutations) values are computed at once
+MINHASH_CHUNK_SIZE = 16
+
+
+def exact_overlap(vocabularies: list[Counter], top_k: int = 1000) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the exact (systems, systems) jaccard, weighted overlap and top-k overlap matrices of the vocabularies.
+
+    The tokens are interned to integer ids shared by all the vocabularies, so each pair of vocabularies is compared
+    by a single intersection of two sorted id arrays (np.intersect1d) instead of a Python set operation.
+
+    Args:
+        vocabularies (list[Counter]): token counts of the compared systems
+        top_k (int): number of the most frequent tokens compared by the top-k overlap
+
+    Returns:
+        The Jaccard index of the token types, the sum of the minimum relative frequencies of the shared tokens and
+        the fraction of the shared top_k most frequent tokens.
+    """
+    token_ids = {}
+    ids, probs, top_ids = [], [], []
+    for vocab in vocabularies:
+        vocab_ids = np.fromiter(
+            (token_ids.setdefault(tok, len(token_ids)) for tok in vocab), dtype=np.int64, count=len(vocab)
+        )
+        counts = np.fromiter(vocab.values(), dtype=np.float64, count=len(vocab))
+        order = np.argsort(vocab_ids)
+        ids.append(vocab_ids[order])
+        probs.append(counts[order] / max(counts.sum(), 1.0))
+        top = np.argsort(-counts, kind="stable")[:top_k]
+        top_ids.append(np.sort(vocab_ids[top]))
+
+    num_systems = len(vocabularies)
+    jaccard = np.ones((num_systems, num_systems))
+    weighted = np.ones((num_systems, num_systems))
+    top = np.ones((num_systems, num_systems))
+    for i, j in itertools.combinations(range(num_systems), 2):
+        shared, idx_i, idx_j = np.intersect1d(ids[i], ids[j], assume_unique=True, return_indices=True)
+        union = ids[i].size + ids[j].size - shared.size
+        jaccard[i, j] = jaccard[j, i] = shared.size / union if union else 1.0
+        weighted[i, j] = weighted[j, i] = np.minimum(probs[i][idx_i], probs[j][idx_j]).sum()
+        num_top = max(top_ids[i].size, top_ids[j].size)
+        num_shared = np.intersect1d(top_ids[i], top_ids[j], assume_unique=True).size
+        top[i, j] = top[j, i] = num_shared / num_top if num_top else 1.0
+    return jaccard, weighted, top
+
+
+@define(kw_only=True)
+class MinHashSignatures:
+    """MinHash (Broder, 1997) and weighted MinHash (Ioffe, 2010) signatures of the vocabularies.
+
+    The signatures of a vocabulary have a fixed size (num_perm) regardless of the vocabulary size, so
+    the (systems, systems) similarity matrices are estimated by comparing the signatures instead of the vocabularies.
+    The fraction of the equal signature values estimates the Jaccard index of the token types (min_hashes) and
+    the weighted Jaccard index of the relative token frequencies (weighted_hashes, consistent weighted sampling).
+    The standard error of the estimates is sqrt(J * (1 - J) / num_perm).
+
+    The permutations are derived from the stable token hashes (see hash_tokens), so the signatures of different
+    systems (or runs) are comparable.
+
+    Args:
+        num_perm (int): number of the permutations (signature size)
+        seed (int): seed of the token hashes
+    """
+
+    num_perm: int = field(converter=int, default=256, validator=validators.ge(1))
+    seed: int = field(converter=int, default=0)
+
+    def signatures(self, vocab: Counter) -> tuple[np.ndarray, np.ndarray]:
+        """Return the (num_perm) min-hash and the (num_perm, 2) weighted min-hash signatures of the vocabulary."""
+        min_hashes = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        weighted_hashes = np.zeros((self.num_perm, 2), dtype=np.uint64)
+        if not vocab:
+            return min_hashes, weighted_hashes
+        hashes = hash_tokens(list(vocab), seed=self.seed)
+        counts = np.fromiter(vocab.values(), dtype=np.float64, count=len(vocab))
+        log_weights = np.log(counts / counts.sum())
+        for start in range(0, self.num_perm, MINHASH_CHUNK_SIZE):
+            perms = np.arange(start, min(start + MINHASH_CHUNK_SIZE, self.num_perm), dtype=np.uint64)
+            keys = hashes[:, None] ^ splitmix64(perms * np.uint64(5) + np.uint64(self.seed))[None, :]
+            min_hashes[perms] = splitmix64(keys).min(axis=0)
+
+            # consistent weighted sampling: r, c ~ Gamma(2, 1), beta ~ Uniform(0, 1) per token and permutation
+            uniforms = [to_unit_interval(splitmix64(keys + np.uint64(k))) for k in range(1, 6)]
+            r = -np.log(uniforms[0] * uniforms[1])
+            c = -np.log(uniforms[2] * uniforms[3])
+            beta = uniforms[4]
+            t = np.floor(log_weights[:, None] / r + beta)
+            a = c / np.exp(r * (t - beta + 1))
+            argmin = a.argmin(axis=0)
+            weighted_hashes[perms, 0] = hashes[argmin]
+            weighted_hashes[perms, 1] = t[argmin, np.arange(perms.size)].astype(np.int64).view(np.uint64)
+        return min_hashes, weighted_hashes
+
+    @staticmethod
+    def similarity(signatures: np.ndarray) -> np.ndarray:
+        """Return the (systems, systems) fraction of the equal values of the (systems, num_perm, ...) signatures."""
+        signatures = signatures.reshape(signatures.shape[0], signatures.shape[1], -1)
+        equal = (signatures[:, None] == signatures[None, :]).all(axis=-1)
+        return equal.mean(axis=-1)
+
+
+@define(kw_only=True)
+class VocabularyOverlap:
+    """Computes the (systems, systems) vocabulary overlap matrices comparing the tokenizers with each other.
+
+    Overlap measures:
+        jaccard: Jaccard index of the used token types
+        weighted_overlap: sum of the minimum relative frequencies of the shared tokens (1 - total variation distance)
+        top_k: fraction of the shared top_k most frequent tokens
+
+    The overlaps are computed exactly (sorted interned token id intersections, see exact_overlap) if the vocabularies
+    have at most exact_max_vocab types. Larger vocabularies are compared by their fixed-size MinHash signatures
+    (see MinHashSignatures), i.e. in O(S * V + S^2 * num_perm) instead of O(S^2 * V). In the minhash mode,
+    the weighted_overlap is derived from the estimated weighted Jaccard index Jw of the relative frequencies as
+    2 * Jw / (1 + Jw) (the sum of the minimums equals 2 - the sum of the maximums). The top-k overlap is always exact.
+
+    Args:
+        measures (list[str]): computed overlap measures
+        top_k (int): number of the most frequent tokens compared by the top_k measure
+        per_language (bool): compare the vocabularies of each language (systems, systems, languages) instead of
+            the whole system vocabularies (systems, systems)
+        mode (str): `exact`, `minhash` or `auto` (exact up to the exact_max_vocab vocabulary size)
+        exact_max_vocab (int): largest vocabulary compared exactly in the auto mode
+        num_perm (int): number of the MinHash permutations
+        seed (int): seed of the MinHash token hashes
+    """
+
+    measures: list[str] = field(
+        converter=list,
+        factory=lambda: list(OVERLAP_MEASURES),
+        validator=[validators.deep_iterable(validators.in_(OVERLAP_MEASURES)), require_any(OVERLAP_MEASURES)],
+    )
+    top_k: int = field(converter=int, default=1000, validator=validators.ge(1))
+    per_language: bool = field(converter=bool, default=True)
+    mode: str = field(default="auto", validator=validators.in_(OVERLAP_MODES))
+    exact_max_vocab: int = field(converter=int, default=200000)
+    num_perm: int = field(converter=int, default=256, validator=validators.ge(1))
+    seed: int = field(converter=int, default=0)
+
+    @classmethod
+    def from_config(cls: "VocabularyOverlap", config: Mapping | None) -> "VocabularyOverlap | None":
+        """Create the overlap from the scorer.overlap config section (see build_optional).
+
+        OmegaConf Args:
+            scorer.overlap.measures: computed overlap measures
+            scorer.overlap.top_k: number of the compared most frequent tokens
+            scorer.overlap.per_language: compare the vocabularies of each language
+            scorer.overlap.mode: exact, minhash or auto
+            scorer.overlap.exact_max_vocab: largest vocabulary compared exactly in the auto mode
+            scorer.overlap.num_perm: number of the MinHash permutations
+            scorer.overlap.seed: seed of the MinHash token hashes
+        """
+        return build_optional(cls, config)
+
+    def result_axes(self) -> dict[str, tuple[str, ...]]:
+        """Return the axis layout of each computed overlap matrix (see compute)."""
+        axes = ("systems", "systems", "languages") if self.per_language else ("systems", "systems")
+        return {f"vocab_{measure}": axes for measure in self.measures}
+
+    def compute(self, data: TokCollateData, systems: list[str], languages: list[str]) -> dict[str, np.ndarray]:
+        """Return the overlap matrix of each measure.
+
+        Returns:
+            Dictionary with the `vocab_{measure}` ndarrays with shape(len(systems), len(systems), len(languages)) if
+            per_language, otherwise shape(len(systems), len(systems)).
+        """
+        if not self.per_language:
+            return self._compare([data.get_vocabulary(system_label) for system_label in systems])
+        per_language = [
+            self._compare([data.get_vocabulary(system_label, lang) for system_label in systems]) for lang in languages
+        ]
+        return {
+            f"vocab_{measure}": (
+                np.stack([res[f"vocab_{measure}"] for res in per_language], axis=-1)
+                if per_language
+                else np.zeros((len(systems), len(systems), 0))
+            )
+            for measure in self.measures
+        }
+
+    def _compare(self, vocabularies: list[Counter]) -> dict[str, np.ndarray]:
+        """Return the (systems, systems) matrices of the requested measures."""
+        if self._is_exact(vocabularies):
+            jaccard, weighted, top = exact_overlap(vocabularies, top_k=self.top_k)
+        else:
+            logger.debug("Estimating the vocabulary overlaps of %d systems with MinHash.", len(vocabularies))
+            jaccard, weighted = self._minhash_overlap(vocabularies)
+            _, _, top = exact_overlap(
+                [Counter(dict(vocab.most_common(self.top_k))) for vocab in vocabularies], top_k=self.top_k
+            )
+        res = {"jaccard": jaccard, "weighted_overlap": weighted, "top_k": top}
+        return {f"vocab_{measure}": res[measure] for measure in self.measures}
+
+    def _is_exact(self, vocabularies: list[Counter]) -> bool:
+        if self.mode == "auto":
+            return max((len(vocab) for vocab in vocabularies), default=0) <= self.exact_max_vocab
+        return self.mode == "exact"
+
+    def _minhash_overlap(self, vocabularies: list[Counter]) -> tuple[np.ndarray, np.ndarray]:
+        minhash = MinHashSignatures(num_perm=self.num_perm, seed=self.seed)
+        min_hashes, weighted_hashes = zip(*(minhash.signatures(vocab) for vocab in vocabularies), strict=True)
+        weighted_jaccard = MinHashSignatures.similarity(np.stack(weighted_hashes))
+        return MinHashSignatures.similarity(np.stack(min_hashes)), 2 * weighted_jaccard / (1 + weighted_jaccard)
@@ -0,0 +1,450 @@
+import gzip
+import json
+import logging
+import random
+import struct
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from attrs import define, field
+from omegaconf import DictConfig, OmegaConf
+
+from tokcollate.data import LanguageInfo, get_data_files, get_system_files, validate_languages
+from tokcollate.metrics import TokCollateMetric, get_metric, list_metrics
+from tokcollate.utils import TOKEN_IDS_SUFFIX, get_vocab_file, load_token_ids, load_vocab
+
+logger = logging.getLogger(__name__)
+
+MB = 2**20
+GB = 2**30
+
+# approximate CPython memory footprint of the loaded texts (list[list[str]])
+TOKEN_OVERHEAD_BYTES = 8 + 49  # list pointer + str object header
+LINE_OVERHEAD_BYTES = 72  # list object with over-allocation
+LOAD_BYTES_PER_SECOND = 50 * MB
+
+# Heaps' law exponent used when the sample is too small for fitting it
+DEFAULT_HEAPS_BETA = 0.6
+
+
+def _count_types(tokens: list[str]) -> int:
+    return len(set(tokens))
+
+
+def extrapolate_vocab_size(sample_tokens: list[str], num_tokens: int, seed: int = 0) -> int:
+    """Extrapolate the vocabulary size of a text from a token sample using Heaps' law (V = K * N^beta).
+
+    The exponent is fitted from the number of distinct tokens in the (shuffled) sample and its first half.
+    """
+    num_sampled = len(sample_tokens)
+    num_types = _count_types(sample_tokens)
+    if num_sampled == 0 or num_tokens <= num_sampled:
+        return num_types
+    tokens = list(sample_tokens)
+    random.Random(seed).shuffle(tokens)
+    half_types = _count_types(tokens[: num_sampled // 2])
+    beta = DEFAULT_HEAPS_BETA
+    if half_types > 0 and num_types > half_types:
+        beta = float(np.clip(np.log2(num_types / half_types), 0.1, 1.0))
+    return int(num_types * (num_tokens / num_sampled) ** beta)
+
+
+@define(kw_only=True)
+class FileEstimate:
+    """Estimated contents of a single dataset file.
+
+    Args:
+        path (Path): file location
+        size_bytes (int): (uncompressed) file size
+        num_lines (int): estimated number of non-empty lines
+        num_tokens (int): estimated number of tokens
+        num_bytes (int): estimated number of utf-8 token bytes
+        exact (bool): the counts come from reading the whole file
+        sample_tokens (list[str]): tokens of the sampled blocks (for the vocabulary estimation)
+    """
+
+    path: Path = field(converter=Path)
+    size_bytes: int = 0
+    num_lines: int = 0
+    num_tokens: int = 0
+    num_bytes: int = 0
+    exact: bool = False
+    sample_tokens: list[str] = field(factory=list, repr=False)
+
+    @property
+    def vocab_size(self) -> int:
+        """Estimated number of distinct tokens."""
+        return extrapolate_vocab_size(self.sample_tokens, self.num_tokens)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary."""
+        return {
+            "path": str(self.path),
+            "size_bytes": self.size_bytes,
+            "num_lines": self.num_lines,
+            "num_tokens": self.num_tokens,
+            "vocab_size": self.vocab_size,
+            "exact": self.exact,
+        }
+
+
+def _read_sample(path: Path, block_size: int, num_blocks: int) -> tuple[int, list[bytes], bool]:
+    """Return the (uncompressed) file size, the sampled complete lines and whether the whole file was read."""
+    if path.suffix == ".gz":
+        compressed_size = path.stat().st_size
+        with path.open("rb") as fh:
+            fh.seek(-4, 2)
+            # the gzip trailer stores the uncompressed size modulo 2^32
+            size = struct.unpack("<I", fh.read(4))[0]
+        if size < compressed_size:
+            size = 3 * compressed_size
+        with gzip.open(path, "rb") as fh:
+            prefix = fh.read(block_size * num_blocks + 1)
+        if len(prefix) <= block_size * num_blocks:
+            return len(prefix), prefix.split(b"\n"), True
+        return size, prefix.split(b"\n")[:-1], False
+
+    size = path.stat().st_size
+    with path.open("rb") as fh:
+        if size <= block_size * num_blocks:
+            return size, fh.read().split(b"\n"), True
+        lines = []
+        for offset in np.linspace(0, size - block_size, num_blocks, dtype=np.int64):
+            fh.seek(int(offset))
+            block_lines = fh.read(block_size).split(b"\n")
+            # drop the partial lines at the block boundaries
+            lines.extend(block_lines[1 if offset > 0 else 0 : -1])
+        return size, lines, False
+
+
+def estimate_file(path: Path, block_size: int = 64 * 1024, num_blocks: int = 16) -> FileEstimate:
+    """Estimate the number of lines, tokens and distinct tokens of a dataset file from evenly spaced blocks.
+
+    Small files are read completely (and the counts are exact). The tokenization follows
+    tokcollate.utils.load_tokenized_text_file (whitespace-separated tokens, empty lines are ignored).
+    """
+    path = Path(path)
+    if path.name.endswith(f".{TOKEN_IDS_SUFFIX}"):
+        return _estimate_token_ids_file(path, max_tokens=block_size * num_blocks // 4)
+    size, raw_lines, exact = _read_sample(path, block_size, num_blocks)
+
+    sample_tokens = []
+    num_lines = 0
+    num_bytes = 0
+    sampled_bytes = 0
+    for raw_line in raw_lines:
+        sampled_bytes += len(raw_line) + 1
+        tokens = raw_line.decode("utf-8", errors="ignore").split()
+        if tokens:
+            num_lines += 1
+            sample_tokens.extend(tokens)
+    num_bytes = sum(len(tok.encode("utf-8")) for tok in sample_tokens)
+
+    scale = 1.0 if exact or sampled_bytes == 0 else size / sampled_bytes
+    return FileEstimate(
+        path=path,
+        size_bytes=size,
+        num_lines=round(num_lines * scale),
+        num_tokens=round(len(sample_tokens) * scale),
+        num_bytes=round(num_bytes * scale),
+        exact=exact,
+        sample_tokens=sample_tokens,
+    )
+
+
+def _estimate_token_ids_file(path: Path, max_tokens: int) -> FileEstimate:
+    """Count the lines and tokens of a token-id file exactly (from its offsets), sampling only the vocabulary."""
+    ids, offsets = load_token_ids(path)
+    vocab = np.asarray(load_vocab(get_vocab_file(path)), dtype=object)
+    exact = ids.size <= max_tokens
+    sample = ids if exact else ids[np.linspace(0, ids.size - 1, max_tokens, dtype=np.int64)]
+    token_bytes = np.fromiter((len(tok.encode("utf-8")) for tok in vocab), dtype=np.int64, count=len(vocab))
+    return FileEstimate(
+        path=path,
+        size_bytes=path.stat().st_size,
+        num_lines=int(np.count_nonzero(np.diff(offsets))),
+        num_tokens=int(ids.size),
+        num_bytes=int(token_bytes[ids].sum()),
+        exact=exact,
+        sample_tokens=vocab[sample].tolist(),
+    )
+
+
+@define(kw_only=True)
+class SystemEstimate:
+    """Estimated contents of the (per-language) outputs of a single system.
+
+    The dictionaries are keyed by the language (None in the monolingual case).
+
+    Args:
+        system_label (str): label of the system
+        files (dict[str, FileEstimate]): estimates of the system output files
+    """
+
+    system_label: str
+    files: dict[str | None, FileEstimate]
+
+    vocab_size: int = field(init=False)
+
+    def __attrs_post_init__(self) -> None:
+        """Estimate the vocabulary size of the whole (multilingual) system output."""
+        self.vocab_size = extrapolate_vocab_size(
+            [tok for estimate in self.files.values() for tok in estimate.sample_tokens], self.total_tokens
+        )
+
+    @property
+    def num_lines(self) -> dict[str | None, int]:
+        return {lang: estimate.num_lines for lang, estimate in self.files.items()}
+
+    @property
+    def num_tokens(self) -> dict[str | None, int]:
+        return {lang: estimate.num_tokens for lang, estimate in self.files.items()}
+
+    @property
+    def lang_vocab_size(self) -> dict[str | None, int]:
+        return {lang: estimate.vocab_size for lang, estimate in self.files.items()}
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.num_tokens.values())
+
+
+@define(kw_only=True)
+class MetricPlan:
+    """Predicted resource usage of a single metric (summed over the systems)."""
+
+    metric_label: str
+    metric: str
+    runtime: float
+    peak_bytes: float
+    calibrated: bool = False
+
+
+@define(kw_only=True)
+class ResourcePlan:
+    """Predicted resource usage of a scorer run.
+
+    Args:
+        files (dict[str, FileEstimate]): estimates of all the loaded dataset files
+        data_bytes (float): predicted memory footprint of the loaded texts
+        load_time (float): predicted loading time
+        metrics (list[MetricPlan]): per-metric predictions
+    """
+
+    files: dict[str, FileEstimate]
+    data_bytes: float
+    load_time: float
+    metrics: list[MetricPlan]
+
+    @property
+    def peak_bytes(self) -> float:
+        """The metrics are computed one by one, so only the largest temporaries add to the loaded texts."""
+        return self.data_bytes + max((m.peak_bytes for m in self.metrics), default=0.0)
+
+    @property
+    def runtime(self) -> float:
+        return self.load_time + sum(m.runtime for m in self.metrics)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable summary."""
+        return {
+            "files": {key: estimate.to_dict() for key, estimate in self.files.items()},
+            "data_bytes": self.data_bytes,
+            "load_time": self.load_time,
+            "metrics": [
+                {
+                    "metric_label": m.metric_label,
+                    "metric": m.metric,
+                    "runtime": m.runtime,
+                    "peak_bytes": m.peak_bytes,
+                    "calibrated": m.calibrated,
+                }
+                for m in self.metrics
+            ],
+            "peak_bytes": self.peak_bytes,
+            "runtime": self.runtime,
+        }
+
+    def report(self) -> str:
+        """Return a human-readable summary of the predictions."""
+        num_tokens = sum(estimate.num_tokens for estimate in self.files.values())
+        num_lines = sum(estimate.num_lines for estimate in self.files.values())
+        lines = [
+            f"Dataset: {len(self.files)} files, ~{num_lines} lines, ~{num_tokens} tokens",
+            "",
+            f"{'stage':<32} {'runtime [s]':>12} {'memory [MB]':>12}",
+            f"{'load':<32} {self.load_time:>12.1f} {self.data_bytes / MB:>12.1f}",
+        ]
+        for m in self.metrics:
+            label = f"{m.metric_label}{' (calibrated)' if m.calibrated else ''}"
+            lines.append(f"{label:<32} {m.runtime:>12.1f} {m.peak_bytes / MB:>12.1f}")
+        lines.extend(
+            [
+                "",
+                f"Predicted runtime: {self.runtime:.1f}s",
+                f"Predicted peak memory: {self.peak_bytes / GB:.2f}GB",
+            ]
+        )
+        return "\n".join(lines)
+
+
+def load_calibration(path: Path) -> dict[str, float]:
+    """Extract the measured per-metric token throughput from the `tokcollate bench` results (keyed by metric name)."""
+    with Path(path).open("r") as fh:
+        stages = json.load(fh)["stages"]
+    throughput = {}
+    for name, stage in stages.items():
+        if not name.startswith("score.") or not stage.get("num_tokens") or not stage.get("wall_time"):
+            continue
+        throughput[name[len("score.") :]] = stage["num_tokens"] / stage["wall_time"]
+    return throughput
+
+
+@define(kw_only=True)
+class ResourcePlanner:
+    """Checks the scorer configuration and predicts the runtime and peak memory of the scoring without loading the data.
+
+    All the dataset files are checked up front and sampled to estimate their line, token and vocabulary counts.
+    These are fed to the cost models of the metrics (TokCollateMetric.estimate_resources).
+
+    Args:
+        config (DictConfig): TokCollate configuration (the scorer section is used)
+        block_size (int): size of a single sampled file block (in bytes)
+        num_blocks (int): number of sampled blocks per file
+        calibration (dict[str, float]): (optional) measured tokens per second of the metrics (see load_calibration)
+
+    OmegaConf Args:
+        plan.block_size_kb: size of a single sampled file block
+        plan.num_blocks: number of sampled blocks per file
+        plan.calibration_file: results of `tokcollate bench` used for calibrating the metric runtimes
+    """
+
+    config: DictConfig
+    block_size: int = field(converter=int, default=64 * 1024)
+    num_blocks: int = field(converter=int, default=16)
+    calibration: dict[str, float] = field(factory=dict)
+
+    metrics: dict[str, TokCollateMetric] = field(init=False, default=None)
+
+    @classmethod
+    def from_config(cls: "ResourcePlanner", config: DictConfig) -> "ResourcePlanner":
+        """Create the planner based on the config contents."""
+        plan_config = config.get("plan", {})
+        calibration_file = plan_config.get("calibration_file", None)
+        return cls(
+            config=config,
+            block_size=plan_config.get("block_size_kb", 64) * 1024,
+            num_blocks=plan_config.get("num_blocks", 16),
+            calibration=load_calibration(calibration_file) if calibration_file is not None else {},
+        )
+
+    @property
+    def scorer_config(self) -> dict[str, Any]:
+        return OmegaConf.to_container(self.config.scorer, resolve=True)
+
+    def check(self) -> dict[str, Path]:
+        """Validate the configuration and return the dataset files.
+
+        Raises:
+            ValueError: on unknown metrics or invalid languages_info entries
+            FileNotFoundError: listing all the missing dataset files
+        """
+        scorer_config = self.scorer_config
+        for key in ("input_dir", "systems", "metrics"):
+            if scorer_config.get(key) is None:
+                err_msg = f"Required attribute scorer.{key} not found in the config file."
+                raise ValueError(err_msg)
+
+        available = list_metrics()
+        unknown = [params["metric"] for params in scorer_config["metrics"] if params["metric"] not in available]
+        if unknown:
+            err_msg = f"Unknown metrics: {unknown}. Available metrics: {sorted(available)}."
+            raise ValueError(err_msg)
+        self.metrics = {}
+        for params in scorer_config["metrics"]:
+            metric_params = dict(params)
+            metric = metric_params.pop("metric")
+            metric_inst = get_metric(metric).build_metric(metric=metric, **metric_params)
+            self.metrics[metric_inst.metric_label] = metric_inst
+
+        languages = scorer_config.get("languages", None) or []
+        if scorer_config.get("languages_info", None) is not None:
+            path = Path(scorer_config["languages_info"])
+            if not path.exists():
+                err_msg = f"Missing languages_info file: {path}"
+                raise FileNotFoundError(err_msg)
+            with path.open("r", encoding="utf-8") as fh:
+                languages_info = {lang: LanguageInfo.create_entry(entry) for lang, entry in json.load(fh).items()}
+            validate_languages(languages, languages_info)
+
+        files = get_data_files(
+            scorer_config["input_dir"],
+            scorer_config["systems"],
+            languages,
+            file_suffix=scorer_config.get("file_suffix", "txt"),
+            input_file_stem="input" if any(m.requires_input_text for m in self.metrics.values()) else None,
+            reference_file_stem="reference" if any(m.requires_reference_text for m in self.metrics.values()) else None,
+        )
+        missing = [str(path) for path in files.values() if not path.exists()]
+        if missing:
+            err_msg = "Missing dataset files:\n  " + "\n  ".join(missing)
+            raise FileNotFoundError(err_msg)
+        return files
+
+    def plan(self) -> ResourcePlan:
+        """Check the configuration, sample the dataset files and predict the resource usage."""
+        files = self.check()
+        scorer_config = self.scorer_config
+        languages = scorer_config.get("languages", None) or []
+
+        estimates = {}
+        for key, path in files.items():
+            logger.debug("Sampling %s ...", path)
+            estimates[key] = estimate_file(path, block_size=self.block_size, num_blocks=self.num_blocks)
+
+        systems = []
+        for system_label in scorer_config["systems"]:
+            system_files = get_system_files(
+                scorer_config["input_dir"], system_label, languages, scorer_config.get("file_suffix", "txt")
+            )
+            systems.append(
+                SystemEstimate(
+                    system_label=system_label,
+                    files={
+                        lang: estimates[system_label if lang is None else f"{system_label}/{lang}"]
+                        for lang in system_files
+                    },
+                )
+            )
+
+        data_bytes = sum(
+            estimate.num_tokens * TOKEN_OVERHEAD_BYTES + estimate.num_bytes + estimate.num_lines * LINE_OVERHEAD_BYTES
+            for estimate in estimates.values()
+        )
+        metric_plans = []
+        for metric_label, metric in self.metrics.items():
+            runtime = 0.0
+            peak_bytes = 0.0
+            for system in systems:
+                system_runtime, system_peak = metric.estimate_resources(
+                    system, tokens_per_second=self.calibration.get(metric.metric, None)
+                )
+                runtime += system_runtime
+                peak_bytes = max(peak_bytes, system_peak)
+            metric_plans.append(
+                MetricPlan(
+                    metric_label=metric_label,
+                    metric=metric.metric,
+                    runtime=runtime,
+                    peak_bytes=peak_bytes,
+                    calibrated=metric.metric in self.calibration,
+                )
+            )
+
+        return ResourcePlan(
+            files=estimates,
+            data_bytes=float(data_bytes),
+            load_time=sum(estimate.size_bytes for estimate in estimates.values()) / LOAD_BYTES_PER_SECOND,
+            metrics=metric_plans,
+        )
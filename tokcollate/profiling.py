@@ -0,0 +1,190 @@
+import cProfile
+import json
+import logging
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Self
+
+from attrs import asdict, define, field
+
+logger = logging.getLogger(__name__)
+
+MB = 2**20
+
+
+def get_peak_rss() -> float:
+    """Return the peak resident set size of the current process (in MB)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / MB
+    return peak / 1024
+
+
+@define(kw_only=True)
+class StageRecord:
+    """Resource usage of a single execution stage.
+
+    Args:
+        stage (str): stage name (e.g. load, score, correlate, save)
+        metric (str): (optional) label of the metric computed during the stage
+        system (str): (optional) label of the system processed during the stage
+        wall_time (float): elapsed wall-clock time (in seconds)
+        cpu_time (float): consumed process CPU time (in seconds)
+        rss_growth_mb (float): growth of the process peak resident set size during the stage (the process peak never
+            decreases, so only the stages raising it above all the earlier stages report a non-zero growth)
+        peak_traced_mb (float): peak of the memory allocated during the stage (only with tracemalloc enabled)
+        num_tokens (int): number of tokens processed during the stage
+    """
+
+    stage: str
+    metric: str | None = None
+    system: str | None = None
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    rss_growth_mb: float = 0.0
+    peak_traced_mb: float | None = None
+    num_tokens: int | None = None
+
+    @property
+    def tokens_per_second(self) -> float | None:
+        """Token throughput of the stage."""
+        if self.num_tokens is None or self.wall_time <= 0:
+            return None
+        return self.num_tokens / self.wall_time
+
+
+@define(kw_only=True)
+class StageProfiler:
+    """Collects the wall time, CPU time, peak memory and token throughput of the scorer execution stages.
+
+    The process peak RSS is recorded once per run (with its per-stage growth). The per-stage allocation peaks
+    (tracemalloc) and the cProfile statistics are only collected in the detailed mode since they slow down
+    the execution considerably. The allocation tracing is started by the first profiled stage and stopped by close()
+    (or at the exit of the profiler context).
+
+    Args:
+        detailed (bool): trace the memory allocations and collect the cProfile statistics of each stage
+        profile_dir (Path): (optional) directory for dumping the per-stage cProfile statistics
+    """
+
+    detailed: bool = field(default=False)
+    profile_dir: Path | None = field(converter=lambda p: Path(p) if p is not None else None, default=None)
+
+    records: list[StageRecord] = field(init=False, factory=list)
+    peak_rss_mb: float = field(init=False, default=0.0)
+
+    _started_tracing: bool = field(init=False, default=False)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop the allocation tracing (if started by the profiler)."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def stage(
+        self,
+        stage: str,
+        metric: str | None = None,
+        system: str | None = None,
+        num_tokens: int | None = None,
+    ) -> Iterator[StageRecord]:
+        """Measure the resource usage of the wrapped code block.
+
+        The yielded record can be updated inside the block (e.g. the num_tokens value).
+        """
+        record = StageRecord(stage=stage, metric=metric, system=system, num_tokens=num_tokens)
+        profile = None
+        if self.detailed:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            tracemalloc.reset_peak()
+            profile = cProfile.Profile()
+            profile.enable()
+
+        rss_start = get_peak_rss()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_time = time.perf_counter() - wall_start
+            record.cpu_time = time.process_time() - cpu_start
+            self.peak_rss_mb = get_peak_rss()
+            record.rss_growth_mb = self.peak_rss_mb - rss_start
+            if profile is not None:
+                profile.disable()
+                record.peak_traced_mb = tracemalloc.get_traced_memory()[1] / MB
+                self._dump_profile(profile, record)
+            self.records.append(record)
+            logger.debug(
+                "[profile] %s: wall %.3fs, cpu %.3fs, peak RSS growth %.1fMB",
+                self._record_name(record),
+                record.wall_time,
+                record.cpu_time,
+                record.rss_growth_mb,
+            )
+
+    def to_list(self) -> list[dict[str, Any]]:
+        """Return the collected records as JSON-serializable dictionaries."""
+        return [{**asdict(record), "tokens_per_second": record.tokens_per_second} for record in self.records]
+
+    def save(self, path: Path) -> None:
+        """Save the process peak RSS and the collected records (stages) as JSON."""
+        logger.info("Saving profile to %s", path)
+        with Path(path).open("w") as fh:
+            json.dump({"peak_rss_mb": self.peak_rss_mb, "stages": self.to_list()}, sort_keys=True, indent=2, fp=fh)
+
+    def summary(self) -> str:
+        """Return a human-readable summary of the records aggregated over the (stage, metric) pairs."""
+        totals = {}
+        for record in self.records:
+            key = (record.stage, record.metric or "-")
+            total = totals.setdefault(key, {"wall": 0.0, "cpu": 0.0, "rss": 0.0, "traced": None, "tokens": None})
+            total["wall"] += record.wall_time
+            total["cpu"] += record.cpu_time
+            total["rss"] += record.rss_growth_mb
+            if record.peak_traced_mb is not None:
+                total["traced"] = max(total["traced"] or 0.0, record.peak_traced_mb)
+            if record.num_tokens is not None:
+                total["tokens"] = (total["tokens"] or 0) + record.num_tokens
+
+        lines = [
+            (
+                f"{'stage':<12} {'metric':<24} {'wall [s]':>10} {'cpu [s]':>10} {'rss+ [MB]':>10} "
+                f"{'traced [MB]':>12} {'tokens/s':>12}"
+            )
+        ]
+        for (stage, metric), total in totals.items():
+            traced = f"{total['traced']:.1f}" if total["traced"] is not None else "-"
+            throughput = f"{total['tokens'] / total['wall']:.0f}" if total["tokens"] and total["wall"] > 0 else "-"
+            lines.append(
+                f"{stage:<12} {metric:<24} {total['wall']:>10.3f} {total['cpu']:>10.3f} {total['rss']:>10.1f} "
+                f"{traced:>12} {throughput:>12}"
+            )
+        lines.append(f"process peak RSS: {self.peak_rss_mb:.1f} MB")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _record_name(record: StageRecord) -> str:
+        return ".".join(name for name in [record.stage, record.metric, record.system] if name is not None)
+
+    def _dump_profile(self, profile: cProfile.Profile, record: StageRecord) -> None:
+        if self.profile_dir is None:
+            return
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = Path(self.profile_dir, f"{self._record_name(record)}.prof")
+        profile.dump_stats(path)
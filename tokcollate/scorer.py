@@ -2,18 +2,67 @@ import datetime
 import gzip
 import json
 import logging
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Any, ClassVar
 
 import numpy as np
-from attrs import converters, define, field, fields, validators
-from omegaconf import DictConfig
+from attrs import asdict, converters, define, field, fields, validators
+from omegaconf import DictConfig, OmegaConf
 
+from tokcollate.bootstrap import BootstrapResampler
+from tokcollate.boundaries import BoundaryAgreement
+from tokcollate.cube import save_stats_cube
 from tokcollate.data import LanguageInfo, TextType, TokCollateData
+from tokcollate.histograms import LengthHistograms
+from tokcollate.line_outputs import LineOutputs
 from tokcollate.metrics import TokCollateMetric, build_metric
+from tokcollate.overlap import VocabularyOverlap
+from tokcollate.profiling import StageProfiler
+from tokcollate.sketches import TokCollateSketchedData
 
 logger = logging.getLogger(__name__)
 
+METRIC_N_DIM = {"mono": 2, "multi": 3}
+
+
+def sweep_values(metrics: dict[str, TokCollateMetric]) -> dict[str, list[float]]:
+    """Return the values of the extra result axis of the metrics sweeping a parameter (see sweep_values)."""
+    return {label: np.asarray(metric.sweep_values).tolist() for label, metric in metrics.items() if metric.sweep_shape}
+
+
+def result_axes(metrics: dict[str, TokCollateMetric], outputs: Iterable = ()) -> dict[str, tuple[str, ...]]:
+    """Return the axis layout of each (flattened) result array, e.g. ("systems", "systems", "languages").
+
+    Args:
+        metrics (dict): scored metrics (also laying out their bootstrap bounds)
+        outputs (Iterable): computed outputs besides the metrics (e.g. LengthHistograms, VocabularyOverlap)
+    """
+    axes = {}
+    for metric_label, metric in metrics.items():
+        for key in (metric_label, f"{metric_label}_lower", f"{metric_label}_upper"):
+            axes[key] = metric.result_axes
+    for output in outputs:
+        axes.update(output.result_axes())
+    axes.update(dict.fromkeys(METRIC_N_DIM, ("metrics", "metrics")))
+    return axes
+
+
+def correlate_scores(metric_scores: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Return the correlation coefficients between the metrics (separately for the mono- and multilingual metrics)."""
+    corr_scores = {}
+    for key, n_dim in METRIC_N_DIM.items():
+        scores = [out for out in metric_scores.values() if out.ndim == n_dim]
+        if not scores:
+            corr_scores[key] = None
+        elif len(scores) == 1:
+            corr_scores[key] = np.float64(1.0)
+        else:
+            scores_stacked = np.stack(scores, axis=0)
+            scores_flat = scores_stacked.reshape((scores_stacked.shape[0], -1))
+            corr_scores[key] = np.corrcoef(scores_flat, rowvar=True)
+    return corr_scores
+
 
 @define(kw_only=True)
 class ScorerResultSaver(dict):
@@ -34,10 +83,30 @@ class ScorerResultSaver(dict):
     tokenizations: dict[str, dict[str, TextType] | TextType] = field(
         validator=validators.optional(validators.instance_of(dict)), default=None
     )
+    profiler: StageProfiler = field(validator=validators.optional(validators.instance_of(StageProfiler)), default=None)
+    bootstrap: BootstrapResampler = field(
+        validator=validators.optional(validators.instance_of(BootstrapResampler)), default=None
+    )
+    histograms: LengthHistograms = field(
+        validator=validators.optional(validators.instance_of(LengthHistograms)), default=None
+    )
+    line_outputs: LineOutputs = field(validator=validators.optional(validators.instance_of(LineOutputs)), default=None)
+    overlap: VocabularyOverlap = field(
+        validator=validators.optional(validators.instance_of(VocabularyOverlap)), default=None
+    )
+    boundary_agreement: BoundaryAgreement = field(
+        validator=validators.optional(validators.instance_of(BoundaryAgreement)), default=None
+    )
+    stats_cube: bool = field(validator=validators.instance_of(bool), default=False)
+    sweep_values: dict[str, list[float]] = field(validator=validators.instance_of(dict), factory=dict)
+    result_axes: dict[str, tuple[str, ...]] = field(validator=validators.instance_of(dict), factory=dict)
 
     _languages_info_filename: ClassVar[str] = "languages_info.json"
     _metadata_filename: ClassVar[str] = "metadata.json"
+    _profile_filename: ClassVar[str] = "profile.json"
     _results_filename: ClassVar[str] = "results.npz"
+    # results saved to their own (memory-mapped) files
+    _external_results: ClassVar[tuple[str, ...]] = ("line_outputs",)
     _tokenizations_filename: ClassVar[str] = "tokenizations.json.gz"
 
     def __attrs_post_init__(self) -> None:
@@ -55,6 +124,15 @@ class ScorerResultSaver(dict):
             "metrics": self.metrics,
             "languages": self.languages,
             "has_tokenizations": self.tokenizations is not None,
+            "has_profile": self.profiler is not None,
+            "bootstrap": asdict(self.bootstrap) if self.bootstrap is not None else None,
+            "histograms": asdict(self.histograms) if self.histograms is not None else None,
+            "line_outputs": asdict(self.line_outputs) if self.line_outputs is not None else None,
+            "overlap": asdict(self.overlap) if self.overlap is not None else None,
+            "boundary_agreement": asdict(self.boundary_agreement) if self.boundary_agreement is not None else None,
+            "has_stats_cube": self.stats_cube,
+            "sweep_values": self.sweep_values,
+            "result_axes": {key: list(axes) for key, axes in self.result_axes.items()},
         }
         with path.open("w") as fh:
             json.dump(data, sort_keys=True, indent=2, fp=fh)
@@ -91,12 +169,19 @@ class ScorerResultSaver(dict):
 
         # Save the result matrices
         path = Path(self.output_dir, self._results_filename)
-        np.savez(path, **results)
+        np.savez(path, **{key: value for key, value in results.items() if key not in self._external_results})
 
         # Save the additional data
         self._save_languages_info()
         self._save_tokenizations()
 
+    def save_profile(self) -> None:
+        """Save the execution profile (separately, so it can include the results saving stage)."""
+        if self.profiler is None:
+            logger.debug("No profile data to save.")
+            return
+        self.profiler.save(Path(self.output_dir, self._profile_filename))
+
 
 @define(kw_only=True)
 class TokCollateScorer:
@@ -115,6 +200,28 @@ class TokCollateScorer:
         scorer.systems: list of the scored system outputs
         scorer.file_suffix: suffix of the dataset files
         scorer.metrics: list of metrics and their configurations (dict)
+        scorer.bootstrap: (optional) bootstrap resampling options (see BootstrapResampler). If set, the lower and
+            upper bounds of the confidence intervals of each metric are stored in the metrics_lower and metrics_upper
+            results as {metric_label}_lower and {metric_label}_upper (with the same shapes as the metrics results).
+        scorer.approximate: (optional) score the unigram metrics from fixed-memory sketches of the system outputs
+            instead of their exact vocabularies. Contains the UnigramSketch settings (an empty dict or true uses
+            the defaults) and the number of files sketched in parallel (num_workers).
+        scorer.histograms: (optional) length histogram options (see LengthHistograms, true uses the defaults). If set,
+            the histograms of the sequence lengths (tokens and bytes) and the token lengths are stored in the
+            histograms results.
+        scorer.line_outputs: (optional) per-line output options (see LineOutputs, true uses the defaults). If set,
+            the (systems, languages, lines) tensors of the line statistics are stored in the line_outputs results
+            (memory-mapped to the line_outputs subdirectory of the output_dir).
+        scorer.overlap: (optional) vocabulary overlap options (see VocabularyOverlap, true uses the defaults). If set,
+            the (systems, systems, languages) overlap matrices of the system vocabularies are stored in the overlap
+            results.
+        scorer.boundary_agreement: (optional) segmentation boundary agreement options (see BoundaryAgreement, true
+            uses the defaults). If set, the (systems, systems, languages) boundary precision, recall and F1 of every
+            pair of systems are stored in the boundary_agreement results.
+        scorer.stats_cube: save the token counts and the line lengths of the system outputs to the stats_cube
+            subdirectory of the output_dir, so the metrics can be re-scored without the dataset files (the `rescore`
+            command, see tokcollate.cube).
+        profile: trace the memory allocations and dump the cProfile statistics of each stage (--profile option)
     """
 
     config: DictConfig = field(validator=validators.instance_of(DictConfig))
@@ -125,10 +232,18 @@ class TokCollateScorer:
     languages: list[str] = field(init=False, factory=list)
     languages_info: dict[str, Any] = field(init=False, default=None)
     file_suffix: str = field(init=False, default="txt")
+    bootstrap: BootstrapResampler = field(converter=BootstrapResampler.from_config, init=False, default=None)
+    approximate: DictConfig | bool = field(init=False, default=None)
+    histograms: LengthHistograms = field(converter=LengthHistograms.from_config, init=False, default=None)
+    line_outputs: LineOutputs = field(converter=LineOutputs.from_config, init=False, default=None)
+    overlap: VocabularyOverlap = field(converter=VocabularyOverlap.from_config, init=False, default=None)
+    boundary_agreement: BoundaryAgreement = field(converter=BoundaryAgreement.from_config, init=False, default=None)
+    stats_cube: bool = field(converter=bool, init=False, default=False)
 
     metrics: dict[str, TokCollateMetric] = field(init=False, default=None)
     data: TokCollateData = field(init=False, default=None)
-    _metric_n_dim: ClassVar[dict] = {"mono": 2, "multi": 3}
+    profiler: StageProfiler = field(init=False, default=None)
+    _metric_n_dim: ClassVar[dict] = METRIC_N_DIM
 
     def __attrs_post_init__(self) -> None:
         """Set the class values based on the config contents and build the requested metric objects."""
@@ -150,15 +265,30 @@ class TokCollateScorer:
                     f"Required {self.__class__.__name__} attribute scorer.{param.name} not found in the config file."
                 )
                 raise ValueError(err_msg)
-        self.metrics = self._build_metrics(self.config.scorer)
-        self.data = TokCollateData(
-            data_dir=self.input_dir,
-            systems=self.systems,
-            languages=self.languages,
-            languages_info=self.languages_info,
-            metrics=self.metrics.values(),
-            file_suffix=self.file_suffix,
+        detailed_profile = self.config.get("profile", False)
+        self.profiler = StageProfiler(
+            detailed=detailed_profile,
+            profile_dir=Path(self.output_dir, "profile") if detailed_profile and self.output_dir is not None else None,
         )
+        self.metrics = self._build_metrics(self.config.scorer)
+        try:
+            with self.profiler.stage("load") as record:
+                if self.approximate is not None and self.approximate is not False:
+                    self.data = self._sketch_data()
+                else:
+                    self.data = TokCollateData(
+                        data_dir=self.input_dir,
+                        systems=self.systems,
+                        languages=self.languages,
+                        languages_info=self.languages_info,
+                        metrics=self.metrics.values(),
+                        file_suffix=self.file_suffix,
+                    )
+                record.num_tokens = self.data.num_tokens()
+        except BaseException:
+            # the allocation tracing (started by the load stage) is otherwise stopped at the end of run()
+            self.profiler.close()
+            raise
 
     def run(self) -> dict[str, dict[str, np.ndarray]]:
         """Execute the evaluation.
@@ -167,31 +297,70 @@ class TokCollateScorer:
             1. Dataset scoring with provided metrics
             2. Computing correlation between the metrics based on the dataset scores.
             3. Reporting the results
+
+        The allocation tracing of the detailed profiling is stopped at the end of the run.
         """
+        try:
+            return self._run()
+        finally:
+            self.profiler.close()
+
+    def _run(self) -> dict[str, dict[str, np.ndarray]]:
         results = {}
 
         logger.info("Scoring datasets...")
         results["metrics"] = self._score_systems()
 
+        if self.bootstrap is not None:
+            logger.info("Computing bootstrap confidence intervals (%d resamples)...", self.bootstrap.num_samples)
+            results["metrics_lower"], results["metrics_upper"] = self._bootstrap_systems()
+
+        results.update(self._extra_outputs())
+
         logger.info("Computing correlation...")
-        results["correlation"] = self._correlate(results["metrics"])
+        with self.profiler.stage("correlate"):
+            results["correlation"] = self._correlate(results["metrics"])
 
         if self.output_dir is not None:
             if not self.output_dir.exists():
                 self.output_dir.mkdir(parents=True)
-            ScorerResultSaver(
-                output_dir=self.output_dir,
-                tokenizers=list(self.systems),
-                metrics=list(self.metrics.keys()),
-                languages=list(self.languages),
-                languages_info=self.languages_info,
-                tokenizations=self._extract_tokenizations(),
-            ).save_results(results)
+            with self.profiler.stage("save"):
+                saver = ScorerResultSaver(
+                    output_dir=self.output_dir,
+                    tokenizers=list(self.systems),
+                    metrics=list(self.metrics.keys()),
+                    languages=list(self.languages),
+                    languages_info=self.languages_info,
+                    tokenizations=self._extract_tokenizations(),
+                    profiler=self.profiler,
+                    bootstrap=self.bootstrap,
+                    histograms=self.histograms if "histograms" in results else None,
+                    line_outputs=self.line_outputs if "line_outputs" in results else None,
+                    overlap=self.overlap if "overlap" in results else None,
+                    boundary_agreement=self.boundary_agreement if "boundary_agreement" in results else None,
+                    stats_cube=self.stats_cube and not self.data.approximate,
+                    sweep_values=sweep_values(self.metrics),
+                    result_axes=result_axes(
+                        self.metrics,
+                        [
+                            getattr(self, output)
+                            for output in ("histograms", "line_outputs", "overlap", "boundary_agreement")
+                            if output in results
+                        ],
+                    ),
+                )
+                saver.save_results(results)
+                if saver.stats_cube:
+                    save_stats_cube(self.data, self.output_dir, self.systems, self.languages)
+                elif self.stats_cube:
+                    logger.warning("The stats cube is not available in the approximate mode.")
+            saver.save_profile()
         else:
             logger.info("No scorer.output_dir was provided. Printing results to STDOUT:\n")
             for key in results:
                 print(results[key])  # noqa: T201
 
+        logger.info("Execution profile:\n%s", self.profiler.summary())
         return results
 
     @classmethod
@@ -208,35 +377,102 @@ class TokCollateScorer:
         """Build the requested metric objects based on their definition in the config."""
         metrics = {}
         for metric_params in config.metrics:
-            metric = metric_params.metric
-            del metric_params["metric"]
-
-            metric_inst = build_metric(metric=metric, **metric_params)
+            # the config is left intact, so it can be reused (e.g. by the streaming pipeline)
+            params = {key: value for key, value in metric_params.items() if key != "metric"}
+            metric_inst = build_metric(metric=metric_params.metric, **params)
             metrics[metric_inst.metric_label] = metric_inst
         return metrics
 
+    def _sketch_data(self) -> TokCollateSketchedData:
+        """Sketch the system outputs (the approximate mode)."""
+        sketch_params = {} if self.approximate is True else OmegaConf.to_container(self.approximate, resolve=True)
+        num_workers = sketch_params.pop("num_workers", 1)
+        return TokCollateSketchedData.from_files(
+            data_dir=self.input_dir,
+            systems=self.systems,
+            languages=self.languages,
+            file_suffix=self.file_suffix,
+            sketch_params=sketch_params,
+            num_workers=num_workers,
+            languages_info=self.languages_info,
+            metrics=self.metrics.values(),
+        )
+
     def _score_systems(self) -> dict[str, np.ndarray]:
         """Score the datasets with the requested metrics."""
         scores = {}
         for metric_label, metric in self.metrics.items():
             logger.info("Running %s metric...", metric_label)
-            scores[metric_label] = metric.score_all(self.data, self.systems, languages=self.languages)
+            system_scores = []
+            for system_label in self.systems:
+                with self.profiler.stage("score", metric=metric_label, system=system_label) as record:
+                    system_scores.append(metric.score_all(self.data, [system_label], languages=self.languages))
+                    record.num_tokens = self.data.num_tokens(system_label)
+            scores[metric_label] = np.concatenate(system_scores, axis=0)
         return scores
 
+    def _bootstrap_systems(self) -> tuple[dict[str, np.ndarray], dict[str, np.ndarray]]:
+        """Return the lower and upper confidence bounds of the metrics (skipping the unsupported metrics).
+
+        The bounds are keyed by {metric_label}_lower and {metric_label}_upper, so they do not collide with the metric
+        scores when the result groups are flattened (e.g. by the frontend or tokcollate.server.decode_results).
+        """
+        lower, upper = {}, {}
+        for metric_label, metric in self.metrics.items():
+            logger.info("Resampling %s metric...", metric_label)
+            try:
+                with self.profiler.stage("bootstrap", metric=metric_label):
+                    samples = metric.resample_all(
+                        self.data, self.systems, languages=self.languages, resampler=self.bootstrap
+                    )
+            except NotImplementedError as err:
+                logger.warning("No confidence intervals of %s: %s", metric_label, err)
+                continue
+            lower[f"{metric_label}_lower"], upper[f"{metric_label}_upper"] = self.bootstrap.interval(samples, axis=1)
+        return lower, upper
+
+    def _extra_outputs(self) -> dict[str, dict[str, np.ndarray]]:
+        """Return the requested outputs besides the metrics (not available in the approximate mode)."""
+        outputs = {}
+        requested = {
+            "histograms": self.histograms,
+            "line_outputs": self.line_outputs,
+            "overlap": self.overlap,
+            "boundary_agreement": self.boundary_agreement,
+        }
+        if all(output is None for output in requested.values()):
+            return outputs
+        if self.data.approximate:
+            logger.warning(
+                "The %s outputs are not available in the approximate mode.",
+                ", ".join(name for name, output in requested.items() if output is not None),
+            )
+            return outputs
+        if self.histograms is not None:
+            logger.info("Computing length histograms...")
+            with self.profiler.stage("histograms"):
+                outputs["histograms"] = self.histograms.compute(self.data, self.systems, self.languages)
+        if self.line_outputs is not None:
+            logger.info("Computing per-line outputs...")
+            with self.profiler.stage("line_outputs"):
+                outputs["line_outputs"] = self.line_outputs.compute(
+                    self.data, self.systems, self.languages, output_dir=self.output_dir
+                )
+        if self.overlap is not None:
+            logger.info("Computing vocabulary overlaps...")
+            with self.profiler.stage("overlap"):
+                outputs["overlap"] = self.overlap.compute(self.data, self.systems, self.languages)
+        if self.boundary_agreement is not None:
+            logger.info("Computing segmentation boundary agreement...")
+            with self.profiler.stage("boundary_agreement"):
+                outputs["boundary_agreement"] = self.boundary_agreement.compute(self.data, self.systems, self.languages)
+        return outputs
+
     def _correlate(self, metric_scores: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
-        """Return the correlation coefficients between the metrics."""
-        corr_scores = {}
-        for key in self._metric_n_dim:
-            scores = [out for out in metric_scores.values() if out.ndim == self._metric_n_dim[key]]
-            if not scores:
-                corr_scores[key] = None
-            elif len(scores) == 1:
-                corr_scores[key] = np.float64(1.0)
-            else:
-                scores_stacked = np.stack(scores, axis=0)
-                scores_flat = scores_stacked.reshape((scores_stacked.shape[0], -1))
-                corr_scores[key] = np.corrcoef(scores_flat, rowvar=True)
-        return corr_scores
+        """Return the correlation coefficients between the metrics (except the metrics sweeping a parameter)."""
+        return correlate_scores(
+            {label: scores for label, scores in metric_scores.items() if not self.metrics[label].sweep_shape}
+        )
 
     def _extract_tokenizations(self) -> dict[str, dict[str, TextType] | TextType]:
         """Extract tokenizations from the data object for visualization.
@@ -248,6 +484,9 @@ class TokCollateScorer:
         """
         if self.data is None:
             return {}
+        if self.data.approximate:
+            logger.debug("The tokenizations are not available in the approximate mode.")
+            return None
 
         tokenizations = {}
         for system_label in self.systems:
@@ -0,0 +1,596 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import math
+import re
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from http import HTTPStatus
+from pathlib import Path
+from typing import Any, ClassVar
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+from attrs import define, field, validators
+
+logger = logging.getLogger(__name__)
+
+METADATA_FILENAME = "metadata.json"
+RESULTS_FILENAME = "results.npz"
+LANGUAGES_INFO_FILENAME = "languages_info.json"
+# axis layout of the results saved without the "result_axes" metadata (the metric scores layout)
+LEGACY_RESULT_AXES = ("systems", "languages", "languages")
+
+
+def json_safe(obj: Any) -> Any:  # noqa: ANN401, PLR0911
+    """Convert numpy values into JSON-serializable structures.
+
+    NaN and infinite values are replaced by the 'NaN', 'Infinity' and '-Infinity' strings, following the
+    format expected by the frontend.
+    """
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "f" and not np.isfinite(obj).all():
+            return json_safe(obj.tolist())
+        return obj.tolist()
+    if isinstance(obj, dict):
+        return {str(k): json_safe(v) for k, v in obj.items()}
+    if isinstance(obj, list | tuple):
+        return [json_safe(v) for v in obj]
+    if isinstance(obj, float | np.floating):
+        if math.isnan(obj):
+            return "NaN"
+        if math.isinf(obj):
+            return "Infinity" if obj > 0 else "-Infinity"
+        return float(obj)
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    return obj
+
+
+def decode_results(source: Path | bytes) -> dict[str, np.ndarray]:
+    """Load a results.npz file and flatten the pickled result dictionaries into a single array mapping.
+
+    The TokCollateScorer saves each result group (e.g. metrics, correlation) as a pickled dictionary. The groups
+    are flattened into their keys, the same way the frontend expects them. On a key collision, the earlier group
+    (i.e. the metrics) takes precedence.
+    """
+    fh = io.BytesIO(source) if isinstance(source, bytes) else source
+    arrays = {}
+    with np.load(fh, allow_pickle=True) as npz:
+        for key in npz.files:
+            arr = npz[key]
+            if arr.dtype == object and arr.shape == ():
+                obj = arr.item()
+                if isinstance(obj, dict):
+                    for k, v in obj.items():
+                        arrays.setdefault(str(k), v)
+                else:
+                    arrays.setdefault(key, obj)
+            elif arr.dtype == object and arr.size == 1 and isinstance(arr.flat[0], dict):
+                for k, v in arr.flat[0].items():
+                    arrays.setdefault(str(k), v)
+            else:
+                arrays.setdefault(key, arr)
+    return arrays
+
+
+@define(kw_only=True)
+class DatasetResults:
+    """Decoded contents of a single scorer output directory."""
+
+    dataset_id: str = field(converter=str)
+    etag: str = field(converter=str)
+    metadata: dict = field(validator=validators.instance_of(dict))
+    arrays: dict[str, Any] = field(validator=validators.instance_of(dict))
+    languages_info: dict | None = field(default=None)
+
+    _json_payload: bytes = field(init=False, default=None)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory footprint of the decoded arrays."""
+        return sum(arr.nbytes for arr in self.arrays.values() if isinstance(arr, np.ndarray))
+
+    def to_json(self) -> bytes:
+        """Return (and memoize) the full JSON-encoded dataset payload."""
+        if self._json_payload is None:
+            payload = {
+                "id": self.dataset_id,
+                "metadata": self.metadata,
+                "npzData": json_safe(self.arrays),
+                "languagesInfo": self.languages_info,
+            }
+            self._json_payload = json.dumps(payload).encode("utf-8")
+        return self._json_payload
+
+    def select(self, key: str, systems: list[str] | None = None, languages: list[str] | None = None) -> np.ndarray:
+        """Return a slice of a result array given the system and language labels.
+
+        The array axes are selected based on the axis layout stored in the metadata (e.g. ("systems", "systems",
+        "languages")). The systems are selected on the first systems axis only (i.e. the pairwise results keep all
+        the compared systems), the languages are selected on every languages axis. The results saved without the
+        layout are assumed to be laid out as the metric scores, i.e. the first axis indexes the systems and the
+        remaining axes (up to two) index the languages.
+        """
+        if key not in self.arrays or not isinstance(self.arrays[key], np.ndarray):
+            raise KeyError(key)
+        arr = self.arrays[key]
+        axes = list(self.metadata.get("result_axes", {}).get(key, LEGACY_RESULT_AXES[: arr.ndim]))
+        if systems and "systems" in axes:
+            arr = arr.take(self._indices("tokenizers", systems), axis=axes.index("systems"))
+        if languages:
+            lang_idx = self._indices("languages", languages)
+            for axis, axis_name in enumerate(axes):
+                if axis_name == "languages":
+                    arr = arr.take(lang_idx, axis=axis)
+        return arr
+
+    def _indices(self, metadata_key: str, labels: list[str]) -> list[int]:
+        available = self.metadata.get(metadata_key, [])
+        missing = [label for label in labels if label not in available]
+        if missing:
+            err_msg = f"Unknown {metadata_key} labels: {', '.join(missing)}"
+            raise ValueError(err_msg)
+        return [available.index(label) for label in labels]
+
+
+@define(kw_only=True)
+class ResultsCache:
+    """In-memory LRU cache of the decoded scorer results.
+
+    The entries are evicted (least recently used first) once the total size of the cached arrays exceeds
+    `max_bytes` or the number of entries exceeds `max_entries`.
+
+    Args:
+        max_bytes (int): memory budget for the cached arrays
+        max_entries (int): maximum number of cached datasets
+    """
+
+    max_bytes: int = field(converter=int, default=512 * 2**20)
+    max_entries: int = field(converter=int, default=64)
+
+    _entries: OrderedDict = field(init=False, factory=OrderedDict)
+    _pending: dict = field(init=False, factory=dict)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the cached arrays."""
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def get(self, key: str) -> DatasetResults | None:
+        """Return a cached entry and mark it as recently used."""
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: str, entry: DatasetResults) -> None:
+        """Add an entry to the cache, evicting the least recently used entries when over budget."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self.nbytes > self.max_bytes):
+            evicted_key, _ = self._entries.popitem(last=False)
+            logger.debug("Evicted %s from the results cache.", evicted_key)
+
+    async def get_or_load(self, key: str, loader: Callable[[], DatasetResults]) -> DatasetResults:
+        """Return a cached entry or load it in a worker thread.
+
+        Concurrent requests for the same (not yet cached) key share a single load.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+        if key not in self._pending:
+            self._pending[key] = asyncio.get_running_loop().run_in_executor(None, loader)
+        try:
+            entry = await self._pending[key]
+        finally:
+            self._pending.pop(key, None)
+        self.put(key, entry)
+        return entry
+
+
+@define(kw_only=True)
+class ResultsIndex:
+    """Index of the scorer output directories available for serving.
+
+    Each root directory is either a scorer output directory itself or a directory containing scorer output
+    directories (e.g. the frontend dataset root).
+
+    Args:
+        roots (list[Path]): directories to index
+    """
+
+    roots: list[Path] = field(converter=lambda roots: [Path(root) for root in roots])
+
+    _datasets: dict[str, Path] = field(init=False, factory=dict)
+
+    def __attrs_post_init__(self) -> None:
+        """Build the initial index."""
+        self.scan()
+
+    @staticmethod
+    def is_output_dir(path: Path) -> bool:
+        """Check whether the directory contains scorer results."""
+        return Path(path, METADATA_FILENAME).exists() and Path(path, RESULTS_FILENAME).exists()
+
+    def scan(self) -> dict[str, Path]:
+        """(Re)index the root directories."""
+        datasets = {}
+        for root in self.roots:
+            if not root.is_dir():
+                logger.warning("Results directory %s does not exist. Skipping...", root)
+                continue
+            candidates = [root] if self.is_output_dir(root) else sorted(p for p in root.iterdir() if p.is_dir())
+            for path in candidates:
+                if self.is_output_dir(path):
+                    if path.name in datasets:
+                        logger.warning("Duplicate dataset id %s (%s). Skipping...", path.name, path)
+                        continue
+                    datasets[path.name] = path
+        self._datasets = datasets
+        return datasets
+
+    def get(self, dataset_id: str) -> Path | None:
+        """Return the dataset directory, rescanning the roots on a miss."""
+        if dataset_id not in self._datasets or not self.is_output_dir(self._datasets[dataset_id]):
+            self.scan()
+        return self._datasets.get(dataset_id)
+
+    def describe(self) -> list[dict[str, Any]]:
+        """Return the dataset descriptors (in the format of the frontend dataset listing)."""
+        descriptors = []
+        for dataset_id, path in self.scan().items():
+            stat = Path(path, METADATA_FILENAME).stat()
+            descriptors.append(
+                {
+                    "id": dataset_id,
+                    "displayName": dataset_id,
+                    "hasLanguagesInfo": Path(path, LANGUAGES_INFO_FILENAME).exists(),
+                    "modifiedAt": stat.st_mtime,
+                }
+            )
+        return descriptors
+
+    def version(self, dataset_id: str) -> str:
+        """Return a version tag of the dataset files, used both as a cache key and an ETag."""
+        path = self._datasets[dataset_id]
+        digest = hashlib.sha1(str(path).encode("utf-8"), usedforsecurity=False)
+        for filename in [METADATA_FILENAME, RESULTS_FILENAME, LANGUAGES_INFO_FILENAME]:
+            file = Path(path, filename)
+            if file.exists():
+                stat = file.stat()
+                digest.update(f"{filename}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+        return digest.hexdigest()
+
+    def load(self, dataset_id: str) -> DatasetResults:
+        """Read and decode the dataset files."""
+        path = self._datasets[dataset_id]
+        logger.info("Loading results of dataset %s (%s)...", dataset_id, path)
+        with Path(path, METADATA_FILENAME).open("r", encoding="utf-8") as fh:
+            metadata = json.load(fh)
+        languages_info = None
+        if Path(path, LANGUAGES_INFO_FILENAME).exists():
+            with Path(path, LANGUAGES_INFO_FILENAME).open("r", encoding="utf-8") as fh:
+                languages_info = json.load(fh)
+        return DatasetResults(
+            dataset_id=dataset_id,
+            etag=self.version(dataset_id),
+            metadata=metadata,
+            arrays=decode_results(Path(path, RESULTS_FILENAME)),
+            languages_info=languages_info,
+        )
+
+
+@define(kw_only=True)
+class Request:
+    """Parsed HTTP request."""
+
+    method: str
+    path: str
+    query: dict[str, list[str]]
+    headers: dict[str, str]
+    body: bytes = b""
+    params: dict[str, str] = field(factory=dict)
+
+    def get_list(self, name: str) -> list[str] | None:
+        """Return a (comma-separated or repeated) query parameter as a list."""
+        if name not in self.query:
+            return None
+        return [item for value in self.query[name] for item in value.split(",") if item]
+
+    def json(self) -> Any:  # noqa: ANN401
+        """Decode the JSON request body."""
+        return json.loads(self.body.decode("utf-8")) if self.body else {}
+
+
+@define(kw_only=True)
+class Response:
+    """HTTP response."""
+
+    status: int = HTTPStatus.OK
+    body: bytes = b""
+    content_type: str = "application/json; charset=utf-8"
+    headers: dict[str, str] = field(factory=dict)
+
+    @classmethod
+    def from_json(cls: "Response", payload: Any, status: int = HTTPStatus.OK, **kwargs) -> "Response":  # noqa: ANN003, ANN401
+        """Create a JSON response."""
+        return cls(status=status, body=json.dumps(json_safe(payload)).encode("utf-8"), **kwargs)
+
+    @classmethod
+    def error(cls: "Response", status: int, message: str) -> "Response":
+        """Create a JSON error response."""
+        return cls.from_json({"error": message}, status=status)
+
+
+class HTTPError(Exception):
+    """Exception converted into an HTTP error response."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+@define(kw_only=True)
+class TokCollateServer:
+    """Long-lived asyncio HTTP service serving the TokCollate scorer results.
+
+    The service indexes the scorer output directories and keeps the decoded results.npz contents in an LRU cache,
+    so repeated requests do not need to re-parse the result files. Responses carry ETags and conditional
+    requests (If-None-Match) are answered with 304 Not Modified.
+
+    Endpoints:
+        GET /api/health
+        GET /api/datasets
+        GET /api/datasets/{id}
+        GET /api/datasets/{id}/metrics
+        GET /api/datasets/{id}/metrics/{key}?system=...&language=...&format=json|npy
+        POST /api/parse-npz
+
+    Args:
+        index (ResultsIndex): index of the served output directories
+        cache (ResultsCache): decoded results cache
+        host (str): listening address
+        port (int): listening port (0 selects a free port)
+        max_body_size (int): maximum accepted request body size
+    """
+
+    index: ResultsIndex = field(validator=validators.instance_of(ResultsIndex))
+    cache: ResultsCache = field(factory=ResultsCache)
+    host: str = field(default="127.0.0.1")
+    port: int = field(converter=int, default=8050)
+    max_body_size: int = field(converter=int, default=100 * 2**20)
+
+    _routes: list[tuple[str, re.Pattern, Handler]] = field(init=False, factory=list)
+    _server: asyncio.AbstractServer = field(init=False, default=None)
+
+    _npy_content_type: ClassVar[str] = "application/x-npy"
+
+    def __attrs_post_init__(self) -> None:
+        """Register the default routes."""
+        self.add_route("GET", r"/api/health", self._handle_health)
+        self.add_route("GET", r"/api/datasets", self._handle_list_datasets)
+        self.add_route("GET", r"/api/datasets/(?P<dataset_id>[^/]+)", self._handle_dataset)
+        self.add_route("GET", r"/api/datasets/(?P<dataset_id>[^/]+)/metrics", self._handle_list_metrics)
+        self.add_route("GET", r"/api/datasets/(?P<dataset_id>[^/]+)/metrics/(?P<key>[^/]+)", self._handle_metric)
+        self.add_route("POST", r"/api/parse-npz", self._handle_parse_npz)
+
+    def add_route(self, method: str, pattern: str, handler: Handler) -> None:
+        """Register a request handler for the given method and (fully matched) path pattern."""
+        self._routes.append((method, re.compile(f"^{pattern}/?$"), handler))
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Return the (host, port) the server listens on."""
+        if self._server is None:
+            return self.host, self.port
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start(self) -> None:
+        """Start listening for connections."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        logger.info("TokCollate server listening at http://%s:%d", *self.address)
+
+    async def stop(self) -> None:
+        """Stop the server."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        """Start the server and serve until cancelled."""
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def dispatch(self, request: Request) -> Response:
+        """Route the request to its handler."""
+        allowed = False
+        for method, pattern, handler in self._routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            request.params = {k: unquote(v) for k, v in match.groupdict().items()}
+            try:
+                return await handler(request)
+            except HTTPError as err:
+                return Response.error(err.status, str(err))
+            except Exception as err:
+                logger.exception("Failed to process %s %s", request.method, request.path)
+                return Response.error(HTTPStatus.INTERNAL_SERVER_ERROR, f"{err.__class__.__name__}: {err}")
+        if allowed:
+            return Response.error(
+                HTTPStatus.METHOD_NOT_ALLOWED, f"Method {request.method} not allowed for {request.path}"
+            )
+        return Response.error(HTTPStatus.NOT_FOUND, f"Unknown endpoint {request.path}")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HTTPError as err:
+                    await self._write_response(writer, Response.error(err.status, str(err)), keep_alive=False)
+                    break
+                if request is None:
+                    break
+                response = await self.dispatch(request)
+                keep_alive = request.headers.get("connection", "keep-alive").lower() != "close"
+                await self._write_response(writer, response, keep_alive=keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Request | None:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError as err:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.") from err
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError as err:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length header.") from err
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed Content-Length header.")
+        if length > self.max_body_size:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Request body exceeds {self.max_body_size} bytes.")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        return Request(
+            method=method.upper(),
+            path=url.path,
+            query=parse_qs(url.query),
+            headers=headers,
+            body=body,
+        )
+
+    async def _write_response(
+        self, writer: asyncio.StreamWriter, response: Response, *, keep_alive: bool = True
+    ) -> None:
+        headers = {
+            "Content-Type": response.content_type,
+            "Content-Length": str(len(response.body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **response.headers,
+        }
+        status_line = f"HTTP/1.1 {response.status} {HTTPStatus(response.status).phrase}\r\n"
+        header_lines = "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        writer.write((status_line + header_lines + "\r\n").encode("latin-1"))
+        if response.status != HTTPStatus.NOT_MODIFIED:
+            writer.write(response.body)
+        await writer.drain()
+
+    @staticmethod
+    def _conditional(request: Request, etag: str, build: Callable[[], Response]) -> Response:
+        """Answer conditional requests with 304 or build the full response with an ETag header."""
+        quoted = f'"{etag}"'
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None and (if_none_match.strip() == "*" or quoted in if_none_match.split(", ")):
+            return Response(status=HTTPStatus.NOT_MODIFIED, headers={"ETag": quoted})
+        response = build()
+        response.headers["ETag"] = quoted
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+    async def _get_dataset(self, dataset_id: str) -> DatasetResults:
+        if self.index.get(dataset_id) is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Dataset '{dataset_id}' not found")
+        version = self.index.version(dataset_id)
+        return await self.cache.get_or_load(f"{dataset_id}@{version}", lambda: self.index.load(dataset_id))
+
+    async def _handle_health(self, request: Request) -> Response:  # noqa: ARG002
+        return Response.from_json({"status": "ok", "cached_datasets": len(self.cache)})
+
+    async def _handle_list_datasets(self, request: Request) -> Response:  # noqa: ARG002
+        return Response.from_json({"datasets": self.index.describe()})
+
+    async def _handle_dataset(self, request: Request) -> Response:
+        dataset = await self._get_dataset(request.params["dataset_id"])
+        return self._conditional(request, dataset.etag, lambda: Response(body=dataset.to_json()))
+
+    async def _handle_list_metrics(self, request: Request) -> Response:
+        dataset = await self._get_dataset(request.params["dataset_id"])
+        payload = {
+            key: {"shape": list(arr.shape), "dtype": str(arr.dtype)}
+            for key, arr in dataset.arrays.items()
+            if isinstance(arr, np.ndarray)
+        }
+        return self._conditional(request, dataset.etag, lambda: Response.from_json(payload))
+
+    async def _handle_metric(self, request: Request) -> Response:
+        dataset = await self._get_dataset(request.params["dataset_id"])
+        key = request.params["key"]
+        systems = request.get_list("system")
+        languages = request.get_list("language")
+        out_format = "npy" if self._npy_content_type in request.headers.get("accept", "") else "json"
+        out_format = (request.get_list("format") or [out_format])[0]
+        if out_format not in ("json", "npy"):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Unsupported format: {out_format}")
+        try:
+            arr = dataset.select(key, systems=systems, languages=languages)
+        except KeyError as err:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown result '{key}' in dataset '{dataset.dataset_id}'") from err
+        except ValueError as err:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(err)) from err
+
+        variant = hashlib.sha1(
+            json.dumps([key, systems, languages, out_format]).encode("utf-8"), usedforsecurity=False
+        ).hexdigest()[:16]
+
+        def build() -> Response:
+            if out_format == "npy":
+                buffer = io.BytesIO()
+                np.save(buffer, np.ascontiguousarray(arr), allow_pickle=False)
+                return Response(body=buffer.getvalue(), content_type=self._npy_content_type)
+            return Response.from_json({"key": key, "shape": list(arr.shape), "data": arr})
+
+        return self._conditional(request, f"{dataset.etag}-{variant}", build)
+
+    async def _handle_parse_npz(self, request: Request) -> Response:
+        if not request.body:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "No file data provided")
+        etag = hashlib.sha1(request.body, usedforsecurity=False).hexdigest()
+        cache_key = f"upload@{etag}"
+
+        def load() -> DatasetResults:
+            return DatasetResults(dataset_id=cache_key, etag=etag, metadata={}, arrays=decode_results(request.body))
+
+        try:
+            dataset = await self.cache.get_or_load(cache_key, load)
+        except (OSError, ValueError) as err:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, f"Failed to parse NPZ file: {err}") from err
+        return Response(body=json.dumps(json_safe(dataset.arrays)).encode("utf-8"), headers={"ETag": f'"{etag}"'})
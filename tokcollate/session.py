@@ -0,0 +1,311 @@
+import itertools
+import json
+import logging
+import threading
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from attrs import converters, define, field, validators
+from omegaconf import DictConfig, ListConfig, OmegaConf
+
+from tokcollate.boundaries import BoundaryAgreement
+from tokcollate.cube import save_stats_cube
+from tokcollate.data import LanguageInfo, TokCollateData, TokenSequencesType
+from tokcollate.histograms import LengthHistograms
+from tokcollate.line_outputs import LineOutputs
+from tokcollate.metrics import TokCollateMetric, get_metric
+from tokcollate.overlap import VocabularyOverlap
+from tokcollate.profiling import StageProfiler
+from tokcollate.scorer import ScorerResultSaver, correlate_scores, result_axes, sweep_values
+
+logger = logging.getLogger(__name__)
+
+MetricConfigType = DictConfig | ListConfig | list[dict] | dict
+
+
+def metric_config_key(metric_params: dict) -> str:
+    """Return an identifier of a metric configuration (ignoring the metric label)."""
+    params = {k: v for k, v in metric_params.items() if k != "metric_label"}
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _default_metric_label(metric: str, params: dict[str, Any]) -> str:
+    if not params:
+        return metric
+    return f"{metric}[{','.join(f'{key}={value}' for key, value in sorted(params.items()))}]"
+
+
+def _metric_configs(metrics: MetricConfigType) -> list[dict[str, Any]]:
+    """Convert the supported metric specifications to a list of (copied) scorer.metrics-style dictionaries."""
+    if isinstance(metrics, DictConfig) and "scorer" in metrics:
+        metrics = metrics.scorer.metrics
+    if isinstance(metrics, DictConfig | ListConfig):
+        metrics = OmegaConf.to_container(metrics, resolve=True)
+    if isinstance(metrics, dict):
+        metrics = [metrics]
+    return [dict(params) for params in metrics]
+
+
+@define(kw_only=True)
+class TokCollateSession:
+    """Scores many metric configurations against a single loaded dataset.
+
+    Unlike TokCollateScorer, the session loads the dataset texts (and caches their statistics, e.g. the vocabularies)
+    only once and keeps its own metric instances instead of the global METRIC_INSTANCE_REGISTRY, so the metric labels
+    of different sessions do not collide. The computed per-system scores are cached, so repeated configurations are
+    free and only the newly added systems are scored.
+
+    Example:
+        session = TokCollateSession.from_config(OmegaConf.load("config.yml"))
+        results = session.run(OmegaConf.load("config.yml"))
+        entropies = session.sweep("entropy", {"power": [1.5, 2.0, 2.5, 3.0]})
+
+    Args:
+        data_dir (Path): location of the dataset files
+        texts (dict): in-memory system outputs used instead of the dataset files (see TokCollateData.texts)
+        systems (list[str]): list of the scored system outputs (defaults to all the in-memory systems)
+        languages (list[str]): (optional) list of the dataset languages
+        languages_info (dict[str, LanguageInfo]): (optional) language metadata
+        file_suffix (str): suffix of the dataset files
+        max_workers (int): default number of metrics scored in parallel (threads sharing the loaded data)
+        data (TokCollateData): (optional) already loaded data used instead of loading the dataset
+    """
+
+    data_dir: Path = field(converter=converters.optional(Path), default=None)
+    texts: dict[str, dict[str, TokenSequencesType] | TokenSequencesType] = field(default=None, repr=False)
+    systems: list[str] = field(converter=converters.optional(list), factory=list)
+    languages: list[str] = field(converter=converters.optional(list), factory=list)
+    languages_info: dict[str, LanguageInfo] = field(
+        validator=validators.optional(validators.instance_of(dict)), default=None
+    )
+    file_suffix: str = field(validator=validators.instance_of(str), default="txt")
+    max_workers: int = field(converter=int, default=1)
+
+    data: TokCollateData = field(default=None, repr=False)
+    profiler: StageProfiler = field(init=False, factory=StageProfiler)
+    _metrics: dict[str, tuple[str, TokCollateMetric]] = field(init=False, factory=dict)
+    _scores: dict[tuple[str, str], np.ndarray] = field(init=False, factory=dict)
+    _lock: threading.Lock = field(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self) -> None:
+        """Load the dataset texts."""
+        if self.data is not None:
+            self.systems = self.data.systems
+            self.languages = self.data.languages
+            self.languages_info = self.data.languages_info
+            return
+        with self.profiler.stage("load") as record:
+            self.data = TokCollateData(
+                data_dir=self.data_dir,
+                texts=self.texts,
+                systems=self.systems,
+                languages=self.languages,
+                languages_info=self.languages_info,
+                file_suffix=self.file_suffix,
+            )
+            record.num_tokens = self.data.num_tokens()
+        self.systems = self.data.systems
+
+    @classmethod
+    def from_config(cls: "TokCollateSession", config: DictConfig, **kwargs) -> "TokCollateSession":  # noqa: ANN003
+        """Create a session for the dataset described by the scorer section of a config (the metrics are ignored).
+
+        OmegaConf Args:
+            scorer.input_dir: location of the dataset files
+            scorer.systems: list of the scored system outputs
+            scorer.languages: (optional) list of the dataset languages
+            scorer.languages_info: (optional) languages_info JSON file
+            scorer.file_suffix: suffix of the dataset files
+        """
+        languages_info = None
+        if config.scorer.get("languages_info", None) is not None:
+            with Path(config.scorer.languages_info).open("r", encoding="utf-8") as fh:
+                languages_info = {lang: LanguageInfo.create_entry(entry) for lang, entry in json.load(fh).items()}
+        return cls(
+            data_dir=config.scorer.input_dir,
+            systems=config.scorer.systems,
+            languages=config.scorer.get("languages", None),
+            languages_info=languages_info,
+            file_suffix=config.scorer.get("file_suffix", "txt"),
+            **kwargs,
+        )
+
+    @property
+    def metrics(self) -> dict[str, TokCollateMetric]:
+        """The metric instances of the session (keyed by their labels)."""
+        return {label: metric for label, (_, metric) in self._metrics.items()}
+
+    def build_metric(self, metric: str, metric_label: str | None = None, **kwargs) -> TokCollateMetric:  # noqa: ANN003
+        """Build a metric instance owned by the session (or return the existing one with the same configuration).
+
+        Args:
+            metric (str): metric class identifier (registered using register_metric)
+            metric_label (str): (optional) unique metric instance identifier. Derived from the parameters by default.
+            **kwargs: additional parameters of the metric class
+
+        Raises:
+            ValueError: if the label is already used by a differently configured metric
+        """
+        if metric_label is None:
+            metric_label = _default_metric_label(metric, kwargs)
+        key = metric_config_key({"metric": metric, **kwargs})
+        with self._lock:
+            if metric_label in self._metrics:
+                if self._metrics[metric_label][0] != key:
+                    err_msg = f"Metric label {metric_label} is already used by a different metric configuration."
+                    raise ValueError(err_msg)
+                return self._metrics[metric_label][1]
+            metric_inst = get_metric(metric).build_metric(metric=metric, metric_label=metric_label, **kwargs)
+            self._metrics[metric_label] = (key, metric_inst)
+        self.data.add_metrics([metric_inst])
+        return metric_inst
+
+    def score(self, metrics: MetricConfigType, max_workers: int | None = None) -> dict[str, np.ndarray]:
+        """Score the dataset systems with the given metrics.
+
+        Args:
+            metrics: metric configurations in the scorer.metrics format (a list or a single dictionary), or
+                a whole TokCollate config (its scorer.metrics are used)
+            max_workers (int): (optional) number of metrics scored in parallel. Defaults to the session max_workers.
+
+        Returns:
+            Dictionary of the metric scores (keyed by the metric labels), with the TokCollateScorer result shapes.
+        """
+        metric_insts = [self.build_metric(**params) for params in _metric_configs(metrics)]
+        max_workers = max_workers or self.max_workers
+        if max_workers > 1 and len(metric_insts) > 1:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tokcollate-session") as executor:
+                scores = list(executor.map(self._score_metric, metric_insts))
+        else:
+            scores = [self._score_metric(metric) for metric in metric_insts]
+        return {metric.metric_label: score for metric, score in zip(metric_insts, scores, strict=True)}
+
+    def run(
+        self,
+        metrics: MetricConfigType,
+        output_dir: Path | None = None,
+        max_workers: int | None = None,
+        *,
+        histograms: LengthHistograms | Mapping | bool | None = None,
+        line_outputs: LineOutputs | Mapping | bool | None = None,
+        overlap: VocabularyOverlap | Mapping | bool | None = None,
+        boundary_agreement: BoundaryAgreement | Mapping | bool | None = None,
+        stats_cube: bool = False,
+    ) -> dict[str, dict[str, np.ndarray]]:
+        """Score the metrics and correlate them (the TokCollateScorer.run equivalent).
+
+        Args:
+            metrics: metric configurations (see TokCollateSession.score)
+            output_dir (Path): (optional) target location for saving the results
+            max_workers (int): (optional) number of metrics scored in parallel
+            histograms: (optional) length histogram options (see LengthHistograms.from_config)
+            line_outputs: (optional) per-line output options (see LineOutputs.from_config)
+            overlap: (optional) vocabulary overlap options (see VocabularyOverlap.from_config)
+            boundary_agreement: (optional) boundary agreement options (see BoundaryAgreement.from_config)
+            stats_cube (bool): save the stats cube to the output_dir (see tokcollate.cube.save_stats_cube)
+        """
+        results = {"metrics": self.score(metrics, max_workers=max_workers)}
+        histograms = LengthHistograms.from_config(histograms)
+        if histograms is not None:
+            with self.profiler.stage("histograms"):
+                results["histograms"] = histograms.compute(self.data, self.systems, self.languages)
+        line_outputs = LineOutputs.from_config(line_outputs)
+        if line_outputs is not None:
+            with self.profiler.stage("line_outputs"):
+                results["line_outputs"] = line_outputs.compute(
+                    self.data, self.systems, self.languages, output_dir=output_dir
+                )
+        overlap = VocabularyOverlap.from_config(overlap)
+        if overlap is not None:
+            with self.profiler.stage("overlap"):
+                results["overlap"] = overlap.compute(self.data, self.systems, self.languages)
+        boundary_agreement = BoundaryAgreement.from_config(boundary_agreement)
+        if boundary_agreement is not None:
+            with self.profiler.stage("boundary_agreement"):
+                results["boundary_agreement"] = boundary_agreement.compute(self.data, self.systems, self.languages)
+        with self.profiler.stage("correlate"):
+            # the metrics sweeping a parameter have an additional result axis (see TokCollateMetric.sweep_values)
+            results["correlation"] = correlate_scores(
+                {label: scores for label, scores in results["metrics"].items() if not self.metrics[label].sweep_shape}
+            )
+        if output_dir is not None:
+            Path(output_dir).mkdir(parents=True, exist_ok=True)
+            scored_metrics = {label: self.metrics[label] for label in results["metrics"]}
+            ScorerResultSaver(
+                output_dir=output_dir,
+                tokenizers=list(self.systems),
+                metrics=list(results["metrics"].keys()),
+                languages=list(self.languages),
+                languages_info=self.languages_info,
+                histograms=histograms,
+                line_outputs=line_outputs,
+                overlap=overlap,
+                boundary_agreement=boundary_agreement,
+                stats_cube=stats_cube,
+                sweep_values=sweep_values(scored_metrics),
+                result_axes=result_axes(
+                    scored_metrics,
+                    [
+                        output
+                        for output in (histograms, line_outputs, overlap, boundary_agreement)
+                        if output is not None
+                    ],
+                ),
+            ).save_results(results)
+            if stats_cube:
+                save_stats_cube(self.data, output_dir, self.systems, self.languages)
+        return results
+
+    def sweep(
+        self,
+        metric: str,
+        param_grid: dict[str, list],
+        max_workers: int | None = None,
+        **kwargs,  # noqa: ANN003
+    ) -> dict[str, np.ndarray]:
+        """Score all the combinations of the metric parameter values.
+
+        Args:
+            metric (str): metric class identifier
+            param_grid (dict[str, list]): values of the swept parameters
+            max_workers (int): (optional) number of metrics scored in parallel
+            **kwargs: fixed metric parameters
+
+        Returns:
+            Dictionary of the metric scores keyed by the labels derived from the parameter values.
+        """
+        keys = list(param_grid.keys())
+        configs = [
+            {"metric": metric, **kwargs, **dict(zip(keys, values, strict=True))}
+            for values in itertools.product(*(param_grid[key] for key in keys))
+        ]
+        return self.score(configs, max_workers=max_workers)
+
+    def add_system(
+        self,
+        system_label: str,
+        system_path: Path | None = None,
+        text: dict[str, TokenSequencesType] | TokenSequencesType | None = None,
+    ) -> None:
+        """Add a system output to the session (e.g. a newly trained tokenizer), see TokCollateData.add_system."""
+        self.data.add_system(system_label, system_path=system_path, text=text)
+
+    def remove_system(self, system_label: str) -> None:
+        """Remove a system output (and its cached scores) from the session."""
+        self.data.remove_system(system_label)
+        for key in [key for key in self._scores if key[1] == system_label]:
+            del self._scores[key]
+
+    def _score_metric(self, metric: TokCollateMetric) -> np.ndarray:
+        logger.info("Running %s metric...", metric.metric_label)
+        for system_label in self.systems:
+            key = (metric.metric_label, system_label)
+            if key in self._scores:
+                continue
+            with self.profiler.stage("score", metric=metric.metric_label, system=system_label) as record:
+                self._scores[key] = metric.score_all(self.data, [system_label], languages=self.languages)[0]
+                record.num_tokens = self.data.num_tokens(system_label)
+        return np.stack([self._scores[(metric.metric_label, system_label)] for system_label in self.systems], axis=0)
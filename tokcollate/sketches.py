@@ -0,0 +1,605 @@
+import hashlib
+import itertools
+import json
+import logging
+from collections import Counter
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, ClassVar, Self
+
+import numpy as np
+from attrs import define, field, validators
+
+from tokcollate.data import TextType, TokCollateData, get_system_files
+from tokcollate.utils import TOKEN_IDS_SUFFIX, get_vocab_file, load_token_ids, load_vocab, open_file
+
+logger = logging.getLogger(__name__)
+
+# number of tokens (per batch) whose entropy sketch projections are computed at once
+ENTROPY_CHUNK_SIZE = 4096
+
+
+def hash_tokens(tokens: Sequence[str], seed: int = 0) -> np.ndarray:
+    """Return stable 64-bit hashes of the tokens (identical across processes and machines, unlike hash())."""
+    key = int(seed).to_bytes(8, "little")
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(tok.encode("utf-8"), digest_size=8, key=key).digest(), "little")
+            for tok in tokens
+        ),
+        dtype=np.uint64,
+        count=len(tokens),
+    )
+
+
+def splitmix64(x: np.ndarray) -> np.ndarray:
+    """Vectorized SplitMix64 finalizer (derives independent pseudo-random values from the hashes)."""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def to_unit_interval(x: np.ndarray) -> np.ndarray:
+    """Map the 64-bit values to the open (0, 1) interval."""
+    return ((x >> np.uint64(11)).astype(np.float64) + 0.5) / 2.0**53
+
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Vectorized int.bit_length of the uint64 values (the 32-bit halves are exactly representable as floats)."""
+    high = (x >> np.uint64(32)).astype(np.float64)
+    low = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, 32 + np.frexp(high)[1], np.frexp(low)[1])
+
+
+@define(kw_only=True)
+class HyperLogLog:
+    """HyperLogLog distinct count sketch.
+
+    Uses 2**precision one-byte registers. The relative standard error of the estimate is 1.04 / sqrt(2**precision)
+    (0.8% with the default precision of 14, i.e. 16kB of registers).
+
+    Args:
+        precision (int): number of the hash bits selecting the register
+    """
+
+    precision: int = field(converter=int, default=14, validator=validators.and_(validators.ge(4), validators.le(18)))
+    registers: np.ndarray = field(default=None, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        """Create the empty registers."""
+        if self.registers is None:
+            self.registers = np.zeros(2**self.precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / np.sqrt(self.registers.size)
+
+    def update(self, hashes: np.ndarray) -> None:
+        num_bits = 64 - self.precision
+        index = (hashes >> np.uint64(num_bits)).astype(np.int64)
+        rank = num_bits - _bit_length(hashes & np.uint64(2**num_bits - 1)) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        num_registers = self.registers.size
+        alpha = 0.7213 / (1 + 1.079 / num_registers)
+        raw = alpha * num_registers**2 / np.sum(2.0 ** -self.registers.astype(np.float64))
+        num_zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * num_registers and num_zeros > 0:
+            # small range correction (linear counting)
+            return float(num_registers * np.log(num_registers / num_zeros))
+        return float(raw)
+
+
+@define(kw_only=True)
+class CountMinSketch:
+    """Count-Min frequency sketch.
+
+    The estimated count of a token never underestimates its true count f and, with probability 1 - e**(-depth),
+    overestimates it by at most e / width * N, where N is the total number of tokens (4 * 2**16 int64 counters,
+    i.e. 2MB, with the default settings: error of 0.004% N with probability 98%).
+
+    Args:
+        width (int): number of counters in each row
+        depth (int): number of rows (independent hash functions)
+    """
+
+    width: int = field(converter=int, default=2**16)
+    depth: int = field(converter=int, default=4)
+    table: np.ndarray = field(default=None, repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        """Create the empty counters."""
+        if self.table is None:
+            self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+
+    def error_bound(self, total: int) -> float:
+        """Return the maximum overestimation (with probability 1 - e**(-depth)) given the total token count."""
+        return np.e / self.width * total
+
+    def _indices(self, hashes: np.ndarray) -> np.ndarray:
+        # double hashing (h1 + j * h2) derives the row hash functions from a single 64-bit hash
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64).reshape(-1, 1)
+        return ((low + rows * high) % np.uint64(self.width)).astype(np.int64)
+
+    def update(self, hashes: np.ndarray, counts: np.ndarray) -> None:
+        indices = self._indices(hashes)
+        for row in range(self.depth):
+            np.add.at(self.table[row], indices[row], counts)
+
+    def query(self, hashes: np.ndarray) -> np.ndarray:
+        indices = self._indices(hashes)
+        return np.min(self.table[np.arange(self.depth).reshape(-1, 1), indices], axis=0)
+
+    def merge(self, other: "CountMinSketch") -> None:
+        self.table += other.table
+
+
+@define(kw_only=True)
+class HeavyHitters:
+    """The most frequent tokens with their Count-Min count estimates.
+
+    The candidates are re-selected after each update (and merge) based on the Count-Min estimates, so every token
+    with a count larger than the `capacity`-th largest count (plus the Count-Min error) is kept.
+
+    Args:
+        capacity (int): number of the tracked tokens
+        cms (CountMinSketch): frequency sketch of all the tokens
+    """
+
+    capacity: int = field(converter=int, default=1024)
+    cms: CountMinSketch = field(factory=CountMinSketch)
+    hashes: np.ndarray = field(factory=lambda: np.zeros(0, dtype=np.uint64), repr=False)
+    tokens: list[str] = field(factory=list, repr=False)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self.cms.query(self.hashes)
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        """Return the (token, estimated count) pairs of the n most frequent tokens."""
+        return list(zip(self.tokens, self.counts.tolist(), strict=True))[:n]
+
+    def update(self, hashes: np.ndarray, counts: np.ndarray, tokens: Sequence[str]) -> None:
+        self.cms.update(hashes, counts)
+        self._select(np.concatenate([self.hashes, hashes]), [*self.tokens, *tokens])
+
+    def merge(self, other: "HeavyHitters") -> None:
+        self.cms.merge(other.cms)
+        self._select(np.concatenate([self.hashes, other.hashes]), [*self.tokens, *other.tokens])
+
+    def _select(self, hashes: np.ndarray, tokens: list[str]) -> None:
+        hashes, index = np.unique(hashes, return_index=True)
+        top = np.argsort(-self.cms.query(hashes), kind="stable")[: self.capacity]
+        self.hashes = hashes[top]
+        self.tokens = [tokens[i] for i in index[top]]
+
+
+@define(kw_only=True)
+class DistinctSample:
+    """Uniform sample of the distinct tokens with their exact counts (a bottom-k sketch).
+
+    Keeps the `size` tokens with the smallest hashes. A sampled token is never evicted before its last occurrence,
+    so the sample counts are exact. As long as the vocabulary is smaller than the sample size, the sample contains
+    the whole vocabulary (the sketch is exact). Otherwise, the quantiles of the count distribution have a rank
+    error of about 1 / sqrt(size).
+
+    Args:
+        size (int): maximum number of the sampled tokens
+    """
+
+    size: int = field(converter=int, default=2**14)
+    hashes: np.ndarray = field(factory=lambda: np.zeros(0, dtype=np.uint64), repr=False)
+    counts: np.ndarray = field(factory=lambda: np.zeros(0, dtype=np.int64), repr=False)
+    saturated: bool = field(converter=bool, default=False)
+
+    def update(self, hashes: np.ndarray, counts: np.ndarray) -> None:
+        if self.saturated:
+            # only the tokens below the current threshold can enter the sample
+            keep = hashes <= self.hashes[-1]
+            hashes, counts = hashes[keep], counts[keep]
+        unique, inverse = np.unique(np.concatenate([self.hashes, hashes]), return_inverse=True)
+        summed = np.zeros(unique.size, dtype=np.int64)
+        np.add.at(summed, inverse, np.concatenate([self.counts, counts]))
+        if unique.size > self.size:
+            self.saturated = True
+        self.hashes, self.counts = unique[: self.size], summed[: self.size]
+
+    def merge(self, other: "DistinctSample") -> None:
+        self.update(other.hashes, other.counts)
+        self.saturated = self.saturated or other.saturated
+
+
+@define(kw_only=True)
+class EntropySketch:
+    """Shannon entropy sketch (Clifford and Cosma, 2013, A simple sketching algorithm for entropy estimation).
+
+    Each projection sums the token counts weighted by the (per-token pseudo-random) maximally skewed 1-stable
+    variables. The standard error of the estimate is about 2.3 / sqrt(num_projections) bits (0.1 bits with
+    512 projections), independently of the shape of the distribution. Computing the projections is expensive
+    (num_projections transcendental functions per distinct token of each update).
+
+    Args:
+        num_projections (int): number of the random projections
+    """
+
+    num_projections: int = field(converter=int, default=512)
+    projections: np.ndarray = field(default=None, repr=False)
+    total: int = field(converter=int, default=0)
+
+    def __attrs_post_init__(self) -> None:
+        """Create the empty projections."""
+        if self.projections is None:
+            self.projections = np.zeros(self.num_projections, dtype=np.float64)
+
+    def update(self, hashes: np.ndarray, counts: np.ndarray) -> None:
+        self.total += int(counts.sum())
+        if self.num_projections == 0:
+            return
+        salts = splitmix64(np.arange(2 * self.num_projections, dtype=np.uint64))
+        for start in range(0, hashes.size, ENTROPY_CHUNK_SIZE):
+            chunk = hashes[start : start + ENTROPY_CHUNK_SIZE].reshape(-1, 1)
+            u_1 = to_unit_interval(splitmix64(chunk ^ salts[0::2]))
+            u_2 = to_unit_interval(splitmix64(chunk ^ salts[1::2]))
+            w_1 = np.pi * (u_1 - 0.5)
+            w_2 = -np.log(u_2)
+            stable = np.tan(w_1) * (np.pi / 2 - w_1) + np.log(w_2 * np.cos(w_1) / (np.pi / 2 - w_1))
+            self.projections += counts[start : start + ENTROPY_CHUNK_SIZE].astype(np.float64) @ stable
+
+    def merge(self, other: "EntropySketch") -> None:
+        self.projections += other.projections
+        self.total += other.total
+
+    def estimate(self) -> float:
+        """Return the estimated entropy (in bits)."""
+        if self.total == 0:
+            return 0.0
+        scaled = self.projections / self.total
+        shift = scaled.max()
+        return float(-(shift + np.log(np.mean(np.exp(scaled - shift)))) / np.log(2))
+
+
+@define(kw_only=True)
+class UnigramSketch:
+    """Fixed-memory, mergeable summary of a token distribution (an approximate replacement of the vocabulary Counter).
+
+    Combines the HyperLogLog (vocabulary size), Count-Min heavy hitters (the most frequent tokens) and a uniform
+    sample of the distinct tokens with exact counts (the long tail and the count quantiles). The sums over
+    the vocabulary (the frequency moments and the Shannon entropy) add the heavy hitter contributions to the tail
+    contributions extrapolated from the sample. The memory does not depend on the data size (about 2.4MB with
+    the default settings). When the vocabulary fits into the distinct sample, all the estimates are exact.
+
+    Optionally (entropy_projections > 0), the Shannon entropy is estimated by the EntropySketch instead, which has
+    a fixed error independent of the distribution shape, but is considerably slower and, on the heavy-tailed token
+    distributions, usually less accurate than the extrapolation.
+
+    The sketches of different shards or files (with the same settings) can be merged, e.g. after a parallel or
+    distributed processing, and saved to (and loaded from) NPZ files.
+
+    Args:
+        hll_precision (int): HyperLogLog precision (see HyperLogLog)
+        cms_width (int): Count-Min width (see CountMinSketch)
+        cms_depth (int): Count-Min depth
+        num_heavy_hitters (int): number of the tracked most frequent tokens
+        sample_size (int): size of the distinct token sample (see DistinctSample)
+        entropy_projections (int): number of the entropy sketch projections (0 disables the EntropySketch)
+        seed (int): seed of the token hashes (only the sketches with the same seed can be merged)
+    """
+
+    hll_precision: int = field(converter=int, default=14)
+    cms_width: int = field(converter=int, default=2**16)
+    cms_depth: int = field(converter=int, default=4)
+    num_heavy_hitters: int = field(converter=int, default=1024)
+    sample_size: int = field(converter=int, default=2**14)
+    entropy_projections: int = field(converter=int, default=0)
+    seed: int = field(converter=int, default=0)
+
+    hll: HyperLogLog = field(init=False)
+    heavy_hitters: HeavyHitters = field(init=False)
+    sample: DistinctSample = field(init=False)
+    entropy: EntropySketch = field(init=False)
+
+    _param_names: ClassVar[tuple[str, ...]] = (
+        "hll_precision",
+        "cms_width",
+        "cms_depth",
+        "num_heavy_hitters",
+        "sample_size",
+        "entropy_projections",
+        "seed",
+    )
+
+    def __attrs_post_init__(self) -> None:
+        """Create the empty sketches."""
+        self.hll = HyperLogLog(precision=self.hll_precision)
+        self.heavy_hitters = HeavyHitters(
+            capacity=self.num_heavy_hitters, cms=CountMinSketch(width=self.cms_width, depth=self.cms_depth)
+        )
+        self.sample = DistinctSample(size=self.sample_size)
+        self.entropy = EntropySketch(num_projections=self.entropy_projections)
+
+    @property
+    def params(self) -> dict[str, int]:
+        return {name: getattr(self, name) for name in self._param_names}
+
+    @property
+    def total(self) -> int:
+        """Total number of the sketched tokens."""
+        return self.entropy.total
+
+    @property
+    def is_exact(self) -> bool:
+        """Whether the whole vocabulary fits into the distinct sample (and all the estimates are exact)."""
+        return not self.sample.saturated
+
+    @property
+    def memory_bytes(self) -> int:
+        """Size of the sketch arrays (excluding the heavy hitter token strings)."""
+        return (
+            self.hll.registers.nbytes
+            + self.heavy_hitters.cms.table.nbytes
+            + 8 * self.num_heavy_hitters
+            + 16 * self.sample_size
+            + self.entropy.projections.nbytes
+        )
+
+    def update(self, tokens: Sequence[str], counts: Iterable[int]) -> None:
+        """Add the counts of the (distinct) tokens."""
+        if not tokens:
+            return
+        hashes = hash_tokens(tokens, seed=self.seed)
+        counts = np.asarray(counts, dtype=np.int64)
+        self.hll.update(hashes)
+        self.heavy_hitters.update(hashes, counts, tokens)
+        self.sample.update(hashes, counts)
+        self.entropy.update(hashes, counts)
+
+    def update_vocabulary(self, vocab: Counter) -> None:
+        """Add the token counts of a vocabulary (e.g. of a batch of lines)."""
+        self.update(list(vocab.keys()), list(vocab.values()))
+
+    def merge(self, other: "UnigramSketch") -> Self:
+        """Add the counts of another sketch (with the same settings) in place."""
+        if self.params != other.params:
+            err_msg = f"Cannot merge sketches with different settings ({self.params} != {other.params})."
+            raise ValueError(err_msg)
+        self.hll.merge(other.hll)
+        self.heavy_hitters.merge(other.heavy_hitters)
+        self.sample.merge(other.sample)
+        self.entropy.merge(other.entropy)
+        return self
+
+    def copy(self) -> "UnigramSketch":
+        return UnigramSketch(**self.params).merge(self)
+
+    def vocab_size(self) -> float:
+        """Return the (estimated) number of distinct tokens."""
+        if self.is_exact:
+            return float(self.sample.hashes.size)
+        return self.hll.estimate()
+
+    def shannon_entropy(self) -> float:
+        """Return the (estimated) Shannon entropy of the token distribution in bits."""
+        if self.total == 0:
+            return 0.0
+        if not self.is_exact and self.entropy_projections > 0:
+            return self.entropy.estimate()
+        # H = log2(N) - sum(f * log2(f)) / N
+        return float(np.log2(self.total) - self._sum_counts(lambda counts: counts * np.log2(counts)) / self.total)
+
+    def frequency_moment(self, power: float, min_count: float = 0) -> float:
+        """Return the (estimated) sum of the token counts raised to the power (over the counts >= min_count)."""
+        return self._sum_counts(lambda counts: counts**power, min_count=min_count)
+
+    def _sum_counts(self, function: Callable[[np.ndarray], np.ndarray], min_count: float = 0) -> float:
+        """Return the (estimated) sum of the function of the token counts (over the counts >= min_count).
+
+        The most frequent tokens contribute with their heavy hitter estimates. The contribution of the remaining
+        tokens is extrapolated from the distinct sample.
+        """
+        if self.is_exact:
+            counts = self.sample.counts[self.sample.counts >= min_count].astype(np.float64)
+            return float(np.sum(function(counts)))
+        heavy_counts = self.heavy_hitters.counts.astype(np.float64)
+        heavy_counts = heavy_counts[heavy_counts >= min_count]
+        tail_counts = self.sample.counts[~np.isin(self.sample.hashes, self.heavy_hitters.hashes)].astype(np.float64)
+        tail_counts = tail_counts[tail_counts >= min_count]
+        scale = max(self.vocab_size() - self.heavy_hitters.hashes.size, 0) / self.sample.hashes.size
+        return float(np.sum(function(heavy_counts)) + scale * np.sum(function(tail_counts)))
+
+    def count_percentiles(self, q: float | Sequence[float]) -> np.ndarray:
+        """Return the (estimated) percentiles of the token counts over the vocabulary (see np.percentile)."""
+        return np.percentile(self.sample.counts, q)
+
+    def save(self, file: Path) -> None:
+        """Save the sketch to an NPZ file."""
+        np.savez(
+            file,
+            params=json.dumps(self.params),
+            hll_registers=self.hll.registers,
+            cms_table=self.heavy_hitters.cms.table,
+            heavy_hashes=self.heavy_hitters.hashes,
+            heavy_tokens=np.array(self.heavy_hitters.tokens, dtype=str),
+            sample_hashes=self.sample.hashes,
+            sample_counts=self.sample.counts,
+            sample_saturated=self.sample.saturated,
+            entropy_projections=self.entropy.projections,
+            entropy_total=self.entropy.total,
+        )
+
+    @classmethod
+    def load(cls: "UnigramSketch", file: Path) -> "UnigramSketch":
+        """Load a sketch saved by UnigramSketch.save."""
+        with np.load(file) as npz:
+            sketch = cls(**json.loads(str(npz["params"])))
+            sketch.hll.registers = npz["hll_registers"]
+            sketch.heavy_hitters.cms.table = npz["cms_table"]
+            sketch.heavy_hitters.hashes = npz["heavy_hashes"]
+            sketch.heavy_hitters.tokens = npz["heavy_tokens"].tolist()
+            sketch.sample.hashes = npz["sample_hashes"]
+            sketch.sample.counts = npz["sample_counts"]
+            sketch.sample.saturated = bool(npz["sample_saturated"])
+            sketch.entropy.projections = npz["entropy_projections"]
+            sketch.entropy.total = int(npz["entropy_total"])
+        return sketch
+
+
+def sketch_file(file: Path, batch_lines: int = 100000, **sketch_params) -> UnigramSketch:  # noqa: ANN003
+    """Sketch a system output file (tokenized text or token ids) without keeping its vocabulary in memory.
+
+    Args:
+        file (Path): system output file (see tokcollate.utils.load_system_output)
+        batch_lines (int): number of text lines counted at once
+        **sketch_params: UnigramSketch settings
+    """
+    sketch = UnigramSketch(**sketch_params)
+    file = Path(file)
+    if file.name.endswith(f".{TOKEN_IDS_SUFFIX}"):
+        vocab = np.asarray(load_vocab(get_vocab_file(file)), dtype=object)
+        ids, _ = load_token_ids(file)
+        counts = np.bincount(ids.astype(np.int64), minlength=len(vocab))
+        present = np.flatnonzero(counts)
+        sketch.update(vocab[present].tolist(), counts[present])
+        return sketch
+    with open_file(file, "r") as fh:
+        while True:
+            lines = list(itertools.islice(fh, batch_lines))
+            if not lines:
+                break
+            sketch.update_vocabulary(Counter(tok for line in lines for tok in line.split()))
+    return sketch
+
+
+@define(kw_only=True)
+class TokCollateSketchedData(TokCollateData):
+    """TokCollateData providing only the unigram sketches of the system outputs (the approximate mode).
+
+    Supports the metrics implementing TokCollateMetric.score_sketch (vocab_size, bits, entropy, percentile_frequency).
+
+    Args:
+        sketches (dict): {system: {language: UnigramSketch}} (or {system: {None: UnigramSketch}} without languages)
+    """
+
+    sketches: dict[str, dict[str | None, UnigramSketch]] = field(validator=validators.instance_of(dict), repr=False)
+
+    approximate: ClassVar[bool] = True
+
+    _sketch_cache: dict[tuple[str, str | None], UnigramSketch] = field(init=False, factory=dict)
+
+    def __attrs_post_init__(self) -> None:
+        """Check the sketches."""
+        if not self.systems:
+            self.systems = list(self.sketches.keys())
+        missing = [
+            f"{system_label}/{lang}"
+            for system_label in self.systems
+            for lang in self.languages or [None]
+            if lang not in self.sketches.get(system_label, {})
+        ]
+        if missing:
+            err_msg = f"Missing sketches of: {missing}"
+            raise ValueError(err_msg)
+        self._data = {}
+        self._load_auxiliary_texts()
+
+    @classmethod
+    def from_files(
+        cls: "TokCollateSketchedData",
+        data_dir: Path,
+        systems: list[str],
+        *,
+        languages: list[str] | None = None,
+        file_suffix: str = "txt",
+        sketch_params: dict[str, Any] | None = None,
+        num_workers: int = 1,
+        **kwargs,  # noqa: ANN003
+    ) -> "TokCollateSketchedData":
+        """Sketch the system output files (in parallel processes).
+
+        Args:
+            data_dir (Path): location of the dataset files
+            systems (list[str]): list of the sketched system outputs
+            languages (list[str]): (optional) list of the dataset languages
+            file_suffix (str): suffix of the dataset files
+            sketch_params (dict): UnigramSketch settings (and the sketch_file batch_lines)
+            num_workers (int): number of the files sketched in parallel
+            **kwargs: additional TokCollateData parameters (e.g. languages_info, metrics)
+        """
+        sketch_params = sketch_params or {}
+        files = {
+            system_label: get_system_files(data_dir, system_label, languages, file_suffix) for system_label in systems
+        }
+        missing = [str(path) for system_files in files.values() for path in system_files.values() if not path.exists()]
+        if missing:
+            err_msg = "Missing dataset files:\n  " + "\n  ".join(missing)
+            raise FileNotFoundError(err_msg)
+        logger.info("Sketching texts for scoring...")
+        jobs = [(system_label, lang, path) for system_label in systems for lang, path in files[system_label].items()]
+        if num_workers > 1:
+            with ProcessPoolExecutor(max_workers=num_workers) as executor:
+                futures = [executor.submit(sketch_file, path, **sketch_params) for _, _, path in jobs]
+                results = [future.result() for future in futures]
+        else:
+            results = [sketch_file(path, **sketch_params) for _, _, path in jobs]
+        sketches = {system_label: {} for system_label in systems}
+        for (system_label, lang, _), sketch in zip(jobs, results, strict=True):
+            sketches[system_label][lang] = sketch
+        return cls(
+            data_dir=data_dir,
+            systems=systems,
+            languages=languages,
+            file_suffix=file_suffix,
+            sketches=sketches,
+            **kwargs,
+        )
+
+    def get_unigram_sketch(self, system_label: str, language: str | None = None) -> UnigramSketch:
+        """Return the sketch of the system output(s) (the per-language sketches are merged if language is None)."""
+        if language is not None or not self.languages:
+            return self.sketches[system_label][language]
+        key = (system_label, language)
+        if key not in self._sketch_cache:
+            sketches = [self.sketches[system_label][lang] for lang in self.languages]
+            merged = sketches[0].copy()
+            for sketch in sketches[1:]:
+                merged.merge(sketch)
+            self._sketch_cache[key] = merged
+        return self._sketch_cache[key]
+
+    def get_system_text(self, system_label: str, language: str | None = None) -> TextType:
+        err_msg = (
+            f"The text of {system_label} ({language}) is not available in the approximate mode. "
+            "Only the metrics supporting the unigram sketches are supported."
+        )
+        raise NotImplementedError(err_msg)
+
+    def get_vocabulary(self, system_label: str, language: str | None = None) -> Counter:
+        err_msg = (
+            f"The exact vocabulary of {system_label} ({language}) is not available in the approximate mode. "
+            "Only the metrics supporting the unigram sketches are supported."
+        )
+        raise NotImplementedError(err_msg)
+
+    def get_sequence_lengths(
+        self, system_label: str, language: str | None = None, *, use_bytes: bool = False
+    ) -> np.ndarray:
+        err_msg = (
+            f"The sequence lengths of {system_label} ({language}) are not available in the approximate mode. "
+            "Only the metrics supporting the unigram sketches are supported."
+        )
+        raise NotImplementedError(err_msg)
+
+    def num_tokens(self, system_label: str | None = None, language: str | None = None) -> int:
+        systems = self.systems if system_label is None else [system_label]
+        return sum(self.get_unigram_sketch(system, language).total for system in systems)
+
+    def add_system(self, system_label: str, **kwargs) -> None:  # noqa: ANN003
+        err_msg = "Systems cannot be added to the sketched data."
+        raise NotImplementedError(err_msg)
@@ -0,0 +1,263 @@
+import json
+import logging
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from attrs import define, field, validators
+from omegaconf import DictConfig, OmegaConf
+
+from tokcollate.data import LanguageInfo, TextType, TokCollateData
+from tokcollate.session import TokCollateSession
+from tokcollate.tokenization import TokenizationRunner, TokenizationStats
+
+logger = logging.getLogger(__name__)
+
+
+@define(kw_only=True)
+class StreamedText:
+    """Statistics of a tokenized text required by the metrics (instead of the text itself).
+
+    Args:
+        vocabulary (Counter): token counts (in the order of the first token occurrences)
+        sequence_lengths (np.ndarray): number of tokens of each non-empty line
+        sequence_bytes (np.ndarray): number of utf-8 token bytes of each non-empty line
+        first_occurrences (np.ndarray): (optional) token stream positions of the first occurrences of the vocabulary
+            entries (see TokCollateData.get_first_occurrences)
+    """
+
+    vocabulary: Counter
+    sequence_lengths: np.ndarray
+    sequence_bytes: np.ndarray
+    first_occurrences: np.ndarray = None
+
+
+@define(kw_only=True)
+class TokenStatisticsAccumulator:
+    """Accumulates the StreamedText statistics from batches of token ids.
+
+    The token ids of each batch are discarded after the update, so the memory usage is given by the vocabulary size
+    and the per-line lengths (two integers per non-empty line, kept for the sequence-level metrics and their
+    quantile digests).
+
+    Args:
+        vocab (list[str]): tokenizer vocabulary (token strings ordered by their ids)
+    """
+
+    vocab: np.ndarray = field(converter=lambda v: np.asarray(v, dtype=object))
+
+    _token_bytes: np.ndarray = field(init=False)
+    _counts: np.ndarray = field(init=False)
+    _first_seen: np.ndarray = field(init=False)
+    _sequence_lengths: list[np.ndarray] = field(init=False, factory=list)
+    _sequence_bytes: list[np.ndarray] = field(init=False, factory=list)
+    _num_tokens: int = field(init=False, default=0)
+
+    def __attrs_post_init__(self) -> None:
+        """Initialize the per-token statistics."""
+        self._token_bytes = np.fromiter(
+            (len(tok.encode("utf-8")) for tok in self.vocab), dtype=np.int64, count=len(self.vocab)
+        )
+        self._counts = np.zeros(len(self.vocab), dtype=np.int64)
+        self._first_seen = np.full(len(self.vocab), np.iinfo(np.int64).max, dtype=np.int64)
+
+    def update(self, ids: np.ndarray, lengths: np.ndarray) -> None:
+        """Add a batch of lines (their concatenated token ids and the number of tokens of each line)."""
+        if ids.size > 0:
+            if ids.max() >= len(self.vocab):
+                err_msg = f"Token id {ids.max()} is outside of the vocabulary (size {len(self.vocab)})."
+                raise ValueError(err_msg)
+            self._counts += np.bincount(ids, minlength=len(self.vocab))
+            unique_ids, first_index = np.unique(ids, return_index=True)
+            self._first_seen[unique_ids] = np.minimum(self._first_seen[unique_ids], self._num_tokens + first_index)
+
+        # the empty lines are ignored (as in the loaded token-id files)
+        line_ends = np.cumsum(lengths)
+        nonempty = lengths > 0
+        byte_offsets = np.concatenate([[0], np.cumsum(self._token_bytes[ids])])
+        sequence_bytes = (byte_offsets[line_ends] - byte_offsets[line_ends - lengths])[nonempty]
+        self._sequence_lengths.append(lengths[nonempty])
+        self._sequence_bytes.append(sequence_bytes)
+        self._num_tokens += int(ids.size)
+
+    def finalize(self) -> StreamedText:
+        """Return the accumulated statistics (identical to the statistics of the loaded tokenized text)."""
+        present = np.flatnonzero(self._counts)
+        order = present[np.argsort(self._first_seen[present], kind="stable")]
+        vocabulary = Counter()
+        first_occurrences = []
+        for tok, count, first in zip(
+            self.vocab[order].tolist(), self._counts[order].tolist(), self._first_seen[order].tolist(), strict=True
+        ):
+            # the token ids with the same string representation are merged
+            if tok not in vocabulary:
+                first_occurrences.append(first)
+            vocabulary[tok] += count
+        empty = np.zeros(0, dtype=np.int64)
+        return StreamedText(
+            vocabulary=vocabulary,
+            sequence_lengths=np.concatenate(self._sequence_lengths) if self._sequence_lengths else empty,
+            sequence_bytes=np.concatenate(self._sequence_bytes) if self._sequence_bytes else empty,
+            first_occurrences=np.array(first_occurrences, dtype=np.int64),
+        )
+
+
+@define(kw_only=True)
+class TokCollateStreamedData(TokCollateData):
+    """TokCollateData providing only the streamed statistics of the system outputs (not their texts).
+
+    Supports the metrics based on the vocabularies and the sequence lengths (get_vocabulary, get_sequence_lengths).
+
+    Args:
+        streamed (dict): {system: {language: StreamedText}} statistics
+    """
+
+    streamed: dict[str, dict[str, StreamedText]] = field(validator=validators.instance_of(dict), repr=False)
+
+    def __attrs_post_init__(self) -> None:
+        """Check the streamed statistics."""
+        if not self.systems:
+            self.systems = list(self.streamed.keys())
+        missing = [
+            f"{system_label}/{lang}"
+            for system_label in self.systems
+            for lang in self.languages
+            if lang not in self.streamed.get(system_label, {})
+        ]
+        if missing:
+            err_msg = f"Missing streamed statistics of: {missing}"
+            raise ValueError(err_msg)
+        self._data = {}
+        self._load_auxiliary_texts()
+
+    def get_system_text(self, system_label: str, language: str | None = None) -> TextType:
+        err_msg = (
+            f"The text of {system_label} ({language}) is not available in the streaming mode. "
+            "Only the metrics based on the vocabularies and the sequence lengths are supported."
+        )
+        raise NotImplementedError(err_msg)
+
+    def get_vocabulary(self, system_label: str, language: str | None = None) -> Counter:
+        if language is not None:
+            return self.streamed[system_label][language].vocabulary
+
+        def compute() -> Counter:
+            vocabulary = Counter()
+            for lang in self.languages:
+                vocabulary.update(self.streamed[system_label][lang].vocabulary)
+            return vocabulary
+
+        return self._get_cached(self._vocab_cache, (system_label, language), compute)
+
+    def get_sequence_lengths(
+        self, system_label: str, language: str | None = None, *, use_bytes: bool = False
+    ) -> np.ndarray:
+        languages = [language] if language is not None else self.languages
+        texts = [self.streamed[system_label][lang] for lang in languages]
+        lengths = [text.sequence_bytes if use_bytes else text.sequence_lengths for text in texts]
+        return lengths[0] if len(lengths) == 1 else np.concatenate(lengths)
+
+    def get_first_occurrences(self, system_label: str, language: str | None = None) -> np.ndarray:
+        if language is None or self.streamed[system_label][language].first_occurrences is None:
+            return super().get_first_occurrences(system_label, language)
+        return self.streamed[system_label][language].first_occurrences
+
+    def num_tokens(self, system_label: str | None = None, language: str | None = None) -> int:
+        systems = self.systems if system_label is None else [system_label]
+        return sum(self.get_vocabulary(system, language).total() for system in systems)
+
+    def add_system(self, system_label: str, **kwargs) -> None:  # noqa: ANN003
+        err_msg = "Systems cannot be added to the streamed data."
+        raise NotImplementedError(err_msg)
+
+
+@define(kw_only=True)
+class StreamingScorer:
+    """Fused tokenize-and-score pipeline, which does not write (or keep) the tokenized texts.
+
+    The plaintext of each language is tokenized in batches (see TokenizationRunner) and the token ids are fed
+    directly into the statistics used by the metrics (token counts, line lengths and byte lengths), then discarded.
+    The metrics are configured in the same way as in TokCollateScorer (scorer.metrics) and give the same results
+    as scoring the outputs of the `tokenize` command.
+
+    Args:
+        config (DictConfig): TokCollate configuration
+
+    OmegaConf Args:
+        tokenize.input_dir: location of the plaintext `{lang}.{file_suffix}` files
+        tokenize.tokenizers: tokenizer specifications keyed by the system labels (see TokenizationRunner)
+        tokenize.languages: (optional) list of the processed languages (defaults to all the input files)
+        tokenize.file_suffix: suffix of the plaintext files
+        tokenize.num_workers: number of worker processes per tokenizer
+        tokenize.shard_size: number of lines encoded in a single batch
+        scorer.output_dir: (optional) target location for saving the scorer results
+        scorer.languages_info: (optional) languages_info JSON file
+        scorer.metrics: list of metrics and their configurations (dict)
+        scorer.max_workers: (optional) number of metrics scored in parallel
+        scorer.histograms: (optional) length histogram options (see LengthHistograms)
+        scorer.line_outputs: (optional) per-line output options (see LineOutputs)
+        scorer.overlap: (optional) vocabulary overlap options (see VocabularyOverlap)
+        scorer.stats_cube: save the stats cube of the streamed statistics (see TokCollateScorer)
+    """
+
+    config: DictConfig = field(validator=validators.instance_of(DictConfig))
+
+    runner: TokenizationRunner = field(init=False)
+    languages_info: dict[str, LanguageInfo] = field(init=False, default=None)
+    session: TokCollateSession = field(init=False, default=None)
+
+    def __attrs_post_init__(self) -> None:
+        """Create the tokenization runner."""
+        tokenize_config = self.config.tokenize
+        self.runner = TokenizationRunner(
+            tokenizers=OmegaConf.to_container(tokenize_config.tokenizers, resolve=True),
+            input_dir=tokenize_config.input_dir,
+            output_dir=self.config.scorer.get("output_dir", None),
+            languages=tokenize_config.get("languages", None),
+            file_suffix=tokenize_config.get("file_suffix", "txt"),
+            num_workers=tokenize_config.get("num_workers", 1),
+            shard_size=tokenize_config.get("shard_size", 10000),
+        )
+        if self.config.scorer.get("languages_info", None) is not None:
+            with Path(self.config.scorer.languages_info).open("r", encoding="utf-8") as fh:
+                self.languages_info = {lang: LanguageInfo.create_entry(entry) for lang, entry in json.load(fh).items()}
+
+    def stream_system(self, system_label: str, spec: dict[str, Any]) -> dict[str, StreamedText]:
+        """Tokenize the plaintext with a single tokenizer and return the statistics of each language."""
+        streamed = {}
+        logger.info("Streaming %d languages through %s...", len(self.runner.languages), system_label)
+        with self.runner.create_executor(spec) as executor:
+            vocab = self.runner.get_vocab(executor)
+            for lang in self.runner.languages:
+                stats = TokenizationStats(system=system_label, language=lang)
+                accumulator = TokenStatisticsAccumulator(vocab=vocab)
+                for ids, lengths in self.runner.encode_file(executor, self.runner.input_file(lang), stats):
+                    accumulator.update(ids, lengths)
+                streamed[lang] = accumulator.finalize()
+                self.runner.add_stats(stats)
+        return streamed
+
+    def run(self) -> dict[str, dict[str, np.ndarray]]:
+        """Tokenize the plaintext with all the tokenizers and score the metrics (the TokCollateScorer.run output)."""
+        streamed = {
+            system_label: self.stream_system(system_label, spec)
+            for system_label, spec in self.runner.tokenizers.items()
+        }
+        data = TokCollateStreamedData(
+            streamed=streamed,
+            systems=list(streamed.keys()),
+            languages=self.runner.languages,
+            languages_info=self.languages_info,
+        )
+        self.session = TokCollateSession(data=data, max_workers=self.config.scorer.get("max_workers", 1))
+        results = self.session.run(
+            self.config.scorer.metrics,
+            output_dir=self.runner.output_dir,
+            histograms=self.config.scorer.get("histograms", None),
+            line_outputs=self.config.scorer.get("line_outputs", None),
+            overlap=self.config.scorer.get("overlap", None),
+            stats_cube=self.config.scorer.get("stats_cube", False),
+        )
+        self.runner.save_stats()
+        return results
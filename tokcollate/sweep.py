@@ -0,0 +1,192 @@
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from attrs import define, field
+from omegaconf import DictConfig, OmegaConf
+
+from tokcollate.scorer import TokCollateScorer
+from tokcollate.tokenization import TokenizationRunner, TokenizationStats
+from tokcollate.utils import TOKEN_IDS_SUFFIX, concat_files
+
+logger = logging.getLogger(__name__)
+
+# special token settings of scripts/train_tokenizer_and_encode_text.py
+SPM_DEFAULT_ARGS = {"bos_id": -1, "eos_id": 0, "unk_id": 1}
+
+
+def expand_grid(grid: dict[str, list]) -> list[dict[str, Any]]:
+    """Return all the combinations of the grid values (in the order of the grid keys)."""
+    keys = list(grid.keys())
+    return [dict(zip(keys, values, strict=True)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def sweep_label(params: dict[str, Any], prefix: str = "spm") -> str:
+    """Return a system label (usable as a file name) identifying the swept parameter values."""
+    return "_".join([prefix, *(f"{key}-{value}" for key, value in params.items())])
+
+
+def train_sentencepiece(model_prefix: Path, train_file: Path, **trainer_args) -> Path:  # noqa: ANN003
+    """Train a SentencePiece model and return the location of the model file.
+
+    Args:
+        model_prefix (Path): prefix of the created .model and .vocab files
+        train_file (Path): training corpus
+        **trainer_args: additional SentencePieceTrainer parameters
+    """
+    import sentencepiece as spm  # noqa: PLC0415
+
+    logger.info("Training model %s...", model_prefix)
+    spm.SentencePieceTrainer.train(
+        input=str(train_file), model_prefix=str(model_prefix), **{**SPM_DEFAULT_ARGS, **trainer_args}
+    )
+    return Path(f"{model_prefix}.model")
+
+
+@define(kw_only=True)
+class SentencePieceSweep:
+    """Trains, encodes and scores a grid of SentencePiece tokenizers in a single job.
+
+    The training corpus is prepared only once and shared by all the trainings, which run in parallel processes.
+    The `{eval_dir}/{lang}.{file_suffix}` evaluation files are then encoded by each model (see TokenizationRunner)
+    and all the models are scored together by a single TokCollateScorer run, so the dataset-side data (e.g. the input
+    and reference texts) is loaded only once. The existing models and encoded files are reused, so an interrupted
+    sweep can be simply restarted.
+
+    Layout of the output_dir:
+        train.txt: the concatenated training corpus
+        models/{label}.model: the trained models
+        tokenized/{label}/{lang}.ids.npz: the encoded evaluation data
+        results/: the scorer results (unless scorer.output_dir is set)
+
+    Args:
+        train_datasets (list[Path]): training corpora
+        eval_dir (Path): location of the plaintext evaluation files
+        output_dir (Path): target location of the sweep outputs
+        grid (dict[str, list]): swept SentencePieceTrainer parameter values (e.g. vocab_size, model_type)
+        trainer_args (dict): fixed SentencePieceTrainer parameters
+        languages (list[str]): (optional) evaluation languages. Defaults to all the files in the eval_dir.
+        file_suffix (str): suffix of the evaluation files
+        num_workers (int): number of models trained in parallel
+        encode_workers (int): number of worker processes encoding the evaluation data
+        shard_size (int): number of lines encoded in a single batch
+    """
+
+    train_datasets: list[Path] = field(converter=lambda paths: [Path(path) for path in paths])
+    eval_dir: Path = field(converter=Path)
+    output_dir: Path = field(converter=Path)
+    grid: dict[str, list] = field(converter=dict)
+    trainer_args: dict[str, Any] = field(converter=dict, factory=dict)
+    languages: list[str] = field(converter=lambda langs: list(langs) if langs is not None else None, default=None)
+    file_suffix: str = field(converter=str, default="txt")
+    num_workers: int = field(converter=int, default=1)
+    encode_workers: int = field(converter=int, default=1)
+    shard_size: int = field(converter=int, default=10000)
+
+    encode_stats: list[TokenizationStats] = field(init=False, factory=list)
+
+    @classmethod
+    def from_config(cls: "SentencePieceSweep", config: DictConfig) -> "SentencePieceSweep":
+        """Create the sweep from the sweep section of a TokCollate config.
+
+        OmegaConf Args:
+            sweep.train_datasets: training corpora
+            sweep.eval_dir: location of the plaintext evaluation files
+            sweep.output_dir: target location of the sweep outputs
+            sweep.grid: swept SentencePieceTrainer parameter values
+            sweep.trainer_args: (optional) fixed SentencePieceTrainer parameters
+            sweep.languages: (optional) evaluation languages
+            sweep.file_suffix: suffix of the evaluation files
+            sweep.num_workers: number of models trained in parallel
+            sweep.encode_workers: number of worker processes encoding the evaluation data
+            sweep.shard_size: number of lines encoded in a single batch
+        """
+        sweep_config = OmegaConf.to_container(config.sweep, resolve=True)
+        return cls(**sweep_config)
+
+    @property
+    def configs(self) -> dict[str, dict[str, Any]]:
+        """The swept parameter combinations keyed by their system labels."""
+        return {sweep_label(params): params for params in expand_grid(self.grid)}
+
+    @property
+    def corpus_file(self) -> Path:
+        return Path(self.output_dir, "train.txt")
+
+    def model_file(self, system_label: str) -> Path:
+        return Path(self.output_dir, "models", f"{system_label}.model")
+
+    @property
+    def tokenized_dir(self) -> Path:
+        return Path(self.output_dir, "tokenized")
+
+    def prepare_corpus(self) -> Path:
+        """Concatenate the training corpora (only once)."""
+        if not self.corpus_file.exists():
+            logger.info("Preparing the training corpus %s...", self.corpus_file)
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.corpus_file.with_suffix(".tmp")
+            concat_files(self.train_datasets, tmp_file)
+            tmp_file.rename(self.corpus_file)
+        return self.corpus_file
+
+    def train(self) -> dict[str, Path]:
+        """Train the missing models in parallel and return the model files keyed by the system labels."""
+        corpus_file = self.prepare_corpus()
+        Path(self.output_dir, "models").mkdir(parents=True, exist_ok=True)
+        missing = {label: params for label, params in self.configs.items() if not self.model_file(label).exists()}
+        logger.info("Training %d models (%d already trained)...", len(missing), len(self.configs) - len(missing))
+        if missing:
+            with ProcessPoolExecutor(max_workers=max(min(self.num_workers, len(missing)), 1)) as executor:
+                futures = [
+                    executor.submit(
+                        train_sentencepiece,
+                        self.model_file(label).with_suffix(""),
+                        corpus_file,
+                        **{**self.trainer_args, **params},
+                    )
+                    for label, params in missing.items()
+                ]
+                for future in futures:
+                    future.result()
+        return {label: self.model_file(label) for label in self.configs}
+
+    def encode(self) -> list[TokenizationStats]:
+        """Encode the evaluation data with all the trained models (into the token-id format)."""
+        runner = TokenizationRunner(
+            tokenizers={
+                label: {"type": "sentencepiece", "model_file": str(self.model_file(label))} for label in self.configs
+            },
+            input_dir=self.eval_dir,
+            output_dir=self.tokenized_dir,
+            languages=self.languages,
+            file_suffix=self.file_suffix,
+            num_workers=self.encode_workers,
+            shard_size=self.shard_size,
+        )
+        self.languages = runner.languages
+        self.encode_stats = runner.run()
+        return self.encode_stats
+
+    def scorer_config(self, config: DictConfig) -> DictConfig:
+        """Return the config of the scorer run over all the swept systems (using the scorer.metrics of the config)."""
+        scorer_config = OmegaConf.merge(
+            {"output_dir": str(Path(self.output_dir, "results"))},
+            config.get("scorer", {}),
+            {
+                "input_dir": str(self.tokenized_dir),
+                "systems": list(self.configs.keys()),
+                "languages": self.languages,
+                "file_suffix": TOKEN_IDS_SUFFIX,
+            },
+        )
+        return OmegaConf.merge(config, {"scorer": scorer_config})
+
+    def run(self, config: DictConfig) -> dict[str, dict[str, np.ndarray]]:
+        """Train and encode the whole grid and score the models with the scorer.metrics of the config."""
+        self.train()
+        self.encode()
+        return TokCollateScorer(config=self.scorer_config(config)).run()
@@ -0,0 +1,240 @@
+import contextlib
+import gc
+import json
+import logging
+import os
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from attrs import asdict, converters, define, field, validators
+
+from tokcollate.tokenization import TokCollateTokenizer, build_tokenizer
+
+logger = logging.getLogger(__name__)
+
+THROUGHPUT_STATISTICS = ("bytes_per_second", "tokens_per_second", "latency_p50", "latency_p99")
+
+
+@contextlib.contextmanager
+def pin_cpus(cpus: list[int] | None) -> Iterator[None]:
+    """Restrict the current process to the given CPUs (restoring the original affinity afterwards).
+
+    Does nothing if no CPUs are given or the platform does not support setting the CPU affinity.
+    """
+    if not cpus:
+        yield
+        return
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("The CPU pinning is not supported on this platform.")
+        yield
+        return
+    original = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, set(cpus))
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, original)
+
+
+@define(kw_only=True)
+class ThroughputStats:
+    """Encoding speed of a tokenizer on the plaintext of a single language.
+
+    Args:
+        system (str): system (tokenizer) label
+        language (str): language label
+        num_lines (int): number of the encoded lines
+        num_bytes (int): number of the utf-8 bytes of the encoded lines
+        num_tokens (int): number of the produced tokens
+        trial_times (list[float]): total encoding time of each trial (in seconds)
+        latencies (np.ndarray): median encoding time of each line across the trials (in seconds)
+    """
+
+    system: str
+    language: str
+    num_lines: int = 0
+    num_bytes: int = 0
+    num_tokens: int = 0
+    trial_times: list[float] = field(factory=list)
+    latencies: np.ndarray = field(factory=lambda: np.zeros(0), repr=False)
+
+    @property
+    def wall_time(self) -> float:
+        """Median total encoding time of the trials."""
+        return float(np.median(self.trial_times)) if self.trial_times else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.num_bytes / self.wall_time if self.wall_time > 0 else 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.num_tokens / self.wall_time if self.wall_time > 0 else 0.0
+
+    def latency(self, quantile: float) -> float:
+        """Return the quantile of the per-line encoding latencies (in seconds)."""
+        return float(np.quantile(self.latencies, quantile)) if self.latencies.size else np.nan
+
+    def get(self, statistic: str) -> float:
+        """Return one of the THROUGHPUT_STATISTICS."""
+        if statistic == "latency_p50":
+            return self.latency(0.5)
+        if statistic == "latency_p99":
+            return self.latency(0.99)
+        if statistic in ("bytes_per_second", "tokens_per_second"):
+            return getattr(self, statistic)
+        err_msg = f"Unknown throughput statistic: {statistic}"
+        raise ValueError(err_msg)
+
+    def to_dict(self) -> dict[str, Any]:
+        stats = asdict(self, filter=lambda attribute, _: attribute.name != "latencies")
+        return {**stats, **{statistic: self.get(statistic) for statistic in THROUGHPUT_STATISTICS}}
+
+
+def measure_encode_throughput(
+    tokenizer: TokCollateTokenizer,
+    lines: list[str],
+    *,
+    stats: ThroughputStats,
+    warmup: int = 100,
+    num_trials: int = 3,
+) -> ThroughputStats:
+    """Measure the encoding speed of the tokenizer by encoding the lines one by one.
+
+    The first `warmup` lines are encoded before the measurement (e.g. to fill the tokenizer caches). Each of
+    the `num_trials` trials then encodes all the lines, timing every line, with the garbage collection disabled.
+    The throughput uses the median trial time and the latencies the median time of each line across the trials.
+
+    Args:
+        tokenizer (TokCollateTokenizer): measured tokenizer
+        lines (list[str]): plaintext lines
+        stats (ThroughputStats): statistics filled with the measurement
+        warmup (int): number of the lines encoded before the measurement
+        num_trials (int): number of the measured passes over the lines
+    """
+    for line in lines[:warmup]:
+        tokenizer.encode_batch([line])
+    stats.num_lines = len(lines)
+    stats.num_bytes = sum(len(line.encode("utf-8")) for line in lines)
+    stats.num_tokens = sum(len(ids) for ids in tokenizer.encode_batch(lines))
+
+    times = np.zeros((num_trials, len(lines)), dtype=np.int64)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for trial in range(num_trials):
+            for i, line in enumerate(lines):
+                start = time.perf_counter_ns()
+                tokenizer.encode_batch([line])
+                times[trial, i] = time.perf_counter_ns() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+    stats.trial_times = (times.sum(axis=1) / 1e9).tolist()
+    stats.latencies = np.median(times, axis=0) / 1e9
+    return stats
+
+
+def read_lines(path: Path, max_lines: int | None = None) -> list[str]:
+    """Read the (stripped, non-empty) plaintext lines of a file."""
+    with Path(path).open("r", encoding="utf-8") as fh:
+        lines = [line.strip() for line in fh]
+    lines = [line for line in lines if line]
+    return lines if max_lines is None else lines[:max_lines]
+
+
+@define(kw_only=True)
+class ThroughputBenchmark:
+    """Measures the encoding speed of multiple tokenizers on the per-language plaintext files.
+
+    The `{input_dir}/{lang}.{file_suffix}` inputs follow the layout of the TokenizationRunner inputs.
+
+    Args:
+        tokenizers (dict[str, dict]): tokenizer specifications ({"type": ..., **params}) keyed by the system labels
+        input_dir (Path): location of the plaintext files
+        languages (list[str]): measured languages
+        file_suffix (str): suffix of the plaintext files
+        max_lines (int): (optional) number of the measured lines per language
+        warmup (int): number of the lines encoded before the measurement
+        num_trials (int): number of the measured passes over the lines
+        cpus (list[int]): (optional) CPUs the measurement is pinned to
+        output_dir (Path): (optional) target location of the throughput statistics
+    """
+
+    tokenizers: dict[str, dict[str, Any]] = field(converter=lambda t: {k: dict(v) for k, v in t.items()})
+    input_dir: Path = field(converter=Path)
+    languages: list[str] = field(converter=list)
+    file_suffix: str = field(converter=str, default="txt")
+    max_lines: int = field(converter=converters.optional(int), default=None)
+    warmup: int = field(converter=int, default=100, validator=validators.ge(0))
+    num_trials: int = field(converter=int, default=3, validator=validators.ge(1))
+    cpus: list[int] = field(converter=converters.optional(list), default=None)
+    output_dir: Path = field(converter=converters.optional(Path), default=None)
+
+    stats: list[ThroughputStats] = field(init=False, factory=list)
+
+    _stats_filename = "throughput_stats.json"
+
+    def measure(
+        self, system_label: str, language: str, tokenizer: TokCollateTokenizer | None = None
+    ) -> ThroughputStats:
+        """Measure the encoding speed of a single tokenizer on a single language."""
+        if tokenizer is None:
+            tokenizer = build_tokenizer(self.tokenizers[system_label])
+        lines = read_lines(Path(self.input_dir, f"{language}.{self.file_suffix}"), self.max_lines)
+        with pin_cpus(self.cpus):
+            stats = measure_encode_throughput(
+                tokenizer,
+                lines,
+                stats=ThroughputStats(system=system_label, language=language),
+                warmup=self.warmup,
+                num_trials=self.num_trials,
+            )
+        logger.info(
+            "[%s] %s: %.2f MB/s, %.0f tokens/s, p50 %.1fus, p99 %.1fus",
+            system_label,
+            language,
+            stats.bytes_per_second / 2**20,
+            stats.tokens_per_second,
+            stats.latency(0.5) * 1e6,
+            stats.latency(0.99) * 1e6,
+        )
+        return stats
+
+    def run(self) -> list[ThroughputStats]:
+        """Measure all the tokenizers on all the languages and return the statistics."""
+        for system_label, spec in self.tokenizers.items():
+            tokenizer = build_tokenizer(spec)
+            for lang in self.languages:
+                self.stats.append(self.measure(system_label, lang, tokenizer=tokenizer))
+        self.save_stats()
+        return self.stats
+
+    def to_matrix(self, statistic: str) -> np.ndarray:
+        """Return the (systems, languages) matrix of a statistic (NaN for the missing measurements)."""
+        res = np.full((len(self.tokenizers), len(self.languages)), np.nan)
+        systems, languages = list(self.tokenizers), list(self.languages)
+        for stats in self.stats:
+            res[systems.index(stats.system), languages.index(stats.language)] = stats.get(statistic)
+        return res
+
+    def save_stats(self) -> None:
+        """Save the throughput statistics as JSON (if the output_dir is set)."""
+        if self.output_dir is None:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with Path(self.output_dir, self._stats_filename).open("w") as fh:
+            json.dump([stats.to_dict() for stats in self.stats], fh, sort_keys=True, indent=2)
+
+    def summary(self) -> str:
+        """Return a human-readable per-tokenizer throughput summary."""
+        lines = [f"{'tokenizer':<24} {'language':<16} {'MB/s':>10} {'tokens/s':>12} {'p50 [us]':>10} {'p99 [us]':>10}"]
+        lines.extend(
+            f"{stats.system:<24} {stats.language:<16} {stats.bytes_per_second / 2**20:>10.2f} "
+            f"{stats.tokens_per_second:>12.0f} {stats.latency(0.5) * 1e6:>10.1f} {stats.latency(0.99) * 1e6:>10.1f}"
+            for stats in self.stats
+        )
+        return "\n".join(lines)
@@ -0,0 +1,417 @@
+import gzip
+import importlib
+import itertools
+import json
+import logging
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Self
+
+import numpy as np
+from attrs import asdict, converters, define, field, validators
+
+from tokcollate.utils import TOKEN_IDS_SUFFIX, save_token_ids, save_vocab
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_REGISTRY = {}
+
+
+def register_tokenizer(name: str) -> Callable:
+    """Register a tokenizer backend usable by `tokcollate tokenize` (similar to the register_metric decorator).
+
+    Args:
+        name (str): the name of the tokenizer backend (the `type` field of the tokenizer specification)
+    """
+
+    def register_tokenizer_cls(cls: "TokCollateTokenizer") -> "TokCollateTokenizer":
+        if name in TOKENIZER_REGISTRY:
+            err_msg = f"Cannot register duplicate tokenizer ({name})"
+            raise ValueError(err_msg)
+        if not issubclass(cls, TokCollateTokenizer):
+            err_msg = f"tokenizer module ({name}: {cls.__name__}) must extend TokCollateTokenizer"
+            raise TypeError(err_msg)
+        TOKENIZER_REGISTRY[name] = cls
+        return cls
+
+    return register_tokenizer_cls
+
+
+def build_tokenizer(spec: dict[str, Any]) -> "TokCollateTokenizer":
+    """Build a tokenizer from its specification ({"type": <registered name>, **parameters})."""
+    params = dict(spec)
+    tokenizer_type = params.pop("type")
+    if tokenizer_type not in TOKENIZER_REGISTRY:
+        err_msg = f"Unknown tokenizer type {tokenizer_type}. Available types: [{','.join(TOKENIZER_REGISTRY)}]"
+        raise ValueError(err_msg)
+    return TOKENIZER_REGISTRY[tokenizer_type](**params)
+
+
+@define(kw_only=True)
+class TokCollateTokenizer:
+    """Base class of the tokenizer backends.
+
+    The backends are built inside the worker processes (from their specification), so they only need to be
+    picklable as a specification, not as a loaded model.
+    """
+
+    def encode_batch(self, lines: list[str]) -> list[list[int]]:
+        """Return the token ids of each line."""
+        raise NotImplementedError()
+
+    def get_vocab(self) -> list[str]:
+        """Return the token strings ordered by their ids."""
+        raise NotImplementedError()
+
+
+@register_tokenizer("sentencepiece")
+@define(kw_only=True)
+class SentencePieceTokenizer(TokCollateTokenizer):
+    """SentencePiece model.
+
+    Args:
+        model_file (Path): location of the trained model
+    """
+
+    model_file: Path = field(converter=Path)
+
+    _model: Any = field(init=False, default=None)
+
+    def __attrs_post_init__(self) -> None:
+        """Load the model."""
+        import sentencepiece as spm  # noqa: PLC0415
+
+        self._model = spm.SentencePieceProcessor(model_file=str(self.model_file))
+
+    def encode_batch(self, lines: list[str]) -> list[list[int]]:
+        return self._model.encode(lines)
+
+    def get_vocab(self) -> list[str]:
+        return [self._model.id_to_piece(i) for i in range(self._model.get_piece_size())]
+
+
+@register_tokenizer("huggingface")
+@define(kw_only=True)
+class HuggingFaceTokenizer(TokCollateTokenizer):
+    """HuggingFace (transformers) tokenizer. The special tokens are not added.
+
+    Args:
+        name (str): model name or path passed to AutoTokenizer.from_pretrained
+        kwargs (dict): additional AutoTokenizer.from_pretrained parameters
+    """
+
+    name: str = field(converter=str)
+    kwargs: dict[str, Any] = field(factory=dict)
+
+    _tokenizer: Any = field(init=False, default=None)
+
+    def __attrs_post_init__(self) -> None:
+        """Load the tokenizer."""
+        from transformers import AutoTokenizer  # noqa: PLC0415
+
+        self._tokenizer = AutoTokenizer.from_pretrained(self.name, **self.kwargs)
+
+    def encode_batch(self, lines: list[str]) -> list[list[int]]:
+        return self._tokenizer(lines, add_special_tokens=False)["input_ids"]
+
+    def get_vocab(self) -> list[str]:
+        return self._tokenizer.convert_ids_to_tokens(list(range(len(self._tokenizer))))
+
+
+@register_tokenizer("callable")
+@define(kw_only=True)
+class CallableTokenizer(TokCollateTokenizer):
+    """Pluggable tokenizer created by a user-provided factory.
+
+    The factory (`module:attribute` import path) is called with the kwargs and must return an object implementing
+    the TokCollateTokenizer interface (encode_batch and get_vocab).
+
+    Args:
+        factory (str): import path of the factory
+        kwargs (dict): factory parameters
+    """
+
+    factory: str = field(validator=validators.instance_of(str))
+    kwargs: dict[str, Any] = field(factory=dict)
+
+    _tokenizer: Any = field(init=False, default=None)
+
+    def __attrs_post_init__(self) -> None:
+        """Create the tokenizer."""
+        module_name, _, attr = self.factory.partition(":")
+        self._tokenizer = getattr(importlib.import_module(module_name), attr)(**self.kwargs)
+
+    def encode_batch(self, lines: list[str]) -> list[list[int]]:
+        return self._tokenizer.encode_batch(lines)
+
+    def get_vocab(self) -> list[str]:
+        return list(self._tokenizer.get_vocab())
+
+
+# tokenizer of the current worker process
+_WORKER_TOKENIZER = None
+
+
+def _init_worker(spec: dict[str, Any]) -> None:
+    global _WORKER_TOKENIZER  # noqa: PLW0603
+    _WORKER_TOKENIZER = build_tokenizer(spec)
+
+
+def _get_worker_vocab() -> list[str]:
+    return _WORKER_TOKENIZER.get_vocab()
+
+
+def _encode_shard(lines: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Encode a shard of lines, returning the concatenated token ids and the line lengths."""
+    sequences = _WORKER_TOKENIZER.encode_batch(lines)
+    lengths = np.fromiter((len(seq) for seq in sequences), dtype=np.int64, count=len(sequences))
+    ids = np.fromiter(itertools.chain.from_iterable(sequences), dtype=np.int64, count=int(lengths.sum()))
+    return ids, lengths
+
+
+@define
+class _InProcessExecutor:
+    """Minimal executor running the tasks directly (used with a single worker)."""
+
+    spec: dict[str, Any]
+
+    def __attrs_post_init__(self) -> None:
+        _init_worker(self.spec)
+
+    def submit(self, fn: Callable, *args) -> Future:  # noqa: ANN002
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *args) -> None:  # noqa: ANN002
+        return
+
+
+@define(kw_only=True)
+class TokenizationStats:
+    """Throughput of tokenizing a single (system, language) input file."""
+
+    system: str
+    language: str
+    num_lines: int = 0
+    num_tokens: int = 0
+    num_bytes: int = 0
+    wall_time: float = 0.0
+
+    @property
+    def tokens_per_second(self) -> float:
+        return self.num_tokens / self.wall_time if self.wall_time > 0 else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.num_bytes / self.wall_time if self.wall_time > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {**asdict(self), "tokens_per_second": self.tokens_per_second, "bytes_per_second": self.bytes_per_second}
+
+
+def read_shards(path: Path, shard_size: int) -> Iterator[tuple[list[str], int]]:
+    """Yield the stripped lines of a plaintext file in shards (together with the number of read bytes)."""
+    opener = gzip.open if Path(path).suffix == ".gz" else open
+    with opener(path, "rb") as fh:
+        while True:
+            raw_lines = list(itertools.islice(fh, shard_size))
+            if not raw_lines:
+                return
+            yield [line.decode("utf-8").strip() for line in raw_lines], sum(len(line) for line in raw_lines)
+
+
+@define(kw_only=True)
+class TokenizationRunner:
+    """Tokenizes plaintext files with multiple tokenizers using batch encoding in a process pool.
+
+    The `{input_dir}/{lang}.{file_suffix}` inputs are read in shards of `shard_size` lines, which are encoded in
+    parallel and written to `{output_dir}/{system}/{lang}.ids.npz` in the compact token-id format (together with
+    the `{output_dir}/{system}/vocab.json` vocabulary), or as whitespace-separated tokens into
+    `{output_dir}/{system}/{lang}.txt`. The outputs can be scored directly (with the matching scorer.file_suffix).
+
+    Args:
+        tokenizers (dict[str, dict]): tokenizer specifications ({"type": ..., **params}) keyed by the system labels
+        input_dir (Path): location of the plaintext files
+        output_dir (Path): target location of the tokenized files (and the throughput statistics)
+        languages (list[str]): (optional) processed languages. Defaults to all the files in the input_dir.
+        file_suffix (str): suffix of the plaintext files
+        output_format (str): `ids` (compact token-id format) or `text`
+        num_workers (int): number of worker processes (per tokenizer)
+        shard_size (int): number of lines encoded in a single batch
+        overwrite (bool): re-tokenize already existing outputs
+    """
+
+    tokenizers: dict[str, dict[str, Any]] = field(converter=lambda t: {k: dict(v) for k, v in t.items()})
+    input_dir: Path = field(converter=Path)
+    output_dir: Path = field(converter=converters.optional(Path), default=None)
+    languages: list[str] = field(converter=lambda langs: list(langs) if langs is not None else None, default=None)
+    file_suffix: str = field(converter=str, default="txt")
+    output_format: str = field(validator=validators.in_(["ids", "text"]), default="ids")
+    num_workers: int = field(converter=int, default=1)
+    shard_size: int = field(converter=int, default=10000)
+    overwrite: bool = field(default=False)
+
+    stats: list[TokenizationStats] = field(init=False, factory=list)
+
+    _stats_filename = "tokenize_stats.json"
+
+    def __attrs_post_init__(self) -> None:
+        """Set the default languages."""
+        if self.languages is None:
+            suffix = f".{self.file_suffix}"
+            self.languages = sorted(
+                path.name.removesuffix(suffix) for path in self.input_dir.iterdir() if path.name.endswith(suffix)
+            )
+
+    def output_file(self, system_label: str, language: str) -> Path:
+        suffix = TOKEN_IDS_SUFFIX if self.output_format == "ids" else "txt"
+        return Path(self.output_dir, system_label, f"{language}.{suffix}")
+
+    def run(self) -> list[TokenizationStats]:
+        """Tokenize all the input files with all the tokenizers and return the throughput statistics."""
+        if self.output_dir is None:
+            err_msg = "The output_dir is required for writing the tokenized files."
+            raise ValueError(err_msg)
+        for system_label, spec in self.tokenizers.items():
+            outputs = {lang: self.output_file(system_label, lang) for lang in self.languages}
+            if not self.overwrite:
+                outputs = {lang: path for lang, path in outputs.items() if not path.exists()}
+            if not outputs:
+                logger.info("All %s outputs exist. Skipping...", system_label)
+                continue
+            Path(self.output_dir, system_label).mkdir(parents=True, exist_ok=True)
+
+            logger.info("Tokenizing %d languages with %s (%d workers)...", len(outputs), system_label, self.num_workers)
+            with self.create_executor(spec) as executor:
+                vocab = self.get_vocab(executor)
+                if self.output_format == "ids":
+                    save_vocab(Path(self.output_dir, system_label, "vocab.json"), vocab)
+                for lang, output_file in outputs.items():
+                    stats = TokenizationStats(system=system_label, language=lang)
+                    self._tokenize_file(executor, self.input_file(lang), output_file, vocab, stats)
+                    self.add_stats(stats)
+        self.save_stats()
+        return self.stats
+
+    def input_file(self, language: str) -> Path:
+        return Path(self.input_dir, f"{language}.{self.file_suffix}")
+
+    def create_executor(self, spec: dict[str, Any]) -> ProcessPoolExecutor:
+        """Create a pool of worker processes with the tokenizer built from the spec (or an in-process executor)."""
+        if self.num_workers > 1:
+            return ProcessPoolExecutor(max_workers=self.num_workers, initializer=_init_worker, initargs=(spec,))
+        return _InProcessExecutor(spec)
+
+    def get_vocab(self, executor: ProcessPoolExecutor) -> list[str]:
+        """Return the vocabulary of the executor tokenizer."""
+        return executor.submit(_get_worker_vocab).result()
+
+    def encode_file(
+        self, executor: ProcessPoolExecutor, input_file: Path, stats: TokenizationStats
+    ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Encode the input file shard by shard, yielding the (token ids, line lengths) of each shard in order.
+
+        Only a bounded number of shards is in flight at once, so the memory usage does not grow with the file size.
+        The line, byte and token counts (and the wall time) are accumulated in the stats.
+        """
+        start = time.perf_counter()
+        pending = []
+        max_pending = 2 * max(self.num_workers, 1)
+        for lines, num_bytes in read_shards(input_file, self.shard_size):
+            stats.num_lines += len(lines)
+            stats.num_bytes += num_bytes
+            pending.append(executor.submit(_encode_shard, lines))
+            if len(pending) >= max_pending:
+                ids, lengths = pending.pop(0).result()
+                stats.num_tokens += int(ids.size)
+                yield ids, lengths
+        for future in pending:
+            ids, lengths = future.result()
+            stats.num_tokens += int(ids.size)
+            yield ids, lengths
+        stats.wall_time += time.perf_counter() - start
+
+    def add_stats(self, stats: TokenizationStats) -> None:
+        """Record (and log) the throughput statistics of a processed file."""
+        self.stats.append(stats)
+        logger.info(
+            "[%s] %s: %d lines, %d tokens, %.1fs (%.0f tokens/s, %.2f MB/s)",
+            stats.system,
+            stats.language,
+            stats.num_lines,
+            stats.num_tokens,
+            stats.wall_time,
+            stats.tokens_per_second,
+            stats.bytes_per_second / 2**20,
+        )
+
+    def save_stats(self) -> None:
+        """Save the throughput statistics as JSON (if the output_dir is set)."""
+        if self.output_dir is None:
+            return
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        with Path(self.output_dir, self._stats_filename).open("w") as fh:
+            json.dump([stats.to_dict() for stats in self.stats], fh, sort_keys=True, indent=2)
+
+    def summary(self) -> str:
+        """Return a human-readable per-tokenizer throughput summary."""
+        lines = [f"{'tokenizer':<24} {'languages':>10} {'tokens':>12} {'wall [s]':>10} {'tokens/s':>12}"]
+        for system_label in self.tokenizers:
+            stats = [s for s in self.stats if s.system == system_label]
+            num_tokens = sum(s.num_tokens for s in stats)
+            wall_time = sum(s.wall_time for s in stats)
+            throughput = f"{num_tokens / wall_time:.0f}" if wall_time > 0 else "-"
+            lines.append(f"{system_label:<24} {len(stats):>10} {num_tokens:>12} {wall_time:>10.2f} {throughput:>12}")
+        return "\n".join(lines)
+
+    def _tokenize_file(
+        self,
+        executor: ProcessPoolExecutor,
+        input_file: Path,
+        output_file: Path,
+        vocab: list[str],
+        stats: TokenizationStats,
+    ) -> None:
+        """Tokenize a single file, writing the shards as they are encoded.
+
+        The output is written into a temporary file, which replaces the output file only once complete, so an
+        interrupted run does not leave a truncated output (skipped as finished by the later runs).
+        """
+        tmp_file = output_file.with_name(f"{output_file.name}.tmp")
+        shards = self.encode_file(executor, input_file, stats)
+        if self.output_format == "ids":
+            ids, lengths = self._collect_ids(shards, vocab_size=len(vocab))
+            start = time.perf_counter()
+            with tmp_file.open("wb") as fh:
+                save_token_ids(fh, ids, lengths)
+            stats.wall_time += time.perf_counter() - start
+        else:
+            tokens = np.asarray(vocab, dtype=object)
+            with tmp_file.open("w", encoding="utf-8") as fh:
+                for ids, lengths in shards:
+                    shard_tokens = tokens[ids].tolist()
+                    bounds = np.concatenate([[0], np.cumsum(lengths)])
+                    fh.writelines(" ".join(shard_tokens[s:e]) + "\n" for s, e in itertools.pairwise(bounds))
+        tmp_file.replace(output_file)
+
+    @staticmethod
+    def _collect_ids(shards: Iterator[tuple[np.ndarray, np.ndarray]], vocab_size: int) -> tuple[np.ndarray, np.ndarray]:
+        """Concatenate the shard token ids into a growing buffer (of the smallest sufficient integer type)."""
+        buffer = np.zeros(0, dtype=np.uint16 if vocab_size <= 2**16 else np.uint32)
+        size = 0
+        lengths = []
+        for ids, shard_lengths in shards:
+            if size + ids.size > buffer.size:
+                grown = np.empty(max(2 * buffer.size, size + ids.size), dtype=buffer.dtype)
+                grown[:size] = buffer[:size]
+                buffer = grown
+            buffer[size : size + ids.size] = ids
+            size += ids.size
+            lengths.append(shard_lengths)
+        return buffer[:size], np.concatenate(lengths) if lengths else np.zeros(0, dtype=np.int64)
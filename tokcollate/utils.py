@@ -1,13 +1,19 @@
+import functools
 import gzip
+import itertools
+import json
 import logging
+import shutil
 from collections import Counter
 from pathlib import Path
-from typing import TextIO
+from typing import BinaryIO, TextIO
 
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+COPY_BLOCK_SIZE = 2**20
+
 
 def open_file(file: Path, mode: str) -> TextIO:
     """Return a correct file handle based on the file suffix."""
@@ -24,12 +30,12 @@ def load_text_file(file: Path) -> tuple[str]:
 
 
 def concat_files(input_files: list[Path], output_file: Path) -> None:
-    """Concatenate files from a given list."""
-    with open_file(output_file, "w") as out_fh:
+    """Concatenate files from a given list (copied in large binary blocks, the .gz files are decompressed)."""
+    output_file = Path(output_file)
+    with (gzip.open if output_file.suffix == ".gz" else open)(output_file, "wb") as out_fh:
         for input_file in input_files:
-            with open_file(input_file, "r") as in_fh:
-                for line in in_fh:
-                    print(line, end="", file=out_fh)
+            with (gzip.open if Path(input_file).suffix == ".gz" else open)(input_file, "rb") as in_fh:
+                shutil.copyfileobj(in_fh, out_fh, COPY_BLOCK_SIZE)
 
 
 def remove_dir(directory: Path) -> None:
@@ -56,6 +62,87 @@ def load_tokenized_text_file(file: Path, token_separator: str | None = None) ->
     return [line for line in text if line]
 
 
+TOKEN_IDS_SUFFIX = "ids.npz"
+
+
+def get_vocab_file(token_ids_file: Path) -> Path:
+    """Return the location of the vocabulary of a token-id file.
+
+    The vocabulary is shared by all the files in the directory (`{dir}/vocab.json`, e.g. per-language outputs of
+    a single system) unless a file-specific `{name}.vocab.json` exists (e.g. monolingual system outputs).
+    """
+    token_ids_file = Path(token_ids_file)
+    name = token_ids_file.name.removesuffix(f".{TOKEN_IDS_SUFFIX}")
+    specific = Path(token_ids_file.parent, f"{name}.vocab.json")
+    if specific.exists():
+        return specific
+    return Path(token_ids_file.parent, "vocab.json")
+
+
+def save_vocab(file: Path, vocab: list[str]) -> None:
+    """Save the tokenizer vocabulary (token strings ordered by their ids)."""
+    with Path(file).open("w", encoding="utf-8") as fh:
+        json.dump(list(vocab), fh, ensure_ascii=False)
+
+
+def load_vocab(file: Path) -> list[str]:
+    """Load the tokenizer vocabulary (token strings ordered by their ids)."""
+    with Path(file).open("r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_vocab_array(file: str, mtime_ns: int) -> np.ndarray:  # noqa: ARG001
+    """Load the vocabulary as an object array (cached, since it is shared by the per-language files)."""
+    return np.asarray(load_vocab(file), dtype=object)
+
+
+def save_token_ids(file: Path | BinaryIO, ids: np.ndarray, lengths: np.ndarray) -> None:
+    """Save tokenized lines in the compact token-id format.
+
+    The file is an uncompressed NPZ archive with the concatenated token ids of all lines (`ids`, the smallest
+    sufficient unsigned integer type) and the line boundaries (`offsets`, line i spans ids[offsets[i]:offsets[i+1]]).
+
+    Args:
+        file (Path): output file (should end with .ids.npz) or an open binary file object
+        ids (np.ndarray): concatenated token ids of all lines
+        lengths (np.ndarray): number of tokens of each line
+    """
+    ids = np.asarray(ids)
+    dtype = np.uint16 if ids.size == 0 or ids.max() < 2**16 else np.uint32
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    np.savez(file, ids=ids.astype(dtype, copy=False), offsets=offsets)
+
+
+def load_token_ids(file: Path) -> tuple[np.ndarray, np.ndarray]:
+    """Load the token ids and line offsets of a token-id file (see save_token_ids)."""
+    with np.load(file) as npz:
+        return npz["ids"], npz["offsets"]
+
+
+def load_token_ids_file(file: Path, vocab: list[str] | None = None) -> list[list[str]]:
+    """Load a token-id file as a list of lists of sentence tokens (mapped to the token strings).
+
+    Args:
+        file (Path): location of the token-id file
+        vocab (list[str]): (optional) vocabulary. Loaded from the accompanying vocabulary file by default.
+    """
+    if vocab is None:
+        vocab_file = get_vocab_file(file)
+        vocab = _load_vocab_array(str(vocab_file), vocab_file.stat().st_mtime_ns)
+    ids, offsets = load_token_ids(file)
+    tokens = np.asarray(vocab, dtype=object)[ids.astype(np.int64)].tolist()
+    return [tokens[start:end] for start, end in itertools.pairwise(offsets) if end > start]
+
+
+def load_system_output(file: Path) -> list[list[str]]:
+    """Load a system output file (tokenized text or token ids, based on the file suffix)."""
+    if Path(file).name.endswith(f".{TOKEN_IDS_SUFFIX}"):
+        return load_token_ids_file(file)
+    return load_tokenized_text_file(file)
+
+
 def file_path(path_str: str) -> Path:
     """A file_path type definition for argparse."""
     path = Path(path_str)
@@ -69,15 +156,29 @@ def get_vocabulary(text: list[list[str]]) -> Counter:
     return Counter(tok for line in text for tok in line)
 
 
-def get_unigram_frequencies(text: list[list[str]], vocab: Counter | None = None) -> np.ndarray:
-    """Return a sorted array of vocabulary token frequencies."""
+def get_unigram_frequencies(
+    text: list[list[str]] | None = None, vocab: Counter | None = None, text_vocab: Counter | None = None
+) -> np.ndarray:
+    """Return a sorted array of vocabulary token frequencies.
+
+    Args:
+        text (list[list[str]]): tokenized text (not needed if the text_vocab is provided)
+        vocab (Counter): (optional) vocabulary defining the order of the returned frequencies
+        text_vocab (Counter): (optional) precomputed vocabulary of the text (e.g. TokCollateData.get_vocabulary)
+    """
+    if text_vocab is None:
+        if text is None:
+            err_msg = "Either the text or its vocabulary (text_vocab) must be provided."
+            raise ValueError(err_msg)
+        text_vocab = get_vocabulary(text)
     if vocab is None:
-        return np.array([tok[1] for tok in get_vocabulary(text).most_common()])
-    text_vocab = get_vocabulary(text)
+        return np.array([tok[1] for tok in text_vocab.most_common()])
     return np.array([text_vocab[tok[0]] for tok in vocab.most_common()])
 
 
-def get_unigram_distribution(text: list[list[str]], vocab: Counter | None = None) -> np.ndarray:
+def get_unigram_distribution(
+    text: list[list[str]] | None = None, vocab: Counter | None = None, text_vocab: Counter | None = None
+) -> np.ndarray:
     """Return the token probability distribution of a given text."""
-    unigram_counts = get_unigram_frequencies(text, vocab=vocab)
+    unigram_counts = get_unigram_frequencies(text, vocab=vocab, text_vocab=text_vocab)
     return unigram_counts / unigram_counts.sum()
@@ -3,11 +3,12 @@ import logging
 import sys
 from collections.abc import Sequence
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from omegaconf import DictConfig
-
-from tokcollate import options
+if TYPE_CHECKING:
+    from omegaconf import DictConfig
 
+# subcommand names and their modules (imported only when the subcommand is executed)
 CMD_MODULES = {}
 
 
@@ -18,7 +19,7 @@ def _print_usage() -> None:
     )
 
 
-def parse_args(argv: Sequence[str]) -> DictConfig:
+def parse_args(argv: Sequence[str]) -> "DictConfig":
     """Shortcut for the argument parsing, given the subcommand."""
     if not argv:
         _print_usage()
@@ -29,6 +30,8 @@ def parse_args(argv: Sequence[str]) -> DictConfig:
         _print_usage()
         sys.exit(1)
 
+    from tokcollate import options  # noqa: PLC0415
+
     config = options.parse_args(argv[1:])
     config.command = cmd
 
@@ -42,7 +45,7 @@ def main(argv: Sequence[str]) -> int:
         logging.basicConfig(level=logging.INFO)
     elif config.log_level == "debug":
         logging.basicConfig(level=logging.DEBUG)
-    return CMD_MODULES[config.command].main(config)
+    return importlib.import_module(CMD_MODULES[config.command]).main(config)
 
 
 cli_dir = Path(__file__).parents[0]
@@ -55,6 +58,5 @@ for file in cli_dir.iterdir():
     ):
         cmd_name = file.stem if file.name.endswith(".py") else file
 
-        # Import all the CLI modules and register them for later calls
-        importlib.import_module(f"tokcollate_cli.{cmd_name}")
-        CMD_MODULES[cmd_name] = sys.modules[f"tokcollate_cli.{cmd_name}"]
+        # Register the CLI modules for later calls (without importing them)
+        CMD_MODULES[cmd_name] = f"tokcollate_cli.{cmd_name}"
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+import logging
+import sys
+import tempfile
+from pathlib import Path
+
+from omegaconf import DictConfig
+
+from tokcollate.benchmark import BenchmarkRunner, SyntheticCorpus, compare_benchmarks, load_benchmark, save_benchmark
+from tokcollate.options import parse_args
+
+logger = logging.getLogger(__name__)
+
+
+def main(config: DictConfig) -> int:
+    """Benchmark the scorer stages on a synthetic corpus and compare the results with a baseline.
+
+    Returns a non-zero exit code if a regression (with respect to the baseline) is detected.
+
+    OmegaConf Args:
+        bench.corpus: SyntheticCorpus parameters (num_systems, num_languages, num_lines, vocab_size, ...)
+        bench.metrics: (optional) list of the benchmarked metric names (defaults to all registered metrics)
+        bench.repeats: number of timed runs
+        bench.trace_memory: run an additional pass with the allocation tracing
+        bench.work_dir: (optional) directory for the generated data (a temporary directory by default)
+        bench.output_file: (optional) file for saving the benchmark results
+        bench.baseline_file: (optional) previously saved results to compare with
+        bench.time_threshold: maximum allowed ratio of the current and the baseline stage wall time
+        bench.memory_threshold: maximum allowed ratio of the current and the baseline stage memory peak
+    """
+    bench_config = config.get("bench", {})
+    corpus = SyntheticCorpus(**bench_config.get("corpus", {}))
+
+    with tempfile.TemporaryDirectory(prefix="tokcollate-bench-") as tmp_dir:
+        runner = BenchmarkRunner(
+            corpus=corpus,
+            work_dir=bench_config.get("work_dir", None) or tmp_dir,
+            metrics=bench_config.get("metrics", None),
+            repeats=bench_config.get("repeats", 3),
+            trace_memory=bench_config.get("trace_memory", True),
+        )
+        results = runner.run()
+
+    for name, stage in results["stages"].items():
+        logger.info(
+            "%-40s wall %8.3fs  cpu %8.3fs  peak %8.1fMB",
+            name,
+            stage["wall_time"],
+            stage["cpu_time"],
+            stage.get("peak_traced_mb", float("nan")),
+        )
+
+    if bench_config.get("output_file", None) is not None:
+        save_benchmark(results, Path(bench_config.output_file))
+        logger.info("Benchmark results saved to %s", bench_config.output_file)
+
+    if bench_config.get("baseline_file", None) is not None:
+        regressions = compare_benchmarks(
+            results,
+            load_benchmark(Path(bench_config.baseline_file)),
+            time_threshold=bench_config.get("time_threshold", 1.25),
+            memory_threshold=bench_config.get("memory_threshold", 1.25),
+        )
+        if regressions:
+            logger.error("Detected performance regressions:\n%s", "\n".join(regressions))
+            return 1
+        logger.info("No performance regressions detected.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))
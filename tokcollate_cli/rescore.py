@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+import logging
+import sys
+
+from omegaconf import DictConfig
+
+from tokcollate.cube import StatsCubeRescorer
+from tokcollate.options import parse_args
+
+logger = logging.getLogger(__name__)
+
+
+def main(config: DictConfig) -> int:
+    """Score the metrics from the stats cube saved by an earlier scorer run (without the dataset files).
+
+    Uses the rescore.cube_dir option and the scorer.metrics of the `run` command (see StatsCubeRescorer).
+    """
+    StatsCubeRescorer(config=config).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))
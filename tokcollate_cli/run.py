@@ -5,13 +5,21 @@ import sys
 from omegaconf import DictConfig
 
 from tokcollate.options import parse_args
+from tokcollate.planner import ResourcePlanner
 from tokcollate.scorer import TokCollateScorer
 
 logger = logging.getLogger(__name__)
 
 
 def main(config: DictConfig) -> int:
-    """Main TokCollate entry point. Executes the scoring based on the provided config file."""
+    """Main TokCollate entry point. Executes the scoring based on the provided config file.
+
+    With --dry-run, only the configuration is checked and the resource usage of the scoring is predicted.
+    """
+    if config.get("dry_run", False):
+        plan = ResourcePlanner.from_config(config).plan()
+        print(plan.report())  # noqa: T201
+        return 0
     scorer = TokCollateScorer(config=config)
     scorer.run()
     return 0
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import asyncio
+import logging
+import sys
+
+from omegaconf import DictConfig, OmegaConf
+
+from tokcollate.jobs import ScoringService, add_job_routes
+from tokcollate.options import parse_args
+from tokcollate.server import ResultsCache, ResultsIndex, TokCollateServer
+
+logger = logging.getLogger(__name__)
+
+
+def build_scoring_service(config: DictConfig) -> ScoringService | None:
+    """Create the on-demand scoring service if any scoring datasets are configured.
+
+    OmegaConf Args:
+        serve.datasets: mapping of dataset names to their scorer configuration files
+        serve.jobs.max_workers: number of concurrently running scoring jobs
+        serve.jobs.max_queued: maximum number of pending scoring jobs
+        serve.jobs.output_dir: (optional) directory for saving the job results
+    """
+    serve_config = config.get("serve", {})
+    datasets = serve_config.get("datasets", None)
+    if not datasets:
+        return None
+    jobs_config = serve_config.get("jobs", {})
+    return ScoringService(
+        datasets={name: OmegaConf.load(config_file) for name, config_file in datasets.items()},
+        max_workers=jobs_config.get("max_workers", 2),
+        max_queued=jobs_config.get("max_queued", 16),
+        output_dir=jobs_config.get("output_dir", None),
+    )
+
+
+def build_server(config: DictConfig) -> TokCollateServer:
+    """Create the results server based on the config contents.
+
+    OmegaConf Args:
+        serve.data_dirs: list of scorer output directories (or directories containing them) to serve
+        serve.host: listening address
+        serve.port: listening port
+        serve.cache_size_mb: memory budget of the decoded results cache
+        serve.cache_max_entries: maximum number of cached datasets
+    """
+    serve_config = config.get("serve", {})
+    data_dirs = list(serve_config.get("data_dirs", None) or [])
+    service = build_scoring_service(config)
+    if service is not None and service.output_dir is not None:
+        # make the finished job results available through the results endpoints
+        service.output_dir.mkdir(parents=True, exist_ok=True)
+        data_dirs.append(service.output_dir)
+    if not data_dirs and service is None:
+        err_msg = "Neither serve.data_dirs nor serve.datasets was found in the config file."
+        raise ValueError(err_msg)
+
+    server = TokCollateServer(
+        index=ResultsIndex(roots=data_dirs),
+        cache=ResultsCache(
+            max_bytes=serve_config.get("cache_size_mb", 512) * 2**20,
+            max_entries=serve_config.get("cache_max_entries", 64),
+        ),
+        host=serve_config.get("host", "127.0.0.1"),
+        port=serve_config.get("port", 8050),
+    )
+    if service is not None:
+        add_job_routes(server, service)
+    return server
+
+
+def main(config: DictConfig) -> int:
+    """Serve the scorer results (and the on-demand scoring jobs) over HTTP until interrupted."""
+    server = build_server(config)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("Shutting down the server...")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))
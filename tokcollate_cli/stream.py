@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+import logging
+import sys
+
+from omegaconf import DictConfig
+
+from tokcollate.options import parse_args
+from tokcollate.streaming import StreamingScorer
+
+logger = logging.getLogger(__name__)
+
+
+def main(config: DictConfig) -> int:
+    """Tokenize the plaintext dataset and score the tokenizers without writing the tokenized files.
+
+    Uses the tokenize.* options of the `tokenize` command and the scorer.metrics of the `run` command
+    (see StreamingScorer).
+    """
+    scorer = StreamingScorer(config=config)
+    scorer.run()
+    logger.info("Tokenization throughput:\n%s", scorer.runner.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+import logging
+import sys
+
+from omegaconf import DictConfig
+
+from tokcollate.options import parse_args
+from tokcollate.sweep import SentencePieceSweep
+
+logger = logging.getLogger(__name__)
+
+
+def main(config: DictConfig) -> int:
+    """Train a grid of SentencePiece models, encode the evaluation data and score all the models in a single run.
+
+    Uses the sweep.* options (see SentencePieceSweep.from_config) and the scorer.metrics of the `run` command.
+    """
+    sweep = SentencePieceSweep.from_config(config)
+    sweep.run(config)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import logging
+import sys
+
+from omegaconf import DictConfig, OmegaConf
+
+from tokcollate.options import parse_args
+from tokcollate.throughput import ThroughputBenchmark
+
+logger = logging.getLogger(__name__)
+
+
+def main(config: DictConfig) -> int:
+    """Measure the encoding speed (bytes/s, tokens/s and per-line latencies) of the tokenizers on each language.
+
+    OmegaConf Args:
+        throughput.input_dir: location of the plaintext `{lang}.{file_suffix}` files
+        throughput.output_dir: (optional) target location of the throughput_stats.json statistics
+        throughput.tokenizers: tokenizer specifications ({"type": sentencepiece|huggingface|callable, ...}) keyed by
+            the system labels
+        throughput.languages: list of the measured languages
+        throughput.file_suffix: suffix of the plaintext files
+        throughput.max_lines: (optional) number of the measured lines per language
+        throughput.warmup: number of the lines encoded before the measurement
+        throughput.num_trials: number of the measured passes over the lines
+        throughput.cpus: (optional) list of the CPUs the measurement is pinned to
+    """
+    throughput_config = config.throughput
+    benchmark = ThroughputBenchmark(
+        tokenizers=OmegaConf.to_container(throughput_config.tokenizers, resolve=True),
+        input_dir=throughput_config.input_dir,
+        languages=throughput_config.languages,
+        file_suffix=throughput_config.get("file_suffix", "txt"),
+        max_lines=throughput_config.get("max_lines", None),
+        warmup=throughput_config.get("warmup", 100),
+        num_trials=throughput_config.get("num_trials", 3),
+        cpus=throughput_config.get("cpus", None),
+        output_dir=throughput_config.get("output_dir", None),
+    )
+    benchmark.run()
+    logger.info("Encoding throughput:\n%s", benchmark.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))
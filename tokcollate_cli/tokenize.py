@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import logging
+import sys
+
+from omegaconf import DictConfig, OmegaConf
+
+from tokcollate.options import parse_args
+from tokcollate.tokenization import TokenizationRunner
+
+logger = logging.getLogger(__name__)
+
+
+def main(config: DictConfig) -> int:
+    """Tokenize the plaintext dataset files with multiple tokenizers (batched, in parallel worker processes).
+
+    OmegaConf Args:
+        tokenize.input_dir: location of the plaintext `{lang}.{file_suffix}` files
+        tokenize.output_dir: target location of the `{system}/{lang}.ids.npz` (or `.txt`) outputs
+        tokenize.tokenizers: tokenizer specifications ({"type": sentencepiece|huggingface|callable, ...}) keyed by
+            the system labels
+        tokenize.languages: (optional) list of the processed languages (defaults to all the input files)
+        tokenize.file_suffix: suffix of the plaintext files
+        tokenize.format: `ids` (compact token-id format) or `text` (whitespace-separated tokens)
+        tokenize.num_workers: number of worker processes per tokenizer
+        tokenize.shard_size: number of lines encoded in a single batch
+        tokenize.overwrite: re-tokenize the existing outputs
+    """
+    tokenize_config = config.tokenize
+    runner = TokenizationRunner(
+        tokenizers=OmegaConf.to_container(tokenize_config.tokenizers, resolve=True),
+        input_dir=tokenize_config.input_dir,
+        output_dir=tokenize_config.output_dir,
+        languages=tokenize_config.get("languages", None),
+        file_suffix=tokenize_config.get("file_suffix", "txt"),
+        output_format=tokenize_config.get("format", "ids"),
+        num_workers=tokenize_config.get("num_workers", 1),
+        shard_size=tokenize_config.get("shard_size", 10000),
+        overwrite=tokenize_config.get("overwrite", False),
+    )
+    runner.run()
+    logger.info("Tokenization throughput:\n%s", runner.summary())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))